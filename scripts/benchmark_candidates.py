@@ -0,0 +1,98 @@
+"""Benchmark creation of search tool candidate models in a pool of processes
+
+The candidates of a modelsearch space for pheno are created with map_in_processes.
+Then the first forward step of covsearch is run with the dummy estimation tool on a
+synthetic dataset with many covariates, so that the candidates of the step are created
+in one batch (wf_effects_addition) by the configured number of worker processes.
+
+Usage: python scripts/benchmark_candidates.py [max number of workers] [number of covariates]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pharmpy.config import ConfigurationContext
+from pharmpy.deps import numpy as np
+from pharmpy.modeling import read_model, set_covariates
+from pharmpy.tools import read_modelfit_results, run_covsearch
+from pharmpy.tools.mfl.helpers import all_combinations
+from pharmpy.tools.mfl.parse import parse as mfl_parse
+from pharmpy.tools.modelsearch.algorithms import create_candidate_exhaustive
+from pharmpy.tools.modelsearch.tool import create_base_model, filter_mfl_statements
+from pharmpy.workflows import ModelEntry
+from pharmpy.workflows.dispatchers import conf
+from pharmpy.workflows.pool import map_in_processes
+
+SEARCH_SPACE = 'ABSORPTION([FO,ZO,SEQ-ZO-FO]);ELIMINATION([FO,MM]);PERIPHERALS([0,1])'
+PHENO = Path(__file__).parent.parent / 'tests' / 'testdata' / 'nonmem' / 'pheno.mod'
+
+
+def candidate_inputs():
+    model = read_model(PHENO)
+    res = read_modelfit_results(PHENO)
+    mfl_statements = mfl_parse(SEARCH_SPACE, mfl_class=True)
+    base = create_base_model(mfl_statements, ModelEntry.create(model, modelfit_results=res))
+    mfl_funcs = filter_mfl_statements(mfl_statements, base)
+    base = ModelEntry.create(base.model, modelfit_results=res)
+    combinations = list(all_combinations(mfl_funcs))
+    return [
+        (f'modelsearch_run{i}', combo, set(mfl_funcs[feat] for feat in combo), 'no_add', base)
+        for i, combo in enumerate(combinations, 1)
+    ]
+
+
+def many_covariates_model(ncovariates):
+    model = read_model(PHENO)
+    res = read_modelfit_results(PHENO)
+    df = model.dataset
+    rng = np.random.default_rng(1234)
+    ids = df['ID'].unique()
+    names = [f'COV{i}' for i in range(1, ncovariates + 1)]
+    for name in names:
+        # NOTE: Positive covariates that are constant for each individual
+        values = dict(zip(ids, rng.lognormal(size=len(ids))))
+        df = df.assign(**{name: df['ID'].map(values)})
+    model = model.replace(dataset=df)
+    model = set_covariates(model, names)
+    search_space = f'COVARIATE?([CL,V],[{",".join(names)}],[exp,lin,pow])'
+    return model, res, search_space
+
+
+def main(max_workers=os.cpu_count(), ncovariates=25):
+    inputs = candidate_inputs()
+    print(f'modelsearch: {len(inputs)} candidates')
+    workers_list = sorted(w for w in {1, 2, max_workers} if w <= max_workers)
+    for workers in workers_list:
+        # NOTE: The first call starts the pool
+        map_in_processes(create_candidate_exhaustive, inputs[:workers], workers)
+        start = time.perf_counter()
+        map_in_processes(create_candidate_exhaustive, inputs, workers)
+        t = time.perf_counter() - start
+        print(f'{workers:3} workers{t:10.2f} s')
+
+    model, res, search_space = many_covariates_model(ncovariates)
+    print(f'covsearch: {2 * ncovariates * 3} candidates in the first forward step')
+    cwd = os.getcwd()
+    for workers in workers_list:
+        with tempfile.TemporaryDirectory() as path:
+            os.chdir(path)
+            with ConfigurationContext(conf, process_pool_workers=workers):
+                start = time.perf_counter()
+                run_covsearch(
+                    search_space,
+                    results=res,
+                    model=model,
+                    max_steps=1,
+                    algorithm='scm-forward',
+                    esttool='dummy',
+                )
+                t = time.perf_counter() - start
+            os.chdir(cwd)
+        print(f'{workers:3} workers{t:10.2f} s')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
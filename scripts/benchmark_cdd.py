@@ -0,0 +1,62 @@
+"""Benchmark CDD case statistics on synthetic leave-one-out results
+
+Usage: python scripts/benchmark_cdd.py [number of individuals] [number of parameters]
+"""
+
+import sys
+import timeit
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+import pharmpy.tools.cdd.results as cdd
+
+
+def synthetic_results(n, nparams, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n + 1)
+    iofv = pd.Series(rng.normal(10, 2, n), index=ids)
+    a = rng.normal(size=(nparams, nparams))
+    base_cov = a @ a.T / nparams + np.eye(nparams)
+    base = SimpleNamespace(
+        individual_ofv=iofv,
+        covariance_matrix=pd.DataFrame(base_cov),
+        parameter_estimates=pd.Series(rng.normal(size=nparams)),
+    )
+    results = []
+    for _ in ids:
+        a = rng.normal(size=(nparams, nparams))
+        results.append(
+            SimpleNamespace(
+                ofv=iofv.sum() - rng.uniform(10, 12),
+                covariance_matrix=pd.DataFrame(a @ a.T / nparams + np.eye(nparams)),
+            )
+        )
+    estimates = pd.DataFrame(rng.normal(size=(n, nparams)))
+    skipped = [[str(i)] for i in ids]
+    return base, results, estimates, skipped
+
+
+def main(n=2000, nparams=10):
+    base, results, estimates, skipped = synthetic_results(n, nparams)
+    benchmarks = {
+        'compute_delta_ofv': lambda: cdd.compute_delta_ofv(base, results, skipped),
+        'compute_covariance_ratios': lambda: cdd.compute_covariance_ratios(
+            results, base.covariance_matrix
+        ),
+        'compute_cook_scores': lambda: cdd.compute_cook_scores(
+            base.parameter_estimates, estimates, base.covariance_matrix
+        ),
+        'compute_jackknife_covariance_matrix': lambda: cdd.compute_jackknife_covariance_matrix(
+            estimates
+        ),
+    }
+    print(f'{n} cases, {nparams} parameters')
+    for name, func in benchmarks.items():
+        t = min(timeit.repeat(func, number=1, repeat=5))
+        print(f'{name:40}{t * 1000:10.2f} ms')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,76 @@
+"""Benchmark a forward step of covsearch with the dummy estimation tool
+
+All candidates of the first forward step are first created in process, with the
+memoised covariate statistics cleared before each candidate (as before they were
+cached) and with the statistics computed once for the dataset. Then a full run of
+covsearch limited to one forward step is timed using the dummy estimation tool.
+
+Usage: python scripts/benchmark_covsearch.py [number of copies of the pheno dataset]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pharmpy.deps import pandas as pd
+from pharmpy.modeling import covariate_effect, read_model
+from pharmpy.tools import read_modelfit_results, run_covsearch
+from pharmpy.tools.covsearch.tool import Candidate, task_add_covariate_effect
+from pharmpy.tools.mfl.parse import ModelFeatures
+from pharmpy.workflows import ModelEntry
+
+SEARCH_SPACE = 'COVARIATE?([CL,V],[WGT,APGR],[exp,lin,pow,piece_lin])'
+
+
+def large_model(copies):
+    path = Path(__file__).parent.parent / 'tests' / 'testdata' / 'nonmem' / 'pheno.mod'
+    model = read_model(path)
+    res = read_modelfit_results(path)
+    df = model.dataset
+    ids = df['ID'].max()
+    parts = [df.assign(ID=df['ID'] + i * ids) for i in range(copies)]
+    model = model.replace(dataset=pd.concat(parts, ignore_index=True))
+    return model, res
+
+
+def create_candidates(modelentry, effect_funcs, cached):
+    candidate = Candidate(modelentry, ())
+    for i, effect in enumerate(effect_funcs.items(), 1):
+        if not cached:
+            covariate_effect._covariate_statistics.clear()
+        task_add_covariate_effect(modelentry, candidate, effect, i)
+
+
+def main(copies=10):
+    model, res = large_model(copies)
+    print(f'{len(model.dataset)} rows')
+    effect_funcs = ModelFeatures.create_from_mfl_string(SEARCH_SPACE).convert_to_funcs()
+    effect_funcs = {k[1:-1]: v for k, v in effect_funcs.items() if k[-1] == 'ADD'}
+    modelentry = ModelEntry.create(model, modelfit_results=res)
+    print(f'{len(effect_funcs)} candidates')
+
+    for cached in (False, True):
+        start = time.perf_counter()
+        create_candidates(modelentry, effect_funcs, cached)
+        t = time.perf_counter() - start
+        print(f'{"cached" if cached else "uncached":10}{t:10.2f} s')
+
+    with tempfile.TemporaryDirectory() as path:
+        os.chdir(path)
+        start = time.perf_counter()
+        run_covsearch(
+            SEARCH_SPACE,
+            results=res,
+            model=model,
+            max_steps=1,
+            algorithm='scm-forward',
+            esttool='dummy',
+        )
+        t = time.perf_counter() - start
+        print(f'forward step{t:8.2f} s')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,75 @@
+"""Compare memory use of loaded and unloaded datasets in modeling.data
+
+A dataset with many records is generated. Summary functions are run on a model
+with the dataset loaded and on the same model with the dataset unloaded, in which
+case the file is read in chunks. The time and the peak of traced memory
+allocations (including loading the dataset) are printed.
+
+Usage: python scripts/benchmark_dataset_streaming.py [individuals] [records per individual]
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pharmpy.modeling import (
+    create_basic_pk_model,
+    get_covariate_baselines,
+    get_number_of_observations_per_individual,
+    load_dataset,
+    set_covariates,
+    unload_dataset,
+)
+
+FUNCTIONS = (get_number_of_observations_per_individual, get_covariate_baselines)
+
+
+def create_dataset(path, nids, nrecords):
+    rng = np.random.default_rng(1)
+    n = nids * nrecords
+    df = pd.DataFrame(
+        {
+            'ID': np.repeat(np.arange(1, nids + 1), nrecords),
+            'TIME': np.tile(np.arange(nrecords, dtype=float), nids),
+            'AMT': np.tile(np.r_[100.0, np.zeros(nrecords - 1)], nids),
+            'DV': rng.uniform(0, 10, n),
+            'WGT': np.repeat(rng.uniform(40, 100, nids), nrecords),
+            'AGE': np.repeat(rng.uniform(20, 80, nids), nrecords),
+        }
+    )
+    df.to_csv(path, index=False)
+
+
+def measure(function, model, load):
+    tracemalloc.start()
+    start = time.perf_counter()
+    if load:
+        model = load_dataset(model)
+    function(model)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(nids=20000, nrecords=50):
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = Path(tempdir) / 'data.csv'
+        create_dataset(path, nids, nrecords)
+        model = create_basic_pk_model('iv', dataset_path=path)
+        model = unload_dataset(set_covariates(model, ['WGT', 'AGE']))
+        print(f'{nids * nrecords} records')
+        for function in FUNCTIONS:
+            for load in (True, False):
+                elapsed, peak = measure(function, model, load)
+                mode = 'loaded' if load else 'in chunks'
+                print(f'{function.__name__:45}{mode:12}{elapsed:8.2f} s{peak / 2**20:10.1f} MiB')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,104 @@
+"""Profile parse, transform and write of a large NONMEM model
+
+A $PRED model with many THETAs, ETAs and dataset columns is generated. It is
+read, all initial estimates are updated, some parameters are fixed, the types of
+the covariate columns are set and the model is written. The total time and the
+functions with the largest cumulative time are printed. Imports are excluded
+by first running the same steps on a small model.
+
+Usage: python scripts/benchmark_large_model.py [THETAs] [ETAs] [columns]
+"""
+
+import cProfile
+import pstats
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pharmpy.modeling import (
+    fix_parameters,
+    read_model,
+    set_initial_estimates,
+    write_model,
+)
+
+
+def create_model(path, nthetas, netas, ncolumns):
+    ncovs = ncolumns - 3
+    covs = [f'COV{i}' for i in range(1, ncovs + 1)]
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(rng.uniform(1, 2, (50, ncovs)), columns=covs)
+    df.insert(0, 'ID', np.repeat(np.arange(1, 11), 5))
+    df.insert(1, 'TIME', np.tile(np.arange(5.0), 10))
+    df.insert(2, 'DV', rng.uniform(1, 2, 50))
+    df.to_csv(path / 'large.csv', index=False)
+
+    pred = []
+    for i in range(1, nthetas + 1):
+        term = f'THETA({i})'
+        if i <= netas:
+            term += f'*EXP(ETA({i}))'
+        term += f'*{covs[(i - 1) % ncovs]}'
+        pred.append(f'P{i} = {term}')
+    # NOTE: Sums of at most 10 terms to keep the parse trees shallow
+    pred.append('IPRED = 0')
+    for start in range(1, nthetas + 1, 10):
+        terms = ' + '.join(f'P{i}' for i in range(start, min(start + 10, nthetas + 1)))
+        pred.append(f'IPRED = IPRED + {terms}')
+    pred.append('Y = IPRED + EPS(1)')
+    code = (
+        '$PROBLEM large\n'
+        f'$INPUT {" ".join(df.columns)}\n'
+        '$DATA large.csv IGNORE=@\n'
+        '$PRED\n'
+        + '\n'.join(pred)
+        + '\n$THETA '
+        + '\n$THETA '.join(['(0,1)'] * nthetas)
+        + '\n$OMEGA '
+        + '\n$OMEGA '.join(['0.1'] * netas)
+        + '\n$SIGMA 0.1\n'
+        '$ESTIMATION METHOD=1 INTER\n'
+    )
+    (path / 'large.mod').write_text(code)
+    return path / 'large.mod'
+
+
+def parse_transform_write(path, outpath):
+    model = read_model(path)
+    model = set_initial_estimates(model, {name: 1.5 for name in model.parameters.names})
+    model = fix_parameters(model, model.parameters.names[::10])
+    di = model.datainfo
+    columns = [
+        di[name].replace(type='covariate') if name.startswith('COV') else di[name]
+        for name in di.names
+    ]
+    model = model.replace(datainfo=di.replace(columns=columns))
+    write_model(model, outpath, force=True)
+    return model
+
+
+def main(nthetas=200, netas=100, ncolumns=150):
+    with tempfile.TemporaryDirectory() as tempdir:
+        # NOTE: Warm up with a small model to leave imports out of the profile
+        (Path(tempdir) / 'small').mkdir()
+        small = create_model(Path(tempdir) / 'small', 2, 1, 4)
+        parse_transform_write(small, small.with_name('out.mod'))
+
+        path = create_model(Path(tempdir), nthetas, netas, ncolumns)
+        outpath = Path(tempdir) / 'out.mod'
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        model = parse_transform_write(path, outpath)
+        profiler.disable()
+        print(f'{len(model.parameters)} parameters, {len(model.datainfo)} columns')
+        print(f'parse, transform and write: {time.perf_counter() - start:.2f} s\n')
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,67 @@
+"""Benchmark the machine learning predictions of pharmpy.tools.funcs.ml
+
+Compares one invocation of the TFLite interpreter per row with batched
+invocations and with the numpy implementation of the networks.
+
+Usage: python scripts/benchmark_ml.py [number of rows]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from pharmpy.modeling import load_example_model
+from pharmpy.tools import load_example_modelfit_results
+from pharmpy.tools.funcs import ml
+
+MODEL_PATH = Path(ml.__file__).parent / 'ml_models' / 'outliers.tflite'
+
+
+def predict_per_row(npdata):
+    import tflite_runtime.interpreter as tflite
+
+    interpreter = tflite.Interpreter(str(MODEL_PATH))
+    interpreter.allocate_tensors()
+    input_index = interpreter.get_input_details()[0]['index']
+    output_index = interpreter.get_output_details()[0]['index']
+    output = np.empty(len(npdata))
+    for i in range(len(npdata)):
+        interpreter.set_tensor(input_index, npdata[i : i + 1])
+        interpreter.invoke()
+        output[i] = interpreter.get_tensor(output_index)[0][0]
+    return output
+
+
+def timed(name, function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    print(f'{name:24}{time.perf_counter() - start:10.4f} s')
+    return result
+
+
+def main(nrows=100000):
+    model = load_example_model('pheno')
+    results = load_example_modelfit_results('pheno')
+    timed('create dataset', ml._create_dataset, model, results)
+    data = ml._create_dataset(model, results)
+    npdata = np.ascontiguousarray(
+        np.resize(data.to_numpy(dtype=np.float32), (nrows, data.shape[1]))
+    )
+
+    numpy_predictor = ml._get_predictor(str(MODEL_PATH), 'numpy')
+    expected = timed('numpy', numpy_predictor, npdata)
+    try:
+        tflite_predictor = ml._get_predictor(str(MODEL_PATH), 'tflite')
+    except ImportError:
+        print('tflite_runtime is not installed')
+        return
+    output = timed('tflite per row', predict_per_row, npdata)
+    assert np.allclose(output, expected, rtol=1e-4, atol=1e-5)
+    output = timed('tflite batched', tflite_predictor, npdata)
+    assert np.allclose(output, expected, rtol=1e-4, atol=1e-5)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
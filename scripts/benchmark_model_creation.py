@@ -0,0 +1,64 @@
+"""Time hashing of datasets and creation of models sharing a large dataset
+
+The dataset of pheno is repeated to get a dataset of the given number of rows.
+The time to hash it with the previous tuple based runtime hash and with
+hash_df_runtime (first and memoised call) is printed. Then models are created
+from a model with this dataset by changing initial estimates and added to a
+set, which hashes each model, and the throughput in models/s is printed.
+
+Usage: python scripts/benchmark_model_creation.py [rows] [models]
+"""
+
+import sys
+import time
+
+from pharmpy.deps import pandas as pd
+from pharmpy.internals.df import _df_hash_values, hash_df_runtime
+from pharmpy.modeling import load_example_model, set_initial_estimates
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def tuple_hash(df):
+    return hash(tuple(map(lambda series: tuple(series.values), _df_hash_values(df))))
+
+
+def large_dataset(model, nrows):
+    df = model.dataset
+    ids = df['ID'].max()
+    n = -(-nrows // len(df))
+    parts = [df.assign(ID=df['ID'] + i * ids) for i in range(n)]
+    return pd.concat(parts, ignore_index=True).iloc[:nrows]
+
+
+def create_models(model, n):
+    models = set()
+    for i in range(n):
+        model = set_initial_estimates(model, {'PTVCL': 0.0047 + i * 1e-6})
+        models.add(model)
+    return models
+
+
+def main(nrows=2_000_000, nmodels=200):
+    model = load_example_model('pheno')
+    df = large_dataset(model, nrows)
+    print(f'{len(df)} rows')
+    _, t = timed(tuple_hash, df)
+    print(f'tuple hash       {t:8.3f} s')
+    _, t = timed(hash_df_runtime, df)
+    print(f'hash_df_runtime  {t:8.3f} s')
+    _, t = timed(hash_df_runtime, df)
+    print(f'memoised         {t * 1e6:8.1f} us')
+
+    model = model.replace(dataset=df)
+    models, t = timed(create_models, model, nmodels)
+    assert len(models) == nmodels
+    print(f'{nmodels} models in {t:.3f} s ({nmodels / t:.1f} models/s)')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,106 @@
+"""Benchmark finding the features of candidates and creating stepwise search workflows
+
+The structural features of the candidates of an exhaustive search from pheno are found
+with the separate checks (has_seq_zo_fo_absorption etc., as get_model_features did
+before), with get_structural_features with the memoised features of the ODE systems
+cleared before each candidate and with the features memoised. Then the workflows of the
+stepwise algorithms of modelsearch are created for the search space.
+
+Usage: python scripts/benchmark_modelsearch_candidates.py [search space]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from pharmpy.model import Model
+from pharmpy.modeling import (
+    get_number_of_peripheral_compartments,
+    get_number_of_transit_compartments,
+    has_first_order_absorption,
+    has_first_order_elimination,
+    has_instantaneous_absorption,
+    has_michaelis_menten_elimination,
+    has_mixed_mm_fo_elimination,
+    has_seq_zo_fo_absorption,
+    has_zero_order_absorption,
+    has_zero_order_elimination,
+    odes,
+    read_model,
+)
+from pharmpy.modeling.odes import get_structural_features, has_lag_time
+from pharmpy.tools.mfl.helpers import all_combinations, funcs, modelsearch_features
+from pharmpy.tools.mfl.parse import parse
+from pharmpy.tools.modelsearch.algorithms import exhaustive_stepwise, reduced_stepwise
+
+SEARCH_SPACE = (
+    'ABSORPTION([FO,ZO,SEQ-ZO-FO]);TRANSITS([1,3],*);LAGTIME([OFF,ON]);PERIPHERALS([0,1,2])'
+)
+ROUNDS = 5
+
+
+def create_candidates(search_space):
+    path = Path(__file__).parent.parent / 'tests' / 'testdata' / 'nonmem' / 'pheno.mod'
+    model = read_model(path)
+    mfl_funcs = funcs(model, parse(search_space), modelsearch_features)
+    candidates = []
+    for combo in all_combinations(mfl_funcs):
+        candidate = model
+        try:
+            for feat in combo:
+                candidate = mfl_funcs[feat](candidate)
+        except ValueError:
+            # NOTE: E.g. one transit with instantaneous absorption
+            continue
+        candidates.append(candidate)
+    return candidates
+
+
+def separate_checks(model):
+    return (
+        has_seq_zo_fo_absorption(model),
+        has_zero_order_absorption(model),
+        has_first_order_absorption(model),
+        has_instantaneous_absorption(model),
+        has_mixed_mm_fo_elimination(model),
+        has_zero_order_elimination(model),
+        has_first_order_elimination(model),
+        has_michaelis_menten_elimination(model),
+        get_number_of_transit_compartments(model),
+        model.statements.ode_system.find_depot(model.statements),
+        has_lag_time(model),
+        get_number_of_peripheral_compartments(model),
+    )
+
+
+def uncached(model):
+    odes._ode_features.clear()
+    return get_structural_features(model)
+
+
+def main(search_space=SEARCH_SPACE):
+    candidates = create_candidates(search_space)
+    print(f'{len(candidates)} candidates, {ROUNDS} rounds')
+
+    for name, func in (
+        ('separate checks', separate_checks),
+        ('uncached', uncached),
+        ('cached', get_structural_features),
+    ):
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            for candidate in candidates:
+                func(candidate)
+        t = time.perf_counter() - start
+        print(f'{name:20}{t:10.2f} s')
+
+    mfl_funcs = funcs(Model(), parse(search_space), modelsearch_features)
+    for algorithm in (exhaustive_stepwise, reduced_stepwise):
+        start = time.perf_counter()
+        _, model_tasks = algorithm(mfl_funcs, 'no_add')
+        t = time.perf_counter() - start
+        print(f'{algorithm.__name__:20}{t:10.2f} s ({len(model_tasks)} candidates)')
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:])
@@ -0,0 +1,74 @@
+"""Benchmark evaluation of weighted residuals for many individuals
+
+The pheno_linear dataset is replicated to the requested number of individuals
+and WRES are computed with evaluate_weighted_residuals and with a per individual
+loop using sqrtm(inv(C)).
+
+Usage: python scripts/benchmark_residuals.py [number of individuals]
+"""
+
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+from scipy import linalg
+
+from pharmpy.modeling import (
+    evaluate_epsilon_gradient,
+    evaluate_eta_gradient,
+    evaluate_population_prediction,
+    evaluate_weighted_residuals,
+    load_example_model,
+)
+from pharmpy.tools import load_example_modelfit_results
+
+
+def replicated_dataset(df, n):
+    ids = df['ID'].unique()
+    copies = -(-n // len(ids))
+    dfs = [df.assign(ID=df['ID'] + k * ids.max()) for k in range(copies)]
+    df = pd.concat(dfs, ignore_index=True)
+    return df[df['ID'].isin(np.sort(df['ID'].unique())[:n])].reset_index(drop=True)
+
+
+def loop_wres(model, parameters, df):
+    omega = model.random_variables.etas.covariance_matrix.subs(parameters).to_numpy()
+    sigma = model.random_variables.epsilons.covariance_matrix.subs(parameters).to_numpy()
+    etas = pd.DataFrame(0, index=df['ID'].unique(), columns=model.random_variables.etas.names)
+    G = evaluate_eta_gradient(model, etas=etas, parameters=parameters, dataset=df)
+    H = evaluate_epsilon_gradient(model, etas=etas, parameters=parameters, dataset=df)
+    F = evaluate_population_prediction(model, parameters=parameters, dataset=df)
+    G.index = H.index = F.index = df['ID']
+    wres = np.float64([])
+    for i in df['ID'].unique():
+        Gi = np.float64(G.loc[[i]])
+        Hi = np.float64(H.loc[[i]])
+        DVi = df['DV'][df['ID'] == i].to_numpy(dtype=np.float64)
+        Ci = Gi @ omega @ Gi.T + np.diag(np.diag(Hi @ sigma @ Hi.T))
+        wres = np.concatenate((wres, linalg.sqrtm(linalg.inv(Ci)) @ (DVi - F.loc[i:i])))
+    return wres
+
+
+def main(n=5000):
+    model = load_example_model('pheno_linear')
+    parameters = dict(load_example_modelfit_results('pheno_linear').parameter_estimates)
+    df = replicated_dataset(model.dataset, n)
+    print(f'{n} individuals, {len(df)} observations')
+
+    batched = evaluate_weighted_residuals(model, parameters=parameters, dataset=df)
+    loop = loop_wres(model, parameters, df)
+    print(f'max abs difference: {np.max(np.abs(batched.to_numpy() - loop)):.2e}')
+
+    for name, func in {
+        'evaluate_weighted_residuals': lambda: evaluate_weighted_residuals(
+            model, parameters=parameters, dataset=df
+        ),
+        'per individual loop': lambda: loop_wres(model, parameters, df),
+    }.items():
+        t = min(timeit.repeat(func, number=1, repeat=3))
+        print(f'{name:40}{t * 1000:10.2f} ms')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
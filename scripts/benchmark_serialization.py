@@ -0,0 +1,69 @@
+"""Compare serialization of models with sympy.srepr and the compact format
+
+The same large $PRED model as in benchmark_large_model.py is generated. The times
+to serialize all statement expressions and to deserialize them again are printed
+for sympy.srepr (the previous format) and for pharmpy.basic.serialization
+together with the total sizes of the serialized strings. The times of a full
+Model.to_dict, Model.from_dict and ModelHash are printed for the compact format.
+
+Usage: python scripts/benchmark_serialization.py [THETAs] [ETAs] [columns]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import sympy
+from benchmark_large_model import create_model
+
+from pharmpy.basic import serialization
+from pharmpy.model import Model
+from pharmpy.modeling import read_model
+from pharmpy.workflows.hashing import ModelHash
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def srepr_all(exprs):
+    return [sympy.srepr(sympy.sympify(expr)) for expr in exprs]
+
+
+def parse_all(strings):
+    return [serialization.decode(s) for s in strings]
+
+
+def encode_all(exprs):
+    return [serialization.encode(expr) for expr in exprs]
+
+
+def main(nthetas=200, netas=100, ncolumns=150):
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = create_model(Path(tempdir), nthetas, netas, ncolumns)
+        model = read_model(path)
+    exprs = [s.expression._expr for s in model.statements if hasattr(s, 'expression')]
+    print(f'{len(exprs)} expressions')
+    for name, encoder in (('srepr', srepr_all), ('compact', encode_all)):
+        strings, encode_time = timed(encoder, exprs)
+        decoded, decode_time = timed(parse_all, strings)
+        assert decoded == exprs
+        size = sum(len(s) for s in strings)
+        print(
+            f'{name:10}encode {encode_time:7.3f} s   decode {decode_time:7.3f} s'
+            f'   size {size / 1024:8.1f} KiB'
+        )
+    d, to_dict_time = timed(model.to_dict)
+    _, from_dict_time = timed(Model.from_dict, d)
+    _, hash_time = timed(ModelHash, model)
+    print(
+        f'Model.to_dict {to_dict_time:.3f} s   Model.from_dict {from_dict_time:.3f} s'
+        f'   ModelHash {hash_time:.3f} s'
+    )
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,67 @@
+"""Benchmark parsing the results of a simulation/estimation run per subproblem
+
+The simfit test run (3 subproblems with 2 estimation steps each) is extended to
+the given number of subproblems by repeating the first subproblem in the .lst, .ext
+and .phi-files. The results of all subproblems are then parsed one subproblem at a
+time as by simfit_results.
+
+Usage: python scripts/benchmark_simfit_parsing.py [number of subproblems]
+"""
+
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pharmpy.modeling import read_model
+from pharmpy.tools.external.nonmem.results import simfit_results
+
+SIMFIT = Path(__file__).parent.parent / 'tests' / 'testdata' / 'nonmem' / 'modelfit_results'
+SIMFIT = SIMFIT / 'simfit' / 'sim-1'
+
+
+def renumber(text, k):
+    text = re.sub(
+        r'(#TBLN:\s+|TABLE NO\.\s+)(\d+)', lambda m: f'{m[1]}{2 * k - 2 + int(m[2])}', text
+    )
+    text = re.sub(r'Subproblem=\d+', f'Subproblem={k}', text)
+    return re.sub(r'(SUBPROBLEM NO\.:\s+)\d+', rf'\g<1>{k}', text)
+
+
+def extend_table_file(suffix, n):
+    text = SIMFIT.with_suffix(suffix).read_text()
+    first = text[: text.index('TABLE NO.     3')]
+    return ''.join(renumber(first, k) for k in range(1, n + 1))
+
+
+def extend_lst(n):
+    lines = SIMFIT.with_suffix('.lst').read_text().splitlines(keepends=True)
+    starts = [i for i, line in enumerate(lines) if 'SUBPROBLEM NO.:' in line]
+    block = ''.join(lines[starts[0] : starts[1]])
+    head = ''.join(lines[: starts[0]]).replace('SUBPROBLEMS:    3', f'SUBPROBLEMS: {n:4}')
+    tail = ''.join(lines[starts[2] + starts[1] - starts[0] :])
+    return head + ''.join(renumber(block, k) for k in range(1, n + 1)) + tail
+
+
+def main(n=100):
+    with tempfile.TemporaryDirectory() as path:
+        path = Path(path) / 'sim-1.mod'
+        code = SIMFIT.with_suffix('.mod').read_text().replace('SUBPROB=3', f'SUBPROB={n}')
+        path.write_text(code)
+        path.with_suffix('.lst').write_text(extend_lst(n))
+        for suffix in ('.ext', '.phi'):
+            path.with_suffix(suffix).write_text(extend_table_file(suffix, n))
+        shutil.copy(SIMFIT.parent.parent.parent / 'pheno_real_linbase.dta', path.parent)
+        model = read_model(path)
+
+        start = time.perf_counter()
+        results = simfit_results(model, path)
+        t = time.perf_counter() - start
+        assert len(results) == n
+        print(f'{n} subproblems{t:10.2f} s')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
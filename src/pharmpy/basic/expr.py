@@ -11,6 +11,8 @@ else:
     from pharmpy.deps import symengine, sympy
     from pharmpy.deps.sympy_printing import pretty
 
+from . import serialization
+
 
 class ExprPrinter(pretty.PrettyPrinter):
     def __init__(self):
@@ -136,11 +138,11 @@ class Expr:
         return repr(sympy.sympify(self._expr))
 
     def serialize(self) -> str:
-        return sympy.srepr(sympy.sympify(self._expr))
+        return serialization.encode(self._expr)
 
     @classmethod
     def deserialize(cls, s: str) -> Expr:
-        return cls(sympy.parse_expr(s))
+        return cls(serialization.decode(s))
 
     def unicode(self) -> str:
         s = sympy.pretty(sympy.sympify(self._expr), wrap_line=False, use_unicode=True)
@@ -11,6 +11,7 @@ else:
     from pharmpy.deps import numpy as np
     from pharmpy.deps import symengine, sympy
 
+from . import serialization
 from .expr import Expr
 
 
@@ -72,7 +73,7 @@ class Matrix:
         return Matrix(sympy.sympify(self._m).diagonal())
 
     def serialize(self) -> str:
-        return sympy.srepr(sympy.sympify(self._m))
+        return serialization.encode_matrix(self._m)
 
     def unicode(self) -> str:
         return sympy.pretty(sympy.sympify(self._m), wrap_line=False, use_unicode=True)
@@ -115,7 +116,7 @@ class Matrix:
 
     @classmethod
     def deserialize(cls, s) -> Matrix:
-        return cls(sympy.parse_expr(s))
+        return cls(serialization.decode_matrix(s))
 
     def is_positive_semidefinite(self) -> bool | None:
         isp = sympy.Matrix(self._m).is_positive_semidefinite
@@ -0,0 +1,298 @@
+"""Compact serialization of symengine expressions
+
+An expression is written as a flat list of opcodes in prefix order together
+with a table of the names of its symbols, each name stored once. The list is
+encoded as JSON after a format tag, e.g. CL*exp(ETA_1) is encoded as
+
+    @1[["ETA_1","CL"],["*",2,"^","c","E","s",0,"s",1]]
+
+The arguments of sums, products, conjunctions and disjunctions are sorted so that
+equal expressions are encoded to the same string, e.g. for hashing. Decoding
+builds the symengine objects directly without going through sympy. Strings
+without the tag are taken to be in the previous format, i.e. sympy.srepr, so
+that stored models and results can still be read. Subexpressions that cannot be
+encoded are stored in the srepr format within the opcode list.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import symengine
+    import sympy
+else:
+    from pharmpy.deps import symengine, sympy
+
+FORMAT_VERSION = 1
+_TAG = '@'
+_PREFIX = f'{_TAG}{FORMAT_VERSION}'
+
+_RELATIONALS = {
+    'Equality': '==',
+    'Unequality': '!=',
+    'StrictLessThan': '<',
+    'LessThan': '<=',
+}
+
+_CONSTANTS = {
+    'Exp1': 'E',
+    'Pi': 'pi',
+    'Infinity': 'oo',
+    'NegativeInfinity': '-oo',
+    'NaN': 'nan',
+    'ComplexInfinity': 'zoo',
+    'BooleanTrue': 'true',
+    'BooleanFalse': 'false',
+    'ImaginaryUnit': 'I',
+}
+
+_NARY = {'Add': '+', 'Mul': '*', 'And': '&', 'Or': '|'}
+
+
+def is_encoded(s: str) -> bool:
+    """Check if a string is in the compact format (and not srepr)"""
+    return s.startswith(_TAG)
+
+
+def encode(expr: symengine.Basic) -> str:
+    """Encode a symengine expression
+
+    Parameters
+    ----------
+    expr : symengine.Basic
+        Expression
+
+    Returns
+    -------
+    str
+        Encoded expression with format tag
+    """
+    encoder = _Encoder()
+    encoder.encode(expr)
+    return _PREFIX + json.dumps([encoder.names, encoder.ops], separators=(',', ':'))
+
+
+def encode_matrix(matrix: symengine.DenseMatrix) -> str:
+    """Encode a symengine matrix
+
+    The elements are encoded in row-major order with one table of symbol names.
+
+    Parameters
+    ----------
+    matrix : symengine.DenseMatrix
+        Matrix
+
+    Returns
+    -------
+    str
+        Encoded matrix with format tag
+    """
+    encoder = _Encoder()
+    for i in range(matrix.rows):
+        for j in range(matrix.cols):
+            encoder.encode(matrix[i, j])
+    shape = [matrix.rows, matrix.cols]
+    return _PREFIX + json.dumps([encoder.names, encoder.ops, shape], separators=(',', ':'))
+
+
+def decode_matrix(s: str) -> symengine.DenseMatrix:
+    """Decode a matrix encoded with encode_matrix or sympy.srepr
+
+    Parameters
+    ----------
+    s : str
+        Encoded matrix
+
+    Returns
+    -------
+    symengine.DenseMatrix
+        Matrix
+    """
+    if not is_encoded(s):
+        return symengine.Matrix(sympy.parse_expr(s))
+    names, ops, shape = _load(s)
+    symbols = [symengine.Symbol(name) for name in names]
+    rows, cols = shape
+    elements = []
+    pos = 0
+    for _ in range(rows * cols):
+        element, pos = _decode(ops, pos, symbols)
+        elements.append(element)
+    return symengine.Matrix(rows, cols, elements)
+
+
+def decode(s: str) -> symengine.Basic:
+    """Decode an expression encoded with encode or sympy.srepr
+
+    Parameters
+    ----------
+    s : str
+        Encoded expression
+
+    Returns
+    -------
+    symengine.Basic
+        Expression
+    """
+    if not is_encoded(s):
+        return symengine.sympify(sympy.parse_expr(s))
+    names, ops = _load(s)
+    symbols = [symengine.Symbol(name) for name in names]
+    expr, pos = _decode(ops, 0, symbols)
+    assert pos == len(ops)
+    return expr
+
+
+def _load(s: str) -> list:
+    start = s.index('[')
+    version = int(s[len(_TAG) : start])
+    if version != FORMAT_VERSION:
+        raise ValueError(f'Unsupported serialization format version {version}')
+    return json.loads(s[start:])
+
+
+class _Encoder:
+    # NOTE: Expressions are first converted to trees of tuples that are flattened
+    # into opcodes. The arguments of commutative operations are sorted, because the
+    # order of the args of symengine objects depends on how they were created, so
+    # that equal expressions are always encoded to the same string.
+
+    def __init__(self):
+        self.names: list[str] = []
+        self.ops: list = []
+        self._index: dict[str, int] = {}
+
+    def encode(self, expr):
+        self._flatten(_tree(expr))
+
+    def _flatten(self, node):
+        ops = self.ops
+        op = node[0]
+        if op == 's':
+            name = node[1]
+            i = self._index.get(name)
+            if i is None:
+                i = len(self.names)
+                self._index[name] = i
+                self.names.append(name)
+            ops.extend(('s', i))
+        elif op in _LEAVES:
+            ops.extend(node)
+        else:
+            ops.extend(node[:-1])
+            children = node[-1]
+            if op not in _FIXED_ARITY:
+                ops.append(len(children))
+            for child in children:
+                self._flatten(child)
+
+
+_LEAVES = frozenset(('i', 'f', 'q', 'c', 'r'))
+_FIXED_ARITY = frozenset(('^', 'R', '!'))
+
+
+def _tree(expr):
+    typename = type(expr).__name__
+    if typename == 'Symbol':
+        return ('s', expr.name)
+    elif isinstance(expr, symengine.Integer):
+        # NOTE: Also the singletons One, Zero and NegativeOne
+        return ('i', int(expr))
+    elif typename == 'RealDouble':
+        return ('f', float(expr))
+    elif isinstance(expr, symengine.Rational):
+        p, q = expr.get_num_den()
+        return ('q', int(p), int(q))
+    elif typename in _NARY:
+        return (_NARY[typename], tuple(sorted(_tree(arg) for arg in expr.args)))
+    elif typename == 'Pow':
+        return ('^', tuple(_tree(arg) for arg in expr.args))
+    elif typename in _CONSTANTS:
+        return ('c', _CONSTANTS[typename])
+    elif typename in _RELATIONALS:
+        return ('R', _RELATIONALS[typename], tuple(_tree(arg) for arg in expr.args))
+    elif typename == 'Not':
+        return ('!', (_tree(expr.args[0]),))
+    elif typename == 'Piecewise':
+        return ('P', tuple(_tree(arg) for arg in expr.args))
+    elif typename == 'Derivative':
+        return ('D', tuple(_tree(arg) for arg in expr.args))
+    elif typename == 'FunctionSymbol':
+        return ('U', expr.get_name(), tuple(_tree(arg) for arg in expr.args))
+    elif isinstance(expr, symengine.Function) and hasattr(symengine, typename):
+        return ('F', typename, tuple(_tree(arg) for arg in expr.args))
+    else:
+        return ('r', sympy.srepr(sympy.sympify(expr)))
+
+
+def _decode(ops, pos, symbols):
+    op = ops[pos]
+    if op == 's':
+        return symbols[ops[pos + 1]], pos + 2
+    elif op == 'i':
+        return symengine.Integer(ops[pos + 1]), pos + 2
+    elif op == 'f':
+        return symengine.RealDouble(ops[pos + 1]), pos + 2
+    elif op == 'q':
+        return symengine.Rational(ops[pos + 1], ops[pos + 2]), pos + 3
+    elif op == '^':
+        base, pos = _decode(ops, pos + 1, symbols)
+        exp, pos = _decode(ops, pos, symbols)
+        return symengine.Pow(base, exp), pos
+    elif op == 'c':
+        return _constant(ops[pos + 1]), pos + 2
+    elif op == 'R':
+        lhs, pos2 = _decode(ops, pos + 2, symbols)
+        rhs, pos2 = _decode(ops, pos2, symbols)
+        return _RELATIONAL_CONSTRUCTORS[ops[pos + 1]](lhs, rhs), pos2
+    elif op == '!':
+        arg, pos = _decode(ops, pos + 1, symbols)
+        return symengine.Not(arg), pos
+    elif op in ('U', 'F'):
+        args, pos2 = _decode_args(ops, pos + 2, symbols)
+        name = ops[pos + 1]
+        function = symengine.Function(name) if op == 'U' else getattr(symengine, name)
+        return function(*args), pos2
+    elif op == 'r':
+        return symengine.sympify(sympy.parse_expr(ops[pos + 1])), pos + 2
+    args, pos = _decode_args(ops, pos + 1, symbols)
+    if op == '+':
+        return symengine.Add(*args), pos
+    elif op == '*':
+        return symengine.Mul(*args), pos
+    elif op == '&':
+        return symengine.And(*args), pos
+    elif op == '|':
+        return symengine.Or(*args), pos
+    elif op == 'P':
+        pairs = [(args[i], args[i + 1]) for i in range(0, len(args), 2)]
+        return symengine.Piecewise(*pairs), pos
+    elif op == 'D':
+        return symengine.Derivative(*args), pos
+    raise ValueError(f'Unknown opcode {op} in serialized expression')
+
+
+def _decode_args(ops, pos, symbols):
+    n = ops[pos]
+    pos += 1
+    args = []
+    for _ in range(n):
+        arg, pos = _decode(ops, pos, symbols)
+        args.append(arg)
+    return args, pos
+
+
+def _constant(name):
+    if name == '-oo':
+        return -symengine.oo
+    return getattr(symengine, name)
+
+
+_RELATIONAL_CONSTRUCTORS = {
+    '==': lambda lhs, rhs: symengine.Eq(lhs, rhs),
+    '!=': lambda lhs, rhs: symengine.Ne(lhs, rhs),
+    '<': lambda lhs, rhs: symengine.Lt(lhs, rhs),
+    '<=': lambda lhs, rhs: symengine.Le(lhs, rhs),
+}
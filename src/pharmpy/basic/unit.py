@@ -11,7 +11,11 @@ class Unit:
         if isinstance(source, Unit):
             self._expr = source._expr
         else:
-            self._expr = sympy.sympify(source).subs(_unit_subs())
+            expr = sympy.sympify(source)
+            # NOTE: Only substitute the symbols in expr. Most units (e.g. 1) have none.
+            unit_subs = _unit_subs()
+            subs = {s: unit_subs[s] for s in expr.free_symbols if s in unit_subs}
+            self._expr = expr.subs(subs) if subs else expr
 
     def unicode(self) -> str:
         printer = UnitPrinter()
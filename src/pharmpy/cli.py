@@ -611,6 +611,28 @@ def results_print(args):
     print(res)
 
 
+def results_profile(args):
+    """Subcommand to summarize the trace of a tool run"""
+    path = args.context / 'trace.json'
+    if not path.is_file():
+        error(FileNotFoundError(str(path)))
+    import json
+
+    from pharmpy.workflows.trace import summarize_trace
+
+    with open(path, 'r') as f:
+        trace = json.load(f)
+    summary = summarize_trace(trace)
+    with pd.option_context('display.max_columns', None, 'display.width', None):
+        print(summary.head(args.top))
+    profiles = sorted((args.context / 'profiles').glob('*.prof'))
+    if profiles:
+        print()
+        print('Profiles:')
+        for profile in profiles:
+            print(profile)
+
+
 def results_qa(args):
     from pharmpy.tools.qa.results import psn_qa_results
 
@@ -1501,6 +1523,28 @@ parser_definition = [
                         ],
                     }
                 },
+                {
+                    'profile': {
+                        'help': 'Summarize where a tool run spent its time',
+                        'description': 'Summarize the trace of a tool run per task name. The '
+                        'trace is recorded if the trace option of pharmpy.workflows is set.',
+                        'func': results_profile,
+                        'args': [
+                            {
+                                'name': 'context',
+                                'metavar': 'directory',
+                                'type': Path,
+                                'help': 'Path to the context directory of the tool run',
+                            },
+                            {
+                                'name': '--top',
+                                'type': int,
+                                'default': 20,
+                                'help': 'Number of tasks to show (default 20)',
+                            },
+                        ],
+                    }
+                },
                 {
                     'qa': {
                         'help': 'Generate qa results',
@@ -80,6 +80,9 @@ class ConfigItem:
         return instance.__dict__.get(self.name, self.default)
 
     def __set__(self, instance, value):
+        if value is None and self.default is None:
+            instance.__dict__[self.name] = None
+            return
         try:
             if isinstance(self.default, list) and isinstance(value, str):
                 value = [v.strip() for v in value.split(',')]
@@ -2,3 +2,4 @@ from pharmpy.internals.module.lazy import LazyImport
 
 stats = LazyImport('stats', globals(), 'scipy.stats')
 linalg = LazyImport('linalg', globals(), 'scipy.linalg')
+optimize = LazyImport('optimize', globals(), 'scipy.optimize')
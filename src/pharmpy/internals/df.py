@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from hashlib import sha256
+from hashlib import blake2b, sha256
 from typing import TYPE_CHECKING, Iterator, Union
 
 if TYPE_CHECKING:
@@ -8,6 +8,11 @@ if TYPE_CHECKING:
 else:
     from pharmpy.deps import pandas as pd
 
+from .memo import IdentityMemo
+
+# NOTE: Runtime hashes of DataFrames
+_runtime_hashes: IdentityMemo[int] = IdentityMemo()
+
 
 def _pd_hash_values(obj: Union[pd.Index, pd.Series, pd.DataFrame]) -> pd.Series:
     # NOTE: We explicit all arguments for future-proofing
@@ -24,7 +29,20 @@ def _df_hash_values(df: pd.DataFrame) -> Iterator[pd.Series]:
 
 
 def hash_df_runtime(df: pd.DataFrame) -> int:
-    return hash(tuple(map(lambda series: tuple(series.values), _df_hash_values(df))))
+    """Hash of a DataFrame for use within the running process
+
+    The hash is computed from the buffers of the row hashes and memoised for the
+    DataFrame object, i.e. the DataFrame must not be modified in place after it
+    has been hashed.
+    """
+    return _runtime_hashes.get(df, lambda: _compute_hash_df_runtime(df))
+
+
+def _compute_hash_df_runtime(df: pd.DataFrame) -> int:
+    digest = blake2b(digest_size=8)
+    for series in _df_hash_values(df):
+        digest.update(series.to_numpy())  # pyright: ignore [reportArgumentType]
+    return int.from_bytes(digest.digest(), 'little', signed=True)
 
 
 def hash_df_fs(df: pd.DataFrame) -> str:
@@ -20,6 +20,8 @@ def cache_method(func):
 
 
 class Immutable(ABC):
+    __slots__ = ()
+
     def __copy__(self):
         return self
 
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import weakref
+from typing import Any, Callable, Generic, TypeVar
+
+V = TypeVar('V')
+
+
+class IdentityMemo(Generic[V]):
+    """Values memoised by the identity of objects
+
+    A value is removed when its object is collected. The objects are not referenced
+    by the memo, so they must support weak references and must not be modified in
+    place after a value has been memoised for them.
+    """
+
+    def __init__(self):
+        self._values: dict[int, V] = {}
+
+    def get(self, obj: Any, compute: Callable[[], V]) -> V:
+        """Get the value memoised for obj, computing and memoising it if needed"""
+        key = id(obj)
+        value = self._values.get(key)
+        if value is None:
+            value = compute()
+            self._values[key] = value
+            weakref.finalize(obj, self._values.pop, key, None)
+        return value
+
+    def clear(self):
+        self._values.clear()
+
+    def __contains__(self, obj: Any) -> bool:
+        return id(obj) in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
@@ -4,6 +4,8 @@ from typing import Iterable, Iterator, List, Tuple, Union
 from lark import Token, Transformer, Tree
 from lark.tree import Meta
 
+_LARK_1_1_6 = version('lark') == '1.1.6'
+
 WS = {' ', '\x00', '\t'}
 LF = {'\r', '\n'}
 
@@ -49,7 +51,7 @@ def _item_range(x: Union[Tree, Token]) -> Tuple[int, int]:
     if isinstance(x, Tree):
         i = x.meta.start_pos
         j = x.meta.end_pos
-        if version('lark') == '1.1.6':
+        if _LARK_1_1_6:
             j = _get_new_end_pos(x)
     else:
         i = x.start_pos
@@ -109,7 +111,7 @@ class InterleaveIgnored(Transformer):
 def with_ignored_tokens(source, tree):
     new_tree = InterleaveIgnored(source).transform(tree)
 
-    if version('lark') == '1.1.6' and new_tree.children:
+    if _LARK_1_1_6 and new_tree.children:
         new_tree.meta.end_pos = _get_new_end_pos(new_tree)
 
     final_meta = Meta()
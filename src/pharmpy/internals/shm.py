@@ -0,0 +1,340 @@
+"""Handoff of immutable DataFrames between processes through shared memory
+
+A SharedDataFrameStore owns shared memory segments holding the numeric blocks
+of datasets. While a store is active, share_dataframe returns a small picklable
+SharedDataFrame handle instead of the DataFrame itself, so that pickling an
+object referencing the dataset only transfers the handle. Opening the handle in
+the receiving process attaches to the segment and builds the DataFrame on top
+of the shared buffer without copying (when all shared columns have the same
+dtype, which is the common case for NONMEM datasets).
+
+Frames built from shared memory are read-only. Datasets are treated as
+immutable throughout Pharmpy so this should never be noticed, but an in-place
+write would otherwise corrupt the dataset for all processes.
+"""
+
+from __future__ import annotations
+
+import gc
+import threading
+import uuid
+import weakref
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    from pharmpy.deps import numpy as np
+    from pharmpy.deps import pandas as pd
+
+_ALIGNMENT = 64
+
+# Segments attached to (or owned by) this process, by segment name
+_attached: dict[str, shared_memory.SharedMemory] = {}
+_attached_lock = threading.Lock()
+
+# Original DataFrames of segments owned by a store in this process
+_originals: dict[str, pd.DataFrame] = {}
+
+# Handles of DataFrames opened from shared memory in this process, by id
+_opened: dict[int, SharedDataFrame] = {}
+
+# Number of live DataFrames opened from each attached segment, by segment name
+_open_counts: dict[str, int] = {}
+
+_active_store: Optional[SharedDataFrameStore] = None
+
+
+class SharedDataFrame:
+    """Picklable handle to a DataFrame stored in shared memory
+
+    Parameters
+    ----------
+    key : str
+        Key identifying the dataset (e.g. its dataset hash)
+    segment : str
+        Name of the shared memory segment
+    nrows : int
+        Number of rows
+    blocks : tuple
+        One (dtype, offset, column labels) triple per shared block
+    columns : pd.Index
+        Column labels in original order
+    index : pd.Index
+        Row index
+    inline : pd.DataFrame or None
+        Columns that could not be shared (e.g. object or categorical columns)
+    """
+
+    __slots__ = ('key', 'segment', 'nrows', 'blocks', 'columns', 'index', 'inline')
+
+    def __init__(self, key, segment, nrows, blocks, columns, index, inline):
+        self.key = key
+        self.segment = segment
+        self.nrows = nrows
+        self.blocks = blocks
+        self.columns = columns
+        self.index = index
+        self.inline = inline
+
+    def __getstate__(self):
+        return tuple(getattr(self, attr) for attr in self.__slots__)
+
+    def __setstate__(self, state):
+        for attr, value in zip(self.__slots__, state):
+            setattr(self, attr, value)
+
+    def __repr__(self):
+        return f'SharedDataFrame({self.key!r}, segment={self.segment!r})'
+
+    def open(self) -> pd.DataFrame:
+        """Create a read-only DataFrame viewing the shared memory
+
+        In the process owning the segment the original DataFrame is returned.
+        """
+        original = _originals.get(self.segment)
+        if original is not None:
+            return original
+        buf = _attach(self.segment).buf
+        frames = []
+        for dtype, offset, labels in self.blocks:
+            dtype = np.dtype(dtype)
+            # NOTE: Unlike np.ndarray, np.frombuffer holds on to the buffer export so
+            # that the segment cannot be unmapped while the frame is alive
+            block = np.frombuffer(
+                buf, dtype=dtype, count=len(labels) * self.nrows, offset=offset
+            ).reshape(len(labels), self.nrows)
+            block.flags.writeable = False
+            frames.append(pd.DataFrame(block.T, columns=labels, copy=False))
+        if self.inline is not None:
+            frames.append(self.inline.reset_index(drop=True))
+
+        if len(frames) == 1:
+            df = frames[0]
+        else:
+            df = pd.concat(frames, axis=1)[self.columns]
+        df.index = self.index
+        _opened[id(df)] = self
+        with _attached_lock:
+            _open_counts[self.segment] = _open_counts.get(self.segment, 0) + 1
+        weakref.finalize(df, _collected, id(df), self.segment)
+        return df
+
+
+class SharedDataFrameStore:
+    """Owner of shared memory segments for a set of DataFrames
+
+    Use as a context manager to make it the active store. All segments are
+    released when the context is exited.
+
+    Parameters
+    ----------
+    key : callable
+        Function computing a content key for a DataFrame. DataFrames with the
+        same key are only stored once.
+    """
+
+    def __init__(self, key: Callable[[pd.DataFrame], str]):
+        self._key = key
+        self._lock = threading.Lock()
+        self._handles: dict[str, SharedDataFrame] = {}
+        self._keys_by_id: dict[int, str] = {}
+        self._segments: list[shared_memory.SharedMemory] = []
+        self._previous = None
+
+    def __enter__(self):
+        global _active_store
+        self._previous = _active_store
+        _active_store = self
+        return self
+
+    def __exit__(self, *_):
+        global _active_store
+        _active_store = self._previous
+        self.close()
+
+    def __len__(self):
+        return len(self._handles)
+
+    def share(self, df: pd.DataFrame) -> SharedDataFrame:
+        """Store a DataFrame in shared memory (once per content key)
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            DataFrame to share
+
+        Returns
+        -------
+        SharedDataFrame
+            Handle to the shared DataFrame
+        """
+        with self._lock:
+            key = self._keys_by_id.get(id(df))
+            if key is None:
+                key = self._key(df)
+                self._keys_by_id[id(df)] = key
+                weakref.finalize(df, self._keys_by_id.pop, id(df), None)
+            handle = self._handles.get(key)
+            if handle is None:
+                handle = self._create(key, df)
+                self._handles[key] = handle
+            return handle
+
+    def _create(self, key: str, df: pd.DataFrame) -> SharedDataFrame:
+        groups: dict[np.dtype, list[int]] = {}
+        inline = []
+        for i, dtype in enumerate(df.dtypes):
+            if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+                groups.setdefault(dtype, []).append(i)
+            else:
+                inline.append(i)
+
+        nrows = len(df)
+        layout = []
+        size = 0
+        for dtype, positions in groups.items():
+            layout.append((dtype, size, positions))
+            nbytes = dtype.itemsize * nrows * len(positions)
+            size += -(-nbytes // _ALIGNMENT) * _ALIGNMENT
+
+        segment = shared_memory.SharedMemory(
+            name=f'pharmpy_{uuid.uuid4().hex[:16]}', create=True, size=max(size, 1)
+        )
+        self._segments.append(segment)
+        with _attached_lock:
+            _attached[segment.name] = segment
+        _originals[segment.name] = df
+
+        blocks = []
+        for dtype, offset, positions in layout:
+            block = np.ndarray(
+                (len(positions), nrows), dtype=dtype, buffer=segment.buf, offset=offset
+            )
+            block[:] = df.iloc[:, positions].to_numpy(dtype=dtype).T
+            blocks.append((dtype.str, offset, df.columns[positions]))
+
+        return SharedDataFrame(
+            key,
+            segment.name,
+            nrows,
+            tuple(blocks),
+            df.columns,
+            df.index,
+            df.iloc[:, inline] if inline else None,
+        )
+
+    def close(self):
+        """Release all shared memory segments owned by the store"""
+        with self._lock:
+            for segment in self._segments:
+                with _attached_lock:
+                    attached = _attached.pop(segment.name, None)
+                _originals.pop(segment.name, None)
+                if attached is not None and attached is not segment:
+                    _release(attached)
+                _release(segment)
+                segment.unlink()
+            self._segments = []
+            self._handles = {}
+            self._keys_by_id = {}
+
+
+# Segments that could not be closed since frames viewing them were alive
+_unreleased: list[shared_memory.SharedMemory] = []
+
+
+def _release(*segments: shared_memory.SharedMemory):
+    with _attached_lock:
+        pending = _unreleased + list(segments)
+        _unreleased.clear()
+        for segment in pending:
+            try:
+                segment.close()
+            except BufferError:
+                # NOTE: The mapping must be kept until the frames viewing it are gone
+                _unreleased.append(segment)
+
+
+def _collected(df_id: int, name: str):
+    # Close an attached segment when the last frame opened from it is gone
+    _opened.pop(df_id, None)
+    with _attached_lock:
+        count = _open_counts.pop(name, 0) - 1
+        if count > 0:
+            _open_counts[name] = count
+            return
+        segment = None if name in _originals else _attached.pop(name, None)
+        if segment is not None:
+            # NOTE: Closed by the next release since the blocks of the frame
+            # being finalized still hold the buffer
+            _unreleased.append(segment)
+
+
+def detach():
+    """Detach from all shared memory segments not owned by this process
+
+    Segments still viewed by live frames are kept mapped until a later call.
+    """
+    with _attached_lock:
+        names = [name for name in _attached if name not in _originals]
+        segments = [_attached.pop(name) for name in names]
+    _release(*segments)
+    if _unreleased:
+        # NOTE: Frames only kept alive by reference cycles
+        gc.collect()
+        _release()
+
+
+class attached:
+    """Context for a consumer of shared DataFrames
+
+    Segments attached to while in the context are closed on exit (or as soon as
+    the frames viewing them are gone if later).
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        detach()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    with _attached_lock:
+        segment = _attached.get(name)
+        if segment is None:
+            segment = shared_memory.SharedMemory(name=name)
+            _attached[name] = segment
+        return segment
+
+
+def get_active_store() -> Optional[SharedDataFrameStore]:
+    """Get the currently active store or None if no store is active"""
+    return _active_store
+
+
+def share_dataframe(df):
+    """Replace a DataFrame with a shared memory handle if a store is active
+
+    DataFrames opened from shared memory are always replaced with their handle
+    so that they are not copied when sent back to the owning process.
+    """
+    if not isinstance(df, pd.DataFrame):
+        return df
+    handle = _opened.get(id(df))
+    if handle is not None:
+        return handle
+    store = _active_store
+    if store is None:
+        return df
+    return store.share(df)
+
+
+def open_dataframe(obj):
+    """Open a shared memory handle, passing other objects through"""
+    if isinstance(obj, SharedDataFrame):
+        return obj.open()
+    return obj
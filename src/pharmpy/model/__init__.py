@@ -2,6 +2,7 @@ from .data import DatasetError, DatasetWarning
 from .datainfo import ColumnInfo, DataInfo
 from .distributions.symbolic import Distribution, JointNormalDistribution, NormalDistribution
 from .execution_steps import EstimationStep, ExecutionSteps, SimulationStep
+from .lazy_dataset import LazyDataset
 from .model import Model, ModelError, ModelfitResultsError, ModelSyntaxError
 from .parameters import Parameter, Parameters
 from .random_variables import RandomVariables, VariabilityHierarchy, VariabilityLevel
@@ -33,6 +34,7 @@ __all__ = (
     'ExecutionSteps',
     'Infusion',
     'JointNormalDistribution',
+    'LazyDataset',
     'Model',
     'ModelError',
     'ModelfitResultsError',
@@ -18,6 +18,10 @@ Data
      - ``'-99'``
      - str
      - Data value to convert NA to when writing data
+   * - ``chunksize``
+     - 100000
+     - int
+     - Number of rows per chunk when a dataset is read in chunks (see LazyDataset)
 
 """
 
@@ -30,6 +34,9 @@ class DataConfiguration(config.Configuration):
         [-99], 'List of data values to be converted to NA when reading data'
     )
     na_rep = config.ConfigItem('-99', 'What to replace NA with in written datasets')
+    chunksize = config.ConfigItem(
+        100000, 'Number of rows per chunk when a dataset is read in chunks', int
+    )
 
 
 conf = DataConfiguration()
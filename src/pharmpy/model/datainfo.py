@@ -549,6 +549,8 @@ class DataInfo(Sequence, Immutable):
         Character or regexp separator for dataset
     """
 
+    __slots__ = ('_columns', '_path', '_separator', '_force_absolute_path', '_index')
+
     def __init__(
         self,
         columns: tuple[ColumnInfo, ...] = (),
@@ -642,11 +644,22 @@ class DataInfo(Sequence, Immutable):
     def __len__(self):
         return len(self._columns)
 
+    def _name_index(self) -> dict[str, int]:
+        # NOTE: Built on first lookup by name. The first of duplicated names is used.
+        try:
+            return self._index
+        except AttributeError:
+            index: dict[str, int] = {}
+            for n, col in enumerate(self._columns):
+                index.setdefault(col.name, n)
+            self._index = index
+            return index
+
     def _getindex(self, i: Union[int, str]) -> int:
         if isinstance(i, str):
-            for n, col in enumerate(self._columns):
-                if col.name == i:
-                    return n
+            n = self._name_index().get(i)
+            if n is not None:
+                return n
             raise IndexError(f"Cannot find column {i} in DataInfo")
         elif isinstance(i, int):
             return i
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass
+from functools import lru_cache, partial
 from io import StringIO
 from pathlib import Path
 from typing import List, Optional, Union
@@ -26,23 +28,23 @@ class NONMEMTableFile:
             tables = []
             if path.stat().st_size == 0:
                 raise OSError("Empty table file")
-            with open(str(path), 'r') as tablefile:
-                if notitle:
+            if notitle:
+                with open(str(path), 'r') as tablefile:
                     table = self._parse_table(
                         tablefile.read().splitlines(keepends=True), notitle=notitle, nolabel=nolabel
                     )
-                    tables.append(table)
-                else:
-                    current = []
-                    for line in tablefile:
-                        if line.startswith("TABLE NO."):
-                            if current:
-                                table = self._parse_table(current, suffix)
-                                tables.append(table)
-                            current = [line]
-                        else:
-                            current.append(line)
-                    table = self._parse_table(current, suffix)
+                tables.append(table)
+            else:
+                # NOTE: Only the titles are parsed here. The content of each table is
+                # read from its offsets in the file when it is first needed.
+                table_class = _table_class(suffix)
+                abspath = str(path.resolve())
+                for location in index_table_file(path):
+                    if location.title is None:
+                        raise ValueError(f"Illegal {suffix}-file: missing TABLE NO.")
+                    reader = partial(_read_content, abspath, location.start, location.end, suffix)
+                    table = table_class(reader=reader)
+                    _parse_title(table, location.title, suffix)
                     tables.append(table)
             self.tables = tables
         elif tables is not None:
@@ -60,47 +62,9 @@ class NONMEMTableFile:
         # NOTE: Content lines must contain endlines!
 
         table_line = None if notitle else content.pop(0)
-
-        content_str = ''.join(content)
-        content_str = re.sub(r"[A-Z]*OBJ", "OBJ", content_str)
-        if suffix == '.ext':
-            table = ExtTable(content_str)
-        elif suffix == '.phi':
-            table = PhiTable(content_str)
-        elif suffix == '.cov' or suffix == '.cor' or suffix == '.coi':
-            table = CovTable(content_str)
-        else:
-            # Remove repeated header lines, but not the first
-            content[1:] = [line for line in content[1:] if not re.match(r'\s[A-Za-z_]', line)]
-            table = NONMEMTable(''.join(content))  # Fallback to non-specific table type
-
+        table = _table_class(suffix)(_prepare_content(content, suffix))
         if table_line is not None:
-            m = re.match(r'TABLE NO.\s+(\d+)', table_line)
-            if not m:
-                raise ValueError(f"Illegal {suffix}-file: missing TABLE NO.")
-            table.number = int(m.group(1))
-            table.is_evaluation = False
-            if re.search(r'(Evaluation)', table_line):
-                table.is_evaluation = True  # No estimation step was run
-
-            m = re.match(
-                r'TABLE NO.\s+\d+: (.*?)(?:: ([\w-]+))?: (?:Goal Function=(.*): )?Problem=(\d+) '
-                r'Subproblem=(\d+) Superproblem1=(\d+) Iteration1=(\d+) Superproblem2=(\d+) '
-                r'Iteration2=(\d+)',
-                table_line,
-            )
-
-            if m:
-                table.method = m.group(1)
-                table.design_optimality = m.group(2)
-                table.goal_function = m.group(3)
-                table.problem = int(m.group(4))
-                table.subproblem = int(m.group(5))
-                table.superproblem1 = int(m.group(6))
-                table.iteration1 = int(m.group(7))
-                table.superproblem2 = int(m.group(8))
-                table.iteration2 = int(m.group(9))
-
+            _parse_title(table, table_line, suffix)
         return table
 
     def __iter__(self):
@@ -154,13 +118,33 @@ class NONMEMTable:
     superproblem2: Optional[int] = None
     iteration2: Optional[int] = None
 
-    def __init__(self, content=None, df=None):
+    def __init__(self, content=None, df=None, reader=None):
+        self._reader = None
         if content is not None:
-            self._df = pd.read_table(StringIO(content), sep=r'\s+', engine='c')
+            self._data = _read_table(content)
         elif df is not None:
-            self._df = df
+            self._data = df
+        elif reader is not None:
+            self._data = None
+            self._reader = reader
         else:
-            raise ValueError('NONMEMTable: content and df cannot be both None')
+            raise ValueError('NONMEMTable: content, df and reader cannot be all None')
+
+    @property
+    def _df(self):
+        if self._data is None:
+            self._data = _read_table(self._reader())
+            self._reader = None
+        return self._data
+
+    def load(self):
+        """Parse the content of the table if it has not been parsed yet
+
+        Errors in the content of a table that was indexed in a table file are raised
+        here instead of when the table file is created.
+        """
+        self._df
+        return self
 
     @property
     def data_frame(self):
@@ -352,3 +336,215 @@ class ExtTable(NONMEMTable):
         except KeyError:
             ser = self._get_ofv(-1000000000)
         return ser
+
+
+def _table_class(suffix: Optional[str]) -> type[NONMEMTable]:
+    if suffix == '.ext':
+        return ExtTable
+    elif suffix == '.phi':
+        return PhiTable
+    elif suffix == '.cov' or suffix == '.cor' or suffix == '.coi':
+        return CovTable
+    else:
+        return NONMEMTable  # Fallback to non-specific table type
+
+
+def _prepare_content(content: List[str], suffix: Optional[str]) -> str:
+    if _table_class(suffix) is NONMEMTable:
+        # Remove repeated header lines, but not the first
+        content[1:] = [line for line in content[1:] if not re.match(r'\s[A-Za-z_]', line)]
+        return ''.join(content)
+    else:
+        return re.sub(r"[A-Z]*OBJ", "OBJ", ''.join(content))
+
+
+def _read_table(content: str) -> pd.DataFrame:
+    return pd.read_table(StringIO(content), sep=r'\s+', engine='c')
+
+
+def _read_content(path: str, start: int, end: int, suffix: Optional[str]) -> str:
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+    return _decode_content(data, suffix)
+
+
+def _decode_content(data: bytes, suffix: Optional[str]) -> str:
+    content = data.decode('utf-8', errors='replace').replace('\r\n', '\n')
+    return _prepare_content(content.splitlines(keepends=True), suffix)
+
+
+def _parse_title(table: NONMEMTable, table_line: str, suffix: Optional[str]):
+    m = re.match(r'TABLE NO.\s+(\d+)', table_line)
+    if not m:
+        raise ValueError(f"Illegal {suffix}-file: missing TABLE NO.")
+    table.number = int(m.group(1))
+    table.is_evaluation = False
+    if re.search(r'(Evaluation)', table_line):
+        table.is_evaluation = True  # No estimation step was run
+
+    m = re.match(
+        r'TABLE NO.\s+\d+: (.*?)(?:: ([\w-]+))?: (?:Goal Function=(.*): )?Problem=(\d+) '
+        r'Subproblem=(\d+) Superproblem1=(\d+) Iteration1=(\d+) Superproblem2=(\d+) '
+        r'Iteration2=(\d+)',
+        table_line,
+    )
+
+    if m:
+        table.method = m.group(1)
+        table.design_optimality = m.group(2)
+        table.goal_function = m.group(3)
+        table.problem = int(m.group(4))
+        table.subproblem = int(m.group(5))
+        table.superproblem1 = int(m.group(6))
+        table.iteration1 = int(m.group(7))
+        table.superproblem2 = int(m.group(8))
+        table.iteration2 = int(m.group(9))
+
+
+@dataclass(frozen=True)
+class TableLocation:
+    """Location of a table in a NONMEM table file
+
+    The content of the table (header and rows) is found between the byte offsets
+    start and end. The title is None for content before the first title line.
+    """
+
+    title: Optional[str]
+    start: int
+    end: int
+
+
+def index_table_file(path: Union[str, Path]) -> tuple[TableLocation, ...]:
+    """Find the byte offsets of all tables in a NONMEM table file
+
+    The file is scanned once and the index is reused until the file is changed.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the table file
+
+    Returns
+    -------
+    tuple
+        TableLocation of each table in the order of the file
+    """
+    path = Path(path)
+    stat = path.stat()
+    return _index_table_file(str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def read_table(path: Union[str, Path], location: TableLocation) -> NONMEMTable:
+    """Read one table of a NONMEM table file from its location
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the table file
+    location : TableLocation
+        Location of the table as given by index_table_file
+
+    Returns
+    -------
+    NONMEMTable
+        The table
+    """
+    path = Path(path)
+    suffix = path.suffix
+    with open(path, 'rb') as fh:
+        fh.seek(location.start)
+        data = fh.read(location.end - location.start)
+    table = _table_class(suffix)(_decode_content(data, suffix))
+    if location.title is not None:
+        _parse_title(table, location.title, suffix)
+    return table
+
+
+@lru_cache(maxsize=64)
+def _index_table_file(path: str, mtime_ns: int, size: int) -> tuple[TableLocation, ...]:
+    locations = []
+    title = None
+    start = 0
+    offset = 0
+    with open(path, 'rb') as fh:
+        for line in fh:
+            if line.startswith(b'TABLE NO.'):
+                if title is not None or offset > 0:
+                    locations.append(TableLocation(title, start, offset))
+                title = line.decode('utf-8', errors='replace')
+                start = offset + len(line)
+            offset += len(line)
+    if title is not None or offset > 0:
+        locations.append(TableLocation(title, start, offset))
+    return tuple(locations)
+
+
+@dataclass(frozen=True)
+class ExtRow:
+    """A row of a .ext-file"""
+
+    table_number: Optional[int]
+    method: Optional[str]
+    values: dict[str, float]
+
+    @property
+    def iteration(self) -> int:
+        return int(self.values['ITERATION'])
+
+    @property
+    def ofv(self) -> float:
+        return self.values['OBJ']
+
+
+class ExtTableStream:
+    """Resumable parser of a .ext-file that is being written
+
+    Each call to read parses the complete lines that have been appended to the
+    file since the previous call.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the .ext-file. It does not need to exist yet.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._offset = 0
+        self._table_number = None
+        self._method = None
+        self._columns = None
+
+    def read(self) -> list[ExtRow]:
+        """Read the rows added since the last read"""
+        try:
+            with open(self.path, 'rb') as fh:
+                fh.seek(self._offset)
+                data = fh.read()
+        except FileNotFoundError:
+            return []
+        # NOTE: A partially written last line is kept for the next read
+        end = data.rfind(b'\n') + 1
+        self._offset += end
+        rows = []
+        for line in data[:end].decode('utf-8', errors='replace').splitlines():
+            if line.startswith('TABLE NO.'):
+                m = re.match(r'TABLE NO.\s+(\d+)(?::\s*([^:]*))?', line)
+                self._table_number = int(m.group(1)) if m else None
+                self._method = m.group(2).strip() if m and m.group(2) else None
+                self._columns = None
+            elif self._columns is None:
+                header = re.sub(r"[A-Z]*OBJ", "OBJ", line)
+                header = re.sub(r'THETA(\d+)', r'THETA(\1)', header)
+                self._columns = header.split()
+            else:
+                fields = line.split()
+                if len(fields) != len(self._columns):
+                    continue
+                try:
+                    values = dict(zip(self._columns, map(float, fields)))
+                except ValueError:
+                    continue
+                rows.append(ExtRow(self._table_number, self._method, values))
+        return rows
@@ -84,10 +84,10 @@ def reorder_diff(diff, kept_names):
 
 
 def update_thetas(model: Model, control_stream, old: Parameters, new: Parameters):
-    new_thetas = [p for p in new if p.symbol not in model.random_variables.free_symbols]
-    old_thetas = [
-        p for p in old if p.symbol not in model.internals.old_random_variables.free_symbols
-    ]
+    rv_symbols = model.random_variables.free_symbols
+    old_rv_symbols = model.internals.old_random_variables.free_symbols
+    new_thetas = [p for p in new if p.symbol not in rv_symbols]
+    old_thetas = [p for p in old if p.symbol not in old_rv_symbols]
 
     diff_thetas = diff(old_thetas, new_thetas)
     theta_records = control_stream.get_records('THETA')
@@ -2168,7 +2168,8 @@ def update_sizes(control_stream, model: Model):
     if odes is not None and isinstance(odes, CompartmentalSystem):
         n_compartments = len(odes)
         sizes = sizes.set_PC(n_compartments)
-    thetas = [p for p in model.parameters if p.symbol not in model.random_variables.free_symbols]
+    rv_symbols = model.random_variables.free_symbols
+    thetas = [p for p in model.parameters if p.symbol not in rv_symbols]
     sizes = sizes.set_LTH(len(thetas))
 
     if len(str(sizes)) > 7:
@@ -2319,7 +2320,8 @@ def abbr_translation(model: Model, rv_trans):
 
 def create_name_map(model):
     trans = {}
-    thetas = [p for p in model._parameters if p.symbol not in model.random_variables.free_symbols]
+    rv_symbols = model.random_variables.free_symbols
+    thetas = [p for p in model._parameters if p.symbol not in rv_symbols]
     for i, theta in enumerate(thetas):
         trans[theta.name] = f'THETA({i + 1})'
 
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    from pharmpy.deps import numpy as np
+    from pharmpy.deps import pandas as pd
+
+from .data import conf
+from .datainfo import DataInfo
+
+
+class LazyDataset:
+    """Handle to a dataset file that is read in chunks
+
+    The file is read in the same way as a dataset loaded with load_dataset, but
+    only a bounded number of rows is kept in memory at a time. Only the requested
+    columns are parsed.
+
+    Parameters
+    ----------
+    datainfo : DataInfo
+        DataInfo with the path to the dataset file
+    chunksize : int
+        Maximum number of rows per chunk. Default is the ``chunksize`` option of
+        ``pharmpy.data``.
+
+    Examples
+    --------
+    >>> from pharmpy.model import LazyDataset
+    >>> from pharmpy.modeling import load_example_model
+    >>> model = load_example_model("pheno")
+    >>> dataset = LazyDataset(model.datainfo, chunksize=100)
+    >>> sum(len(chunk) for chunk in dataset.chunks(['ID']))
+    744
+    """
+
+    def __init__(self, datainfo: DataInfo, chunksize: Optional[int] = None):
+        if datainfo.path is None:
+            raise ValueError('datainfo.path is None')
+        self._datainfo = datainfo
+        self._chunksize = conf.chunksize if chunksize is None else chunksize
+
+    @property
+    def datainfo(self) -> DataInfo:
+        """DataInfo of the dataset"""
+        return self._datainfo
+
+    @property
+    def chunksize(self) -> int:
+        """Maximum number of rows per chunk"""
+        return self._chunksize
+
+    def chunks(self, columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+        """Iterate over chunks of rows
+
+        The index of the chunks continues over the whole dataset, i.e. it is the
+        same as the index of the loaded dataset.
+
+        Parameters
+        ----------
+        columns : list
+            Names of columns to read. Default is all columns.
+
+        Returns
+        -------
+        Iterator[pd.DataFrame]
+            Chunks of the dataset
+        """
+        dtype = self._datainfo.get_dtype_dict()
+        if columns is not None:
+            columns = list(columns)
+            dtype = {name: dtype[name] for name in columns}
+        reader = pd.read_csv(
+            self._datainfo.path,
+            sep=self._datainfo.separator,
+            dtype=dtype,
+            usecols=columns,
+            float_precision='round_trip',
+            chunksize=self._chunksize,
+        )
+        with reader:
+            for chunk in reader:
+                yield chunk if columns is None else chunk[columns]
+
+    def blocks(self, columns: Optional[Sequence[str]] = None) -> Iterator[pd.DataFrame]:
+        """Iterate over chunks of rows that contain whole ID blocks
+
+        The rows of an ID block, i.e. consecutive rows with the same ID, are never
+        split between chunks. A chunk can be larger than chunksize if an ID block is.
+
+        Parameters
+        ----------
+        columns : list
+            Names of columns to read. The ID column is always read.
+
+        Returns
+        -------
+        Iterator[pd.DataFrame]
+            Chunks of the dataset
+        """
+        idcol = self._datainfo.id_column.name
+        if columns is not None and idcol not in columns:
+            columns = [idcol, *columns]
+        rest = None
+        for chunk in self.chunks(columns):
+            if rest is not None:
+                chunk = pd.concat([rest, chunk])
+            ids = chunk[idcol].to_numpy()
+            # NOTE: Start of the last ID block of the chunk
+            other = np.flatnonzero(ids != ids[-1])
+            start = other[-1] + 1 if len(other) else 0
+            if start > 0:
+                yield chunk.iloc[:start]
+            rest = chunk.iloc[start:]
+        if rest is not None and len(rest) > 0:
+            yield rest
+
+    def load(self) -> pd.DataFrame:
+        """Read the whole dataset
+
+        Returns
+        -------
+        pd.DataFrame
+            The dataset
+        """
+        return pd.concat(self.chunks())
+
+    def __repr__(self):
+        return f'LazyDataset({self._datainfo.path}, chunksize={self._chunksize})'
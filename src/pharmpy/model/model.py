@@ -25,6 +25,7 @@ import pharmpy
 from pharmpy.basic import Expr, TExpr, TSymbol
 from pharmpy.internals.df import hash_df_runtime
 from pharmpy.internals.immutable import Immutable, cache_method, frozenmapping
+from pharmpy.internals.shm import open_dataframe, share_dataframe
 from pharmpy.model.external import detect_model
 
 from .datainfo import ColumnInfo, DataInfo
@@ -475,7 +476,11 @@ class Model(Immutable):
 
     @cache_method
     def __hash__(self):
+        # NOTE: The hashes of DataFrames are memoised so that they are computed once
+        # per DataFrame object even if it is shared by many models
         dataset_hash = hash_df_runtime(self._dataset) if self._dataset is not None else None
+        ie = self._initial_individual_estimates
+        ie_hash = hash_df_runtime(ie) if ie is not None else None
         return hash(
             (
                 self._parameters,
@@ -484,13 +489,25 @@ class Model(Immutable):
                 self._dependent_variables,
                 self._observation_transformation,
                 self._execution_steps,
-                self._initial_individual_estimates,
+                ie_hash,
                 self._datainfo,
                 dataset_hash,
                 self._value_type,
             )
         )
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # NOTE: The cached hash is not valid in other processes
+        state.pop('_hash', None)
+        # NOTE: Only a handle is pickled if a shared dataset store is active
+        state['_dataset'] = share_dataframe(self._dataset)
+        return state
+
+    def __setstate__(self, state):
+        state['_dataset'] = open_dataframe(state['_dataset'])
+        self.__dict__.update(state)
+
     def to_dict(self) -> dict[str, Any]:
         if self._initial_individual_estimates is not None:
             ie = self._initial_individual_estimates.to_dict()
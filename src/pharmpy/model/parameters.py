@@ -194,6 +194,8 @@ class Parameters(CollectionsSequence, Immutable):
 
     """
 
+    __slots__ = ('_params', '_index', '_hash')
+
     def __init__(self, parameters: tuple[Parameter, ...] = ()):
         self._params = parameters
 
@@ -226,6 +228,14 @@ class Parameters(CollectionsSequence, Immutable):
     def __len__(self):
         return len(self._params)
 
+    def _name_index(self) -> dict[str, int]:
+        # NOTE: Built on first lookup by name
+        try:
+            return self._index
+        except AttributeError:
+            self._index = {param.name: i for i, param in enumerate(self._params)}
+            return self._index
+
     def _lookup_param(self, ind: Union[int, str, Expr, Parameter]):
         if isinstance(ind, Expr):
             if ind.is_symbol():
@@ -233,10 +243,10 @@ class Parameters(CollectionsSequence, Immutable):
             else:
                 raise KeyError("Cannot index Parameters with Expr other than Symbol")
         if isinstance(ind, str):
-            for i, param in enumerate(self._params):
-                if ind == param.name:
-                    return i, param
-            raise KeyError(f'Could not find {ind} in Parameters')
+            i = self._name_index().get(ind)
+            if i is None:
+                raise KeyError(f'Could not find {ind} in Parameters')
+            return i, self._params[i]
         elif isinstance(ind, Parameter):
             try:
                 i = self._params.index(ind)
@@ -258,6 +258,8 @@ class RandomVariables(CollectionsSequence, Immutable):
     >>> rvs = RandomVariables.create([dist])
     """
 
+    __slots__ = ('_dists', '_eta_levels', '_epsilon_levels', '_index')
+
     def __init__(
         self,
         dists: tuple[Distribution, ...],
@@ -418,13 +420,25 @@ class RandomVariables(CollectionsSequence, Immutable):
             dists.append(dist)
         return cls(dists=tuple(dists), eta_levels=eta_levels, epsilon_levels=epsilon_levels)
 
+    def _name_index(self) -> dict[str, int]:
+        # NOTE: Maps the names of all random variables to the index of their distribution
+        try:
+            return self._index
+        except AttributeError:
+            index: dict[str, int] = {}
+            for i, dist in enumerate(self._dists):
+                for name in dist.names:
+                    index.setdefault(name, i)
+            self._index = index
+            return index
+
     def _lookup_rv(self, ind: TSymbol):
         if isinstance(ind, Expr) and ind.is_symbol():
             ind = ind.name
         if isinstance(ind, str):
-            for i, dist in enumerate(self._dists):
-                if ind in dist.names:
-                    return i, dist
+            i = self._name_index().get(ind)
+            if i is not None:
+                return i, self._dists[i]
         raise KeyError(f'Could not find {ind} in RandomVariables')
 
     @overload
@@ -827,6 +841,43 @@ class RandomVariables(CollectionsSequence, Immutable):
         _, M, _ = self._calc_covariance_matrix()
         return Matrix(M)
 
+    def numeric_covariance(
+        self, parameter_names: Optional[Sequence[str]] = None
+    ) -> NumericCovariance:
+        """Covariance matrix of all random variables compiled for numeric evaluation
+
+        The compiled covariance matrix maps arrays of parameter vectors to stacked
+        covariance matrices and can check, correct and sample from many sets of
+        parameter values at once.
+
+        Parameters
+        ----------
+        parameter_names : list
+            Names of the parameters in the order of the columns of the parameter
+            vectors. Default is parameter_names of the random variables.
+
+        Returns
+        -------
+        NumericCovariance
+            Compiled covariance matrix
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> from pharmpy.modeling import load_example_model
+        >>> model = load_example_model("pheno")
+        >>> cov = model.random_variables.etas.numeric_covariance(['IVCL', 'IVV'])
+        >>> cov(np.array([[0.03, 0.02], [0.1, 0.2]]))
+        array([[[0.03, 0.  ],
+                [0.  , 0.02]],
+        <BLANKLINE>
+               [[0.1 , 0.  ],
+                [0.  , 0.2 ]]])
+        """
+        if parameter_names is None:
+            parameter_names = self.parameter_names
+        return NumericCovariance(self, parameter_names)
+
     def __repr__(self):
         return '\n'.join(map(repr, self._dists))
 
@@ -927,6 +978,230 @@ class RandomVariables(CollectionsSequence, Immutable):
         return sympy_expr
 
 
+class NumericCovariance:
+    """Covariance matrix of random variables compiled for numeric evaluation
+
+    Maps parameter vectors, i.e. arrays of shape (n, p) with one column per
+    parameter, to stacked block diagonal covariance matrices of shape (n, k, k)
+    where k is the number of random variables. Elements that are parameters or
+    numbers are gathered directly from the parameter vectors, other elements are
+    evaluated vectorized over all parameter vectors. Created with
+    :py:meth:`RandomVariables.numeric_covariance`.
+    """
+
+    def __init__(self, rvs: RandomVariables, parameter_names: Sequence[str]):
+        self._names = tuple(rvs.names)
+        self._parameter_names = tuple(parameter_names)
+        column = {name: i for i, name in enumerate(self._parameter_names)}
+        symbols = [sympy.Symbol(name) for name in self._parameter_names]
+
+        # NOTE: Elements are (row, col, column of parameter), (row, col, value) or
+        # (row, col, function of all parameters)
+        gathered, constant, evaluated = [], [], []
+        mean_gathered, mean_constant, mean_evaluated = [], [], []
+        # NOTE: Lower triangle elements of the joint distributions that are parameters
+        self._blocks = []
+        self._lower = []
+
+        def _add(i, j, expr, gathered, constant, evaluated):
+            if expr.is_symbol() and expr.name in column:
+                gathered.append((i, j, column[expr.name]))
+            elif expr.is_number():
+                constant.append((i, j, float(expr)))
+            else:
+                missing = {s.name for s in expr.free_symbols} - column.keys()
+                if missing:
+                    raise ValueError(f'Missing values for parameters {sorted(missing)}')
+                fn = sympy.lambdify(symbols, sympy.sympify(expr), modules='numpy')
+                evaluated.append((i, j, fn))
+
+        start = 0
+        for dist in rvs:
+            if isinstance(dist, NormalDistribution):
+                _add(start, start, dist.variance, gathered, constant, evaluated)
+                _add(start, 0, dist.mean, mean_gathered, mean_constant, mean_evaluated)
+            else:
+                assert isinstance(dist, JointNormalDistribution)
+                var = dist.variance
+                k = var.rows
+                for i in range(k):
+                    for j in range(k):
+                        _add(start + i, start + j, var[i, j], gathered, constant, evaluated)
+                    _add(start + i, 0, dist.mean[i], mean_gathered, mean_constant, mean_evaluated)
+                self._blocks.append(slice(start, start + k))
+                for i in range(k):
+                    for j in range(i + 1):
+                        elt = var[i, j]
+                        if elt.is_symbol() and elt.name in column:
+                            self._lower.append((start + i, start + j, column[elt.name]))
+            start += len(dist)
+
+        self._cov = _compile_elements(gathered, constant, evaluated)
+        self._mean = _compile_elements(mean_gathered, mean_constant, mean_evaluated)
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """Names of the random variables, i.e. of the rows and columns of the matrices"""
+        return self._names
+
+    @property
+    def parameter_names(self) -> tuple[str, ...]:
+        """Names of the parameters, i.e. of the columns of the parameter vectors"""
+        return self._parameter_names
+
+    def _as_2d(self, values) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[np.newaxis, :]
+        if values.ndim != 2 or values.shape[1] != len(self._parameter_names):
+            raise ValueError(
+                f'Expected parameter vectors of length {len(self._parameter_names)}, '
+                f'got array of shape {values.shape}'
+            )
+        return values
+
+    def __call__(self, values) -> np.ndarray:
+        """Covariance matrices for parameter vectors
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Parameter vectors of shape (n, p) or a single parameter vector of shape (p,)
+
+        Returns
+        -------
+        np.ndarray
+            Covariance matrices of shape (n, k, k) or (k, k) for a single vector
+        """
+        single = np.ndim(values) == 1
+        values = self._as_2d(values)
+        cov = _evaluate_elements(self._cov, values, (len(self._names), len(self._names)))
+        return cov[0] if single else cov
+
+    def mean(self, values) -> np.ndarray:
+        """Means of the random variables for parameter vectors
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Parameter vectors of shape (n, p) or a single parameter vector of shape (p,)
+
+        Returns
+        -------
+        np.ndarray
+            Means of shape (n, k) or (k,) for a single vector
+        """
+        single = np.ndim(values) == 1
+        values = self._as_2d(values)
+        mean = _evaluate_elements(self._mean, values, (len(self._names), 1))[..., 0]
+        return mean[0] if single else mean
+
+    def validate(self, values) -> np.ndarray:
+        """Check which parameter vectors are valid
+
+        Checks that the covariance matrices of all joint distributions are positive
+        semidefinite, cf. :py:meth:`RandomVariables.validate_parameters`
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Parameter vectors of shape (n, p)
+
+        Returns
+        -------
+        np.ndarray
+            Boolean array of shape (n,)
+        """
+        values = self._as_2d(values)
+        cov = self(values)
+        valid = np.ones(len(values), dtype=bool)
+        for block in self._blocks:
+            # NOTE: Same check as is_positive_semidefinite for consistent results
+            eigvals = np.linalg.eigvals(cov[:, block, block]).real
+            valid &= (eigvals >= 0).all(axis=1)
+        return valid
+
+    def nearest_valid(self, values) -> np.ndarray:
+        """Force parameter vectors into being valid
+
+        Parameter vectors that are not valid are changed as little as possible,
+        cf. :py:meth:`RandomVariables.nearest_valid_parameters`
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Parameter vectors of shape (n, p)
+
+        Returns
+        -------
+        np.ndarray
+            Valid parameter vectors of shape (n, p)
+        """
+        values = self._as_2d(values).copy()
+        invalid = np.flatnonzero(~self.validate(values))
+        if len(invalid) == 0 or not self._lower:
+            return values
+        cov = self(values[invalid])
+        for block in self._blocks:
+            for A in cov[:, block, block]:
+                A[...] = nearest_positive_semidefinite(A)
+        rows, cols, params = (np.array(a, dtype=np.intp) for a in zip(*self._lower))
+        values[invalid[:, np.newaxis], params] = cov[:, rows, cols]
+        return values
+
+    def sample(self, values, samples: int = 1, rng=None) -> np.ndarray:
+        """Sample the random variables for parameter vectors
+
+        Parameters
+        ----------
+        values : np.ndarray
+            Parameter vectors of shape (n, p)
+        samples : int
+            Number of samples per parameter vector
+        rng : Generator or int
+            Random number generator or seed
+
+        Returns
+        -------
+        np.ndarray
+            Samples of shape (n, samples, k)
+        """
+        values = self._as_2d(values)
+        cov = self(values)
+        mean = self.mean(values)
+        # NOTE: Factorize with eigendecomposition since the matrices can be singular
+        w, V = np.linalg.eigh(cov)
+        L = V * np.sqrt(np.maximum(w, 0.0))[:, np.newaxis, :]
+        z = _create_rng(rng).standard_normal((len(values), samples, len(self._names)))
+        return mean[:, np.newaxis, :] + np.einsum('nsj,nij->nsi', z, L)
+
+
+def _compile_elements(gathered, constant, evaluated):
+    def _indices(elements):
+        return tuple(np.array(a, dtype=np.intp) for a in zip(*elements)) if elements else None
+
+    gathered_indices = _indices(gathered)
+    constant_indices = _indices([(i, j) for i, j, _ in constant])
+    constant_values = np.array([value for _, _, value in constant])
+    return gathered_indices, constant_indices, constant_values, evaluated
+
+
+def _evaluate_elements(compiled, values, shape):
+    gathered, constant_indices, constant_values, evaluated = compiled
+    out = np.zeros((len(values),) + shape)
+    if gathered is not None:
+        rows, cols, params = gathered
+        out[:, rows, cols] = values[:, params]
+    if constant_indices is not None:
+        rows, cols = constant_indices
+        out[:, rows, cols] = constant_values
+    if evaluated:
+        columns = values.T
+        for i, j, fn in evaluated:
+            out[:, i, j] = fn(*columns)
+    return out
+
+
 def _sample_from_distributions(distributions, expr, parameters, nsamples, rng):
     random_variable_symbols = expr.free_symbols.difference(parameters.keys())
     filtered_distributions = filter_distributions(distributions, random_variable_symbols)
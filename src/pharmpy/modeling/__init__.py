@@ -52,6 +52,7 @@ from .data import (
     get_observations,
     list_time_varying_covariates,
     load_dataset,
+    load_dataset_lazily,
     read_dataset_from_datainfo,
     remove_loq_data,
     set_covariates,
@@ -97,10 +98,13 @@ from .estimation_steps import (
     set_simulation,
 )
 from .evaluation import (
+    evaluate_conditional_weighted_residuals,
     evaluate_epsilon_gradient,
     evaluate_eta_gradient,
     evaluate_expression,
     evaluate_individual_prediction,
+    evaluate_npd,
+    evaluate_npde,
     evaluate_population_prediction,
     evaluate_weighted_residuals,
 )
@@ -301,10 +305,13 @@ __all__ = [
     'display_odes',
     'drop_columns',
     'drop_dropped_columns',
+    'evaluate_conditional_weighted_residuals',
     'evaluate_epsilon_gradient',
     'evaluate_eta_gradient',
     'evaluate_expression',
     'evaluate_individual_prediction',
+    'evaluate_npd',
+    'evaluate_npde',
     'evaluate_population_prediction',
     'evaluate_weighted_residuals',
     'expand_additional_doses',
@@ -375,6 +382,7 @@ __all__ = [
     'is_real',
     'list_time_varying_covariates',
     'load_dataset',
+    'load_dataset_lazily',
     'load_example_model',
     'make_declarative',
     'mu_reference_model',
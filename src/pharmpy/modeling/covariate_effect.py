@@ -13,6 +13,7 @@ from pharmpy.basic.expr import BooleanExpr, Expr
 from pharmpy.deps import numpy as np
 from pharmpy.deps import sympy
 from pharmpy.internals.expr.parse import parse as parse_expr
+from pharmpy.internals.memo import IdentityMemo
 from pharmpy.model import Assignment, Model, Parameter, Parameters, Statement, Statements
 
 from .common import get_model_covariates
@@ -28,6 +29,9 @@ from .parameters import get_thetas
 EffectType = Union[Literal['lin', 'cat', 'cat2', 'piece_lin', 'exp', 'pow'], str]
 OperationType = Literal['*', '+']
 
+# NOTE: Summary statistics of covariates of datasets
+_covariate_statistics: IdentityMemo[dict] = IdentityMemo()
+
 
 def get_covariate_effects(model: Model) -> dict[list]:
     """Return a dictionary of all used covariates within a model
@@ -493,9 +497,48 @@ def _create_thetas(model, parameter, effect, covariate, template, _ctre=re.compi
     return pset, theta_names
 
 
+def _dataset_statistics(df) -> dict:
+    """Get the memoised statistics of a dataset
+
+    The dataset must not be modified in place after the statistics have been calculated.
+    """
+    return _covariate_statistics.get(df, dict)
+
+
+def _summarize_covariate(df, covariate) -> dict:
+    """Summary statistics of a covariate calculated in one pass over the dataset
+
+    Mean, median and standard deviation are calculated first per individual, then
+    for the group.
+    """
+    covariate = str(covariate)
+    statistics = _dataset_statistics(df)
+    try:
+        return statistics[('summary', covariate)]
+    except KeyError:
+        pass
+
+    per_id = df.groupby('ID')[covariate].agg(['mean', 'median'])
+    column = df[covariate]
+    summary = {
+        'mean': per_id['mean'].mean(),
+        'median': per_id['median'].median(),
+        'std': per_id['mean'].std(),
+        'min': column.min(),
+        'max': column.max(),
+    }
+    statistics[('summary', covariate)] = summary
+    return summary
+
+
 def _count_categorical(model, covariate):
     """Gets the number of individuals that has a level of categorical covariate."""
     idcol = model.datainfo.id_column.name
+    statistics = _dataset_statistics(model.dataset)
+    key = ('counts', idcol, str(covariate))
+    if key in statistics:
+        return statistics[key].copy()
+
     df = model.dataset.set_index(idcol)
     allcounts = df[covariate].groupby('ID').value_counts()
     allcounts.name = None  # To avoid collisions when resetting index
@@ -503,7 +546,8 @@ def _count_categorical(model, covariate):
     counts.sort_index(inplace=True)  # To make deterministic in case of multiple modes
     if model.dataset[covariate].isna().any():
         counts[np.nan] = 0
-    return counts
+    statistics[key] = counts
+    return counts.copy()
 
 
 def _calculate_mean(df, covariate, baselines=False):
@@ -512,7 +556,7 @@ def _calculate_mean(df, covariate, baselines=False):
     if baselines:
         return df[str(covariate)].mean()
     else:
-        return df.groupby('ID')[str(covariate)].mean().mean()
+        return _summarize_covariate(df, covariate)['mean']
 
 
 def _calculate_median(model, covariate, baselines=False):
@@ -521,8 +565,7 @@ def _calculate_median(model, covariate, baselines=False):
     if baselines:
         return get_baselines(model)[str(covariate)].median()
     else:
-        df = model.dataset
-        return df.groupby('ID')[str(covariate)].median().median()
+        return _summarize_covariate(model.dataset, covariate)['median']
 
 
 def _calculate_std(model, covariate, baselines=False):
@@ -531,21 +574,20 @@ def _calculate_std(model, covariate, baselines=False):
     if baselines:
         return get_baselines(model)[str(covariate)].std()
     else:
-        df = model.dataset
-        return df.groupby('ID')[str(covariate)].mean().std()
+        return _summarize_covariate(model.dataset, covariate)['std']
 
 
 def _choose_param_inits(effect, model, covariate, index=None):
     """Chooses inits for parameters. If the effect is exponential, the
     bounds need to be dynamic."""
-    df = model.dataset
     init_default = 0.001
 
     inits = {}
 
-    cov_median = _calculate_median(model, covariate)
-    cov_min = df[str(covariate)].min()
-    cov_max = df[str(covariate)].max()
+    summary = _summarize_covariate(model.dataset, covariate)
+    cov_median = summary['median']
+    cov_min = summary['min']
+    cov_max = summary['max']
 
     lower, upper = _choose_bounds(effect, cov_median, cov_min, cov_max, index)
 
@@ -11,7 +11,14 @@ from pharmpy.deps.rich import box as rich_box
 from pharmpy.deps.rich import console as rich_console
 from pharmpy.deps.rich import table as rich_table
 from pharmpy.internals.fs.path import normalize_user_given_path, path_absolute
-from pharmpy.model import ColumnInfo, CompartmentalSystem, DataInfo, DatasetError, Model
+from pharmpy.model import (
+    ColumnInfo,
+    CompartmentalSystem,
+    DataInfo,
+    DatasetError,
+    LazyDataset,
+    Model,
+)
 from pharmpy.model.model import update_datainfo
 
 from .iterators import resample_data
@@ -38,8 +45,10 @@ def get_ids(model: Model):
     [1, 2, 3, ..., 57, 58, 59]
     """
     idcol = model.datainfo.id_column.name
-    ids = list(model.dataset[idcol].unique())
-    return ids
+    ids = {}
+    for chunk in _dataset_chunks(model, [idcol]):
+        ids.update(dict.fromkeys(chunk[idcol].unique()))
+    return list(ids)
 
 
 def get_number_of_individuals(model: Model):
@@ -204,7 +213,15 @@ def get_number_of_observations_per_individual(model: Model):
         dataset
 
     """
-    ser = get_observations(model).groupby(model.datainfo.id_column.name).count()
+    idcol = model.datainfo.id_column.name
+    dvcol = model.datainfo.dv_column.name
+    label = _get_observation_label(model.datainfo)
+    columns = [idcol, dvcol] if label is None else [idcol, dvcol, label]
+    counts = []
+    for chunk in _dataset_chunks(model, columns):
+        df = _select_observations(chunk, label)
+        counts.append(df[dvcol].groupby(df[idcol]).count())
+    ser = pd.concat(counts).groupby(level=0).sum()
     ser.name = "observation_count"
     return ser
 
@@ -249,28 +266,21 @@ def get_observations(model: Model, keep_index: bool = False) -> pd.Series:
     get_number_of_observations : get the number of observations
     get_number_of_observations_per_individual : get the number of observations per individual
     """
-    try:
-        label = model.datainfo.typeix['mdv'][0].name
-    except IndexError:
-        try:
-            label = model.datainfo.typeix['event'][0].name
-        except IndexError:
-            try:
-                label = model.datainfo.typeix['dose'][0].name
-            except IndexError:
-                label = None  # All data records are observations
+    label = _get_observation_label(model.datainfo)
 
     idcol = model.datainfo.id_column.name
     idvcol = model.datainfo.idv_column.name
     dvcol = model.datainfo.dv_column.name
 
-    if label:
-        df = model.dataset.query(f'{label} == 0')
-        if df.empty:
-            df = model.dataset.astype({label: 'float'})
-            df = df.query(f'{label} == 0')
+    if model.dataset is not None:
+        df = _select_observations(model.dataset, label)
     else:
-        df = model.dataset.copy()
+        columns = [dvcol] if keep_index else [idcol, idvcol, dvcol]
+        if label is not None and label not in columns:
+            columns.append(label)
+        df = pd.concat(
+            [_select_observations(chunk, label) for chunk in _dataset_chunks(model, columns)]
+        )
 
     if not keep_index:
         df = df[[idcol, idvcol, dvcol]]
@@ -287,6 +297,51 @@ def get_observations(model: Model, keep_index: bool = False) -> pd.Series:
     return df
 
 
+def _get_observation_label(datainfo: DataInfo) -> Optional[str]:
+    try:
+        return datainfo.typeix['mdv'][0].name
+    except IndexError:
+        try:
+            return datainfo.typeix['event'][0].name
+        except IndexError:
+            try:
+                return datainfo.typeix['dose'][0].name
+            except IndexError:
+                return None  # All data records are observations
+
+
+def _select_observations(df: pd.DataFrame, label: Optional[str]) -> pd.DataFrame:
+    if label:
+        obs = df.query(f'{label} == 0')
+        if obs.empty:
+            obs = df.astype({label: 'float'})
+            obs = obs.query(f'{label} == 0')
+        return obs
+    else:
+        return df.copy()
+
+
+def _chunks_of(dataset: Union[pd.DataFrame, LazyDataset], columns: Optional[List[str]] = None):
+    if isinstance(dataset, LazyDataset):
+        yield from dataset.chunks(columns)
+    else:
+        yield dataset if columns is None else dataset[columns]
+
+
+def _dataset_chunks(model: Model, columns: Optional[List[str]] = None):
+    # NOTE: A dataset that is not loaded is read from its file in chunks
+    if model.dataset is None and model.datainfo.path is not None:
+        return _chunks_of(LazyDataset(model.datainfo), columns)
+    return _chunks_of(model.dataset, columns)
+
+
+def _first_rows(chunks, idlab: str) -> pd.DataFrame:
+    firsts = [chunk.groupby(idlab).nth(0) for chunk in chunks]
+    if len(firsts) == 1:
+        return firsts[0]
+    return pd.concat(firsts).groupby(idlab).nth(0)
+
+
 def get_baselines(model: Model):
     """Baselines for each subject.
 
@@ -370,7 +425,7 @@ def get_baselines(model: Model):
     59   0.0  22.8  1.1   6.0  0.0  1.0  1.0
     """
     idlab = model.datainfo.id_column.name
-    baselines = model.dataset.groupby(idlab).nth(0).set_index(idlab)
+    baselines = _first_rows(_dataset_chunks(model), idlab).set_index(idlab)
     return baselines
 
 
@@ -551,9 +606,8 @@ def get_covariate_baselines(model: Model):
     """
     covariates = model.datainfo.typeix['covariate'].names
     idlab = model.datainfo.id_column.name
-    df = model.dataset[covariates + [idlab]]
-    df = df.set_index(idlab)
-    return df.groupby(idlab).nth(0)
+    chunks = (df.set_index(idlab) for df in _dataset_chunks(model, covariates + [idlab]))
+    return _first_rows(chunks, idlab)
 
 
 def list_time_varying_covariates(model: Model):
@@ -1803,24 +1857,27 @@ class Checker:
             scaled_upper = float(
                 sympy.physics.units.convert_to(upper * unit, col.unit._expr) / col.unit._expr
             )
-        if lower_included:
-            lower_viol = self.dataset[name] < scaled_lower
-        else:
-            lower_viol = self.dataset[name] <= scaled_lower
-        if upper_included:
-            upper_viol = self.dataset[name] > scaled_upper
-        else:
-            upper_viol = self.dataset[name] >= scaled_upper
-        all_viol = lower_viol | upper_viol
-        violations = all_viol[all_viol]
-        if not violations.empty:
+        found = False
+        for chunk in _chunks_of(self.dataset, [name]):
+            values = chunk[name]
+            if lower_included:
+                lower_viol = values < scaled_lower
+            else:
+                lower_viol = values <= scaled_lower
+            if upper_included:
+                upper_viol = values > scaled_upper
+            else:
+                upper_viol = values >= scaled_upper
+            all_viol = lower_viol | upper_viol
+            violations = all_viol[all_viol]
             for i in violations.index:
+                found = True
                 self.set_result(
                     code,
                     test=False,
-                    violation=f"{col.name} index={i} value={self.dataset[name].loc[i]}",
+                    violation=f"{col.name} index={i} value={values.loc[i]}",
                 )
-        else:
+        if not found:
             self.set_result(code, test=True)
 
     def get_dataframe(self):
@@ -1907,6 +1964,8 @@ def check_dataset(model: Model, dataframe: bool = False, verbose: bool = False):
     """
     di = model.datainfo
     df = model.dataset
+    if df is None and di.path is not None:
+        df = LazyDataset(di)
     checker = Checker(di, df, verbose=verbose)
 
     for col in di:
@@ -2200,6 +2259,38 @@ def load_dataset(model: Model):
     return model
 
 
+def load_dataset_lazily(model: Model) -> LazyDataset:
+    """Get a handle to the dataset given datainfo that reads it in chunks
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+
+    Returns
+    -------
+    LazyDataset
+        Handle reading the dataset file in chunks instead of loading it
+
+    Notes
+    -----
+    get_ids, get_number_of_individuals, get_observations, get_number_of_observations,
+    get_number_of_observations_per_individual, get_baselines, get_covariate_baselines and
+    check_dataset read the dataset file in chunks if the dataset of the model is not loaded, so
+    that only a bounded number of rows is kept in memory.
+
+    Example
+    -------
+    >>> from pharmpy.modeling import load_example_model, load_dataset_lazily
+    >>> model = load_example_model("pheno")
+    >>> dataset = load_dataset_lazily(model)
+    >>> sum(len(block) for block in dataset.blocks(['DV']))
+    744
+
+    """
+    return LazyDataset(model.datainfo)
+
+
 def set_dataset(
     model: Model, path_or_df: Union[str, Path, pd.DataFrame], datatype: Optional[str] = None
 ):
@@ -5,8 +5,9 @@ from typing import TYPE_CHECKING, Optional, Union
 
 from pharmpy.basic import Expr, TExpr
 from pharmpy.internals.expr.eval import eval_expr
-from pharmpy.model import Model
+from pharmpy.model import Infusion, Model
 
+from .data import _get_observation_label, _select_observations
 from .expressions import (
     calculate_epsilon_gradient_expression,
     calculate_eta_gradient_expression,
@@ -18,12 +19,12 @@ if TYPE_CHECKING:
     import numpy as np
     import pandas as pd
     import sympy
-    from scipy import linalg
+    from scipy import linalg, stats
 else:
     from pharmpy.deps import numpy as np
     from pharmpy.deps import pandas as pd
     from pharmpy.deps import sympy
-    from pharmpy.deps.scipy import linalg
+    from pharmpy.deps.scipy import linalg, stats
 
 
 ParameterMap = Mapping[Union[str, 'sympy.Symbol'], Union[float, 'sympy.Float']]
@@ -113,7 +114,8 @@ def evaluate_population_prediction(
     The evaluation is done for each data record in the model dataset
     or optionally using the dataset argument.
 
-    This function currently only support models without ODE systems
+    Models with ODE systems are supported if the system is linear and its rates
+    do not depend on time.
 
     Parameters
     ----------
@@ -154,12 +156,21 @@ def evaluate_population_prediction(
     --------
     evaluate_individual_prediction : Evaluate the individual prediction
     """
+    df = model.dataset if dataset is None else dataset
+
+    if model.statements.ode_system is not None:
+        etas = pd.DataFrame(
+            0,
+            index=df[model.datainfo.id_column.name].unique(),
+            columns=model.random_variables.etas.names,
+        )
+        pred = _evaluate_linear_ode_prediction(model, etas, parameters, df)
+        return pd.Series(pred, name='PRED')
+
     y = get_population_prediction_expression(model)
     mapping = model.parameters.inits if parameters is None else parameters
     expr = y.subs(mapping)
 
-    df = model.dataset if dataset is None else dataset
-
     pred = eval_expr(expr, len(df), DataFrameMapping(df))
     return pd.Series(pred, name='PRED')
 
@@ -179,7 +190,8 @@ def evaluate_individual_prediction(
     The evaluation is done at the current eta values
     or optionally at the given eta values.
 
-    This function currently only support models without ODE systems
+    Models with ODE systems are supported if the system is linear and its rates
+    do not depend on time.
 
     Parameters
     ----------
@@ -223,10 +235,6 @@ def evaluate_individual_prediction(
     evaluate_population_prediction : Evaluate the population prediction
     """
 
-    y = get_individual_prediction_expression(model)
-    mapping = model.parameters.inits if parameters is None else parameters
-    y = y.subs(mapping)
-
     df = model.dataset if dataset is None else dataset
 
     idcol = model.datainfo.id_column.name
@@ -241,6 +249,14 @@ def evaluate_individual_prediction(
         else etas
     )
 
+    if model.statements.ode_system is not None:
+        ipred = _evaluate_linear_ode_prediction(model, _etas, parameters, df)
+        return pd.Series(ipred, name='IPRED')
+
+    y = get_individual_prediction_expression(model)
+    mapping = model.parameters.inits if parameters is None else parameters
+    y = y.subs(mapping)
+
     _df = df.join(_etas, on=idcol)
 
     ipred = eval_expr(y, len(_df), DataFrameMapping(_df))
@@ -485,13 +501,6 @@ def evaluate_weighted_residuals(
     Name: WRES, Length: 155, dtype: float64
     """
 
-    omega = model.random_variables.etas.covariance_matrix
-    sigma = model.random_variables.epsilons.covariance_matrix
-    parameters = model.parameters.inits if parameters is None else parameters
-    omega = omega.subs(parameters)
-    sigma = sigma.subs(parameters)
-    omega = omega.to_numpy()
-    sigma = sigma.to_numpy()
     df = model.dataset if dataset is None else dataset
     # FIXME: Could have option to gradients to set all etas 0
     etas = pd.DataFrame(
@@ -499,21 +508,477 @@ def evaluate_weighted_residuals(
         index=df[model.datainfo.id_column.name].unique(),
         columns=model.random_variables.etas.names,
     )
-    G = evaluate_eta_gradient(model, etas=etas, parameters=parameters, dataset=dataset)
+    F = evaluate_population_prediction(model, parameters=parameters, dataset=dataset)
+    WRES = _evaluate_whitened_residuals(model, etas, F.to_numpy(), parameters, df)
+    return pd.Series(WRES, name='WRES')
+
+
+def evaluate_conditional_weighted_residuals(
+    model: Model,
+    etas: Optional[pd.DataFrame] = None,
+    parameters: Optional[ParameterMap] = None,
+    dataset: Optional[pd.DataFrame] = None,
+):
+    """Evaluate the conditional weighted residuals
+
+    The residuals are evaluated with the model linearized around the given
+    individual eta values (typically the empirical Bayes estimates) instead of
+    around zero as for the weighted residuals.
+
+    The residuals is evaluated at the current model parameter values
+    or optionally at the given parameter values.
+    The residuals is done for each data record in the model dataset
+    or optionally using the dataset argument.
+    The residuals is done at the current eta values
+    or optionally at the given eta values.
+
+    This function currently only support models without ODE systems
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+    etas : pd.DataFrame
+        Optional individual eta values
+    parameters : dict
+        Optional dictionary of parameters and values
+    dataset : pd.DataFrame
+        Optional dataset
+
+    Returns
+    -------
+    pd.Series
+        CWRES
+
+    Examples
+    --------
+    >>> from pharmpy.modeling import load_example_model, evaluate_conditional_weighted_residuals
+    >>> from pharmpy.tools import load_example_modelfit_results
+    >>> model = load_example_model("pheno_linear")
+    >>> results = load_example_modelfit_results("pheno_linear")
+    >>> parameters = dict(results.parameter_estimates)
+    >>> etas = results.individual_estimates
+    >>> evaluate_conditional_weighted_residuals(model, etas=etas, parameters=parameters)
+    0     -0.305695
+    1      0.664750
+    2     -1.229693
+    3      1.742607
+    4      1.411125
+             ...
+    150    1.140839
+    151   -0.017752
+    152    0.041607
+    153    0.882184
+    154    0.749860
+    Name: CWRES, Length: 155, dtype: float64
+
+    See also
+    --------
+    evaluate_weighted_residuals : Evaluate the weighted residuals
+    """
+    df = model.dataset if dataset is None else dataset
+    idcol = model.datainfo.id_column.name
+
+    if etas is not None:
+        _etas = etas
+    elif model.initial_individual_estimates is not None:
+        _etas = model.initial_individual_estimates
+    else:
+        _etas = pd.DataFrame(
+            0,
+            index=df[idcol].unique(),
+            columns=model.random_variables.etas.names,
+        )
+
+    IPRED = evaluate_individual_prediction(
+        model, etas=_etas, parameters=parameters, dataset=dataset
+    )
+    G = evaluate_eta_gradient(model, etas=_etas, parameters=parameters, dataset=dataset)
+    # NOTE: The prediction of the model linearized around the etas at eta=0
+    eta_values = df[[idcol]].join(_etas, on=idcol)[model.random_variables.etas.names]
+    F = IPRED.to_numpy() - np.einsum('ij,ij->i', G.to_numpy(), eta_values.to_numpy(np.float64))
+    CWRES = _evaluate_whitened_residuals(model, _etas, F, parameters, df)
+    return pd.Series(CWRES, name='CWRES')
+
+
+def evaluate_npde(
+    model: Model,
+    simulations: Union[pd.DataFrame, np.ndarray],
+    dataset: Optional[pd.DataFrame] = None,
+):
+    """Evaluate the normalized prediction distribution errors
+
+    The observations of each individual and the simulated replicates are
+    decorrelated using the Cholesky factor of the empirical covariance
+    matrix of the simulations of the individual. The prediction discrepancy
+    of an observation is the fraction of the decorrelated simulations that
+    are below the decorrelated observation. It is transformed to a normal
+    distribution to give the NPDE. A discrepancy of 0 or 1 is replaced by
+    1/(2K) or 1 - 1/(2K) respectively, where K is the number of simulations.
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+    simulations : pd.DataFrame or np.ndarray
+        Simulated values of the dependent variable with one row per data
+        record or per observation record and one column per simulation
+    dataset : pd.DataFrame
+        Optional dataset
+
+    Returns
+    -------
+    pd.Series
+        NPDE with one value per data record. NaN for records that are not
+        observations
+
+    See also
+    --------
+    evaluate_npd : Evaluate the normalized prediction discrepancies
+    """
+    return _evaluate_npde(model, simulations, dataset, decorrelate=True)
+
+
+def evaluate_npd(
+    model: Model,
+    simulations: Union[pd.DataFrame, np.ndarray],
+    dataset: Optional[pd.DataFrame] = None,
+):
+    """Evaluate the normalized prediction discrepancies
+
+    The NPD are computed as the NPDE but without decorrelation of the
+    observations of each individual.
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+    simulations : pd.DataFrame or np.ndarray
+        Simulated values of the dependent variable with one row per data
+        record or per observation record and one column per simulation
+    dataset : pd.DataFrame
+        Optional dataset
+
+    Returns
+    -------
+    pd.Series
+        NPD with one value per data record. NaN for records that are not
+        observations
+
+    See also
+    --------
+    evaluate_npde : Evaluate the normalized prediction distribution errors
+    """
+    return _evaluate_npde(model, simulations, dataset, decorrelate=False)
+
+
+def _group_records_by_individual(ids: np.ndarray) -> list[np.ndarray]:
+    # Group the individuals by their number of records. Each group is an array
+    # with the record positions of one individual per row, so that quantities
+    # of all individuals in a group can be stacked into 3-D arrays.
+    codes, _ = pd.factorize(ids, sort=False)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return [order[starts[counts == m][:, np.newaxis] + np.arange(m)] for m in np.unique(counts)]
+
+
+def _whiten(C: np.ndarray, r: np.ndarray, decorrelation: str = 'symmetric') -> np.ndarray:
+    # Whiten residuals r (stack of vectors or matrices) with covariance matrices C
+    if decorrelation == 'cholesky':
+        # NOTE: A general batched solve since numpy has no batched triangular solve
+        return np.linalg.solve(np.linalg.cholesky(C), r)
+    # NOTE: C^(-1/2) for the symmetric square root, as used by NONMEM for WRES
+    w, V = np.linalg.eigh(C)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scaled = np.einsum('...ji,...j->...i', V, r) / np.sqrt(w)
+    return np.einsum('...ij,...j->...i', V, scaled)
+
+
+def _evaluate_whitened_residuals(
+    model: Model,
+    etas: pd.DataFrame,
+    F: np.ndarray,
+    parameters: Optional[ParameterMap],
+    df: pd.DataFrame,
+) -> np.ndarray:
+    # Residuals DV - F weighted with the covariance of the model linearized around etas:
+    # Ci = Gi Omega Gi^T + diag(Hi Sigma Hi^T)
+    omega = model.random_variables.etas.covariance_matrix
+    sigma = model.random_variables.epsilons.covariance_matrix
+    mapping = model.parameters.inits if parameters is None else parameters
+    omega = omega.subs(mapping).to_numpy()
+    sigma = sigma.subs(mapping).to_numpy()
+    dataset = None if df is model.dataset else df
+    G = evaluate_eta_gradient(model, etas=etas, parameters=parameters, dataset=dataset).to_numpy()
     H = evaluate_epsilon_gradient(model, etas=etas, parameters=parameters, dataset=dataset)
-    F = evaluate_population_prediction(model)
-    index = df[model.datainfo.id_column.name]
-    G.index = index
-    H.index = index
-    F.index = index
-    WRES = np.float64([])
-    for i in df[model.datainfo.id_column.name].unique():
-        Gi = np.float64(G.loc[[i]])
-        Hi = np.float64(H.loc[[i]])
-        Fi = F.loc[i:i]
-        DVi = (df['DV'][df[model.datainfo.id_column.name] == i]).astype(np.float64).values
-        Ci = Gi @ omega @ Gi.T + np.diag(np.diag(Hi @ sigma @ Hi.T))
-        WRESi = linalg.sqrtm(linalg.inv(Ci)) @ (DVi - Fi)
-        WRES = np.concatenate((WRES, WRESi))
+    H = H.to_numpy()
+    DV = df[model.datainfo.dv_column.name].to_numpy(dtype=np.float64)
+    residual_variance = np.einsum('ik,kl,il->i', H, sigma, H)
 
-    return pd.Series(WRES, name='WRES')
+    residuals = np.empty(len(df))
+    for rows in _group_records_by_individual(df[model.datainfo.id_column.name].to_numpy()):
+        Gb = G[rows]
+        C = np.einsum('sik,kl,sjl->sij', Gb, omega, Gb)
+        i = np.arange(rows.shape[1])
+        C[:, i, i] += residual_variance[rows]
+        residuals[rows] = _whiten(C, DV[rows] - F[rows])
+    return residuals
+
+
+def _evaluate_npde(
+    model: Model,
+    simulations: Union[pd.DataFrame, np.ndarray],
+    dataset: Optional[pd.DataFrame],
+    decorrelate: bool,
+) -> pd.Series:
+    df = model.dataset if dataset is None else dataset
+    # NOTE: Only observation records are evaluated. Other records get NaN
+    obs_index = _select_observations(df, _get_observation_label(model.datainfo)).index
+    obs_rows = np.flatnonzero(df.index.isin(obs_index))
+    sims = np.asarray(simulations, dtype=np.float64)
+    if sims.ndim != 2 or len(sims) not in (len(df), len(obs_rows)):
+        raise ValueError(
+            f'Expected simulations with one row per data record ({len(df)}) or per observation '
+            f'({len(obs_rows)}), got shape {sims.shape}'
+        )
+    if len(sims) == len(df):
+        sims = sims[obs_rows]
+    nsim = sims.shape[1]
+    DV = df[model.datainfo.dv_column.name].to_numpy(dtype=np.float64)[obs_rows]
+    ids = df[model.datainfo.id_column.name].to_numpy()[obs_rows]
+
+    pde = np.empty(len(obs_rows))
+    for rows in _group_records_by_individual(ids):
+        Y = sims[rows]
+        E = Y.mean(axis=2)
+        Ysim = Y - E[..., np.newaxis]
+        Yobs = (DV[rows] - E)[..., np.newaxis]
+        if decorrelate:
+            V = Ysim @ Ysim.transpose(0, 2, 1) / (nsim - 1)
+            Ysim = _whiten(V, Ysim, 'cholesky')
+            Yobs = _whiten(V, Yobs, 'cholesky')
+        pde[rows] = np.mean(Ysim < Yobs, axis=2)
+
+    pde = np.clip(pde, 1 / (2 * nsim), 1 - 1 / (2 * nsim))
+    values = np.full(len(df), np.nan)
+    values[obs_rows] = stats.norm.ppf(pde)
+    return pd.Series(values, name='NPDE' if decorrelate else 'NPD')
+
+
+def _get_column_names(model: Model, coltype: str) -> list[str]:
+    try:
+        return model.datainfo.typeix[coltype].names
+    except IndexError:
+        return []
+
+
+def _evaluate_linear_ode_prediction(
+    model: Model, etas: pd.DataFrame, parameters: Optional[ParameterMap], df: pd.DataFrame
+) -> np.ndarray:
+    # Numeric evaluation of the prediction for models with a linear ODE system
+    # with rates that are constant between records. The system is solved for all
+    # subjects at once by propagating the compartment amounts from event to event
+    # using batched matrix exponentials. As in NONMEM the values of the
+    # parameters of a record are used for the interval ending at that record.
+    statements = model.statements
+    odes = statements.ode_system
+    assert odes is not None
+    before = statements.before_odes
+    mapping = model.parameters.inits if parameters is None else parameters
+    idcol = model.datainfo.id_column.name
+    idvcol = model.datainfo.idv_column.name
+
+    _df = df.join(etas, on=idcol).reset_index(drop=True)
+    n = len(_df)
+
+    def evaluate(expr) -> np.ndarray:
+        expr = before.full_expression(expr).subs(mapping)
+        if odes.t in expr.free_symbols:
+            raise ValueError(
+                'Numeric evaluation of ODE systems only supports linear systems with rates '
+                f'that do not depend on time or amounts: {expr}'
+            )
+        return np.broadcast_to(eval_expr(expr, n, DataFrameMapping(_df)), n).astype(np.float64)
+
+    for coltype in ('additional', 'ss'):
+        for col in _get_column_names(model, coltype):
+            if (_df[col] != 0).any():
+                raise NotImplementedError(
+                    f'Numeric evaluation of ODE systems does not support {col} records'
+                )
+
+    names = odes.compartment_names
+    comps = [odes.find_compartment_or_raise(name) for name in names]
+    ncomps = len(comps)
+
+    K_expr = odes.compartmental_matrix
+    K = np.zeros((n, ncomps, ncomps))
+    for i in range(ncomps):
+        for j in range(ncomps):
+            if K_expr[i, j] != 0:
+                K[:, i, j] = evaluate(K_expr[i, j])
+    zero_order = np.zeros((n, ncomps))
+    for i, inp in enumerate(odes.zero_order_inputs):
+        if inp != 0:
+            zero_order[:, i] = evaluate(inp)
+
+    time = _df[idvcol].to_numpy(dtype=np.float64)
+    amt = _df[_get_column_names(model, 'dose')[0]].to_numpy(dtype=np.float64)
+    is_dose = amt != 0
+    evidcols = _get_column_names(model, 'event')
+    if evidcols:
+        evid = _df[evidcols[0]].to_numpy()
+        if np.isin(evid, (3, 4)).any():
+            raise NotImplementedError('Numeric evaluation of ODE systems does not support resets')
+        is_dose = evid == 1
+
+    dosing = odes.dosing_compartments
+    cmtcols = _get_column_names(model, 'compartment')
+    admidcols = _get_column_names(model, 'admid')
+    if cmtcols:
+        dose_comp = _df[cmtcols[0]].to_numpy(dtype=np.int64) - 1
+        if ((dose_comp[is_dose] < 0) | (dose_comp[is_dose] >= ncomps)).any():
+            raise ValueError(f'Dose to non-existing compartment in column {cmtcols[0]}')
+    else:
+        dose_comp = np.full(n, names.index(dosing[0].name))
+
+    # Dose events as arrays of (record, time, compartment, amount, rate)
+    dose_records, dose_times, dose_comps, dose_amounts, dose_rates = [], [], [], [], []
+    for k, comp in enumerate(comps):
+        records = np.flatnonzero(is_dose & (dose_comp == k))
+        if len(records) == 0:
+            continue
+        doses = comp.doses
+        if admidcols and len(doses) > 1:
+            admids = _df[admidcols[0]].to_numpy()[records]
+        else:
+            admids = None
+        for dose in doses if doses else (None,):
+            if admids is not None:
+                recs = records[admids == dose.admid]
+            else:
+                recs = records
+            if dose is None:
+                amount = amt
+            else:
+                amount = evaluate(dose.amount)
+            amount = amount * evaluate(comp.bioavailability)
+            lag = evaluate(comp.lag_time)
+            if isinstance(dose, Infusion) and dose.rate is not None:
+                rate = evaluate(dose.rate)
+            elif isinstance(dose, Infusion) and dose.duration is not None:
+                duration = evaluate(dose.duration)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    rate = np.where(duration > 0, amount / duration, 0.0)
+            else:
+                rate = np.zeros(n)
+            dose_records.append(recs)
+            dose_times.append(time[recs] + lag[recs])
+            dose_comps.append(np.full(len(recs), k))
+            dose_amounts.append(amount[recs])
+            dose_rates.append(rate[recs])
+            if admids is None:
+                break
+
+    if dose_records:
+        dose_record = np.concatenate(dose_records)
+        dose_time = np.concatenate(dose_times)
+        dose_cmt = np.concatenate(dose_comps)
+        dose_amount = np.concatenate(dose_amounts)
+        dose_rate = np.concatenate(dose_rates)
+    else:
+        dose_record = np.array([], dtype=np.int64)
+        dose_time = dose_amount = dose_rate = np.array([])
+        dose_cmt = np.array([], dtype=np.int64)
+
+    # Event kinds: 0 - record, 1 - bolus, 2 - change of infusion rate
+    infusion = dose_rate > 0
+    inf_record = dose_record[infusion]
+    inf_cmt = dose_cmt[infusion]
+    inf_rate = dose_rate[infusion]
+    inf_start = dose_time[infusion]
+    inf_end = inf_start + dose_amount[infusion] / inf_rate
+    bolus = ~infusion
+    records = np.arange(n)
+    lagged = dose_time != time[dose_record]
+
+    ev_record = np.concatenate((records, dose_record[bolus], inf_record, inf_record))
+    ev_time = np.concatenate((time, dose_time[bolus], inf_start, inf_end))
+    ev_kind = np.concatenate(
+        (np.zeros(n), np.ones(bolus.sum()), np.full(2 * infusion.sum(), 2))
+    ).astype(np.int64)
+    ev_cmt = np.concatenate((np.zeros(n, dtype=np.int64), dose_cmt[bolus], inf_cmt, inf_cmt))
+    ev_value = np.concatenate((np.zeros(n), dose_amount[bolus], inf_rate, -inf_rate))
+    # Events not at the time of their record are ordered before records at the same time
+    ev_pos = np.concatenate(
+        (
+            records,
+            np.where(lagged[bolus], -1, dose_record[bolus]),
+            np.where(lagged[infusion], -1, inf_record),
+            np.full(infusion.sum(), -1),
+        )
+    )
+    ev_id = _df[idcol].to_numpy()[ev_record]
+    ev_subject = pd.factorize(ev_id, sort=False)[0]
+    # Doses (kind 1 and 2) at the time of their own record come before the record itself
+    order = np.lexsort((-ev_kind, ev_pos, ev_time, ev_subject))
+    ev_record, ev_time, ev_kind, ev_cmt, ev_value, ev_subject = (
+        a[order] for a in (ev_record, ev_time, ev_kind, ev_cmt, ev_value, ev_subject)
+    )
+
+    # The parameters of the next record (or of the last record) govern each interval
+    governing = pd.Series(np.where(ev_kind == 0, ev_record, np.nan))
+    governing = governing.groupby(ev_subject).transform(lambda s: s.bfill().ffill())
+    ev_gov = governing.to_numpy(dtype=np.int64)
+
+    # Lay out the events as a (subject, event number) grid
+    nsubjects = ev_subject.max() + 1 if len(ev_subject) else 0
+    ev_number = pd.Series(ev_subject).groupby(ev_subject).cumcount().to_numpy()
+    nevents = ev_number.max() + 1 if len(ev_number) else 0
+    grid = np.full((nsubjects, nevents), -1)
+    grid[ev_subject, ev_number] = np.arange(len(ev_subject))
+
+    amounts = np.zeros((nsubjects, ncomps))
+    rates = np.zeros((nsubjects, ncomps))
+    previous_time = ev_time[grid[:, 0]] if nevents else np.array([])
+    result = np.empty((n, ncomps))
+    for p in range(nevents):
+        events = grid[:, p]
+        subjects = np.flatnonzero(events >= 0)
+        events = events[subjects]
+        dt = ev_time[events] - previous_time[subjects]
+        moving = dt > 0
+        if moving.any():
+            subj = subjects[moving]
+            ev = events[moving]
+            gov = ev_gov[ev]
+            # Augmented system to include constant inputs: d/dt [A, 1] = [[K, r], [0, 0]] [A, 1]
+            augmented = np.zeros((len(subj), ncomps + 1, ncomps + 1))
+            augmented[:, :ncomps, :ncomps] = K[gov]
+            augmented[:, :ncomps, ncomps] = rates[subj] + zero_order[gov]
+            augmented *= dt[moving][:, np.newaxis, np.newaxis]
+            propagator = linalg.expm(augmented)
+            amounts[subj] = (
+                np.einsum('nij,nj->ni', propagator[:, :ncomps, :ncomps], amounts[subj])
+                + propagator[:, :ncomps, ncomps]
+            )
+        previous_time[subjects] = ev_time[events]
+
+        kind = ev_kind[events]
+        is_bolus = kind == 1
+        amounts[subjects[is_bolus], ev_cmt[events[is_bolus]]] += ev_value[events[is_bolus]]
+        is_rate = kind == 2
+        rates[subjects[is_rate], ev_cmt[events[is_rate]]] += ev_value[events[is_rate]]
+        is_record = kind == 0
+        result[ev_record[events[is_record]]] = amounts[subjects[is_record]]
+
+    dv = list(model.dependent_variables.keys())[0]
+    y = before.full_expression(statements.after_odes.full_expression(dv))
+    y = y.subs({Expr.symbol(eps): 0 for eps in model.random_variables.epsilons.names})
+    y = y.subs({amount: Expr.symbol(amount.name) for amount in odes.amounts})
+    y = y.subs(mapping)
+
+    data = _df.assign(**{amount.name: result[:, i] for i, amount in enumerate(odes.amounts)})
+    data[odes.t.name] = time
+    return np.broadcast_to(eval_expr(y, n, DataFrameMapping(data)), n).astype(np.float64)
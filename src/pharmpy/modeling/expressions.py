@@ -855,12 +855,15 @@ def _cut_partial_odes(model, g, dv):
             deps |= set(nx.descendants(ode_deps, amount))
         return deps
 
+    # NOTE: The equations are derived from the compartmental matrix on each access
+    eqs = odes.eqs
+
     ode_deps = nx.DiGraph()
-    for eq in odes.eqs:
+    for eq in eqs:
         fn = dep_funcs(eq.lhs).pop()
         ode_deps.add_node(fn)
 
-    for eq in odes.eqs:
+    for eq in eqs:
         lhs_func = dep_funcs(eq.lhs).pop()
         rhs_funcs = dep_funcs(eq.rhs) - {lhs_func}
         for fn in rhs_funcs:
@@ -877,7 +880,7 @@ def _cut_partial_odes(model, g, dv):
     dep_symbs = set()
     nondep_symbs = set()
 
-    for eq in odes.eqs:
+    for eq in eqs:
         lhs_func = dep_funcs(eq.lhs).pop()
         if lhs_func in deps:
             dep_symbs |= eq.free_symbols
@@ -3,10 +3,12 @@
 """
 
 from collections.abc import Mapping
+from dataclasses import dataclass
 from typing import Literal, Union
 
 from pharmpy.basic import Expr, TExpr
 from pharmpy.deps import sympy
+from pharmpy.internals.memo import IdentityMemo
 from pharmpy.internals.unicode import bracket
 from pharmpy.model import (
     Assignment,
@@ -1673,6 +1675,116 @@ def has_lag_time(model: Model):
     return False
 
 
+@dataclass(frozen=True)
+class _OdeFeatures:
+    dose: Union[Bolus, Infusion]
+    dose_to_central: bool
+    first_order_absorption: bool
+    nonlinear_elimination: bool
+    clearance_in_elimination: bool
+    transits: int
+    depot: bool
+    lagtime: bool
+    peripherals: int
+
+
+# NOTE: Features of the ODE systems of statements
+_ode_features: IdentityMemo[_OdeFeatures] = IdentityMemo()
+
+
+def get_structural_features(model: Model) -> dict:
+    """Get the absorption, elimination, absorption delay and distribution of a model
+
+    The features are determined in the same way as by the corresponding checks, e.g.
+    :func:`has_seq_zo_fo_absorption` and :func:`get_number_of_transit_compartments`,
+    but the ODE system is only inspected once. What is found in the ODE system is
+    memoised on the statements of the model.
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model
+
+    Return
+    ------
+    dict
+        Absorption ('SEQ-ZO-FO', 'ZO', 'FO', 'INST' or None), elimination ('MIX-FO-MM',
+        'ZO', 'FO', 'MM' or None), number of transit compartments, whether the model
+        has a depot and lag time and number of peripheral compartments
+
+    Examples
+    --------
+    >>> from pharmpy.modeling import load_example_model
+    >>> from pharmpy.modeling.odes import get_structural_features
+    >>> model = load_example_model("pheno")
+    >>> get_structural_features(model)  # doctest: +NORMALIZE_WHITESPACE
+    {'absorption': 'INST', 'elimination': 'FO', 'transits': 0, 'depot': False,
+     'lagtime': False, 'peripherals': 0}
+    """
+    odes = get_and_check_odes(model)
+    features = _get_ode_features(model.statements, odes)
+
+    is_zero_order_absorption = _dose_zo(model, features.dose)
+    if is_zero_order_absorption and features.first_order_absorption:
+        absorption = 'SEQ-ZO-FO'
+    elif is_zero_order_absorption:
+        absorption = 'ZO'
+    elif features.first_order_absorption:
+        absorption = 'FO'
+    elif features.dose_to_central and isinstance(features.dose, Bolus):
+        absorption = 'INST'
+    else:
+        absorption = None
+
+    is_nonlinear = features.nonlinear_elimination
+    is_zero_order = 'POP_KM' in model.parameters and model.parameters['POP_KM'].fix
+    could_be_mixed = features.clearance_in_elimination
+    if not is_nonlinear:
+        elimination = 'FO'
+    elif could_be_mixed:
+        elimination = None if is_zero_order else 'MIX-FO-MM'
+    else:
+        elimination = 'ZO' if is_zero_order else 'MM'
+
+    return {
+        'absorption': absorption,
+        'elimination': elimination,
+        'transits': features.transits,
+        'depot': features.depot,
+        'lagtime': features.lagtime,
+        'peripherals': features.peripherals,
+    }
+
+
+def _get_ode_features(statements: Statements, odes: CompartmentalSystem) -> _OdeFeatures:
+    return _ode_features.get(statements, lambda: _find_ode_features(statements, odes))
+
+
+def _find_ode_features(statements: Statements, odes: CompartmentalSystem) -> _OdeFeatures:
+    central = odes.central_compartment
+    dosing = odes.dosing_compartments[0]
+
+    in_flow = [comp for comp, _ in odes.get_compartment_inflows(central) if comp != output]
+    out_flow = [comp for comp, _ in odes.get_compartment_outflows(central) if comp != output]
+    unidirectional_flow = [comp for comp in in_flow if comp not in out_flow]
+
+    rate = odes.get_flow(central, output)
+    transits = odes.find_transit_compartments(statements)
+    depot = odes.find_depot(statements)
+
+    return _OdeFeatures(
+        dose=dosing.doses[0],
+        dose_to_central=dosing == central,
+        first_order_absorption=dosing != central and len(unidirectional_flow) == 1,
+        nonlinear_elimination=odes.t in rate.free_symbols,
+        clearance_in_elimination=Expr.symbol('CL') in rate.free_symbols,
+        transits=len(transits),
+        depot=depot is not None,
+        lagtime=bool(dosing.lag_time),
+        peripherals=len(odes.find_peripheral_compartments()),
+    )
+
+
 def _add_zero_order_absorption(
     model, old_dose, to_comp, parameter_name, lag_time=None, replace=True
 ):
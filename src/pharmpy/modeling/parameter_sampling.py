@@ -104,17 +104,30 @@ def _sample_from_function(
     else:
         force_posdef = False
 
+    # NOTE: Parameter vectors of the covariance matrices are the samples for the sampled
+    # parameters and the initial estimates for the others
+    rvs = model.random_variables
+    cov = rvs.numeric_covariance()
+    inits = model.parameters.inits
+    base = np.array([inits[name] for name in cov.parameter_names], dtype=np.float64)
+    sampled = [
+        (i, parameter_estimates.index.get_loc(name))
+        for i, name in enumerate(cov.parameter_names)
+        if name in parameter_estimates.index
+    ]
+    cov_cols, sample_cols = (list(a) for a in zip(*sampled)) if sampled else ([], [])
+
     i = 0
     while remaining > 0:
         samples = samplingfn(pe, lower, upper, n=remaining, rng=rng)
-        df = pd.DataFrame(samples, columns=parameter_estimates.keys())
+        values = np.tile(base, (len(samples), 1))
+        values[:, cov_cols] = samples[:, sample_cols]
         if not force_posdef:
-            selected = df[df.apply(model.random_variables.validate_parameters, axis=1)]
+            samples = samples[cov.validate(values)]
         else:
-            rvs = model.random_variables
-            selected = df.transform(
-                lambda row: pd.Series(rvs.nearest_valid_parameters(row)), axis=1
-            )
+            samples = samples.copy()
+            samples[:, sample_cols] = cov.nearest_valid(values)[:, cov_cols]
+        selected = pd.DataFrame(samples, columns=parameter_estimates.keys())
         kept_samples = pd.concat((kept_samples, selected))
         remaining = n - len(kept_samples)
         i += 1
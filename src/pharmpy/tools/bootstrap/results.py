@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import warnings
 from dataclasses import dataclass, replace
 from pathlib import Path
@@ -91,94 +93,203 @@ def plot_parameter_estimates_histogram(res):
     return plot
 
 
+class BootstrapAggregator:
+    """Aggregation of bootstrap fits one fit at a time
+
+    Only the parameter estimates and OFVs of each fit are kept, as compact arrays, so
+    results can be created at any time, e.g. for interim results while fits are still
+    running, and the models and datasets of finished fits can be released.
+
+    Parameters
+    ----------
+    original_results : ModelfitResults
+        Results of the original model or None
+    """
+
+    def __init__(self, original_results: Optional[ModelfitResults] = None):
+        self.original_results = original_results
+        self.parameter_names = None
+        self._estimates = []
+        self._ofvs = []
+        self._included = []
+        self._intervals = None
+        self.stopped = False
+
+    @property
+    def n(self) -> int:
+        """Number of added fits"""
+        return len(self._ofvs)
+
+    def copy(self) -> BootstrapAggregator:
+        new = BootstrapAggregator(self.original_results)
+        new.parameter_names = self.parameter_names
+        new._estimates = list(self._estimates)
+        new._ofvs = list(self._ofvs)
+        new._included = list(self._included)
+        new._intervals = self._intervals
+        new.stopped = self.stopped
+        return new
+
+    def add(
+        self,
+        results: Optional[ModelfitResults],
+        included_individuals: Optional[list] = None,
+        origdata_ofv: Optional[float] = None,
+    ):
+        """Add the results of the next bootstrap fit
+
+        Parameters
+        ----------
+        results : ModelfitResults
+            Results of the fit on the resampled dataset or None if not available
+        included_individuals : list
+            Individuals of the original dataset included in the resampled dataset,
+            repeated as many times as they were sampled
+        origdata_ofv : float
+            OFV of the bootstrap estimates evaluated on the original dataset
+        """
+        pe = None if results is None else results.parameter_estimates
+        if pe is not None:
+            if self.parameter_names is None:
+                self.parameter_names = pe.index
+            self._estimates.append(pe.reindex(self.parameter_names).to_numpy(dtype=np.float64))
+
+        ofv = np.nan if results is None or results.ofv is None else results.ofv
+        original_bootdata_ofv = np.nan
+        base_iofv = None if self.original_results is None else self.original_results.individual_ofv
+        if included_individuals and base_iofv is not None:
+            original_bootdata_ofv = base_iofv[included_individuals].sum()
+        origdata_ofv = np.nan if origdata_ofv is None else origdata_ofv
+        self._ofvs.append((ofv, original_bootdata_ofv, origdata_ofv))
+        self._included.append(included_individuals)
+
+    @property
+    def parameter_estimates(self) -> pd.DataFrame:
+        """Parameter estimates with one row per fit with estimates"""
+        names = self.parameter_names
+        if names is None:
+            # NOTE: No fit with estimates has been added
+            orig = self.original_results
+            orig = None if orig is None else orig.parameter_estimates
+            names = pd.Index([]) if orig is None else orig.index
+        return pd.DataFrame(
+            np.array(self._estimates, dtype=np.float64).reshape(len(self._estimates), len(names)),
+            columns=names,
+        )
+
+    def check_intervals(self, tolerance: float) -> bool:
+        """Check whether the 95% confidence intervals of the parameters have stabilised
+
+        The limits of the intervals are compared with the limits at the previous check.
+        They are stable if no limit moved more than tolerance times the width of its
+        interval.
+        """
+        if not self._estimates:
+            return False
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', r'All-NaN slice encountered')
+            intervals = np.nanquantile(np.array(self._estimates), [0.025, 0.975], axis=0)
+        previous, self._intervals = self._intervals, intervals
+        if previous is None:
+            return False
+        width = previous[1] - previous[0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.abs(intervals - previous) / width
+        # NOTE: Zero width intervals are stable as long as they do not move
+        change[:, width == 0] = np.where(intervals == previous, 0.0, np.inf)[:, width == 0]
+        return bool(np.all(change <= tolerance))
+
+    def results(self, plots: bool = True) -> BootstrapResults:
+        """Create bootstrap results from all fits added so far"""
+        original_results = self.original_results
+        parameter_estimates = self.parameter_estimates
+        df = parameter_estimates
+
+        with warnings.catch_warnings():
+            # NOTE: The statistics are NaN if less than two fits have estimates
+            warnings.filterwarnings('ignore', category=RuntimeWarning)
+            covariance_matrix = df.cov()
+            mean = df.mean()
+            if original_results is not None:
+                orig = original_results.parameter_estimates
+                bias = mean - orig
+            else:
+                bias = np.nan
+            statistics = pd.DataFrame(
+                {'mean': mean, 'median': df.median(), 'bias': bias, 'stderr': df.std()}
+            )
+            statistics['RSE'] = statistics['stderr'] / statistics['mean']
+
+            distribution = create_distribution(df)
+
+        ofvs = pd.DataFrame(
+            np.array(self._ofvs).reshape(self.n, 3),
+            columns=['bootstrap_bootdata_ofv', 'original_bootdata_ofv', 'bootstrap_origdata_ofv'],
+        )
+        if original_results is not None:
+            ofvs['original_origdata_ofv'] = original_results.ofv
+
+        ofvs['delta_bootdata'] = ofvs['original_bootdata_ofv'] - ofvs['bootstrap_bootdata_ofv']
+
+        if original_results is not None:
+            ofvs['delta_origdata'] = ofvs['bootstrap_origdata_ofv'] - ofvs['original_origdata_ofv']
+        else:
+            ofvs['delta_origdata'] = np.nan
+
+        with warnings.catch_warnings():
+            # Catch numpy warnings beause of NaN in ofvs
+            warnings.filterwarnings('ignore', r'All-NaN slice encountered')
+            warnings.filterwarnings('ignore', 'Mean of empty slice')
+            ofv_dist = create_distribution(ofvs)
+            ofv_stats = pd.DataFrame(
+                {'mean': ofvs.mean(), 'median': ofvs.median(), 'stderr': ofvs.std()}
+            )
+
+        included_individuals = self._included if any(self._included) else None
+
+        res = BootstrapResults(
+            covariance_matrix=covariance_matrix,
+            parameter_statistics=statistics,
+            parameter_distribution=distribution,
+            ofv_distribution=ofv_dist,
+            ofv_statistics=ofv_stats,
+            included_individuals=included_individuals,
+            ofvs=ofvs,
+            parameter_estimates=parameter_estimates,
+        )
+
+        if not plots:
+            return res
+
+        return replace(
+            res,
+            ofv_plot=plot_ofv(res),
+            # FIXME: Plot broken
+            # parameter_estimates_correlation_plot = plot_parameter_estimates_correlation(res)
+            dofv_quantiles_plot=plot_dofv_quantiles(res),
+            parameter_estimates_histogram=plot_parameter_estimates_histogram(res),
+        )
+
+
 def calculate_results(
     bootstrap_models, results, original_results=None, included_individuals=None, dofv_results=None
 ):
+    _warn_if_no_original_results(original_results)
+    aggregator = BootstrapAggregator(original_results)
+    for i, res in enumerate(results):
+        included = included_individuals[i] if included_individuals else None
+        dofv_res = dofv_results[i] if dofv_results is not None and i < len(dofv_results) else None
+        aggregator.add(res, included, None if dofv_res is None else dofv_res.ofv)
+    return aggregator.results()
+
+
+def _warn_if_no_original_results(original_results):
     if original_results is None:
         warnings.warn(
             'No results for the base model could be read. Cannot calculate bias and '
             'original_bootdata_ofv'
         )
 
-    df = pd.DataFrame()
-    for res in results:
-        df = pd.concat([df, res.parameter_estimates], axis=1, ignore_index=True, sort=False)
-    df = df.T
-    df = df.reindex(results[0].parameter_estimates.index, axis=1)
-    parameter_estimates = df.reset_index(drop=True)
-
-    covariance_matrix = df.cov()
-
-    df = parameter_estimates.copy()
-    mean = df.mean()
-    if original_results is not None:
-        orig = original_results.parameter_estimates
-        bias = mean - orig
-    else:
-        bias = np.nan
-    statistics = pd.DataFrame(
-        {'mean': mean, 'median': df.median(), 'bias': bias, 'stderr': df.std()}
-    )
-    statistics['RSE'] = statistics['stderr'] / statistics['mean']
-
-    df = parameter_estimates
-    distribution = create_distribution(df)
-
-    boot_ofvs = [x.ofv for x in results]
-    ofvs = pd.Series(boot_ofvs, name='bootstrap_bootdata_ofv')
-    ofvs = pd.DataFrame(ofvs)
-    ofvs['original_bootdata_ofv'] = np.nan
-    ofvs['bootstrap_origdata_ofv'] = np.nan
-    if original_results is not None:
-        base_iofv = original_results.individual_ofv
-        if included_individuals and base_iofv is not None:
-            for i, included in enumerate(included_individuals):
-                ofvs.at[i, 'original_bootdata_ofv'] = base_iofv[included].sum()
-
-    if dofv_results is not None:
-        for i, res in enumerate(dofv_results):
-            if res is not None:
-                ofvs.at[i, 'bootstrap_origdata_ofv'] = res.ofv
-
-    if original_results is not None:
-        ofvs['original_origdata_ofv'] = original_results.ofv
-
-    ofvs['delta_bootdata'] = ofvs['original_bootdata_ofv'] - ofvs['bootstrap_bootdata_ofv']
-
-    if original_results is not None:
-        ofvs['delta_origdata'] = ofvs['bootstrap_origdata_ofv'] - ofvs['original_origdata_ofv']
-    else:
-        ofvs['delta_origdata'] = np.nan
-
-    with warnings.catch_warnings():
-        # Catch numpy warnings beause of NaN in ofvs
-        warnings.filterwarnings('ignore', r'All-NaN slice encountered')
-        warnings.filterwarnings('ignore', 'Mean of empty slice')
-        ofv_dist = create_distribution(ofvs)
-        ofv_stats = pd.DataFrame(
-            {'mean': ofvs.mean(), 'median': ofvs.median(), 'stderr': ofvs.std()}
-        )
-
-    res = BootstrapResults(
-        covariance_matrix=covariance_matrix,
-        parameter_statistics=statistics,
-        parameter_distribution=distribution,
-        ofv_distribution=ofv_dist,
-        ofv_statistics=ofv_stats,
-        included_individuals=included_individuals,
-        ofvs=ofvs,
-        parameter_estimates=parameter_estimates,
-    )
-
-    return replace(
-        res,
-        ofv_plot=plot_ofv(res),
-        # FIXME: Plot broken
-        # parameter_estimates_correlation_plot = plot_parameter_estimates_correlation(res)
-        dofv_quantiles_plot=plot_dofv_quantiles(res),
-        parameter_estimates_histogram=plot_parameter_estimates_histogram(res),
-    )
-
 
 def create_distribution(df):
     dist = pd.DataFrame(
@@ -1,14 +1,27 @@
-from typing import Optional
+from typing import Optional, Union
 
+from pharmpy.deps import numpy as np
+from pharmpy.deps import pandas as pd
 from pharmpy.model import Model
-from pharmpy.modeling import resample_data
-from pharmpy.tools.bootstrap.results import calculate_results
-from pharmpy.tools.modelfit import create_fit_workflow
+from pharmpy.modeling import create_rng
+from pharmpy.tools.bootstrap.results import BootstrapAggregator, _warn_if_no_original_results
+from pharmpy.tools.modelfit.tool import retrieve_from_database_or_execute_model_with_tool
 from pharmpy.workflows import ModelEntry, Task, Workflow, WorkflowBuilder
 from pharmpy.workflows.results import ModelfitResults
 
+# NOTE: Number of fits aggregated together. The fits of a batch wait for the aggregation
+# of the batch before the previous one, which allows stopping when the confidence
+# intervals have stabilised while keeping two batches of fits running.
+BATCH_SIZE = 25
 
-def create_workflow(model: Model, results: Optional[ModelfitResults] = None, resamples: int = 1):
+
+def create_workflow(
+    model: Model,
+    results: Optional[ModelfitResults] = None,
+    resamples: int = 1,
+    seed: Optional[Union[np.random.Generator, int]] = None,
+    ci_tolerance: Optional[float] = None,
+):
     """Run bootstrap tool
 
     Parameters
@@ -19,6 +32,12 @@ def create_workflow(model: Model, results: Optional[ModelfitResults] = None, res
         Results for model
     resamples : int
         Number of bootstrap resamples
+    seed : int or rng
+        Random number generator or seed for the resampling
+    ci_tolerance : float
+        Stop when no limit of the 95% confidence intervals of the parameters has moved
+        more than ci_tolerance times the width of its interval after a batch of fits.
+        Default is to run all resamples.
 
     Returns
     -------
@@ -36,36 +55,100 @@ def create_workflow(model: Model, results: Optional[ModelfitResults] = None, res
 
     wb = WorkflowBuilder(name='bootstrap')
 
-    for i in range(resamples):
-        task_resample = Task('resample', resample_model, model, f'bs_{i + 1}')
-        wb.add_task(task_resample)
+    # NOTE: Only a seed per resample is created here. The resampled datasets are created
+    # in the fit tasks.
+    seeds = create_rng(seed).integers(2**63, size=resamples)
+
+    aggregate_tasks = []
+    for start in range(0, resamples, BATCH_SIZE):
+        fit_tasks = []
+        for i in range(start, min(start + BATCH_SIZE, resamples)):
+            task_fit = Task(f'fit{i + 1}', fit_resample, model, f'bs_{i + 1}', int(seeds[i]))
+            if len(aggregate_tasks) >= 2:
+                wb.add_task(task_fit, predecessors=aggregate_tasks[-2])
+            else:
+                wb.add_task(task_fit)
+            fit_tasks.append(task_fit)
 
-    wf_fit = create_fit_workflow(n=resamples)
-    wb.insert_workflow(wf_fit)
+        batch = len(aggregate_tasks) + 1
+        if aggregate_tasks:
+            task_aggregate = Task(f'aggregate{batch}', aggregate_fits, resamples, ci_tolerance)
+            wb.add_task(task_aggregate, predecessors=[aggregate_tasks[-1]] + fit_tasks)
+        else:
+            task_aggregate = Task(
+                f'aggregate{batch}',
+                aggregate_fits,
+                resamples,
+                ci_tolerance,
+                BootstrapAggregator(results),
+            )
+            wb.add_task(task_aggregate, predecessors=fit_tasks)
+        aggregate_tasks.append(task_aggregate)
 
-    task_result = Task('results', post_process_results, results)
-    wb.add_task(task_result, predecessors=wb.output_tasks)
+    task_result = Task('results', post_process_results)
+    wb.add_task(task_result, predecessors=aggregate_tasks[-1])
 
     return Workflow(wb)
 
 
-def resample_model(input_model, name):
-    resample = resample_data(
-        input_model, input_model.datainfo.id_column.name, resamples=1, name=name
-    )
-    model, _ = next(resample)
+def resample_model(input_model: Model, name: str, seed: int) -> tuple[Model, list]:
+    """Resample the individuals of the dataset of a model with replacement
+
+    The row numbers of each individual are found once and the resampled dataset is
+    taken from the original dataset in one step. The individuals are renumbered from 1
+    in the order they were sampled.
+    """
+    df = input_model.dataset
+    idcol = input_model.datainfo.id_column.name
+    codes, ids = pd.factorize(df[idcol])
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=len(ids))
+    starts = np.concatenate(([0], np.cumsum(counts)))
+
+    rng = create_rng(seed)
+    sampled = rng.integers(len(ids), size=len(ids))
+    rows = np.concatenate([order[starts[j] : starts[j + 1]] for j in sampled])
+
+    resampled_df = df.iloc[rows].reset_index(drop=True)
+    resampled_df[idcol] = np.repeat(np.arange(1, len(sampled) + 1), counts[sampled])
+    model = input_model.replace(name=name, dataset=resampled_df)
+    return model, ids[sampled].tolist()
+
+
+def fit_resample(context, input_model, name, seed, aggregator=None):
+    if aggregator is not None and aggregator.stopped:
+        return None
+    model, included = resample_model(input_model, name, seed)
     model_entry = ModelEntry.create(model=model, parent=input_model)
-    return model_entry
-
-
-def post_process_results(original_model_res, *model_entries):
-    models = [model_entry.model for model_entry in model_entries]
-    modelfit_results = [model_entry.modelfit_results for model_entry in model_entries]
-    res = calculate_results(
-        models,
-        results=modelfit_results,
-        original_results=original_model_res,
-        included_individuals=None,
-        dofv_results=None,
-    )
-    return res
+    execute_model = retrieve_from_database_or_execute_model_with_tool()
+    model_entry = execute_model(context, model_entry)
+    # NOTE: Only keep what is needed for the results to not hold on to models and datasets
+    res = model_entry.modelfit_results
+    if res is not None:
+        res = ModelfitResults(ofv=res.ofv, parameter_estimates=res.parameter_estimates)
+    return res, included
+
+
+def aggregate_fits(context, resamples, ci_tolerance, aggregator, *fits):
+    aggregator = aggregator.copy()
+    for fit in fits:
+        if fit is not None:
+            aggregator.add(*fit)
+    if ci_tolerance is not None and not aggregator.stopped:
+        aggregator.stopped = aggregator.check_intervals(ci_tolerance)
+        if aggregator.stopped:
+            context.log_message(
+                'note',
+                f'Confidence intervals stable after {aggregator.n} of {resamples} resamples. '
+                'Resamples that have not been started are skipped.',
+            )
+    if aggregator.n < resamples and not aggregator.stopped:
+        context.store_results(aggregator.results(plots=False))
+    return aggregator
+
+
+def post_process_results(context, aggregator):
+    _warn_if_no_original_results(aggregator.original_results)
+    if aggregator.parameter_names is None:
+        context.log_message('warning', 'None of the bootstrap fits gave parameter estimates')
+    return aggregator.results()
@@ -1,6 +1,5 @@
 import re
 from dataclasses import dataclass
-from math import sqrt
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
@@ -38,27 +37,39 @@ def compute_cook_scores(base_estimate, cdd_estimates, covariance_matrix):
         chol, islow = linalg.cho_factor(covariance_matrix)
         delta_matrix = cdd_estimates - base_estimate
         x = linalg.solve_triangular(chol, delta_matrix.transpose(), lower=islow, trans=1)
-        return list(map(np.linalg.norm, x.transpose()))
+        return np.linalg.norm(x, axis=0).tolist()
     except Exception:
         return None
 
 
+def _skip_mask(index, skipped_individuals):
+    # Sparse representation of the (case x individual) skip-mask matrix as
+    # arrays of (case number, position in index) pairs. IDs not in index are dropped.
+    lengths = [len(skipped) for skipped in skipped_individuals]
+    cases = np.repeat(np.arange(len(lengths)), lengths)
+    # need to set dtype for the lookup to work
+    ids = np.array([i for skipped in skipped_individuals for i in skipped]).astype(index.dtype)
+    positions = index.get_indexer(pd.Index(ids))
+    found = positions >= 0
+    pairs = np.unique(np.stack((cases[found], positions[found])), axis=1)
+    return pairs[0], pairs[1]
+
+
 def compute_delta_ofv(base_model_results, cdd_model_results, skipped_individuals):
     iofv = base_model_results.individual_ofv
     if iofv is None:
         return [np.nan] * len(cdd_model_results)
 
-    cdd_ofvs = [res.ofv if res is not None else np.nan for res in cdd_model_results]
-
-    # need to set dtype for index.difference to work
-    skipped_indices = [
-        pd.Index(np.array(skipped, dtype=iofv.index.dtype)) for skipped in skipped_individuals
-    ]
+    cdd_ofvs = np.array(
+        [res.ofv if res is not None else np.nan for res in cdd_model_results], dtype=np.float64
+    )
 
-    return [
-        sum(iofv[iofv.index.difference(skipped)]) - ofv
-        for skipped, ofv in zip(skipped_indices, cdd_ofvs)
-    ]
+    # The OFV of the individuals remaining in each case is the total OFV minus
+    # the product of the skip-mask matrix with the individual OFVs
+    values = iofv.to_numpy(dtype=np.float64)
+    cases, positions = _skip_mask(iofv.index, skipped_individuals)
+    skipped_ofv = np.bincount(cases, weights=values[positions], minlength=len(cdd_ofvs))
+    return (values.sum() - skipped_ofv - cdd_ofvs).tolist()
 
 
 def compute_jackknife_covariance_matrix(cdd_estimates):
@@ -69,15 +80,23 @@ def compute_jackknife_covariance_matrix(cdd_estimates):
 
 def compute_covariance_ratios(cdd_model_results, covariance_matrix):
     try:
-        orig_det = np.linalg.det(covariance_matrix)
-        return [
-            (
-                sqrt(np.linalg.det(res.covariance_matrix) / orig_det)
-                if res is not None and res.covariance_matrix is not None
-                else np.nan
-            )
-            for res in cdd_model_results
-        ]
+        orig_sign, orig_logdet = np.linalg.slogdet(covariance_matrix)
+        ratios = np.full(len(cdd_model_results), np.nan)
+
+        # Stack covariance matrices of equal shape to compute all log-determinants at once
+        stacks = {}
+        for i, res in enumerate(cdd_model_results):
+            if res is not None and res.covariance_matrix is not None:
+                cov = np.asarray(res.covariance_matrix, dtype=np.float64)
+                stacks.setdefault(cov.shape, ([], []))
+                stacks[cov.shape][0].append(i)
+                stacks[cov.shape][1].append(cov)
+
+        for indices, covs in stacks.values():
+            sign, logdet = np.linalg.slogdet(np.stack(covs))
+            ratio = np.sqrt(np.exp(logdet - orig_logdet))
+            ratios[indices] = np.where(sign * orig_sign > 0, ratio, np.nan)
+        return ratios.tolist()
     except Exception:
         return None
 
@@ -54,6 +54,7 @@ class ToolResults(Results):
     summary_individuals: Optional[pd.DataFrame] = None
     summary_individuals_count: Optional[pd.DataFrame] = None
     summary_errors: Optional[pd.DataFrame] = None
+    summary_fit_cache: Optional[pd.DataFrame] = None
     final_model: Optional[Model] = None
     final_results: Optional[ModelfitResults] = None
     models: Sequence[Model] = ()
@@ -1,5 +1,6 @@
 from collections import Counter, defaultdict
 from dataclasses import astuple, dataclass, replace
+from functools import partial
 from itertools import count
 from typing import Any, Callable, Iterable, List, Literal, Optional, Tuple, Union
 
@@ -31,6 +32,7 @@ from pharmpy.tools.modelfit import create_fit_workflow
 from pharmpy.tools.run import summarize_modelfit_results_from_entries
 from pharmpy.tools.scm.results import candidate_summary_dataframe, ofv_summary_dataframe
 from pharmpy.workflows import ModelEntry, Task, Workflow, WorkflowBuilder, call_workflow
+from pharmpy.workflows.pool import add_batch_tasks
 from pharmpy.workflows.results import ModelfitResults
 
 from ..mfl.filter import COVSEARCH_STATEMENT_TYPES
@@ -604,20 +606,14 @@ def perform_step_procedure(
         # Filter effects with same parameter or covariate
         last_step_effect = best_candidate_so_far.steps[-1].effect
 
-        candidate_effect_funcs = {
-            effect_description: effect_func
-            for effect_description, effect_func in candidate_effect_funcs.items()
-            if effect_description[0] != last_step_effect.parameter
-            or effect_description[1] != last_step_effect.covariate
-        }
-
         # Filter away any stashed effects as well
-        nonsig_param_cov_eff = tuple((eff[0], eff[1]) for eff in nonsignificant_effects.keys())
+        excluded_param_cov = {(eff[0], eff[1]) for eff in nonsignificant_effects.keys()}
+        excluded_param_cov.add((last_step_effect.parameter, last_step_effect.covariate))
 
         candidate_effect_funcs = {
             effect_description: effect_func
             for effect_description, effect_func in candidate_effect_funcs.items()
-            if (effect_description[0], effect_description[1]) not in nonsig_param_cov_eff
+            if (effect_description[0], effect_description[1]) not in excluded_param_cov
         }
 
     return nonsignificant_effects, all_candidates_so_far, best_candidate_so_far
@@ -631,16 +627,18 @@ def wf_effects_addition(
 ):
     wb = WorkflowBuilder()
 
-    for i, effect in enumerate(candidate_effect_funcs.items(), 1):
-        task = Task(
-            repr(effect[0]),
-            task_add_covariate_effect,
-            modelentry,
-            candidate,
-            effect,
-            index_offset + i,
-        )
-        wb.add_task(task)
+    # NOTE: The initial estimates of the parent are updated once for all candidates. The
+    # entry has no results so that the candidate tasks do not update them again.
+    model = update_initial_estimates(modelentry.model, modelentry.modelfit_results)
+    updated_modelentry = ModelEntry.create(model=model)
+    effects = list(candidate_effect_funcs.items())
+    add_batch_tasks(
+        wb,
+        [repr(effect[0]) for effect in effects],
+        partial(task_add_covariate_effect, updated_modelentry, candidate),
+        [(effect, index_offset + i) for i, effect in enumerate(effects, 1)],
+        batch_name='create_candidates',
+    )
 
     wf_fit = create_fit_workflow(n=len(candidate_effect_funcs))
     wb.insert_workflow(wf_fit)
@@ -0,0 +1,3 @@
+from .results import parse_modelfit_results
+
+__all__ = ('parse_modelfit_results',)
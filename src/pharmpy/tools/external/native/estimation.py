@@ -0,0 +1,551 @@
+"""In-process FO and FOCE estimation for models without ODE system
+
+The observation expression of a $PRED or linearized model is differentiated
+symbolically once and compiled into a numpy function of the data columns, the
+etas and the model parameters. The objective function is then evaluated for all
+individuals at the same time. Sums over the observations of an individual are
+segment sums over the observation records sorted by individual so that only
+arrays of size number of etas by number of etas are needed per individual.
+
+The objective function value is given without the constant N·log(2π) as
+reported by NONMEM. With G_i the eta gradient of the predictions f_i, H_i the
+epsilon gradient and R_i the diagonal matrix of the residual variances
+H_i Σ H_iᵀ the FO objective of individual i is
+
+    OFV_i = log|C_i| + r_iᵀ C_i⁻¹ r_i
+
+with r_i = y_i - f_i(0) and C_i = G_i Ω G_iᵀ + R_i. The FOCE objective is
+
+    OFV_i = O_i(η̂_i) + log|Ω| + log|A_i|
+
+where O_i(η) = log|R_i| + (y_i - f_i)ᵀ R_i⁻¹ (y_i - f_i) + ηᵀ Ω⁻¹ η is the
+conditional objective, η̂_i its minimum (the EBEs, found by batched Newton steps)
+and A_i half of its expected Hessian. A_i⁻¹ is the covariance of the EBEs. With
+interaction H_i is evaluated at η̂_i otherwise at 0.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from pharmpy.basic import Expr
+from pharmpy.model import Model
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    import sympy
+    from scipy import optimize
+else:
+    from pharmpy.deps import numpy as np
+    from pharmpy.deps import pandas as pd
+    from pharmpy.deps import sympy
+    from pharmpy.deps.scipy import optimize
+
+SUPPORTED_METHODS = ('FO', 'FOCE')
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    """Objective function evaluated at one set of parameter values"""
+
+    ofv: float
+    individual_ofv: np.ndarray
+    etas: np.ndarray
+    etas_covariance: np.ndarray
+
+
+class Objective:
+    """FO/FOCE objective function of a model without ODE system
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model with $PRED or linearized statements
+    method : str
+        'FO' or 'FOCE'. Default is the method of the first estimation step.
+    interaction : bool
+        Evaluate the residual error at the EBEs (FOCE only). Default is the
+        interaction setting of the first estimation step for FOCE.
+    """
+
+    def __init__(
+        self, model: Model, method: Optional[str] = None, interaction: Optional[bool] = None
+    ):
+        from pharmpy.modeling import get_mdv, get_observation_expression
+
+        if model.dataset is None:
+            raise ValueError('Model has no dataset')
+        if model.statements.ode_system is not None:
+            raise ValueError('Models with ODE systems are not supported')
+        step = model.execution_steps[0] if model.execution_steps else None
+        method = (step.method if step is not None else 'FOCE') if method is None else method
+        if method not in SUPPORTED_METHODS:
+            raise ValueError(
+                f'Unsupported estimation method {method}, must be one of {SUPPORTED_METHODS}'
+            )
+        if interaction is None:
+            interaction = method == 'FOCE' and step is not None and step.interaction
+        if method == 'FO' and interaction:
+            raise ValueError('Interaction is not supported with FO')
+        self.method = method
+        self.interaction = interaction
+
+        rvs = model.random_variables
+        self.eta_names = rvs.etas.names
+        self.parameter_names = model.parameters.names
+
+        df = model.dataset
+        obs = (get_mdv(model) == 0).to_numpy()
+        codes, uniques = pd.factorize(df[model.datainfo.id_column.name].to_numpy()[obs])
+        self.ids = uniques
+        self._order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes)
+        self._starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        self._codes = codes[self._order]
+        df = df.iloc[np.flatnonzero(obs)[self._order]]
+        self._dv = df[model.datainfo.dv_column.name].to_numpy(dtype=np.float64)
+
+        y = get_observation_expression(model)
+        etas = [Expr.symbol(name) for name in self.eta_names]
+        epsilons = [Expr.symbol(name) for name in rvs.epsilons.names]
+        h = [y.diff(eps).subs({e: 0 for e in epsilons}) for eps in epsilons]
+        f = y.subs({eps: 0 for eps in epsilons})
+        g = [f.diff(eta) for eta in etas]
+        dh = [hl.diff(eta) for hl in h for eta in etas]
+        d2f = [gk.diff(eta) for gk in g for eta in etas]
+        d2h = [dhk.diff(eta) for dhk in dh for eta in etas]
+        exprs = (f, *g, *h, *dh, *d2f, *d2h)
+        # NOTE: FO is exact and equal to FOCE if the predictions are linear in the
+        # etas and the residual errors do not depend on them
+        self.linear = all(_is_zero(e) for e in d2f) and (
+            not interaction or all(_is_zero(e) for e in dh)
+        )
+
+        parameters = [Expr.symbol(name) for name in self.parameter_names]
+        known = set(etas) | set(parameters)
+        columns = sorted({s for e in exprs for s in e.free_symbols if s not in known}, key=str)
+        missing = [str(s) for s in columns if str(s) not in df.columns]
+        if missing:
+            raise ValueError(f'Symbols {missing} are neither parameters nor data columns')
+        self._data = [df[str(s)].to_numpy(dtype=np.float64) for s in columns]
+
+        args = [sympy.sympify(s) for s in (*columns, *etas, *parameters)]
+        # NOTE: Dummy symbols since lambdify does not accept names like ETA(1)
+        dummies = [sympy.Dummy() for _ in args]
+        substitutions = dict(zip(args, dummies))
+        exprs = [sympy.sympify(e).subs(substitutions) for e in exprs]
+        self._predictions = sympy.lambdify(dummies, exprs, modules='numpy', cse=True)
+        parameters = [sympy.sympify(p) for p in parameters]
+        self._omega_matrix = sympy.sympify(rvs.etas.covariance_matrix)
+        self._sigma_matrix = sympy.sympify(rvs.epsilons.covariance_matrix)
+        self._omega = sympy.lambdify(parameters, self._omega_matrix, modules='numpy')
+        self._sigma = sympy.lambdify(parameters, self._sigma_matrix, modules='numpy')
+        self._neps = len(epsilons)
+        self._etas = np.zeros((len(self.ids), len(etas)))
+        # NOTE: Parameter derivatives for the gradient are compiled when first needed
+        self._first_order = exprs[: 1 + len(etas) + len(epsilons)]
+        self._dummies = dummies
+        self._substitutions = {p: substitutions[p] for p in parameters}
+        self._parameter_dummies = [substitutions[p] for p in parameters]
+        self._parameter_derivatives = None
+
+    def _segment_sum(self, x: np.ndarray) -> np.ndarray:
+        return np.add.reduceat(x, self._starts, axis=0)
+
+    def _evaluate_records(self, etas: np.ndarray, theta: np.ndarray):
+        # Prediction, its first and second eta derivatives, epsilon gradient and
+        # its first and second eta derivatives for all observation records
+        n, ne, nh = len(self._dv), etas.shape[1], self._neps
+        values = self._predictions(*self._data, *etas[self._codes].T, *theta)
+        values = np.stack(
+            [np.broadcast_to(np.asarray(v, dtype=np.float64), (n,)) for v in values], axis=1
+        )
+        sizes = np.cumsum([1, ne, nh, nh * ne, ne * ne])
+        f, G, H, dH, d2f, d2H = np.split(values, sizes, axis=1)
+        return (
+            f[:, 0],
+            G,
+            H,
+            dH.reshape(n, nh, ne),
+            d2f.reshape(n, ne, ne),
+            d2H.reshape(n, nh, ne, ne),
+        )
+
+    def _H0(self, theta: np.ndarray) -> Optional[np.ndarray]:
+        # Epsilon gradient at eta = 0 to use without interaction
+        if self.interaction:
+            return None
+        return self._evaluate_records(np.zeros_like(self._etas), theta)[2]
+
+    def _conditional(self, etas, theta, omega_inv, sigma, H0=None, derivatives=True):
+        # Conditional objective of each individual, its gradient, the expected
+        # Hessian (Gauss-Newton for the predictions and Fisher scoring for the
+        # residual variances) and the observed Hessian
+        f, G, H, dH, d2f, d2H = self._evaluate_records(etas, theta)
+        if H0 is not None:
+            H, dH, d2H = H0, np.zeros_like(dH), np.zeros_like(d2H)
+        R = np.einsum('nk,kl,nl->n', H, sigma, H)
+        r = self._dv - f
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terms = np.where(R > 0, np.log(R) + r**2 / R, np.inf)
+        value = self._segment_sum(terms) + np.einsum('ik,kl,il->i', etas, omega_inv, etas)
+        if not derivatives:
+            return value
+        dR = 2 * np.einsum('nk,kl,nla->na', H, sigma, dH)
+        d2R = 2 * (
+            np.einsum('nka,kl,nlb->nab', dH, sigma, dH)
+            + np.einsum('nk,kl,nlab->nab', H, sigma, d2H)
+        )
+        w = (1 - r**2 / R) / R
+        grad = self._segment_sum(w[:, None] * dR - (2 * r / R)[:, None] * G)
+        grad += 2 * etas @ omega_inv
+        expected = self._segment_sum(
+            np.einsum('na,nb->nab', 2 * G / R[:, None], G)
+            + np.einsum('na,nb->nab', dR / R[:, None] ** 2, dR)
+        )
+        expected += 2 * omega_inv
+        cross = np.einsum('na,nb->nab', (2 * r / R**2)[:, None] * G, dR)
+        observed = expected + self._segment_sum(
+            np.einsum('na,nb->nab', ((2 * r**2 / R - 2) / R**2)[:, None] * dR, dR)
+            + w[:, None, None] * d2R
+            + cross
+            + cross.transpose(0, 2, 1)
+            - (2 * r / R)[:, None, None] * d2f
+        )
+        return value, grad, expected, observed
+
+    def _newton_system(self, etas, theta, omega_inv, sigma, H0):
+        # NOTE: The observed Hessian gives quadratic convergence close to the
+        # minimum. The expected Hessian is used where it is not positive definite.
+        value, grad, expected, observed = self._conditional(etas, theta, omega_inv, sigma, H0)
+        positive = np.linalg.eigvalsh(observed)[:, 0] > 0
+        return value, grad, np.where(positive[:, None, None], observed, expected)
+
+    def estimate_etas(
+        self,
+        theta: np.ndarray,
+        etas: Optional[np.ndarray] = None,
+        tol: float = 1e-10,
+        max_iterations: int = 100,
+    ) -> np.ndarray:
+        """Empirical Bayes estimates of all individuals
+
+        Parameters
+        ----------
+        theta : np.ndarray
+            Values of all model parameters
+        etas : np.ndarray
+            Start values, one row per individual. Default is zero.
+        tol : float
+            Convergence tolerance for the largest Newton step
+        max_iterations : int
+            Maximum number of Newton steps
+
+        Returns
+        -------
+        np.ndarray
+            EBEs with one row per individual
+        """
+        omega_inv = np.linalg.inv(self._omega(*theta))
+        sigma = np.asarray(self._sigma(*theta), dtype=np.float64)
+        H0 = self._H0(theta)
+        eta = np.zeros_like(self._etas) if etas is None else np.array(etas, dtype=np.float64)
+        value, grad, hess = self._newton_system(eta, theta, omega_inv, sigma, H0)
+        converged = np.zeros(len(eta), dtype=bool)
+        for _ in range(max_iterations):
+            step = np.linalg.solve(hess, grad[..., np.newaxis])[..., 0]
+            small = np.max(np.abs(step), axis=1) < tol
+            eta[small & ~converged] -= step[small & ~converged]
+            converged |= small
+            if converged.all():
+                break
+            decrease = np.einsum('ij,ij->i', grad, step)
+            t = np.ones(len(eta))
+            done = converged.copy()
+            # NOTE: Step halving per individual until the Armijo condition holds
+            for _ in range(30):
+                trial = eta - t[:, np.newaxis] * step
+                new = self._conditional(trial, theta, omega_inv, sigma, H0, derivatives=False)
+                # NOTE: With some slack for rounding errors close to the minimum
+                slack = 1e-12 * np.abs(value)
+                ok = ~done & (new <= value - 1e-4 * t * decrease + slack)
+                eta[ok] = trial[ok]
+                done |= ok
+                if done.all():
+                    break
+                t[~done] /= 2
+            # NOTE: No decrease within rounding errors
+            converged |= ~done
+            value, grad, hess = self._newton_system(eta, theta, omega_inv, sigma, H0)
+        return eta
+
+    def evaluate(self, theta: np.ndarray, etas: Optional[np.ndarray] = None) -> Evaluation:
+        """Evaluate the objective function
+
+        Parameters
+        ----------
+        theta : np.ndarray
+            Values of all model parameters
+        etas : np.ndarray
+            EBEs to use. Default is to estimate them (FOCE) or zero (FO).
+
+        Returns
+        -------
+        Evaluation
+            OFV, individual OFVs, EBEs and their covariances
+        """
+        theta = np.asarray(theta, dtype=np.float64)
+        if etas is None and (self.method == 'FO' or self.linear):
+            return self._exact(theta)[0]
+        omega = np.asarray(self._omega(*theta), dtype=np.float64)
+        sigma = np.asarray(self._sigma(*theta), dtype=np.float64)
+        omega_inv = np.linalg.inv(omega)
+        _, logdet_omega = np.linalg.slogdet(omega)
+        if etas is None:
+            etas = self.estimate_etas(theta, self._etas)
+            self._etas = etas
+        value, _, hess, _ = self._conditional(etas, theta, omega_inv, sigma, self._H0(theta))
+        A = hess / 2
+        sign, logdet_A = np.linalg.slogdet(A)
+        iofv = value + logdet_omega + logdet_A
+        iofv = np.where((sign > 0) & np.isfinite(iofv), iofv, np.inf)
+        return Evaluation(
+            ofv=float(np.sum(iofv)),
+            individual_ofv=iofv,
+            etas=etas,
+            etas_covariance=np.linalg.inv(A),
+        )
+
+    @property
+    def has_gradient(self) -> bool:
+        """Whether the gradient of the OFV can be computed analytically (FO or linear)"""
+        return self.method == 'FO' or self.linear
+
+    def gradient(self, theta: np.ndarray) -> np.ndarray:
+        """Gradient of the OFV with respect to all model parameters
+
+        Only available if has_gradient is True.
+
+        Parameters
+        ----------
+        theta : np.ndarray
+            Values of all model parameters
+
+        Returns
+        -------
+        np.ndarray
+            Partial derivatives of the OFV in the order of parameter_names
+        """
+        if not self.has_gradient:
+            raise ValueError('Analytic gradient only available for FO or models linear in etas')
+        return self._exact(np.asarray(theta, dtype=np.float64), gradient=True)[1]
+
+    def _exact(self, theta: np.ndarray, gradient: bool = False):
+        # NOTE: The FO objective. log|C| and rᵀC⁻¹r by the matrix determinant lemma
+        # and the Woodbury identity. With A = Ω⁻¹ + GᵀR⁻¹G and b = GᵀR⁻¹r
+        # OFV_i = Σlog R + rᵀR⁻¹r - bᵀA⁻¹b + log|Ω| + log|A| and A⁻¹b are the EBEs
+        omega = np.asarray(self._omega(*theta), dtype=np.float64)
+        sigma = np.asarray(self._sigma(*theta), dtype=np.float64)
+        omega_inv = np.linalg.inv(omega)
+        _, logdet_omega = np.linalg.slogdet(omega)
+        f, G, H = self._evaluate_records(np.zeros_like(self._etas), theta)[:3]
+        R = np.einsum('nk,kl,nl->n', H, sigma, H)
+        r = self._dv - f
+        A = omega_inv + self._segment_sum(np.einsum('ni,nj->nij', G / R[:, None], G))
+        b = self._segment_sum(G * (r / R)[:, None])
+        etas = np.linalg.solve(A, b[..., np.newaxis])[..., 0]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            iofv = self._segment_sum(np.log(R) + r**2 / R) - np.einsum('ij,ij->i', b, etas)
+        sign, logdet_A = np.linalg.slogdet(A)
+        iofv = iofv + logdet_omega + logdet_A
+        iofv = np.where((sign > 0) & np.isfinite(iofv), iofv, np.inf)
+        A_inv = np.linalg.inv(A)
+        evaluation = Evaluation(
+            ofv=float(np.sum(iofv)),
+            individual_ofv=iofv,
+            etas=np.zeros_like(etas) if self.method == 'FO' else etas,
+            etas_covariance=A_inv,
+        )
+        if not gradient:
+            return evaluation, None
+        if not np.isfinite(evaluation.ofv):
+            return evaluation, np.zeros_like(theta)
+
+        df, dG, dH, domega, dsigma = self._derivatives(theta)
+        dR = 2 * np.einsum('nk,kl,nlp->np', H, sigma, dH) + np.einsum('nk,pkl,nl->np', H, dsigma, H)
+        dr = -df
+        Gq = np.einsum('na,na->n', G, etas[self._codes])
+        # NOTE: dA is contracted with M = A⁻¹ + ηηᵀ for d(log|A| - bᵀA⁻¹b)
+        M = A_inv + np.einsum('ia,ib->iab', etas, etas)
+        GMG = np.einsum('na,nab,nb->n', G, M[self._codes], G)
+        GMdG = np.einsum('na,nab,nbp->np', G, M[self._codes], dG)
+        etadG = np.einsum('na,nap->np', etas[self._codes], dG)
+        records = (
+            dR / R[:, None]
+            + (2 * r / R)[:, None] * dr
+            - (r**2 / R**2)[:, None] * dR
+            - 2 * etadG * (r / R)[:, None]
+            - 2 * (Gq / R)[:, None] * dr
+            + 2 * (Gq * r / R**2)[:, None] * dR
+            + 2 * GMdG / R[:, None]
+            - (GMG / R**2)[:, None] * dR
+        )
+        nind = len(self.ids)
+        outer = omega_inv @ M.sum(axis=0) @ omega_inv
+        grad = (
+            records.sum(axis=0)
+            + nind * np.einsum('ab,pba->p', omega_inv, domega)
+            - np.einsum('ab,pba->p', outer, domega)
+        )
+        return evaluation, grad
+
+    def _derivatives(self, theta: np.ndarray):
+        # Derivatives of the prediction, its eta gradient and the epsilon gradient
+        # for all observation records and of Ω and Σ with respect to the parameters
+        if self._parameter_derivatives is None:
+            exprs = [sympy.diff(e, p) for e in self._first_order for p in self._parameter_dummies]
+            records = sympy.lambdify(self._dummies, exprs, modules='numpy', cse=True)
+            matrices = [
+                sympy.lambdify(
+                    self._parameter_dummies,
+                    [m.subs(self._substitutions).diff(p) for p in self._parameter_dummies],
+                    modules='numpy',
+                )
+                for m in (self._omega_matrix, self._sigma_matrix)
+            ]
+            self._parameter_derivatives = (records, *matrices)
+        records, domega, dsigma = self._parameter_derivatives
+        n, ne, nh, npar = len(self._dv), self._etas.shape[1], self._neps, len(theta)
+        etas = np.zeros((n, ne))
+        values = records(*self._data, *etas.T, *theta)
+        values = np.stack(
+            [np.broadcast_to(np.asarray(v, dtype=np.float64), (n,)) for v in values], axis=1
+        ).reshape(n, 1 + ne + nh, npar)
+        domega = np.array(
+            [np.asarray(m, dtype=np.float64) for m in domega(*theta)], dtype=np.float64
+        ).reshape(npar, ne, ne)
+        dsigma = np.array(
+            [np.asarray(m, dtype=np.float64) for m in dsigma(*theta)], dtype=np.float64
+        ).reshape(npar, nh, nh)
+        return values[:, 0, :], values[:, 1 : 1 + ne, :], values[:, 1 + ne :, :], domega, dsigma
+
+
+@dataclass(frozen=True)
+class EstimationResult:
+    """Final estimates of an estimation"""
+
+    parameters: pd.Series
+    individuals: np.ndarray
+    evaluation: Evaluation
+    minimization_successful: bool
+    function_evaluations: int
+    runtime: float
+
+
+def estimate(model: Model, evaluation: Optional[bool] = None) -> EstimationResult:
+    """Estimate the parameters of a model with FO or FOCE
+
+    Free parameters are scaled by their initial estimates and optimized within
+    their bounds with L-BFGS-B. Covariance matrices that are not positive
+    definite are rejected. The gradient is analytic for FO and for models that are
+    linear in the etas and finite differences otherwise.
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model with $PRED or linearized statements
+    evaluation : bool
+        Only evaluate the objective function at the initial estimates. Default is
+        taken from the first estimation step.
+
+    Returns
+    -------
+    EstimationResult
+        Parameter estimates and the objective function evaluated at them
+    """
+    start_time = time.time()
+    objective = Objective(model)
+    step = model.execution_steps[0] if model.execution_steps else None
+    if evaluation is None:
+        evaluation = step is not None and (step.evaluation or step.maximum_evaluations == 0)
+
+    params = model.parameters
+    inits = np.array([params[name].init for name in objective.parameter_names], dtype=np.float64)
+    free = np.array([not params[name].fix for name in objective.parameter_names], dtype=bool)
+    scale = np.where(inits[free] != 0, np.abs(inits[free]), 1.0)
+    lower = np.array([params[name].lower for name in objective.parameter_names])[free] / scale
+    # NOTE: A variance at a lower bound of zero gives a singular covariance matrix and
+    # an infinite OFV that stops the line search
+    variances = set(model.random_variables.variance_parameters)
+    is_variance = np.array([name in variances for name in objective.parameter_names])[free]
+    lower = np.where(is_variance & (lower == 0), 1e-8, lower)
+    upper = np.array([params[name].upper for name in objective.parameter_names])[free] / scale
+    bounds = [
+        (None if np.isinf(lo) else lo, None if np.isinf(up) else up) for lo, up in zip(lower, upper)
+    ]
+
+    def to_theta(x):
+        theta = inits.copy()
+        theta[free] = x * scale
+        return theta
+
+    def ofv(x):
+        theta = to_theta(x)
+        for matrix in (objective._omega(*theta), objective._sigma(*theta)):
+            if not _is_positive_definite(np.asarray(matrix, dtype=np.float64)):
+                return np.inf
+        return objective.evaluate(theta).ofv
+
+    def ofv_and_gradient(x):
+        theta = to_theta(x)
+        for matrix in (objective._omega(*theta), objective._sigma(*theta)):
+            if not _is_positive_definite(np.asarray(matrix, dtype=np.float64)):
+                return np.inf, np.zeros_like(x)
+        value, grad = objective._exact(theta, gradient=True)
+        return value.ofv, grad[free] * scale
+
+    nfev = 1
+    successful = True
+    x = np.ones(np.count_nonzero(free))
+    if not evaluation and len(x):
+        gradient = objective.has_gradient
+        # NOTE: Overflows at trial points give infinite OFVs that are rejected
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            res = optimize.minimize(
+                ofv_and_gradient if gradient else ofv,
+                x,
+                jac=gradient,
+                method='L-BFGS-B',
+                bounds=bounds,
+                options={'ftol': 1e-12, 'gtol': 1e-6},
+            )
+        x, nfev, successful = res.x, res.nfev, bool(res.success)
+    theta = to_theta(x)
+    final = objective.evaluate(theta)
+    return EstimationResult(
+        parameters=pd.Series(theta, index=objective.parameter_names, name='estimates'),
+        individuals=objective.ids,
+        evaluation=final,
+        minimization_successful=bool(successful and np.isfinite(final.ofv)),
+        function_evaluations=int(nfev),
+        runtime=time.time() - start_time,
+    )
+
+
+def _is_zero(expr: Expr) -> bool:
+    if expr.is_piecewise():
+        return all(_is_zero(value) for value, _ in expr.args)
+    return expr == 0
+
+
+def _is_positive_definite(matrix: np.ndarray) -> bool:
+    if matrix.size == 0:
+        return True
+    try:
+        np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        return False
+    return True
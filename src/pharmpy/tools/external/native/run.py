@@ -0,0 +1,82 @@
+import tempfile
+from pathlib import Path
+
+from pharmpy.deps import pandas as pd
+from pharmpy.model import Model
+from pharmpy.workflows import ModelEntry
+from pharmpy.workflows.log import Log
+from pharmpy.workflows.results import ModelfitResults
+
+from .estimation import estimate
+
+
+def execute_model(model_entry, context):
+    assert isinstance(model_entry, ModelEntry)
+    model = model_entry.model
+
+    modelfit_results = create_modelfit_results(model)
+    model_entry = model_entry.attach_results(
+        modelfit_results=modelfit_results, log=modelfit_results.log
+    )
+
+    database = context.model_database
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f'{model.name}_results.json'
+        modelfit_results.to_json(path=path)
+        with database.transaction(model_entry) as txn:
+            txn.store_local_file(path=path)
+
+    context.store_model_entry(model_entry)
+
+    return model_entry
+
+
+def create_modelfit_results(model: Model) -> ModelfitResults:
+    """Estimate a model in-process and create its ModelfitResults
+
+    Parameters
+    ----------
+    model : Model
+        Pharmpy model with $PRED or linearized statements
+
+    Returns
+    -------
+    ModelfitResults
+        Results of the estimation
+    """
+    log = Log()
+    try:
+        result = estimate(model)
+    except (ValueError, ArithmeticError) as e:
+        log = log.log_error(str(e))
+        return ModelfitResults(minimization_successful=False, log=log)
+
+    evaluation = result.evaluation
+    if not result.minimization_successful:
+        log = log.log_warning('Minimization was not successful')
+
+    eta_names = list(model.random_variables.etas.names)
+    index = pd.Index(result.individuals, name=model.datainfo.id_column.name)
+    individual_estimates = pd.DataFrame(evaluation.etas, index=index, columns=eta_names)
+    individual_estimates_covariance = pd.Series(
+        [
+            pd.DataFrame(cov, index=eta_names, columns=eta_names)
+            for cov in evaluation.etas_covariance
+        ],
+        index=index,
+        dtype='object',
+    )
+
+    return ModelfitResults(
+        ofv=evaluation.ofv,
+        parameter_estimates=result.parameters[model.parameters.nonfixed.names],
+        minimization_successful=result.minimization_successful,
+        function_evaluations=result.function_evaluations,
+        estimation_runtime=result.runtime,
+        runtime_total=result.runtime,
+        individual_ofv=pd.Series(evaluation.individual_ofv, index=index, name='iOFV'),
+        individual_estimates=individual_estimates,
+        individual_estimates_covariance=individual_estimates_covariance,
+        log=log,
+        warnings=[],
+    )
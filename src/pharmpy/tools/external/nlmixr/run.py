@@ -28,6 +28,7 @@ from pharmpy.tools import fit
 from pharmpy.workflows import ModelEntry, default_context
 from pharmpy.workflows.log import Log
 from pharmpy.workflows.results import ModelfitResults
+from pharmpy.workflows.trace import external_process
 
 PARENT_DIR = f'..{os.path.sep}'
 
@@ -105,7 +106,10 @@ def execute_model(model_entry, context, evaluate=False, path=None):
     args = [str(rpath), str(path / (model.name + '.R'))]
 
     with open(stdout, "wb") as out, open(stderr, "wb") as err:
-        result = subprocess.run(args, stdin=subprocess.DEVNULL, stderr=err, stdout=out, env=newenv)
+        with external_process():
+            result = subprocess.run(
+                args, stdin=subprocess.DEVNULL, stderr=err, stdout=out, env=newenv
+            )
 
     rdata_path = path / f'{model.name}.RDATA'
 
@@ -0,0 +1,182 @@
+"""Monitoring of running NONMEM estimations
+
+The .ext-file is parsed incrementally while NONMEM is writing it. New
+iterations are passed to a callback and to an optional early stopping policy
+that can terminate the run.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from pharmpy.model.external.nonmem.table import ExtTableStream
+
+
+@dataclass(frozen=True)
+class Progress:
+    """The objective function value at one iteration of an estimation step"""
+
+    table_number: Optional[int]
+    method: Optional[str]
+    iteration: int
+    ofv: float
+
+
+class EarlyStoppingPolicy(ABC):
+    """Decide from the progress of a run if it should be stopped
+
+    Subclasses implement __call__ that gets the progress of the current estimation step
+    so far and returns the reason for stopping or None to let the run continue.
+    """
+
+    @abstractmethod
+    def __call__(self, progress: list[Progress]) -> Optional[str]:
+        pass
+
+
+class OFVThresholdPolicy(EarlyStoppingPolicy):
+    """Stop a run with an OFV worse than a reference OFV after a number of iterations
+
+    Parameters
+    ----------
+    ofv : float
+        Reference OFV, e.g. the OFV of the best model so far
+    delta : float
+        Allowed difference to the reference OFV
+    iterations : int
+        Number of iterations of an estimation step before the OFV is compared
+    """
+
+    def __init__(self, ofv: float, delta: float, iterations: int):
+        self.ofv = ofv
+        self.delta = delta
+        self.iterations = iterations
+
+    def __call__(self, progress: list[Progress]) -> Optional[str]:
+        if not progress:
+            return None
+        last = progress[-1]
+        if last.iteration >= self.iterations and last.ofv > self.ofv + self.delta:
+            return (
+                f'OFV {last.ofv} after {last.iteration} iterations is worse than '
+                f'{self.ofv} + {self.delta}'
+            )
+        return None
+
+
+def create_policy(
+    options: Optional[Mapping[str, Any]], best_ofv: Optional[float]
+) -> Optional[EarlyStoppingPolicy]:
+    """Create an early stopping policy from the early_stopping common option
+
+    Parameters
+    ----------
+    options : dict
+        Dictionary with delta, iterations (default 0) and optionally ofv. If ofv is not
+        given best_ofv is used as reference.
+    best_ofv : float
+        Best OFV of the models run so far
+
+    Returns
+    -------
+    EarlyStoppingPolicy
+        The policy or None if there is no option or no reference OFV
+    """
+    if not options:
+        return None
+    ofv = options.get('ofv', best_ofv)
+    if ofv is None:
+        return None
+    return OFVThresholdPolicy(ofv, options['delta'], options.get('iterations', 0))
+
+
+def terminate(process: subprocess.Popen):
+    """Terminate a process started in a new session together with its children"""
+    if process.poll() is not None:
+        return
+    if os.name == 'nt':
+        process.terminate()
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+
+class ExtMonitor:
+    """Follow the .ext-file of a running NONMEM process in a background thread
+
+    Parameters
+    ----------
+    path : Path
+        Path to the .ext-file
+    process : subprocess.Popen
+        The running process
+    callback : callable
+        Called with each new Progress
+    policy : EarlyStoppingPolicy
+        Policy to decide if the process should be terminated
+    interval : float
+        Seconds between reads of the .ext-file
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        process: subprocess.Popen,
+        callback: Optional[Callable[[Progress], None]] = None,
+        policy: Optional[EarlyStoppingPolicy] = None,
+        interval: float = 1.0,
+    ):
+        self.process = process
+        self.callback = callback
+        self.policy = policy
+        self.interval = interval
+        self.progress: list[Progress] = []
+        self.stop_reason: Optional[str] = None
+        self._step: list[Progress] = []
+        self._stream = ExtTableStream(path)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._done = threading.Event()
+
+    def start(self):
+        self._thread.start()
+
+    def join(self):
+        """Stop following the file after the process has ended and read the rest of it"""
+        self._done.set()
+        self._thread.join()
+        if self.stop_reason is None:
+            self._read(check=False)
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            if self._read(check=True):
+                terminate(self.process)
+                return
+
+    def _read(self, check: bool) -> bool:
+        for row in self._stream.read():
+            # NOTE: Negative iterations are final estimates, standard errors etc
+            if row.iteration < 0:
+                continue
+            progress = Progress(row.table_number, row.method, row.iteration, row.ofv)
+            if self._step and self._step[-1].table_number != progress.table_number:
+                self._step = []
+            self._step.append(progress)
+            self.progress.append(progress)
+            if self.callback is not None:
+                self.callback(progress)
+            if check and self.policy is not None:
+                self.stop_reason = self.policy(self._step)
+                if self.stop_reason is not None:
+                    return True
+        return False
@@ -11,9 +11,17 @@ from pharmpy.internals.math import nearest_positive_semidefinite
 from pharmpy.model import ExecutionSteps, Model, Parameters, RandomVariables
 from pharmpy.model.external.nonmem.nmtran_parser import NMTranControlStream
 from pharmpy.model.external.nonmem.parsing import extract_verbatim_derivatives, parse_table_columns
-from pharmpy.model.external.nonmem.table import ExtTable, NONMEMTableFile, PhiTable
+from pharmpy.model.external.nonmem.table import (
+    ExtTable,
+    NONMEMTableFile,
+    PhiTable,
+    TableLocation,
+    index_table_file,
+    read_table,
+)
 from pharmpy.model.external.nonmem.update import create_name_map
 from pharmpy.workflows.log import Log
+from pharmpy.workflows.pool import map_in_processes
 from pharmpy.workflows.results import ModelfitResults, SimulationResults
 
 from .results_file import NONMEMResultsFile
@@ -26,18 +34,36 @@ else:
     from pharmpy.deps import pandas as pd
 
 
+class _TableFiles:
+    """Table files of a run, each opened once for all subproblems"""
+
+    def __init__(self):
+        self._files = {}
+
+    def open(self, path: Path, notitle: bool = False, nolabel: bool = False) -> NONMEMTableFile:
+        key = (path, notitle, nolabel)
+        table_file = self._files.get(key)
+        if table_file is None:
+            table_file = NONMEMTableFile(path, notitle=notitle, nolabel=nolabel)
+            self._files[key] = table_file
+        return table_file
+
+
 def _parse_modelfit_results(
     path: Optional[Union[str, Path]],
     control_stream: NMTranControlStream,
     name_map,
     model: Model,
     subproblem: Optional[int] = None,
+    files: Optional[_TableFiles] = None,
 ):
     # Path to model file or results file
     if path is None:
         return None
 
     path = Path(path)
+    if files is None:
+        files = _TableFiles()
 
     execution_steps = model.execution_steps
     parameters = model.parameters
@@ -47,7 +73,13 @@ def _parse_modelfit_results(
     try:
         try:
             ext_path = path.with_suffix('.ext')
-            ext_tables = NONMEMTableFile(ext_path)
+            ext_tables = files.open(ext_path)
+            # NOTE: Only the tables of the subproblem and the last table are parsed
+            tables = [
+                table.load()
+                for table in ext_tables
+                if not subproblem or table.subproblem == subproblem or table is ext_tables[-1]
+            ]
         except ValueError:
             log = log.log_error(f"Broken ext-file {path.with_suffix('.ext')}")
             return ModelfitResults(
@@ -57,7 +89,7 @@ def _parse_modelfit_results(
                 log=log,
             )
 
-        for table in ext_tables:
+        for table in tables:
             try:
                 table.data_frame
             except ValueError:
@@ -81,14 +113,16 @@ def _parse_modelfit_results(
     ) = _parse_ext(control_stream, name_map, ext_tables, subproblem, parameters)
 
     table_df = _parse_tables(
-        model, path, control_stream, netas=len(model.random_variables.etas.names)
+        model, path, control_stream, netas=len(model.random_variables.etas.names), files=files
     )  # $TABLEs
     residuals = _parse_residuals(table_df)
     predictions = _parse_predictions(table_df)
     derivatives = _parse_derivatives(table_df, model)
-    iofv, ie, iec = _parse_phi(path, control_stream, name_map, etas, model, final_pe, subproblem)
+    iofv, ie, iec = _parse_phi(
+        path, control_stream, name_map, etas, model, final_pe, subproblem, files
+    )
     gradients_iterations, final_zero_gradient, gradients = _parse_grd(
-        path, control_stream, name_map, parameters, subproblem
+        path, control_stream, name_map, parameters, subproblem, files
     )
     rse = _calculate_relative_standard_errors(final_pe, ses)
     (
@@ -120,11 +154,17 @@ def _parse_modelfit_results(
     sigdigs_iters = pd.Series(significant_digits, index=eststeps, name='significant_digits')
 
     if covstatus and ses is not None and not cov_abort:
-        cov = _parse_matrix(path.with_suffix(".cov"), control_stream, name_map, table_numbers)
-        cor = _parse_matrix(path.with_suffix(".cor"), control_stream, name_map, table_numbers)
+        cov = _parse_matrix(
+            path.with_suffix(".cov"), control_stream, name_map, table_numbers, files
+        )
+        cor = _parse_matrix(
+            path.with_suffix(".cor"), control_stream, name_map, table_numbers, files
+        )
         if cor is not None:
             np.fill_diagonal(cor.values, 1)
-        coi = _parse_matrix(path.with_suffix(".coi"), control_stream, name_map, table_numbers)
+        coi = _parse_matrix(
+            path.with_suffix(".coi"), control_stream, name_map, table_numbers, files
+        )
     else:
         cov, cor, coi = None, None, None
 
@@ -216,9 +256,10 @@ def _parse_matrix(
     control_stream: NMTranControlStream,
     name_map,
     table_numbers,
+    files: _TableFiles,
 ):
     try:
-        tables = NONMEMTableFile(path)
+        tables = files.open(path)
     except OSError:
         return None
 
@@ -369,10 +410,11 @@ def _parse_phi(
     etas: RandomVariables,
     model,
     pe,
-    subproblem=None,
+    subproblem: Optional[int],
+    files: _TableFiles,
 ):
     try:
-        phi_tables = NONMEMTableFile(path.with_suffix('.phi'))
+        phi_tables = files.open(path.with_suffix('.phi'))
     except FileNotFoundError:
         return None, None, None
     if subproblem is None:
@@ -440,10 +482,11 @@ def _parse_grd(
     control_stream: NMTranControlStream,
     name_map,
     parameters: Parameters,
-    subproblem=None,
+    subproblem: Optional[int],
+    files: _TableFiles,
 ):
     try:
-        grd_tables = NONMEMTableFile(path.with_suffix('.grd'))
+        grd_tables = files.open(path.with_suffix('.grd'))
     except FileNotFoundError:
         return None, None, None
     if subproblem is None:
@@ -467,7 +510,11 @@ def _parse_grd(
 
 
 def _parse_tables(
-    model: Model, path: Path, control_stream: NMTranControlStream, netas
+    model: Model,
+    path: Path,
+    control_stream: NMTranControlStream,
+    netas,
+    files: _TableFiles,
 ) -> pd.DataFrame:
     """Parse $TABLE and table files into one large dataframe of useful columns"""
     interesting_columns = {
@@ -508,7 +555,7 @@ def _parse_tables(
         nolabel = table_rec.has_option("NOLABEL") or noheader
         table_path = path.parent / table_rec.path
         try:
-            table_file = NONMEMTableFile(table_path, notitle=notitle, nolabel=nolabel)
+            table_file = files.open(table_path, notitle=notitle, nolabel=nolabel)
         except IOError:
             continue
         table = table_file.tables[0]
@@ -796,12 +843,25 @@ def _get_fixed_parameters(table: ExtTable, parameters: Parameters, pe_translatio
 
 def simfit_results(model, model_path):
     """Read in modelfit results from a simulation/estimation model"""
+    return list(iterate_simfit_results(model, model_path))
+
+
+def iterate_simfit_results(model, model_path):
+    """Read in modelfit results from a simulation/estimation model one subproblem at a time"""
     nsubs = model.internals.control_stream.get_records('SIMULATION')[0].nsubs
-    results = []
+    # NOTE: The files are opened once and the tables of each subproblem are read from
+    # their offsets in the files
+    name_map = _results_name_map(model)
+    files = _TableFiles()
     for i in range(1, nsubs + 1):
-        res = parse_modelfit_results(model, model_path, subproblem=i)
-        results.append(res)
-    return results
+        yield _parse_modelfit_results(
+            model_path,
+            model.internals.control_stream,
+            name_map,
+            model,
+            subproblem=i,
+            files=files,
+        )
 
 
 # def parse_ext(model, path, subproblem):
@@ -827,15 +887,18 @@ def simfit_results(model, model_path):
 #     return _parse_ext(model.internals.control_stream, ext_tables, subproblem, model.parameters)
 
 
+def _results_name_map(model):
+    name_map = create_name_map(model)
+    return {value: key for key, value in name_map.items()}
+
+
 def parse_modelfit_results(
     model, path: Optional[Union[str, Path]], subproblem: Optional[int] = None
 ):
-    name_map = create_name_map(model)
-    name_map = {value: key for key, value in name_map.items()}
     res = _parse_modelfit_results(
         path,
         model.internals.control_stream,
-        name_map,
+        _results_name_map(model),
         model,
         subproblem=subproblem,
     )
@@ -844,24 +907,43 @@ def parse_modelfit_results(
 
 def _parse_table_file(model, path: Optional[Union[str, Path]], subproblem: Optional[int] = None):
     table_recs = model.internals.control_stream.get_records('TABLE')
-    df = pd.DataFrame()
+    sims = []
+    dvs = []
     for table_rec in table_recs:
         noheader = table_rec.has_option("NOHEADER")
         notitle = table_rec.has_option("NOTITLE") or noheader
         nolabel = table_rec.has_option("NOLABEL") or noheader
         table_path = path.parent / table_rec.path
         try:
-            table_file = NONMEMTableFile(table_path, notitle=notitle, nolabel=nolabel)
+            if notitle:
+                table_file = NONMEMTableFile(table_path, notitle=notitle, nolabel=nolabel)
+                tables = [table_file.tables[0].data_frame['DV'].to_numpy()]
+            else:
+                # NOTE: The table of each subproblem is read from its offset in the file.
+                # Subproblems are parsed in parallel if a process pool is configured.
+                locations = index_table_file(table_path)
+                if subproblem is not None:
+                    locations = locations[subproblem - 1 : subproblem]
+                inputs = [(str(table_path), location) for location in locations]
+                tables = map_in_processes(_parse_simulated_dv, inputs)
         except IOError:
             continue
-        for i in range(len(table_file)):
-            sim = table_file.tables[i].data_frame[['DV']].copy()
-            assert 'DV' in sim.columns
-            sim['SIM'] = i + 1
-            sim['index'] = np.arange(len(model.dataset))
-            df = pd.concat([df, sim], ignore_index=True)
-    df = df.set_index(['SIM', 'index'])
-    return df
+        for i, dv in enumerate(tables, start=1 if subproblem is None else subproblem):
+            sims.append(np.full(len(dv), i))
+            dvs.append(dv)
+    if not dvs:
+        return pd.DataFrame(
+            {'DV': []}, index=pd.MultiIndex.from_arrays([[], []], names=['SIM', 'index'])
+        )
+    index = pd.MultiIndex.from_arrays(
+        [np.concatenate(sims), np.concatenate([np.arange(len(dv)) for dv in dvs])],
+        names=['SIM', 'index'],
+    )
+    return pd.DataFrame({'DV': np.concatenate(dvs)}, index=index)
+
+
+def _parse_simulated_dv(path: str, location: TableLocation):
+    return read_table(path, location).data_frame['DV'].to_numpy()
 
 
 def parse_simulation_results(
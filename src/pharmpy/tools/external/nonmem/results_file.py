@@ -1,5 +1,12 @@
+from __future__ import annotations
+
 import re
+from collections.abc import Mapping
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from itertools import accumulate
+from pathlib import Path
 from typing import Dict, Optional, Union
 
 import dateutil.parser
@@ -13,6 +20,10 @@ class NONMEMResultsFile:
     This is not a generic output object and will be combined by other classes
     into new structures.
     We rely on tags in NONMEM >= 7.2.0
+
+    The file is indexed in one pass (see index_results_file). The termination and
+    covariance sections of a table are read from their offsets in the file when the
+    table is first accessed.
     """
 
     def __init__(self, path=None, log=None):
@@ -21,13 +32,15 @@ class NONMEMResultsFile:
         self.nonmem_version = None
         self.runtime_total = None
         if path is not None:
-            for name, content in self.table_blocks(path):
-                if name == 'INIT':
-                    self.nonmem_version = content.pop('nonmem_version', None)
-                elif name == 'runtime':
-                    self.runtime_total = content.pop('total', None)
-                else:
-                    self.table[name] = content
+            index = index_results_file(path)
+            self.nonmem_version = index.nonmem_version
+            self.runtime_total = index.runtime_total
+            self.table = _TableBlocks(index)
+            if self.log is not None:
+                for message in index.warnings:
+                    self.log = self.log.log_warning(message)
+                for message in index.errors:
+                    self.log = self.log.log_error(message)
 
     @property
     def _supported_nonmem_version(self):
@@ -283,7 +296,8 @@ class NONMEMResultsFile:
             time = dateutil.parser.parse(row_next).time()
             return datetime.combine(date, time)
 
-    def log_items(self, lines):
+    @staticmethod
+    def log_messages(lines):
         fulltext = '\n'.join(lines)
 
         warnings = []
@@ -303,44 +317,85 @@ class NONMEMResultsFile:
                 message_trimmed = '\n'.join([m.strip() for m in message_split])
                 warnings.append(message_trimmed.strip())
 
+        # NOTE: Patterns spanning lines with (.*\n)+ backtrack through the rest of the file
+        # for each match of their first line. They are only searched for if the text of
+        # their last line is in the file.
         error_patterns = [
-            re.compile(
-                r'(AN ERROR WAS FOUND IN THE CONTROL STATEMENTS\.(.*\n)+'
-                r'.+UPPER OR LOWER BOUNDS\.)'
+            (
+                re.compile(
+                    r'(AN ERROR WAS FOUND IN THE CONTROL STATEMENTS\.(.*\n)+'
+                    r'.+UPPER OR LOWER BOUNDS\.)'
+                ),
+                'UPPER OR LOWER BOUNDS.',
             ),
-            re.compile(
-                r'(INITIAL ESTIMATE OF OMEGA HAS A NONZERO BLOCK WHICH IS NUMERICALLY NOT '
-                r'POSITIVE DEFINITE)'
+            (
+                re.compile(
+                    r'(INITIAL ESTIMATE OF OMEGA HAS A NONZERO BLOCK WHICH IS NUMERICALLY NOT '
+                    r'POSITIVE DEFINITE)'
+                ),
+                None,
             ),
-            re.compile(r'0(UPPER BOUNDS INAPPROPRIATE)'),
-            re.compile(r'0(PRED EXIT CODE = 1\n(.*\n)+.+MAY BE TOO LARGE\.)'),
-            re.compile(
-                r'0(PRED EXIT CODE = 1\n(.*\n)+\s*'
-                r'NUMERICAL DIFFICULTIES OBTAINING THE SOLUTION\.)\s*\n'
+            (re.compile(r'0(UPPER BOUNDS INAPPROPRIATE)'), None),
+            (
+                re.compile(r'0(PRED EXIT CODE = 1\n(.*\n)+.+MAY BE TOO LARGE\.)'),
+                'MAY BE TOO LARGE.',
             ),
-            re.compile(r'0(PRED EXIT CODE = 1\n(.*\n)+\s+.+IS TOO CLOSE TO AN EIGENVALUE\s*)\n'),
-            re.compile(r'0(PRED EXIT CODE = 1\n(.*\n)+\s+.+IS VERY LARGE\.\s*)\n'),
-            re.compile(r'0(PROGRAM TERMINATED BY OBJ\n\s*MESSAGE ISSUED FROM ESTIMATION STEP)'),
-            re.compile(
-                r'0(PROGRAM TERMINATED BY OBJ\n(.*\n)*\s*'
-                r'MESSAGE ISSUED FROM ESTIMATION STEP\n\s*'
-                r'((AT 0TH ITERATION, UPON EVALUATION OF GRADIENT.*)|'
-                r'(AT INITIAL OBJ. FUNCTION EVALUATION)))\n'
+            (
+                re.compile(
+                    r'0(PRED EXIT CODE = 1\n(.*\n)+\s*'
+                    r'NUMERICAL DIFFICULTIES OBTAINING THE SOLUTION\.)\s*\n'
+                ),
+                'NUMERICAL DIFFICULTIES OBTAINING THE SOLUTION.',
             ),
-            re.compile(r'0(MINIMIZATION TERMINATED\n\s*DUE TO ROUNDING ERRORS.+)\n'),
-            re.compile(r'0(MINIMIZATION TERMINATED\n\s*DUE TO ZERO GRADIENT)\n'),
-            re.compile(
-                r'0(MINIMIZATION TERMINATED\n\s*DUE TO MAX. NO. OF FUNCTION EVALUATIONS EXCEEDED)\n'
+            (
+                re.compile(
+                    r'0(PRED EXIT CODE = 1\n(.*\n)+\s+.+IS TOO CLOSE TO AN EIGENVALUE\s*)\n'
+                ),
+                'IS TOO CLOSE TO AN EIGENVALUE',
             ),
-            re.compile(r'0(MINIMIZATION TERMINATED\n(.*\n)+\s*IS NON POSITIVE DEFINITE)\n'),
-            re.compile(
-                r'0(MINIMIZATION TERMINATED\n(.*\n)+\s*SUM OF "SQUARED" WEIGHTED INDIVIDUAL '
-                r'RESIDUALS IS INFINITE)\n'
+            (
+                re.compile(r'0(PRED EXIT CODE = 1\n(.*\n)+\s+.+IS VERY LARGE\.\s*)\n'),
+                'IS VERY LARGE.',
+            ),
+            (
+                re.compile(r'0(PROGRAM TERMINATED BY OBJ\n\s*MESSAGE ISSUED FROM ESTIMATION STEP)'),
+                None,
+            ),
+            (
+                re.compile(
+                    r'0(PROGRAM TERMINATED BY OBJ\n(.*\n)*\s*'
+                    r'MESSAGE ISSUED FROM ESTIMATION STEP\n\s*'
+                    r'((AT 0TH ITERATION, UPON EVALUATION OF GRADIENT.*)|'
+                    r'(AT INITIAL OBJ. FUNCTION EVALUATION)))\n'
+                ),
+                'MESSAGE ISSUED FROM ESTIMATION STEP',
+            ),
+            (re.compile(r'0(MINIMIZATION TERMINATED\n\s*DUE TO ROUNDING ERRORS.+)\n'), None),
+            (re.compile(r'0(MINIMIZATION TERMINATED\n\s*DUE TO ZERO GRADIENT)\n'), None),
+            (
+                re.compile(
+                    r'0(MINIMIZATION TERMINATED\n\s*DUE TO MAX. NO. OF FUNCTION EVALUATIONS '
+                    r'EXCEEDED)\n'
+                ),
+                None,
+            ),
+            (
+                re.compile(r'0(MINIMIZATION TERMINATED\n(.*\n)+\s*IS NON POSITIVE DEFINITE)\n'),
+                'IS NON POSITIVE DEFINITE',
+            ),
+            (
+                re.compile(
+                    r'0(MINIMIZATION TERMINATED\n(.*\n)+\s*SUM OF "SQUARED" WEIGHTED INDIVIDUAL '
+                    r'RESIDUALS IS INFINITE)\n'
+                ),
+                'RESIDUALS IS INFINITE',
             ),
-            re.compile(r'\s*(NO. OF SIG. DIGITS UNREPORTABLE)\s*\n'),
+            (re.compile(r'\s*(NO. OF SIG. DIGITS UNREPORTABLE)\s*\n'), None),
         ]
 
-        for pattern in error_patterns:
+        for pattern, required in error_patterns:
+            if required is not None and required not in fulltext:
+                continue
             match = pattern.search(fulltext)
             if match:
                 message = match.group(1)
@@ -348,127 +403,201 @@ class NONMEMResultsFile:
                 message_trimmed = '\n'.join([m.strip() for m in message_split])
                 errors.append(message_trimmed.strip())
 
-        if self.log is not None:
-            for message in warnings:
-                self.log = self.log.log_warning(message)
-            for message in errors:
-                self.log = self.log.log_error(message)
-
-    def tag_items(self, path):
-        nmversion = re.compile(r'1NONLINEAR MIXED EFFECTS MODEL PROGRAM \(NONMEM\) VERSION\s+(\S+)')
-        tag = re.compile(r'\s*#([A-Z]{4}):\s*(.*)')
-        end_TERE = re.compile(
-            r'(0|1)'
-        )  # The part we need after #TERE: will precede the next ^1 or ^0
-        cleanup = re.compile(r'\*+\s*')
-        TERM = []
-        TERE = []
-        found_TERM = False
-        found_TERE = False
-        runtime = None
-        endtime_index = None
-
-        with open(path, 'rb') as fp:
-            binary = fp.readlines()
-            # Since lst-files sometimes can have mixed encodings:
-            # Allow for separate encodings of date strings and the rest of the content
-            # Always try utf-8 first and fallback to latin-1 separately for each section
-            try:
-                line1 = binary[0].decode('utf-8')
-            except UnicodeDecodeError:
-                line1 = binary[0].decode('latin-1', errors='ignore')
+        return warnings, errors
 
-            try:
-                last_line = binary[-1].decode('utf-8')
-            except UnicodeDecodeError:
-                last_line = binary[-1].decode('latin-1', errors='ignore')
 
-            chunk = b''.join(binary[1:-1])
-            try:
-                decoded_chunk = chunk.decode('utf-8')
-            except UnicodeDecodeError:
-                decoded_chunk = chunk.decode('latin-1', errors='ignore')
-
-            lines = [line1]
-            lines += decoded_chunk.replace('\r', '').split('\n')
-            lines[-1] = last_line  # Replace since lst-files always end with \n
-
-        version_number = None
-        starttime = NONMEMResultsFile.parse_runtime(lines[0], lines[1])
-        for row in lines:
-            m = nmversion.match(row)
+@dataclass(frozen=True)
+class ResultsFileIndex:
+    """Index of a NONMEM results file
+
+    Each table (by number, see the TBLN tag) has its tags and the byte offsets
+    (start, end) of its termination (TERM) and covariance (TERE) sections.
+    """
+
+    path: str
+    nonmem_version: Optional[str]
+    runtime_total: Optional[float]
+    tables: dict[int, tuple[dict[str, str], tuple[tuple[str, int, int], ...]]]
+    warnings: tuple[str, ...]
+    errors: tuple[str, ...]
+
+
+def index_results_file(path: Union[str, Path]) -> ResultsFileIndex:
+    """Index a NONMEM results file in one pass
+
+    The index is reused until the file is changed, so that the results of
+    all subproblems of a run can be parsed without scanning the file again.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the results file
+
+    Returns
+    -------
+    ResultsFileIndex
+        Index of the file
+    """
+    path = Path(path)
+    stat = path.stat()
+    return _index_results_file(str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=32)
+def _index_results_file(path: str, mtime_ns: int, size: int) -> ResultsFileIndex:
+    with open(path, 'rb') as fp:
+        binary = fp.readlines()
+    lines = _decode_lines(binary)
+    offsets = list(accumulate(map(len, binary), initial=0))
+
+    nonmem_version = None
+    runtime_total = None
+    tables = {}
+    table_number = None
+    tags = {}
+    sections = []
+    for name, content in _tag_items(lines, offsets):
+        if name == 'nonmem_version':
+            nonmem_version = content
+        elif name == 'runtime':
+            runtime_total = content
+        elif name == 'TERM' or name == 'TERE':
+            sections.append((name, *content))
+        elif name == 'TBLN':
+            if (tags or sections) and table_number is not None:
+                tables[table_number] = (tags, tuple(sections))
+            tags = {}
+            sections = []
+            table_number = int(content)
+        # If already set then it means TBLN was missing, probably $SIM, skip
+        elif name not in tags:
+            tags[name] = content
+    if (tags or sections) and table_number is not None:
+        tables[table_number] = (tags, tuple(sections))
+
+    warnings, errors = NONMEMResultsFile.log_messages(lines)
+    return ResultsFileIndex(
+        path, nonmem_version, runtime_total, tables, tuple(warnings), tuple(errors)
+    )
+
+
+def _decode(binary: bytes) -> str:
+    # Since lst-files sometimes can have mixed encodings:
+    # Always try utf-8 first and fallback to latin-1 separately for each section
+    try:
+        return binary.decode('utf-8')
+    except UnicodeDecodeError:
+        return binary.decode('latin-1', errors='ignore')
+
+
+def _decode_lines(binary: list[bytes]) -> list[str]:
+    # Allow for separate encodings of date strings and the rest of the content
+    lines = [_decode(binary[0])]
+    lines += _decode(b''.join(binary[1:-1])).replace('\r', '').split('\n')
+    lines[-1] = _decode(binary[-1])  # Replace since lst-files always end with \n
+    return lines
+
+
+_tag = re.compile(r'\s*#([A-Z]{4}):\s*(.*)')
+
+
+def _tag_items(lines: list[str], offsets: list[int]):
+    nmversion = re.compile(r'1NONLINEAR MIXED EFFECTS MODEL PROGRAM \(NONMEM\) VERSION\s+(\S+)')
+    end_TERE = re.compile(r'(0|1)')  # The part we need after #TERE: will precede the next ^1 or ^0
+    cleanup = re.compile(r'\*+\s*')
+    found_TERM = False
+    found_TERE = False
+    TERM_start = 0
+    TERE_start = 0
+    runtime = None
+    endtime_index = None
+
+    version_number = None
+    starttime = NONMEMResultsFile.parse_runtime(lines[0], lines[1])
+    for row in lines:
+        m = nmversion.match(row)
+        if m:
+            version_number = NONMEMResultsFile.cleanup_version(m.group(1))
+            yield ('nonmem_version', version_number)
+            break
+
+    if NONMEMResultsFile.supported_version(version_number):
+        for i, row in enumerate(lines):
+            row = row.rstrip()
+            m = _tag.match(row)
             if m:
-                version_number = NONMEMResultsFile.cleanup_version(m.group(1))
-                yield ('nonmem_version', version_number)
-                break  # We will stay at current file position
-
-        self.log_items(lines)
-
-        if NONMEMResultsFile.supported_version(version_number):
-            for i, row in enumerate(lines):
-                row = row.rstrip()
-                m = tag.match(row)
-                if m:
-                    if m.group(1) == 'TERM':
-                        if found_TERM:
-                            raise NotImplementedError('Two TERM tags without TERE in between')
-                        found_TERM = True
-                        TERM = []
-                    elif m.group(1) == 'TERE':
-                        if not found_TERM:
-                            raise NotImplementedError('TERE tag without TERM tag')
-                        found_TERE = True
-                        yield ('TERM', NONMEMResultsFile.parse_termination(TERM))
-                        found_TERM = False
-                        TERM = []
-                    elif found_TERE:
-                        found_TERE = False
-                        # Raise NotImplementedError('TERE tag without ^1 or ^0 before next tag')
-                    else:
-                        v = cleanup.sub('', m.group(2))
-                        yield (m.group(1), v.strip())
+                if m.group(1) == 'TERM':
+                    if found_TERM:
+                        raise NotImplementedError('Two TERM tags without TERE in between')
+                    found_TERM = True
+                    TERM_start = i + 1
+                elif m.group(1) == 'TERE':
+                    if not found_TERM:
+                        raise NotImplementedError('TERE tag without TERM tag')
+                    found_TERE = True
+                    TERE_start = i + 1
+                    yield ('TERM', (offsets[TERM_start], offsets[i]))
+                    found_TERM = False
                 elif found_TERE:
-                    if end_TERE.match(row):
-                        yield ('TERE', NONMEMResultsFile.parse_tere(TERE))
-                        found_TERE = False
-                        TERE = []
-                    else:
-                        TERE.append(row)
-                elif found_TERM:
-                    TERM.append(row)
-                if row == 'Stop Time:':
-                    endtime_index = i + 1
-
-            if endtime_index is not None:
-                second_line = lines[i] if (i := endtime_index + 1) < len(lines) else None
-                endtime = NONMEMResultsFile.parse_runtime(lines[endtime_index], second_line)
-                if starttime and endtime:
-                    runtime = (endtime - starttime).total_seconds()
-
-            if found_TERM:
-                yield ('TERM', NONMEMResultsFile.parse_termination(TERM))
-            if found_TERE:
-                yield ('TERE', NONMEMResultsFile.parse_tere(TERE))
-            if runtime is not None:
-                yield ('runtime', runtime)
-
-    def table_blocks(self, path):
-        block = {}
-        table_number = 'INIT'
-        for name, content in self.tag_items(path):
-            if name == 'TERM' or name == 'TERE':
-                for k, v in content.items():
-                    block[k] = v
-            elif name == 'TBLN':
-                if bool(block):
-                    yield (table_number, block)
-                block = {}
-                table_number = int(content)
-            elif name == 'runtime':
-                yield ('runtime', {'total': content})
-            else:
-                # If already set then it means TBLN was missing, probably $SIM, skip
-                if name not in block.keys():
-                    block[name] = content
-        if bool(block):
-            yield (table_number, block)
+                    found_TERE = False
+                    # Raise NotImplementedError('TERE tag without ^1 or ^0 before next tag')
+                else:
+                    v = cleanup.sub('', m.group(2))
+                    yield (m.group(1), v.strip())
+            elif found_TERE and end_TERE.match(row):
+                yield ('TERE', (offsets[TERE_start], offsets[i]))
+                found_TERE = False
+            if row == 'Stop Time:':
+                endtime_index = i + 1
+
+        if endtime_index is not None:
+            second_line = lines[i] if (i := endtime_index + 1) < len(lines) else None
+            endtime = NONMEMResultsFile.parse_runtime(lines[endtime_index], second_line)
+            if starttime and endtime:
+                runtime = (endtime - starttime).total_seconds()
+
+        if found_TERM:
+            yield ('TERM', (offsets[TERM_start], offsets[-1]))
+        if found_TERE:
+            yield ('TERE', (offsets[TERE_start], offsets[-1]))
+        if runtime is not None:
+            yield ('runtime', runtime)
+
+
+def _read_section(fp, start: int, end: int) -> list[str]:
+    fp.seek(start)
+    rows = _decode(fp.read(end - start)).replace('\r', '').split('\n')
+    if rows[-1] == '':
+        rows.pop()
+    # NOTE: Tags are not part of the sections
+    return [row.rstrip() for row in rows if not _tag.match(row)]
+
+
+class _TableBlocks(Mapping):
+    """Tables of a results file parsed from the index when first accessed"""
+
+    def __init__(self, index: ResultsFileIndex):
+        self._index = index
+        self._blocks = {}
+
+    def __getitem__(self, table_number):
+        block = self._blocks.get(table_number)
+        if block is None:
+            tags, sections = self._index.tables[table_number]
+            block = dict(tags)
+            if sections:
+                with open(self._index.path, 'rb') as fp:
+                    for name, start, end in sections:
+                        rows = _read_section(fp, start, end)
+                        if name == 'TERM':
+                            block.update(NONMEMResultsFile.parse_termination(rows))
+                        else:
+                            block.update(NONMEMResultsFile.parse_tere(rows))
+            self._blocks[table_number] = block
+        return block
+
+    def __iter__(self):
+        return iter(self._index.tables)
+
+    def __len__(self):
+        return len(self._index.tables)
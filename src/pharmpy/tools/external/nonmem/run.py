@@ -6,6 +6,7 @@ import subprocess
 import time
 import uuid
 import warnings
+from dataclasses import replace
 from itertools import repeat
 from pathlib import Path
 
@@ -13,10 +14,17 @@ import pharmpy.config as config
 from pharmpy.model.external.nonmem import convert_model
 from pharmpy.modeling import get_config_path, write_csv, write_model
 from pharmpy.tools.external.nonmem import conf, parse_modelfit_results, parse_simulation_results
+from pharmpy.tools.external.nonmem.monitor import ExtMonitor, create_policy, terminate
 from pharmpy.workflows import ModelEntry
+from pharmpy.workflows.hashing import DatasetHash
+from pharmpy.workflows.log import Log
+from pharmpy.workflows.trace import external_process
 
 PARENT_DIR = f'..{os.path.sep}'
 
+# Seconds between reads of the .ext-file of a running model
+PROGRESS_INTERVAL = 1.0
+
 
 def execute_model(model_entry, context):
     assert isinstance(model_entry, ModelEntry)
@@ -68,10 +76,43 @@ def execute_model(model_entry, context):
     stdout = model_path / 'stdout'
     stderr = model_path / 'stderr'
 
+    early_stopping = context.retrieve_common_options().get('early_stopping')
+    name = model_entry.model.name
+    dataset = '' if model.dataset is None else str(DatasetHash(model.dataset))
+    best_ofv = context.retrieve_best_progress_ofv(name, dataset) if early_stopping else None
+    policy = create_policy(early_stopping, best_ofv)
+
+    def publish(progress):
+        context.log_progress(name, progress.iteration, progress.ofv, dataset)
+
     with open(stdout, "wb") as out, open(stderr, "wb") as err:
-        result = subprocess.run(
-            args, stdin=subprocess.DEVNULL, stderr=err, stdout=out, cwd=str(model_path)
+        # NOTE: A new session so that NONMEM can be terminated together with nmfe
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.DEVNULL,
+            stderr=err,
+            stdout=out,
+            cwd=str(model_path),
+            start_new_session=os.name != 'nt',
         )
+        monitor = ExtMonitor(
+            model_path / 'model.ext',
+            process,
+            callback=publish,
+            policy=policy,
+            interval=PROGRESS_INTERVAL,
+        )
+        monitor.start()
+        process_start = time.time()
+        try:
+            with external_process():
+                process.wait()
+        except BaseException:
+            terminate(process)
+            raise
+        finally:
+            runtime = time.time() - process_start
+            monitor.join()
 
     basename = Path("model")
 
@@ -79,7 +120,7 @@ def execute_model(model_entry, context):
     start = time.time()
     timeout = 5
 
-    while not results_path.is_file():
+    while monitor.stop_reason is None and not results_path.is_file():
         elapsed_time = time.time() - start
         if elapsed_time >= timeout:
             warnings.warn(f'UNEXPECTED Could not find .lst-file after waiting {elapsed_time}s')
@@ -96,12 +137,15 @@ def execute_model(model_entry, context):
         'commands': [
             {
                 'args': args,
-                'returncode': result.returncode,
+                'returncode': process.returncode,
+                'runtime': runtime,
                 'stdout': 'stdout',
                 'stderr': 'stderr',
             }
         ]
     }
+    if monitor.stop_reason is not None:
+        plugin['commands'][0]['early_stopping'] = monitor.stop_reason
 
     if model.internals.control_stream.get_records('ESTIMATION'):
         modelfit_results = parse_modelfit_results(model, model_path / basename)
@@ -112,6 +156,16 @@ def execute_model(model_entry, context):
     else:
         simulation_results = None
 
+    if monitor.stop_reason is not None:
+        message = f'Run terminated early: {monitor.stop_reason}'
+        context.log_message('warning', f'{name}: {message}')
+        if modelfit_results is not None:
+            modelfit_results = replace(
+                modelfit_results,
+                minimization_successful=False,
+                log=(modelfit_results.log or Log()).log_error(message),
+            )
+
     log = modelfit_results.log if modelfit_results else None
     model_entry = model_entry.attach_results(
         modelfit_results=modelfit_results, simulation_results=simulation_results, log=log
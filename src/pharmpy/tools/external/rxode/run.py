@@ -16,6 +16,7 @@ from pharmpy.tools import fit
 from pharmpy.tools.external.nlmixr.run import compare_models, print_step
 from pharmpy.workflows import ModelEntry, default_context
 from pharmpy.workflows.results import ModelfitResults
+from pharmpy.workflows.trace import external_process
 
 
 def execute_model(model_entry, db):
@@ -78,7 +79,10 @@ def execute_model(model_entry, db):
     args = [str(rpath), str(path / (model.name + '.R'))]
 
     with open(stdout, "wb") as out, open(stderr, "wb") as err:
-        result = subprocess.run(args, stdin=subprocess.DEVNULL, stderr=err, stdout=out, env=newenv)
+        with external_process():
+            result = subprocess.run(
+                args, stdin=subprocess.DEVNULL, stderr=err, stdout=out, env=newenv
+            )
 
     rdata_path = path / f'{model.name}.RDATA'
 
@@ -0,0 +1,180 @@
+"""Numpy evaluation of small dense neural networks stored as TFLite models
+
+The TFLite file format is a flatbuffer. Only the parts needed to run float32
+networks built from fully connected layers and elementwise operations (e.g. a
+keras normalization layer followed by dense layers) are read, so that the
+networks of pharmpy.tools.funcs.ml can be evaluated without tflite_runtime.
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+else:
+    from pharmpy.deps import numpy as np
+
+# NOTE: Values from the TFLite schema
+_FLOAT32 = 0
+_ADD = 0
+_FULLY_CONNECTED = 9
+_LOGISTIC = 14
+_MUL = 18
+_RELU = 19
+_RELU6 = 21
+_RESHAPE = 22
+_TANH = 28
+_SUB = 41
+_DIV = 42
+
+_ACTIVATIONS = {
+    0: lambda x: x,
+    1: lambda x: np.maximum(x, 0),
+    2: lambda x: np.clip(x, -1, 1),
+    3: lambda x: np.clip(x, 0, 6),
+    4: np.tanh,
+}
+
+_BINARY = {_ADD: np.add, _SUB: np.subtract, _MUL: np.multiply, _DIV: np.divide}
+
+_UNARY = {
+    _RELU: _ACTIVATIONS[1],
+    _RELU6: _ACTIVATIONS[3],
+    _TANH: np.tanh,
+    _LOGISTIC: lambda x: 1 / (1 + np.exp(-x)),
+}
+
+
+class _FlatBuffer:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def _uint(self, pos: int) -> int:
+        return struct.unpack_from('<I', self.data, pos)[0]
+
+    def root(self) -> int:
+        return self._uint(0)
+
+    def _field(self, table: int, i: int) -> Optional[int]:
+        vtable = table - struct.unpack_from('<i', self.data, table)[0]
+        offset = 4 + 2 * i
+        if offset >= struct.unpack_from('<H', self.data, vtable)[0]:
+            return None
+        pos = struct.unpack_from('<H', self.data, vtable + offset)[0]
+        return table + pos if pos else None
+
+    def scalar(self, table: int, i: int, fmt: str, default=0):
+        pos = self._field(table, i)
+        return default if pos is None else struct.unpack_from('<' + fmt, self.data, pos)[0]
+
+    def table(self, table: int, i: int) -> Optional[int]:
+        pos = self._field(table, i)
+        return None if pos is None else pos + self._uint(pos)
+
+    def _vector(self, table: int, i: int) -> tuple[int, int]:
+        pos = self._field(table, i)
+        if pos is None:
+            return 0, 0
+        start = pos + self._uint(pos)
+        return start + 4, self._uint(start)
+
+    def tables(self, table: int, i: int) -> list[int]:
+        start, n = self._vector(table, i)
+        return [start + 4 * k + self._uint(start + 4 * k) for k in range(n)]
+
+    def ints(self, table: int, i: int) -> list[int]:
+        start, n = self._vector(table, i)
+        return list(struct.unpack_from(f'<{n}i', self.data, start))
+
+    def bytes(self, table: int, i: int) -> bytes:
+        start, n = self._vector(table, i)
+        return self.data[start : start + n]
+
+
+@dataclass(frozen=True)
+class _Operator:
+    code: int
+    inputs: tuple[int, ...]
+    outputs: tuple[int, ...]
+    activation: int
+
+
+class DenseNetwork:
+    """A network with float32 weights read from a TFLite model
+
+    The network is evaluated in double precision.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the TFLite model file
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        fb = _FlatBuffer(Path(path).read_bytes())
+        root = fb.root()
+        # NOTE: builtin_code replaced deprecated_builtin_code for codes above 127
+        codes = [
+            max(fb.scalar(code, 3, 'i'), fb.scalar(code, 0, 'b')) for code in fb.tables(root, 1)
+        ]
+        buffers = fb.tables(root, 4)
+        subgraph = fb.tables(root, 2)[0]
+
+        self._constants: dict[int, np.ndarray] = {}
+        for i, tensor in enumerate(fb.tables(subgraph, 0)):
+            data = fb.bytes(buffers[fb.scalar(tensor, 2, 'I')], 0)
+            if not data:
+                continue
+            if fb.scalar(tensor, 1, 'b') != _FLOAT32:
+                raise NotImplementedError('Only float32 tensors are supported')
+            shape = fb.ints(tensor, 0)
+            self._constants[i] = np.frombuffer(data, dtype='<f4').reshape(shape).astype(np.float64)
+
+        self._inputs = fb.ints(subgraph, 1)
+        self._outputs = fb.ints(subgraph, 2)
+        self._operators = []
+        for op in fb.tables(subgraph, 3):
+            code = codes[fb.scalar(op, 0, 'I')]
+            if code not in (_FULLY_CONNECTED, _RESHAPE, *_BINARY, *_UNARY):
+                raise NotImplementedError(f'Unsupported TFLite operator {code}')
+            options = fb.table(op, 4)
+            # NOTE: The fused activation is the first option of all supported operators
+            activation = 0 if options is None else fb.scalar(options, 0, 'b')
+            self._operators.append(
+                _Operator(code, tuple(fb.ints(op, 1)), tuple(fb.ints(op, 2)), activation)
+            )
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """Evaluate the network for a batch of inputs
+
+        Parameters
+        ----------
+        x : np.ndarray
+            Inputs with one row per sample
+
+        Returns
+        -------
+        np.ndarray
+            First output of the network with one row per sample
+        """
+        values = dict(self._constants)
+        values[self._inputs[0]] = np.asarray(x, dtype=np.float64)
+        for op in self._operators:
+            args = [values[i] if i >= 0 else None for i in op.inputs]
+            if op.code == _FULLY_CONNECTED:
+                weights, bias = args[1], args[2] if len(args) > 2 else None
+                result = args[0].reshape(-1, weights.shape[1]) @ weights.T
+                if bias is not None:
+                    result = result + bias
+            elif op.code == _RESHAPE:
+                result = args[0].reshape(len(args[0]), -1)
+            elif op.code in _BINARY:
+                result = _BINARY[op.code](args[0], args[1])
+            else:
+                result = _UNARY[op.code](args[0])
+            values[op.outputs[0]] = _ACTIVATIONS[op.activation](result)
+        return values[self._outputs[0]]
@@ -1,20 +1,18 @@
 from __future__ import annotations
 
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Union
+from typing import Callable, Literal, Optional, Union
 
 from pharmpy.deps import numpy as np
 from pharmpy.deps import pandas as pd
 from pharmpy.model import Model, ModelfitResultsError
-from pharmpy.modeling import (
-    get_ids,
-    get_model_covariates,
-    get_number_of_individuals,
-    get_number_of_observations,
-    get_number_of_observations_per_individual,
-)
+from pharmpy.modeling import get_ids, get_mdv, get_model_covariates
 from pharmpy.workflows.results import ModelfitResults
 
+from .dense_network import DenseNetwork
+
 
 def _all_parameters(model: Model, res: ModelfitResults):
     # All parameter estimates including fixed
@@ -34,15 +32,29 @@ def _create_dataset(model: Model, res: ModelfitResults):
     if 'CWRES' not in res.residuals.columns:
         raise ModelfitResultsError("CWRES not an available residual in ModelfitResults")
     idcol = model.datainfo.id_column.name
-    nids = get_number_of_individuals(model)
-    nobs = get_number_of_observations(model)
-    nobsi = get_number_of_observations_per_individual(model)
-    cwres = res.residuals[['CWRES']].join(model.dataset[idcol]).set_index(idcol).squeeze()
-    iofv = res.individual_estimates
     npar = len(model.parameters)
     ofv = res.ofv
     assert ofv is not None
 
+    # NOTE: All per individual features of the dataset in one grouped aggregation
+    dataset = model.dataset
+    cov_names = get_model_covariates(model, strings=True)
+    observations = dataset[model.datainfo.dv_column.name].where(get_mdv(model).to_numpy() == 0)
+    data = dataset[[idcol] + cov_names].assign(
+        _dv=observations, _cwres=res.residuals['CWRES'].abs()
+    )
+    aggregations = {name: (name, 'mean') for name in cov_names}
+    grouped = data.groupby(idcol).agg(
+        nobsi=('_dv', 'count'),
+        max_cwres=('_cwres', 'max'),
+        median_cwres=('_cwres', 'median'),
+        **aggregations,
+    )
+    # NOTE: Individuals without observations are not counted
+    nobsi = grouped['nobsi'][grouped['nobsi'] > 0]
+    nids = len(grouped)
+    nobs = int(nobsi.sum())
+
     # Max ratio of abs(ETAi) and omegai
     variance_omegas = [
         model.random_variables[rv].get_variance(rv).name for rv in model.random_variables.etas.names
@@ -75,10 +87,8 @@ def _create_dataset(model: Model, res: ModelfitResults):
         mean_etc_ratio.index = ofv_ratio.index
 
     # max((abs(indcov - mean(cov))) / sd(cov))
-    cov_names = get_model_covariates(model, strings=True)
     if len(cov_names) > 0:
-        covariates = model.dataset[cov_names + [idcol]].set_index(idcol)
-        mean_covs = covariates.groupby(idcol).mean()
+        mean_covs = grouped[cov_names]
         maxcov = (abs(mean_covs - mean_covs.mean()) / mean_covs.std()).max(axis=1)
     else:
         maxcov = 0.0
@@ -91,8 +101,8 @@ def _create_dataset(model: Model, res: ModelfitResults):
             'nobsi': nobsi,
             'ncovs': len(cov_names),
             'maxcov': maxcov,
-            'max_cwres': abs(cwres).groupby(idcol).max(),
-            'median_cwres': abs(cwres).groupby(idcol).median(),
+            'max_cwres': grouped['max_cwres'],
+            'median_cwres': grouped['median_cwres'],
             'max_ebe_ratio': max_ebe_ratio,
             'ofv_ratio': ofv_ratio,
             'etc_ratio': mean_etc_ratio,
@@ -202,7 +212,7 @@ def predict_outliers(model: Model, results: ModelfitResults, cutoff: float = 3.0
     """
     model_path = Path(__file__).resolve().parent / 'ml_models' / 'outliers.tflite'
     data = _create_dataset(model, results)
-    output = _predict_with_tflite(model_path, data)
+    output = _predict(model_path, data)
     df = pd.DataFrame({'residual': output, 'outlier': output > cutoff}, index=get_ids(model))
     df.index.name = model.datainfo.id_column.name
     return df
@@ -236,7 +246,7 @@ def predict_influential_individuals(model: Model, results: ModelfitResults, cuto
 
     model_path = Path(__file__).resolve().parent / 'ml_models' / 'infinds.tflite'
     data = _create_dataset(model, results)
-    output = _predict_with_tflite(model_path, data)
+    output = _predict(model_path, data)
     df = pd.DataFrame({'dofv': output, 'influential': output > cutoff}, index=get_ids(model))
     df.index.name = model.datainfo.id_column.name
     return df
@@ -281,22 +291,85 @@ def predict_influential_outliers(
     return df
 
 
-def _predict_with_tflite(model_path: Union[str, Path], data: pd.DataFrame):
-    import tflite_runtime.interpreter as tflite
-
-    interpreter = tflite.Interpreter(str(model_path))
-    interpreter.allocate_tensors()
-    input_details = interpreter.get_input_details()
-    output_details = interpreter.get_output_details()
+# NOTE: Number of rows per invocation of the TFLite interpreter
+CHUNK_SIZE = 1024
+
+
+class _TFLitePredictor:
+    # A TFLite interpreter evaluating a batch of rows per invocation. The
+    # interpreter is not thread safe and is resized only when the size of the
+    # batch changes.
+
+    def __init__(self, model_path: str):
+        import tflite_runtime.interpreter as tflite
+
+        self._interpreter = tflite.Interpreter(model_path)
+        self._input = self._interpreter.get_input_details()[0]['index']
+        self._output = self._interpreter.get_output_details()[0]['index']
+        self._batch_size = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, npdata: np.ndarray) -> np.ndarray:
+        interpreter = self._interpreter
+        outputs = []
+        with self._lock:
+            for start in range(0, len(npdata), CHUNK_SIZE):
+                chunk = npdata[start : start + CHUNK_SIZE]
+                if len(chunk) != self._batch_size:
+                    interpreter.resize_tensor_input(self._input, chunk.shape)
+                    interpreter.allocate_tensors()
+                    self._batch_size = len(chunk)
+                interpreter.set_tensor(self._input, chunk)
+                interpreter.invoke()
+                outputs.append(interpreter.get_tensor(self._output)[:, 0])
+        return np.concatenate(outputs) if outputs else np.empty(0)
+
+
+def _numpy_predictor(model_path: str) -> Callable[[np.ndarray], np.ndarray]:
+    network = DenseNetwork(model_path)
+    return lambda npdata: network.predict(npdata)[:, 0]
+
+
+@lru_cache(maxsize=None)
+def _get_predictor(
+    model_path: str, backend: Optional[Literal['tflite', 'numpy']] = None
+) -> Callable[[np.ndarray], np.ndarray]:
+    # One predictor per model file and backend for the whole process
+    if backend is None:
+        try:
+            import tflite_runtime.interpreter  # noqa: F401
+        except ImportError:
+            backend = 'numpy'
+        else:
+            backend = 'tflite'
+    if backend == 'tflite':
+        return _TFLitePredictor(model_path)
+    elif backend == 'numpy':
+        return _numpy_predictor(model_path)
+    raise ValueError(f'Unknown backend {backend}, must be one of tflite and numpy')
+
+
+def _predict(
+    model_path: Union[str, Path],
+    data: pd.DataFrame,
+    backend: Optional[Literal['tflite', 'numpy']] = None,
+) -> np.ndarray:
+    """Predict with a TFLite model for all rows of data
 
-    npdata = data.astype('float32').values
-    nrows = len(data)
-    output = np.empty(nrows)
-
-    for i in range(0, nrows):
-        interpreter.set_tensor(input_details[0]['index'], npdata[i : (i + 1), :])
-        interpreter.invoke()
-        output_data = interpreter.get_tensor(output_details[0]['index'])
-        output[i] = output_data[0][0]
+    Parameters
+    ----------
+    model_path : str or Path
+        Path to the TFLite model
+    data : pd.DataFrame
+        Input features with one row per prediction
+    backend : str
+        'tflite' to use tflite_runtime or 'numpy' to use DenseNetwork. Default is to
+        use tflite_runtime if it is installed.
 
-    return output
+    Returns
+    -------
+    np.ndarray
+        One prediction per row
+    """
+    predictor = _get_predictor(str(model_path), backend)
+    return predictor(np.ascontiguousarray(data.to_numpy(dtype=np.float32)))
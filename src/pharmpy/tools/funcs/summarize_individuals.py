@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import importlib.util
-import warnings
 from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
 from pharmpy.model import Model, ModelfitResultsError
@@ -71,10 +69,6 @@ def summarize_individuals(models: List[Model], models_res: List[ModelfitResults]
 
     resDict = {model.name: res for model, res in zip(models, models_res)}
 
-    spec = importlib.util.find_spec('tflite_runtime')
-    if spec is None:
-        warnings.warn("tflite is not installed, using NaN for predictions")
-
     df = pd.concat(
         map(
             lambda model: groupedByIDAddColumnsOneModel(resDict, model, resDict[model.name]),
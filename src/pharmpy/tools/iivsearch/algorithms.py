@@ -23,6 +23,7 @@ from pharmpy.workflows import (
     WorkflowBuilder,
     call_workflow,
 )
+from pharmpy.workflows.pool import add_batch_tasks
 from pharmpy.workflows.results import mfr
 
 
@@ -42,25 +43,18 @@ def td_exhaustive_no_of_etas(base_model, index_offset=0, keep=None, param_mappin
     fixed_etas = _get_fixed_etas(base_model)
     iiv_names = _remove_sublist(iiv_names, fixed_etas)
 
-    for i, to_remove in enumerate(non_empty_subsets(iiv_names), 1):
-        model_name = f'iivsearch_run{i + index_offset}'
-        if param_mapping:
-            etas = param_mapping.keys()
-            param_names = param_mapping.values()
-        else:
-            etas = tuple()
-            param_names = tuple()
-        task_candidate_entry = Task(
-            'candidate_entry',
-            create_no_of_etas_candidate_entry,
-            model_name,
-            to_remove,
-            etas,
-            param_names,
-            False,
-            None,
-        )
-        wb.add_task(task_candidate_entry)
+    etas, param_names = _split_param_mapping(param_mapping)
+    candidate_inputs = [
+        (f'iivsearch_run{i + index_offset}', to_remove, etas, param_names, False, None)
+        for i, to_remove in enumerate(non_empty_subsets(iiv_names), 1)
+    ]
+    add_batch_tasks(
+        wb,
+        ['candidate_entry'] * len(candidate_inputs),
+        create_no_of_etas_candidate_entry,
+        candidate_inputs,
+        batch_name='create_candidates',
+    )
 
     wf_fit = modelfit.create_fit_workflow(n=len(wb.output_tasks))
     wb.insert_workflow(wf_fit)
@@ -129,12 +123,7 @@ def stepwise_BU_algorithm(
     to_be_removed = [i for i in iiv_names if i not in parameters_to_ignore]
     model_name = f'iivsearch_run{1 + index_offset}'
     index_offset += 1
-    if param_mapping:
-        etas = param_mapping.keys()
-        param_names = param_mapping.values()
-    else:
-        etas = tuple()
-        param_names = tuple()
+    etas, param_names = _split_param_mapping(param_mapping)
 
     bu_base_entry = Task(
         'candidate_entry',
@@ -182,23 +171,30 @@ def stepwise_BU_algorithm(
     for step_number, steps in step_dict.items():
         effect_dict = {}
         temp_wb = WorkflowBuilder(name=f'stepwise_bu_{step_number}')
+        candidate_inputs = []
         for to_remove in steps:
             if all(e in previous_removed for e in to_remove):  # Filter unwanted effects
                 model_name = f'iivsearch_run{previous_index + 1}'
                 effect_dict[model_name] = to_remove
-                task_candidate_entry = Task(
-                    'candidate_entry',
-                    create_no_of_etas_candidate_entry,
-                    model_name,
-                    to_remove,
-                    etas,
-                    param_names,
-                    False,
-                    best_model_entry,
-                    base_model_entry,
+                candidate_inputs.append(
+                    (
+                        model_name,
+                        to_remove,
+                        etas,
+                        param_names,
+                        False,
+                        best_model_entry,
+                        base_model_entry,
+                    )
                 )
-                temp_wb.add_task(task_candidate_entry)
                 previous_index += 1
+        add_batch_tasks(
+            temp_wb,
+            ['candidate_entry'] * len(candidate_inputs),
+            create_no_of_etas_candidate_entry,
+            candidate_inputs,
+            batch_name='create_candidates',
+        )
         wf_fit = modelfit.create_fit_workflow(n=len(temp_wb.output_tasks))
         temp_wb.insert_workflow(wf_fit, predecessors=temp_wb.output_tasks)
         task_gather = Task('gather', lambda *model_entries: model_entries)
@@ -246,34 +242,37 @@ def td_exhaustive_block_structure(base_model, index_offset=0, param_mapping=None
     fixed_etas = _get_fixed_etas(base_model)
     iiv_names = _remove_sublist(iivs.names, fixed_etas)
 
+    etas, param_names = _split_param_mapping(param_mapping)
+    candidate_inputs = []
     for block_structure in _rv_block_structures(iiv_names):
         if _is_rv_block_structure(iivs, block_structure, fixed_etas):
             continue
 
         model_name = f'iivsearch_run{model_no}'
-        if param_mapping:
-            etas = param_mapping.keys()
-            param_names = param_mapping.values()
-        else:
-            etas = tuple()
-            param_names = tuple()
-        task_candidate_entry = Task(
-            'candidate_entry',
-            create_block_structure_candidate_entry,
-            model_name,
-            block_structure,
-            etas,
-            param_names,
-        )
-        wb.add_task(task_candidate_entry)
+        candidate_inputs.append((model_name, block_structure, etas, param_names))
 
         model_no += 1
 
+    add_batch_tasks(
+        wb,
+        ['candidate_entry'] * len(candidate_inputs),
+        create_block_structure_candidate_entry,
+        candidate_inputs,
+        batch_name='create_candidates',
+    )
+
     wf_fit = modelfit.create_fit_workflow(n=len(wb.output_tasks))
     wb.insert_workflow(wf_fit)
     return Workflow(wb)
 
 
+def _split_param_mapping(param_mapping):
+    # NOTE: Tuples since the inputs of batched tasks are pickled
+    if param_mapping:
+        return tuple(param_mapping.keys()), tuple(param_mapping.values())
+    return tuple(), tuple()
+
+
 def create_no_of_etas_candidate_entry(
     name, to_remove, etas, param_names, base_parent, best_model_entry, base_model_entry
 ):
@@ -7,6 +7,7 @@ from pharmpy.modeling import add_predictions, get_mdv, set_estimation_step, set_
 from pharmpy.modeling.estimation_steps import add_derivative
 from pharmpy.tools.modelfit import create_fit_workflow
 from pharmpy.workflows import ModelEntry, Task, Workflow, WorkflowBuilder
+from pharmpy.workflows.hashing import ModelHash
 
 from .results import calculate_results
 
@@ -50,7 +51,7 @@ def create_workflow(
     fit_deriv_task = wb.output_tasks
 
     lin_task = Task(
-        "create_linearized_model", _create_linearized_model, model_name, description, model
+        "create_linearized_model", create_linearized_model, model_name, description, model
     )
     wb.add_task(lin_task, predecessors=fit_deriv_task)
 
@@ -93,8 +94,36 @@ def create_derivative_model(modelentry):
     return ModelEntry.create(model=der_model)
 
 
-def _create_linearized_model(model_name, description, model, derivative_model_entry):
-    new_input_file = cleanup_columns(derivative_model_entry)
+def create_linearized_model(context, model_name, description, model, derivative_model_entry):
+    derivative_table = retrieve_or_create_derivative_table(context, derivative_model_entry)
+    return _create_linearized_model(
+        model_name, description, model, derivative_model_entry, derivative_table
+    )
+
+
+def retrieve_or_create_derivative_table(context, derivative_model_entry):
+    """Derivative table of a fitted derivative model, reused from the context if possible
+
+    The table is stored in the context under the hash of the derivative model, which
+    includes the initial estimates and the requested derivatives. Linearizations of the
+    same model with the same estimates, e.g. in different stages of a tool, get the same
+    table while changed estimates give a new one.
+    """
+    key = ModelHash(derivative_model_entry.model)
+    derivative_table = context.retrieve_derivatives(key)
+    if derivative_table is None:
+        derivative_table = cleanup_columns(derivative_model_entry)
+        context.store_derivatives(key, derivative_table)
+    return derivative_table
+
+
+def _create_linearized_model(
+    model_name, description, model, derivative_model_entry, derivative_table=None
+):
+    if derivative_table is None:
+        new_input_file = cleanup_columns(derivative_model_entry)
+    else:
+        new_input_file = derivative_table
     new_datainfo = DataInfo.create(list(new_input_file.columns))
     new_datainfo = new_datainfo.set_dv_column("DV")
     new_datainfo = new_datainfo.set_id_column("ID")
@@ -7,19 +7,7 @@ from lark import Lark
 
 from pharmpy.model import Model
 from pharmpy.modeling.covariate_effect import get_covariate_effects
-from pharmpy.modeling.odes import (
-    get_number_of_peripheral_compartments,
-    get_number_of_transit_compartments,
-    has_first_order_absorption,
-    has_first_order_elimination,
-    has_instantaneous_absorption,
-    has_lag_time,
-    has_michaelis_menten_elimination,
-    has_mixed_mm_fo_elimination,
-    has_seq_zo_fo_absorption,
-    has_zero_order_absorption,
-    has_zero_order_elimination,
-)
+from pharmpy.modeling.odes import get_structural_features
 from pharmpy.tools.mfl.feature.covariate import features as covariate_features
 from pharmpy.tools.mfl.statement.definition import Let
 from pharmpy.tools.mfl.statement.feature.absorption import Absorption
@@ -1105,31 +1093,17 @@ def get_model_features(model: Model, supress_warnings: bool = False) -> str:
         A MFL string representation of the input model.
 
     """
+    structural = get_structural_features(model)
+
     # ABSORPTION
-    absorption = None
-    if has_seq_zo_fo_absorption(model):
-        absorption = "SEQ-ZO-FO"
-    elif has_zero_order_absorption(model):
-        absorption = "ZO"
-    elif has_first_order_absorption(model):
-        absorption = "FO"
-    elif has_instantaneous_absorption(model):
-        absorption = "INST"
+    absorption = structural['absorption']
 
     if not supress_warnings:
         if absorption is None:
             warnings.warn("Could not determine absorption of model.")
 
     # ElIMINATION
-    elimination = None
-    if has_mixed_mm_fo_elimination(model):
-        elimination = "MIX-FO-MM"
-    elif has_zero_order_elimination(model):
-        elimination = "ZO"
-    elif has_first_order_elimination(model):
-        elimination = "FO"
-    elif has_michaelis_menten_elimination(model):
-        elimination = "MM"
+    elimination = structural['elimination']
 
     if not supress_warnings:
         if elimination is None:
@@ -1137,20 +1111,20 @@ def get_model_features(model: Model, supress_warnings: bool = False) -> str:
 
     # ABSORPTION DELAY (TRANSIT AND LAGTIME)
     # TRANSITS
-    transits = get_number_of_transit_compartments(model)
+    transits = structural['transits']
 
     # TODO : DEPOT
-    if not model.statements.ode_system.find_depot(model.statements):
+    if not structural['depot']:
         depot = "NODEPOT"
     else:
         depot = "DEPOT"
 
-    lagtime = has_lag_time(model)
+    lagtime = structural['lagtime']
     if not lagtime:
         lagtime = None
 
     # DISTRIBUTION (PERIPHERALS)
-    peripherals = get_number_of_peripheral_compartments(model)
+    peripherals = structural['peripherals']
 
     # COVARIATES
     covariates = get_covariate_effects(model)
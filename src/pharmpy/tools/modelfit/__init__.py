@@ -10,7 +10,7 @@ r"""
    * - ``default_tool``
      - 'nonmem'
      - str
-     - Name of default estimation tool either 'nonmem' or 'nlmixr'
+     - Name of default estimation tool either 'nonmem', 'nlmixr' or 'native'
 """
 
 import pharmpy.config as config
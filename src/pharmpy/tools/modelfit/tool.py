@@ -1,10 +1,12 @@
+import os.path
 from typing import Iterable, Literal, Optional, Tuple, Union
 
+import pharmpy
 from pharmpy.model import Model
 from pharmpy.workflows import ModelEntry, Task, Workflow, WorkflowBuilder
 from pharmpy.workflows.hashing import ModelHash
 
-SupportedExternalTools = Literal['nonmem', 'nlmixr', 'rxode']
+SupportedExternalTools = Literal['nonmem', 'nlmixr', 'rxode', 'native']
 
 
 def create_workflow(
@@ -51,8 +53,8 @@ def create_workflow(
     return wf
 
 
-def create_fit_workflow(modelentries=None, n=None):
-    execute_model = retrieve_from_database_or_execute_model_with_tool()
+def create_fit_workflow(modelentries=None, n=None, esttool=None):
+    execute_model = retrieve_from_database_or_execute_model_with_tool(esttool)
 
     wb = WorkflowBuilder()
     if modelentries is None:
@@ -82,31 +84,70 @@ def post_process_results_many(context, *modelentries: ModelEntry):
     return tuple([m.modelfit_results for m in modelentries])
 
 
-def retrieve_from_database_or_execute_model_with_tool():
+def retrieve_from_database_or_execute_model_with_tool(esttool=None):
     def task(context, model_entry):
-        tool = context.retrieve_common_options().get('esttool', None)
+        # NOTE: A given esttool overrides the common option
+        tool = esttool or context.retrieve_common_options().get('esttool', None)
         assert isinstance(model_entry, ModelEntry)
         model = model_entry.model
-        try:
-            db_model_entry = context.model_database.retrieve_model_entry(model)
-        except (KeyError, AttributeError, FileNotFoundError):
-            db_model_entry = None
-
-        if db_model_entry and db_model_entry.modelfit_results is not None:
-            if model.has_same_dataset_as(db_model_entry.model):
+        key = ModelHash(model)
+        tool, version = get_esttool_version(tool)
+        # NOTE: Identical models in the same batch wait for the first to be fitted
+        with context.fit_lock(key):
+            db_model_entry = context.retrieve_fit(model, key, tool, version)
+            if db_model_entry is not None:
                 me = model_entry.attach_results(db_model_entry.modelfit_results, db_model_entry.log)
-                context.store_key(model.name, ModelHash(model))
+                context.store_key(model.name, key)
                 context.store_annotation(model.name, model.description)
                 return me
 
-        # NOTE: Fallback to executing the model
-        execute_model = get_execute_model(tool)
-        me = execute_model(model_entry, context)
+            # NOTE: Fallback to executing the model
+            execute_model = get_execute_model(tool)
+            me = execute_model(model_entry, context)
+            context.store_fit(me, key, tool, version)
         return me
 
     return task
 
 
+def get_esttool_version(tool: Optional[SupportedExternalTools]) -> Tuple[str, str]:
+    """Get the name and version of an estimation tool
+
+    Fits are only reused for the same estimation tool and version. The version of
+    NONMEM is the resolved path to its nmfe script. Installations of the same NONMEM
+    version at different paths therefore do not share fits and an upgrade of NONMEM in
+    place is not detected, i.e. the fit cache needs to be cleared after such an upgrade.
+
+    Parameters
+    ----------
+    tool : str
+        Name of the estimation tool. Default is the configured default tool.
+
+    Returns
+    -------
+    tuple
+        Name and version of the tool. The version is empty if it cannot be determined.
+    """
+    from pharmpy.tools.modelfit import conf
+
+    if tool is None:
+        tool = conf.default_tool
+
+    if tool == 'nonmem':
+        from pharmpy.tools.external.nonmem.run import nmfe_path
+
+        # NOTE: The NONMEM installation is identified by the normalised path to its nmfe script
+        try:
+            version = os.path.normcase(os.path.realpath(nmfe_path()))
+        except FileNotFoundError:
+            version = ''
+    elif tool in ('native', 'dummy'):
+        version = pharmpy.__version__
+    else:
+        version = ''
+    return tool, version
+
+
 def get_execute_model(tool: Optional[SupportedExternalTools]):
     from pharmpy.tools.modelfit import conf
 
@@ -121,6 +162,8 @@ def get_execute_model(tool: Optional[SupportedExternalTools]):
         from pharmpy.tools.external.rxode.run import execute_model
     elif tool == 'dummy':
         from pharmpy.tools.external.dummy.run import execute_model
+    elif tool == 'native':
+        from pharmpy.tools.external.native.run import execute_model
     else:
         raise ValueError(f"Unknown estimation tool {tool}")
 
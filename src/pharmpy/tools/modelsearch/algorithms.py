@@ -4,6 +4,7 @@ from pharmpy.modeling import add_iiv, add_pk_iiv, create_joint_distribution, set
 from pharmpy.tools.common import update_initial_estimates
 from pharmpy.tools.modelfit import create_fit_workflow
 from pharmpy.workflows import ModelEntry, Task, Workflow, WorkflowBuilder
+from pharmpy.workflows.pool import add_batch_tasks
 
 from ..mfl.helpers import all_combinations, get_funcs_same_type, key_to_str
 
@@ -19,17 +20,20 @@ def exhaustive(mfl_funcs, iiv_strategy: str):
 
     combinations = list(all_combinations(mfl_funcs))
 
-    for i, combo in enumerate(combinations, 1):
-        model_name = f'modelsearch_run{i}'
-
-        # NOTE: The different functions need to be extracted first otherwise an error is raised
-        funcs = set(mfl_funcs[feat] for feat in combo)
-
-        task_create_candidate = Task(
-            'create_candidate', create_candidate_exhaustive, model_name, combo, funcs, iiv_strategy
-        )
-        wb_search.add_task(task_create_candidate)
-
+    # NOTE: The different functions need to be extracted first otherwise an error is raised
+    candidate_inputs = [
+        (f'modelsearch_run{i}', combo, set(mfl_funcs[feat] for feat in combo), iiv_strategy)
+        for i, combo in enumerate(combinations, 1)
+    ]
+    tasks_create_candidate = add_batch_tasks(
+        wb_search,
+        ['create_candidate'] * len(candidate_inputs),
+        create_candidate_exhaustive,
+        candidate_inputs,
+        batch_name='create_candidates',
+    )
+
+    for task_create_candidate in tasks_create_candidate:
         wf_fit = create_fit_workflow(n=1)
         wb_search.insert_workflow(wf_fit, predecessors=task_create_candidate)
 
@@ -42,35 +46,22 @@ def exhaustive_stepwise(mfl_funcs, iiv_strategy: str, wb_search=None, tool_name=
     if not wb_search:
         wb_search = WorkflowBuilder()
     model_tasks = []
+    lattice = CandidateLattice(mfl_funcs)
 
     while True:
         no_of_trans = 0
-        actions = _get_possible_actions(wb_search, mfl_funcs)
+        actions = _get_possible_actions(wb_search, lattice)
         for task_parent, feat_new in actions.items():
-            for feat in feat_new:
-                model_no = len(model_tasks) + 1
-                model_name = f'{tool_name}_run{model_no}'
-
-                task_create_candidate = Task(
-                    key_to_str(feat),
-                    create_candidate_stepwise,
-                    model_name,
-                    feat,
-                    mfl_funcs[feat],
-                    iiv_strategy,
-                )
-
-                if task_parent:
-                    wb_search.add_task(task_create_candidate, predecessors=[task_parent])
-                else:
-                    wb_search.add_task(task_create_candidate)
-
-                wf_fit = create_fit_workflow(n=1)
-                wb_search.insert_workflow(wf_fit, predecessors=task_create_candidate)
-
-                model_tasks += wf_fit.output_tasks
-
-                no_of_trans += 1
+            model_tasks += _add_stepwise_candidates(
+                wb_search,
+                task_parent,
+                feat_new,
+                mfl_funcs,
+                iiv_strategy,
+                tool_name,
+                len(model_tasks) + 1,
+            )
+            no_of_trans += len(feat_new)
         if no_of_trans == 0:
             break
 
@@ -80,11 +71,12 @@ def exhaustive_stepwise(mfl_funcs, iiv_strategy: str, wb_search=None, tool_name=
 def reduced_stepwise(mfl_funcs, iiv_strategy: str):
     wb_search = WorkflowBuilder()
     model_tasks = []
+    lattice = CandidateLattice(mfl_funcs)
 
     while True:
         no_of_trans = 0
-        actions = _get_possible_actions(wb_search, mfl_funcs)
-        groups = _find_same_model_groups(wb_search, mfl_funcs)
+        actions = _get_possible_actions(wb_search, lattice)
+        groups = _find_same_model_groups(wb_search, lattice)
         if len(groups) > 1:
             for group in groups:
                 # Only add collector nodes to tasks with possible actions (i.e. not to leaf nodes)
@@ -92,60 +84,55 @@ def reduced_stepwise(mfl_funcs, iiv_strategy: str):
                     task_best_model = Task('choose_best_model', _get_best_model)
                     wb_search.add_task(task_best_model, predecessors=group)
             # Overwrite actions with new collector nodes
-            actions = _get_possible_actions(wb_search, mfl_funcs)
+            actions = _get_possible_actions(wb_search, lattice)
 
         for task_parent, feat_new in actions.items():
-            for feat in feat_new:
-                model_no = len(model_tasks) + 1
-                model_name = f'modelsearch_run{model_no}'
-
-                task_create_candidate = Task(
-                    key_to_str(feat),
-                    create_candidate_stepwise,
-                    model_name,
-                    feat,
-                    mfl_funcs[feat],
-                    iiv_strategy,
-                )
-
-                if task_parent:
-                    wb_search.add_task(task_create_candidate, predecessors=[task_parent])
-                else:
-                    wb_search.add_task(task_create_candidate)
-
-                wf_fit = create_fit_workflow(n=1)
-                wb_search.insert_workflow(wf_fit, predecessors=task_create_candidate)
-
-                model_tasks += wf_fit.output_tasks
-
-                no_of_trans += 1
+            model_tasks += _add_stepwise_candidates(
+                wb_search,
+                task_parent,
+                feat_new,
+                mfl_funcs,
+                iiv_strategy,
+                'modelsearch',
+                len(model_tasks) + 1,
+            )
+            no_of_trans += len(feat_new)
         if no_of_trans == 0:
             break
 
     return Workflow(wb_search), model_tasks
 
 
-def _find_same_model_groups(wf, mfl_funcs):
-    tasks = wf.output_tasks
-    tasks_removed = []
-    all_groups = []
-    for task_start in tasks:
-        if id(task_start) in tasks_removed:
-            continue
-        else:
-            tasks_removed += [id(task_start)]
-        group = [task_start]
-        features_previous = set(_get_previous_features(wf, task_start, mfl_funcs))
-        for task in tasks:
-            if (
-                set(_get_previous_features(wf, task, mfl_funcs)) == features_previous
-                and id(task) not in tasks_removed
-            ):
-                tasks_removed += [id(task)]
-                group += [task]
-        if len(group) > 1:
-            all_groups += [group]
-    return all_groups
+def _add_stepwise_candidates(
+    wb_search, task_parent, feats, mfl_funcs, iiv_strategy, tool_name, first_model_no
+):
+    # NOTE: Candidates are named after their feature since the features of a candidate
+    # are found from the names of its upstream tasks (see CandidateLattice.features_of)
+    tasks_create_candidate = add_batch_tasks(
+        wb_search,
+        [key_to_str(feat) for feat in feats],
+        create_candidate_stepwise,
+        [
+            (f'{tool_name}_run{model_no}', feat, mfl_funcs[feat], iiv_strategy)
+            for model_no, feat in enumerate(feats, first_model_no)
+        ],
+        predecessors=[task_parent] if task_parent else None,
+        batch_name='create_candidates',
+    )
+
+    model_tasks = []
+    for task_create_candidate in tasks_create_candidate:
+        wf_fit = create_fit_workflow(n=1)
+        wb_search.insert_workflow(wf_fit, predecessors=task_create_candidate)
+        model_tasks += wf_fit.output_tasks
+    return model_tasks
+
+
+def _find_same_model_groups(wf, lattice):
+    groups = {}
+    for task in wf.output_tasks:
+        groups.setdefault(lattice.features_of(wf, task), []).append(task)
+    return [group for group in groups.values() if len(group) > 1]
 
 
 def _get_best_model(*model_entries):
@@ -156,7 +143,7 @@ def _get_best_model(*model_entries):
     return model_entries[0]
 
 
-def _get_possible_actions(wf, mfl_funcs):
+def _get_possible_actions(wf, lattice):
     actions = {}
     if wf.output_tasks:
         tasks = wf.output_tasks
@@ -164,27 +151,86 @@ def _get_possible_actions(wf, mfl_funcs):
         tasks = ['']
     for task in tasks:
         if task:
-            feat_previous = _get_previous_features(wf, task, mfl_funcs)
+            feat_previous = lattice.features_of(wf, task)
         else:
-            feat_previous = []
-        trans_possible = [
-            feat
-            for feat, func in mfl_funcs.items()
-            if _is_allowed(feat, func, feat_previous, mfl_funcs)
-        ]
-
-        actions[task] = trans_possible
+            feat_previous = frozenset()
+        actions[task] = lattice.transitions(feat_previous)
     return actions
 
 
-def _get_previous_features(wf, task, mfl_funcs):
-    tasks_upstream = wf.get_upstream_tasks(task)
-    tasks_upstream.reverse()
-    tasks_dict = {key_to_str(key): key for key in mfl_funcs.keys()}
-    features_previous = [
-        tasks_dict[task.name] for task in tasks_upstream if task.name in tasks_dict
-    ]
-    return features_previous
+class CandidateLattice:
+    """Allowed transformations between the candidates of a search space
+
+    Which transformations are allowed for a candidate only depends on the set of
+    features of the candidate. When the lattice is created each feature is checked
+    against each other feature of the search space with _is_allowed, after which the
+    transformations allowed from a set of features are found with set operations
+    and memoised. The features of the tasks of a search workflow are memoised as well.
+
+    Parameters
+    ----------
+    mfl_funcs : dict
+        Features of the search space and their functions
+    """
+
+    def __init__(self, mfl_funcs):
+        self.features = tuple(mfl_funcs.keys())
+        self._names = {key_to_str(feat): feat for feat in self.features}
+        self._peripherals = frozenset(feat for feat in self.features if feat[0] == 'PERIPHERALS')
+
+        def is_allowed(feat, feat_previous):
+            return _is_allowed(feat, mfl_funcs[feat], feat_previous, mfl_funcs)
+
+        self._first = frozenset(feat for feat in self.features if is_allowed(feat, []))
+        # NOTE: Which peripheral transformations are allowed after another only depends
+        # on that there has been one before
+        self._later_peripherals = frozenset(
+            feat
+            for feat in self._peripherals
+            if any(is_allowed(feat, [other]) for other in self._peripherals - {feat})
+        )
+        self._conflicts = {
+            feat: frozenset(other for other in self.features if not is_allowed(feat, [other]))
+            for feat in self._first - self._peripherals
+        }
+        self._transitions = {}
+        self._task_features = {}
+
+    def transitions(self, feat_previous):
+        """Features that can be added to a candidate with the given features"""
+        transitions = self._transitions.get(feat_previous)
+        if transitions is None:
+            if feat_previous & self._peripherals:
+                peripherals = self._later_peripherals
+            else:
+                peripherals = self._first & self._peripherals
+            transitions = tuple(
+                feat
+                for feat in self.features
+                if feat not in feat_previous
+                and (
+                    feat in peripherals
+                    if feat in self._peripherals
+                    else feat in self._conflicts and self._conflicts[feat].isdisjoint(feat_previous)
+                )
+            )
+            self._transitions[feat_previous] = transitions
+        return transitions
+
+    def features_of(self, wf, task):
+        """Features of the candidate of a task of a search workflow
+
+        The features are found from the names of the upstream tasks.
+        """
+        features = self._task_features.get(task)
+        if features is None:
+            features = frozenset()
+            for pred in wf.get_predecessors(task):
+                features |= self.features_of(wf, pred)
+                if pred.name in self._names:
+                    features |= {self._names[pred.name]}
+            self._task_features[task] = features
+        return features
 
 
 def create_candidate_exhaustive(model_name, combo, funcs, iiv_strategy, model_entry):
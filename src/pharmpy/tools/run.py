@@ -217,7 +217,7 @@ def run_tool_with_name(
         "model" in tool_options
         and "results" in tool_options
         and "esttool" in common_options
-        and common_options["esttool"] != "dummy"
+        and common_options["esttool"] not in ("dummy", "native")
     ):
 
         model_type = str(type(tool_options["model"])).split(".")[-3]
@@ -234,10 +234,12 @@ def run_tool_with_name(
     wf: Workflow = create_workflow(*args, **tool_options)
     assert wf.name == name
 
-    res = execute_workflow(wf, dispatcher=dispatcher, context=ctx)
+    res = execute_workflow(
+        wf, dispatcher=dispatcher, context=ctx, resume=common_options.get('resume', False)
+    )
     assert name == 'modelfit' or isinstance(res, Results) or name == 'simulation'
 
-    tool_metadata = _update_metadata(tool_metadata, res)
+    tool_metadata = _update_metadata(tool_metadata, res, ctx)
     ctx.store_metadata(tool_metadata)
 
     return res
@@ -262,9 +264,15 @@ def _create_metadata(
     return tool_metadata
 
 
-def _update_metadata(tool_metadata, res):
+def _update_metadata(tool_metadata, res, ctx):
     # FIXME: Make metadata immutable
     tool_metadata['stats']['end_time'] = _now()
+    summary = ctx.retrieve_fit_cache_summary()
+    tool_metadata['stats']['fit_cache'] = {
+        'hits': int(summary['hits'].sum()),
+        'misses': int(summary['misses'].sum()),
+        'saved_runtime': float(summary['saved_runtime'].sum()),
+    }
     return tool_metadata
 
 
@@ -312,10 +320,10 @@ def resume_tool(path: str):
     wf: Workflow = create_workflow(*args, **kwargs)
     assert wf.name == tool_name
 
-    res = execute_workflow(wf, dispatcher=dispatcher, database=tool_database)
+    res = execute_workflow(wf, dispatcher=dispatcher, context=tool_database, resume=True)
     assert tool_name == 'modelfit' or isinstance(res, Results)
 
-    tool_metadata = _update_metadata(tool_metadata, res)
+    tool_metadata = _update_metadata(tool_metadata, res, tool_database)
     tool_database.store_metadata(tool_metadata)
 
     return res
@@ -39,6 +39,7 @@ from pharmpy.tools.common import (
     update_initial_estimates,
 )
 from pharmpy.tools.modelfit import create_fit_workflow
+from pharmpy.tools.modelfit.tool import SupportedExternalTools
 from pharmpy.tools.run import summarize_errors_from_entries, summarize_modelfit_results_from_entries
 from pharmpy.workflows import ModelEntry, Task, Workflow, WorkflowBuilder, call_workflow
 from pharmpy.workflows.results import ModelfitResults
@@ -57,6 +58,7 @@ def create_workflow(
     max_iter: int = 3,
     dv: Optional[int] = None,
     strictness: Optional[str] = "minimization_successful or (rounding_errors and sigdigs>=0.1)",
+    resmod_esttool: Optional[SupportedExternalTools] = 'native',
 ):
     """Run the ruvsearch tool. For more details, see :ref:`ruvsearch`.
 
@@ -78,6 +80,9 @@ def create_workflow(
         Which DV to assess the error model for.
     strictness : str or None
         Strictness criteria
+    resmod_esttool : str or None
+        Estimation tool for the models of the conditional weighted residuals. Default is
+        'native', which estimates them in-process. None to use the estimation tool of the run.
 
     Returns
     -------
@@ -96,7 +101,17 @@ def create_workflow(
 
     wb = WorkflowBuilder(name="ruvsearch")
     start_task = Task(
-        'start_ruvsearch', start, model, results, groups, p_value, skip, max_iter, dv, strictness
+        'start_ruvsearch',
+        start,
+        model,
+        results,
+        groups,
+        p_value,
+        skip,
+        max_iter,
+        dv,
+        strictness,
+        resmod_esttool,
     )
     wb.add_task(start_task)
     task_results = Task('results', _results)
@@ -104,7 +119,9 @@ def create_workflow(
     return Workflow(wb)
 
 
-def create_iteration_workflow(model_entry, groups, cutoff, skip, current_iteration, dv):
+def create_iteration_workflow(
+    model_entry, groups, cutoff, skip, current_iteration, dv, resmod_esttool='native'
+):
     wb = WorkflowBuilder()
 
     start_task = Task('start_iteration', _start_iteration, model_entry)
@@ -151,7 +168,7 @@ def create_iteration_workflow(model_entry, groups, cutoff, skip, current_iterati
             tasks.append(task)
             wb.add_task(task, predecessors=task_base_model)
 
-    fit_wf = create_fit_workflow(n=1 + len(tasks))
+    fit_wf = create_fit_workflow(n=1 + len(tasks), esttool=resmod_esttool)
     wb.insert_workflow(fit_wf, predecessors=[task_base_model] + tasks)
     post_pro = partial(post_process, cutoff=cutoff, current_iteration=current_iteration, dv=dv)
     task_post_process = Task('post_process', post_pro)
@@ -185,7 +202,18 @@ def _change_proportional_model(model_entry):
     return ModelEntry.create(model, modelfit_results=None)
 
 
-def start(context, input_model, input_res, groups, p_value, skip, max_iter, dv, strictness):
+def start(
+    context,
+    input_model,
+    input_res,
+    groups,
+    p_value,
+    skip,
+    max_iter,
+    dv,
+    strictness,
+    resmod_esttool,
+):
     cutoff = float(stats.chi2.isf(q=p_value, df=1))
     if skip is None:
         skip = []
@@ -201,7 +229,15 @@ def start(context, input_model, input_res, groups, p_value, skip, max_iter, dv,
         selected_model_entries = [input_model_entry, model_entry]
     cwres_models = []
     for current_iteration in range(1, max_iter + 1):
-        wf = create_iteration_workflow(model_entry, groups, cutoff, skip, current_iteration, dv=dv)
+        wf = create_iteration_workflow(
+            model_entry,
+            groups,
+            cutoff,
+            skip,
+            current_iteration,
+            dv=dv,
+            resmod_esttool=resmod_esttool,
+        )
         res, best_model_entry, selected_model_name = call_workflow(
             wf, f'results{current_iteration}', context
         )
@@ -349,6 +385,10 @@ def _create_base_model(input_model_entry, current_iteration, dv):
         dependent_variables={y.symbol: 1},
     )
     base_model = base_model.replace(dataset=_create_dataset(input_model_entry, dv))
+    di = base_model.datainfo
+    for name, type in (('ID', 'id'), ('DV', 'dv'), ('MDV', 'mdv')):
+        di = di.set_column(di[name].replace(type=type))
+    base_model = base_model.replace(datainfo=di)
     return ModelEntry.create(base_model, modelfit_results=None, parent=input_model)
 
 
@@ -561,7 +601,7 @@ def _create_best_model(model_entry, res, current_iteration, dv, groups=4, cutoff
 
 @with_runtime_arguments_type_check
 @with_same_arguments_as(create_workflow)
-def validate_input(model, results, groups, p_value, skip, max_iter, dv, strictness):
+def validate_input(model, results, groups, p_value, skip, max_iter, dv, strictness, resmod_esttool):
     if groups <= 0:
         raise ValueError(f'Invalid `groups`: got `{groups}`, must be >= 1.')
 
@@ -2,13 +2,14 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
+from pharmpy.deps import numpy as np
 from pharmpy.deps import pandas as pd
 from pharmpy.model import Model
 from pharmpy.modeling import plot_individual_predictions
 from pharmpy.tools import read_modelfit_results
-from pharmpy.tools.simfit.results import psn_simfit_results
+from pharmpy.tools.simfit.results import iterate_psn_simfit_results
 from pharmpy.workflows import Results
 
 
@@ -21,31 +22,115 @@ class SimevalResults(Results):
     individual_predictions_plot: Optional[Any] = None
 
 
+class IndividualOFVAggregator:
+    """Online aggregation of individual OFVs from simulated refits
+
+    Results are consumed one at a time. Running means and variances are kept per
+    individual together with a compact float32 matrix of the sampled OFVs used
+    for the quantiles, so that a summary can be created at any time, e.g. to detect
+    outliers before all refits have finished.
+
+    Parameters
+    ----------
+    index : pd.Index
+        Individuals to aggregate over. Individual OFVs for other individuals are ignored.
+    """
+
+    def __init__(self, index: pd.Index):
+        self.index = index
+        self.n = 0
+        self._count = np.zeros(len(index))
+        self._mean = np.zeros(len(index))
+        self._m2 = np.zeros(len(index))
+        self._samples = np.empty((len(index), 16), dtype=np.float32)
+
+    def add(self, individual_ofv: Optional[pd.Series]):
+        """Add individual OFVs of the next refit (None for a failed refit)"""
+        if self.n == self._samples.shape[1]:
+            grown = np.empty((len(self.index), 2 * self.n), dtype=np.float32)
+            grown[:, : self.n] = self._samples
+            self._samples = grown
+
+        if individual_ofv is None:
+            x = np.full(len(self.index), np.nan)
+        else:
+            x = individual_ofv.reindex(self.index).to_numpy(dtype=np.float64)
+        self._samples[:, self.n] = x
+        self.n += 1
+
+        # Welford's algorithm
+        present = ~np.isnan(x)
+        self._count[present] += 1
+        delta = x[present] - self._mean[present]
+        self._mean[present] += delta / self._count[present]
+        self._m2[present] += delta * (x[present] - self._mean[present])
+
+    @property
+    def sampled_iofv(self) -> pd.DataFrame:
+        """Individual OFVs with one column per refit"""
+        return pd.DataFrame(
+            self._samples[:, : self.n].astype(np.float64),
+            index=self.index,
+            columns=range(1, self.n + 1),
+        )
+
+    def mean(self) -> pd.Series:
+        mean = np.where(self._count > 0, self._mean, np.nan)
+        return pd.Series(mean, index=self.index)
+
+    def std(self) -> pd.Series:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = np.where(self._count > 1, self._m2 / (self._count - 1), np.nan)
+        return pd.Series(np.sqrt(var), index=self.index)
+
+    def quantile(self, q: float) -> pd.Series:
+        samples = self._samples[:, : self.n]
+        quantiles = np.full(len(self.index), np.nan)
+        rows = self._count > 0
+        if rows.any():
+            quantiles[rows] = np.nanquantile(samples[rows].astype(np.float64), q, axis=1)
+        return pd.Series(quantiles, index=self.index)
+
+    def summary(self, original_iofv: pd.Series) -> pd.DataFrame:
+        """Summary of sampled individual OFVs compared to the original individual OFVs"""
+        iofv_summary = pd.DataFrame(
+            {
+                'original': original_iofv.reindex(self.index),
+                'sampled_mean': self.mean(),
+                'sampled_stdev': self.std(),
+            }
+        )
+        iofv_summary['residual'] = (
+            iofv_summary['original'] - iofv_summary['sampled_mean']
+        ) / iofv_summary['sampled_stdev']
+        iofv_summary['residual_q1'] = (
+            iofv_summary['original'] - self.quantile(0.25)
+        ) / iofv_summary['sampled_stdev']
+        iofv_summary['residual_q3'] = (
+            iofv_summary['original'] - self.quantile(0.75)
+        ) / iofv_summary['sampled_stdev']
+        iofv_summary['residual_outlier'] = iofv_summary['residual'] >= 3
+        return iofv_summary
+
+
 def calculate_results(original_model, original_results, simfit_results):
-    """Calculate simeval results"""
-    sampled_iofv = pd.concat(
-        [res.individual_ofv for res in simfit_results.modelfit_results],
-        axis=1,
-        keys=range(1, len(simfit_results.modelfit_results) + 1),
-    )
+    """Calculate simeval results
+
+    simfit_results can either be SimfitResults or any iterable of ModelfitResults,
+    for example a generator reading results one at a time.
+    """
+    if hasattr(simfit_results, 'modelfit_results'):
+        simfit_results = simfit_results.modelfit_results
+    return _calculate_results(original_model, original_results, simfit_results)
+
+
+def _calculate_results(original_model, original_results, modelfit_results: Iterable):
     origiofv = original_results.individual_ofv
-    iofv_summary = pd.DataFrame(
-        {
-            'original': origiofv,
-            'sampled_mean': sampled_iofv.T.mean(),
-            'sampled_stdev': sampled_iofv.T.std(),
-        }
-    )
-    iofv_summary['residual'] = (
-        iofv_summary['original'] - iofv_summary['sampled_mean']
-    ) / iofv_summary['sampled_stdev']
-    iofv_summary['residual_q1'] = (
-        iofv_summary['original'] - sampled_iofv.T.quantile(0.25)
-    ) / iofv_summary['sampled_stdev']
-    iofv_summary['residual_q3'] = (
-        iofv_summary['original'] - sampled_iofv.T.quantile(0.75)
-    ) / iofv_summary['sampled_stdev']
-    iofv_summary['residual_outlier'] = iofv_summary['residual'] >= 3
+    aggregator = IndividualOFVAggregator(origiofv.index)
+    for res in modelfit_results:
+        aggregator.add(res.individual_ofv if res is not None else None)
+
+    iofv_summary = aggregator.summary(origiofv)
 
     ids = iofv_summary.index[iofv_summary['residual_outlier']].tolist()
     id_plot = None
@@ -60,7 +145,7 @@ def calculate_results(original_model, original_results, simfit_results):
             pass
 
     res = SimevalResults(
-        sampled_iofv=sampled_iofv,
+        sampled_iofv=aggregator.sampled_iofv,
         iofv_summary=iofv_summary,
         individual_predictions_plot=id_plot,
     )
@@ -70,10 +155,9 @@ def calculate_results(original_model, original_results, simfit_results):
 def psn_simeval_results(path):
     path = Path(path)
     simfit_paths = (path / 'm1').glob('sim-*.mod')
-    simfit_results = psn_simfit_results(simfit_paths)
     original = Model.parse_model(path / 'm1' / 'original.mod')
     original_results = read_modelfit_results(path / 'm1' / 'original.mod')
-    res = calculate_results(original, original_results, simfit_results)
+    res = calculate_results(original, original_results, iterate_psn_simfit_results(simfit_paths))
 
     # Add CWRES outliers as 2 in data_flag
     # Reading PsN results for now
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Any, Optional
 
 from pharmpy.model import Model
-from pharmpy.tools.external.nonmem.results import simfit_results
+from pharmpy.tools.external.nonmem.results import iterate_simfit_results, simfit_results
 from pharmpy.workflows import Results
 
 
@@ -25,3 +25,10 @@ def psn_simfit_results(paths):
         modelfit_results.extend(simfit_results(model, path))
     res = calculate_results(modelfit_results)
     return res
+
+
+def iterate_psn_simfit_results(paths):
+    """Iterate over the modelfit results of all subproblems without keeping them in memory"""
+    for path in paths:
+        model = Model.parse_model(path)
+        yield from iterate_simfit_results(model, path)
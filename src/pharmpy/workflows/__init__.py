@@ -19,12 +19,36 @@
      - ``pharmpy.workflows.LocalDirectoryContext``
      - str
      - Name of default context class
+   * - ``fit_cache``
+     - None
+     - str
+     - Path to a model database shared by all contexts. Fits of identical models with the same
+       dataset are reused from it instead of being run again. Fits with NONMEM are only reused
+       for the same path to the NONMEM installation, so the cache needs to be cleared after
+       upgrading NONMEM in place.
+   * - ``trace``
+     - False
+     - bool
+     - Record a trace of the tasks of executed workflows and store it in the context
+       (see ``pharmpy.workflows.trace``)
+   * - ``profile_tasks``
+     - []
+     - list
+     - Glob patterns for names of tasks to run under cProfile. The profiles are stored in the
+       context.
+   * - ``checkpoints``
+     - False
+     - bool
+     - Store the output of each task of executed workflows in the context so that an
+       interrupted workflow can be resumed without running completed tasks again
+       (see ``pharmpy.workflows.checkpoint``)
 
 """
 
 import importlib
 
 import pharmpy.config as config
+from pharmpy.internals.fs.path import normalize_user_given_path
 
 from .args import split_common_options
 from .call import call_workflow
@@ -55,6 +79,16 @@ class WorkflowConfiguration(config.Configuration):
     default_context = config.ConfigItem(
         'pharmpy.workflows.LocalDirectoryContext', 'Name of default context class'
     )
+    fit_cache = config.ConfigItem(
+        None,
+        'Path to a model database shared by all contexts for reusing fits',
+        cls=normalize_user_given_path,
+    )
+    trace = config.ConfigItem(False, 'Whether to record a trace of the tasks of workflows', bool)
+    profile_tasks = config.ConfigItem([], 'Glob patterns for names of tasks to profile', list)
+    checkpoints = config.ConfigItem(
+        False, 'Whether to store the outputs of the tasks of workflows for resuming', bool
+    )
 
 
 conf = WorkflowConfiguration()
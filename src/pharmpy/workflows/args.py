@@ -3,7 +3,7 @@ from typing import Any
 
 from pharmpy.internals.fs.path import normalize_user_given_path
 
-ALLOWED_ESTTOOLS = (None, 'dummy', 'nonmem', 'nlmixr')
+ALLOWED_ESTTOOLS = (None, 'dummy', 'native', 'nonmem', 'nlmixr')
 
 
 def split_common_options(d) -> tuple[Mapping[str, Any], Mapping[str, Any], Mapping[str, Any]]:
@@ -23,7 +23,7 @@ def split_common_options(d) -> tuple[Mapping[str, Any], Mapping[str, Any], Mappi
     Tuple of dispatching options, common options and other option dictionaries
     """
     all_dispatching_options = ('context', 'path')
-    all_common_options = ('resume', 'esttool')
+    all_common_options = ('resume', 'esttool', 'early_stopping')
     dispatching_options = {}
     common_options = {}
     other_options = {}
@@ -39,7 +39,19 @@ def split_common_options(d) -> tuple[Mapping[str, Any], Mapping[str, Any], Mappi
                     raise ValueError(
                         f"Invalid estimation tool {value}, must be one of {ALLOWED_ESTTOOLS}"
                     )
+            elif key == 'early_stopping':
+                _validate_early_stopping(value)
             common_options[key] = value
         else:
             other_options[key] = value
     return dispatching_options, common_options, other_options
+
+
+def _validate_early_stopping(value):
+    if value is None:
+        return
+    if not isinstance(value, Mapping) or 'delta' not in value:
+        raise ValueError(f"Invalid early_stopping {value}, must be a dict with at least delta")
+    unknown = set(value) - {'delta', 'iterations', 'ofv'}
+    if unknown:
+        raise ValueError(f"Unknown early_stopping keys {sorted(unknown)}")
@@ -26,11 +26,20 @@ def call_workflow(wf: Workflow[T], unique_name, ctx) -> T:
     """
     from dask.distributed import get_client, rejoin, secede
 
+    from .checkpoint import current_checkpointer
     from .optimize import optimize_task_graph_for_dask_distributed
+    from .trace import current_tracer
 
     wb = WorkflowBuilder(wf)
     insert_context(wb, ctx)
     wf = Workflow(wb)
+    checkpointer = current_checkpointer()
+    if checkpointer is not None:
+        wf = checkpointer.instrument(wf, ctx)
+    traced = current_tracer()
+    if traced is not None:
+        tracer, parent = traced
+        wf = tracer.instrument(wf, parent=parent)
 
     client = get_client()
     dsk = wf.as_dask_dict()
@@ -0,0 +1,326 @@
+"""Checkpoints of the outputs of the tasks of workflows
+
+If the ``checkpoints`` option of ``pharmpy.workflows`` is set, or if a workflow
+is resumed, the function of each task of an executed workflow is wrapped to store
+the output of the task in the context when it is done. The output is stored under
+a key computed from
+
+- the name and the function of the task (including the code of the function)
+- the static input of the task
+- the keys of the predecessors of the task
+
+so that a task has the same key in a later execution of the same workflow if and
+only if it and all its upstream tasks are the same. Models, datasets and contexts
+in the input are identified by content and not by object.
+
+When a workflow is resumed in the same context each task with a stored output is
+replaced by a task loading the output and tasks that were only needed by such
+tasks are removed, i.e. completed subgraphs are not run again. Workflows called
+from tasks (see call_workflow) are checkpointed as well, which makes it possible
+to resume in the middle of a dynamic workflow.
+
+Stored and replayed tasks are recorded in the checkpoint manifest of the context
+(see Context.retrieve_checkpoint_manifest).
+
+Tasks are assumed to be functions of their input. Side effects of replayed tasks,
+e.g. messages logged in the context, are not repeated.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import pickle
+import threading
+import types
+import uuid
+from typing import TYPE_CHECKING, Any, Optional
+
+from pharmpy.internals.df import hash_df_runtime
+from pharmpy.internals.shm import SharedDataFrame
+from pharmpy.model import Model
+
+from .task import Task
+from .workflow import Workflow, WorkflowBuilder
+
+if TYPE_CHECKING:
+    import networkx as nx
+    import pandas as pd
+else:
+    from pharmpy.deps import networkx as nx
+    from pharmpy.deps import pandas as pd
+
+# NOTE: Checkpointers are looked up by id so that wrapped functions stay picklable
+_checkpointers: dict[str, Checkpointer] = {}
+_current = threading.local()
+
+
+class _CheckpointedFunction:
+    def __init__(self, checkpointer_id, name, key, function, context_id):
+        self.checkpointer_id = checkpointer_id
+        self.name = name
+        self.key = key
+        self.function = function
+        self.context_id = context_id
+        # NOTE: For inspect.signature, see insert_context
+        self.__wrapped__ = function
+
+    def __call__(self, *args):
+        checkpointer = _checkpointers.get(self.checkpointer_id)
+        if checkpointer is None:
+            return self.function(*args)
+        return checkpointer._run(self, args)
+
+
+class _ReplayedFunction:
+    def __init__(self, name, key):
+        self.name = name
+        self.key = key
+
+    def __call__(self, context):
+        return loads(context.retrieve_checkpoint(self.name, self.key))
+
+
+class Checkpointer:
+    """Store and replay the outputs of the tasks of workflows
+
+    Parameters
+    ----------
+    replay : bool
+        Whether to replace tasks with stored outputs with tasks loading them
+    """
+
+    def __init__(self, replay: bool = False):
+        self.id = str(uuid.uuid4())
+        self.replay = replay
+        self._fingerprints: dict[int, tuple[Any, tuple]] = {}
+        # NOTE: Contexts are not picklable and are looked up by id as well
+        self._contexts: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        _checkpointers[self.id] = self
+
+    def instrument(self, workflow: Workflow, context) -> Workflow:
+        """Wrap the functions of all tasks of a workflow
+
+        Tasks with stored outputs are replaced if replaying.
+
+        Parameters
+        ----------
+        workflow : Workflow
+            Workflow to instrument. The context must already have been inserted.
+        context : Context
+            Context to store the outputs in
+
+        Returns
+        -------
+        Workflow
+            Instrumented workflow
+        """
+        g = workflow._g
+        keys: dict[Task, Optional[str]] = {}
+        for task in nx.topological_sort(g):
+            predecessor_keys = tuple(keys[pred] for pred in g.predecessors(task))
+            if None in predecessor_keys:
+                keys[task] = None
+            else:
+                keys[task] = self.key(task, predecessor_keys)
+
+        replayed = set()
+        if self.replay:
+            replayed = {
+                task
+                for task, key in keys.items()
+                if key is not None and context.has_checkpoint(key)
+            }
+
+        context_id = str(uuid.uuid4())
+        self._contexts[context_id] = context
+        wb = WorkflowBuilder(workflow)
+        if replayed:
+            _remove_upstream(wb, replayed)
+        for task in wb.tasks:
+            key = keys[task]
+            if task in replayed:
+                new_task = Task(task.name, _ReplayedFunction(task.name, key), context)
+            else:
+                function = _CheckpointedFunction(self.id, task.name, key, task.function, context_id)
+                new_task = task.replace(function=function)
+            wb.replace_task(task, new_task)
+        return Workflow(wb)
+
+    def key(self, task: Task, predecessor_keys: tuple[str, ...]) -> Optional[str]:
+        """Key of a task given the keys of its predecessors
+
+        Returns None if the input of the task cannot be fingerprinted.
+        """
+        h = hashlib.sha256()
+        try:
+            _Fingerprinter(_HashWriter(h), self).dump(
+                (task.name, task.function, task.task_input, predecessor_keys)
+            )
+        except (pickle.PicklingError, TypeError, AttributeError, ValueError, RecursionError):
+            return None
+        return h.hexdigest()
+
+    def _run(self, checkpointed: _CheckpointedFunction, args: tuple):
+        previous = getattr(_current, 'checkpointer', None)
+        _current.checkpointer = self
+        try:
+            result = checkpointed.function(*args)
+        finally:
+            _current.checkpointer = previous
+        if checkpointed.key is not None:
+            try:
+                data = dumps(result)
+            except (pickle.PicklingError, TypeError, AttributeError, RecursionError):
+                # NOTE: The task will be run again when resuming
+                return result
+            context = self._contexts[checkpointed.context_id]
+            context.store_checkpoint(checkpointed.name, checkpointed.key, data)
+        return result
+
+    def _fingerprint_model(self, model: Model) -> tuple:
+        with self._lock:
+            cached = self._fingerprints.get(id(model))
+        if cached is not None and cached[0] is model:
+            return cached[1]
+        fingerprint = (
+            'Model',
+            type(model).__qualname__,
+            model.name,
+            model.description,
+            model.parent_model,
+            json.dumps(model.to_dict()),
+            model.dataset,
+        )
+        with self._lock:
+            # NOTE: The model is kept to make sure that its id is not reused
+            self._fingerprints[id(model)] = (model, fingerprint)
+        return fingerprint
+
+    def close(self):
+        """Stop checkpointing"""
+        _checkpointers.pop(self.id, None)
+        self._fingerprints = {}
+        self._contexts = {}
+
+
+def create_checkpointer(resume: bool = False) -> Optional[Checkpointer]:
+    """Create a checkpointer if checkpoints are enabled in the configuration or if resuming"""
+    from pharmpy.workflows import conf
+
+    if not conf.checkpoints and not resume:
+        return None
+    return Checkpointer(replay=resume)
+
+
+def current_checkpointer() -> Optional[Checkpointer]:
+    """The checkpointer of the checkpointed task running in this thread, if any"""
+    checkpointer = getattr(_current, 'checkpointer', None)
+    if checkpointer is None or checkpointer.id not in _checkpointers:
+        return None
+    return checkpointer
+
+
+def dumps(obj) -> bytes:
+    """Serialize the output of a task
+
+    Datasets in shared memory are serialized in full.
+    """
+    f = io.BytesIO()
+    _OutputPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+    return f.getvalue()
+
+
+def loads(data: bytes):
+    """Deserialize the output of a task"""
+    return pickle.loads(data)
+
+
+def _remove_upstream(wb: WorkflowBuilder, replayed: set[Task]):
+    # NOTE: Replayed tasks do not need their predecessors. Tasks that are then no
+    # longer upstream of an output of the workflow are removed.
+    g = wb._g
+    outputs = wb.output_tasks
+    for task in replayed:
+        g.remove_edges_from(list(g.in_edges(task)))
+    needed = set(outputs)
+    for task in outputs:
+        needed.update(nx.ancestors(g, task))
+    g.remove_nodes_from([task for task in wb.tasks if task not in needed])
+
+
+def _identity(obj):
+    return obj
+
+
+class _OutputPickler(pickle.Pickler):
+    def reducer_override(self, obj):
+        if isinstance(obj, SharedDataFrame):
+            return _identity, (obj.open(),)
+        return NotImplemented
+
+
+class _HashWriter:
+    def __init__(self, h):
+        self.h = h
+
+    def write(self, b):
+        self.h.update(b)
+
+
+class _Fingerprinter(pickle.Pickler):
+    def __init__(self, file, checkpointer: Checkpointer):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.checkpointer = checkpointer
+
+    def persistent_id(self, obj):
+        if isinstance(obj, pd.DataFrame):
+            return ('DataFrame', hash_df_runtime(obj))
+        if isinstance(obj, SharedDataFrame):
+            return ('DataFrame', hash_df_runtime(obj.open()))
+        if isinstance(obj, Model):
+            return self.checkpointer._fingerprint_model(obj)
+        if isinstance(obj, types.FunctionType):
+            return (
+                'function',
+                obj.__module__,
+                obj.__qualname__,
+                _code_digest(obj.__code__),
+                obj.__defaults__,
+                tuple(_cell_contents(cell) for cell in obj.__closure__ or ()),
+            )
+        if isinstance(obj, (set, frozenset)):
+            # NOTE: The iteration order of sets of strings differs between processes
+            return (type(obj).__name__, tuple(sorted(obj, key=repr)))
+        if isinstance(obj, _CheckpointedFunction):
+            return ('checkpointed', obj.function)
+        if _is_context(obj):
+            return ('Context', type(obj).__qualname__, getattr(obj, 'context_path', None))
+        return None
+
+
+def _code_digest(code: types.CodeType) -> str:
+    h = hashlib.sha256(code.co_code)
+    h.update(repr(code.co_names).encode('utf-8'))
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            h.update(_code_digest(const).encode('utf-8'))
+        else:
+            h.update(repr(const).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _cell_contents(cell):
+    try:
+        return cell.cell_contents
+    except ValueError:
+        # NOTE: Empty cell
+        return None
+
+
+def _is_context(obj) -> bool:
+    from .context import Context
+
+    return isinstance(obj, Context)
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import cProfile
 from abc import ABC, abstractmethod
-from typing import Any, Literal, Optional, Union
+from typing import Any, ContextManager, Literal, Optional, Union
 
 from pharmpy.deps import pandas as pd
 from pharmpy.model import Model
@@ -65,6 +66,40 @@ class Context(ABC):
             Tool results object
         """
 
+    @abstractmethod
+    def store_trace(self, trace: dict):
+        """Store a trace of the tasks of the tool
+
+        Parameters
+        ----------
+        trace : dict
+            Trace in the Chrome trace event format
+        """
+        pass
+
+    @abstractmethod
+    def retrieve_trace(self) -> dict:
+        """Retrieve the trace of the tasks of the tool
+
+        Return
+        ------
+        dict
+            Trace in the Chrome trace event format
+        """
+
+    @abstractmethod
+    def store_profile(self, name: str, profile: cProfile.Profile):
+        """Store a cProfile profile of a task
+
+        Parameters
+        ----------
+        name : str
+            Name of the profile
+        profile : cProfile.Profile
+            The profile
+        """
+        pass
+
     @abstractmethod
     def store_metadata(self, metadata: dict):
         """Store tool metadata
@@ -128,6 +163,126 @@ class Context(ABC):
         """
         pass
 
+    @abstractmethod
+    def log_progress(self, name: str, iteration: int, ofv: float, dataset: str = ''):
+        """Add the objective function value at an iteration of a running estimation
+
+        The dataset is given as the hash of the dataset of the model.
+        """
+        pass
+
+    @abstractmethod
+    def retrieve_progress(self, level: Literal['all', 'current', 'lower'] = 'all') -> pd.DataFrame:
+        """Retrieve the progress of estimations
+        all - progress in all Contexts
+        current - only the current Context level
+        lower - current and sub levels
+        """
+        pass
+
+    @abstractmethod
+    def retrieve_best_progress_ofv(self, name: str, dataset: str) -> Optional[float]:
+        """Lowest OFV so far of the other models in the current Context with the same dataset
+
+        Returns None if no other model estimated on the dataset has progressed.
+        """
+        pass
+
+    @abstractmethod
+    def retrieve_fit(
+        self, model: Model, key: ModelHash, esttool: str, version: str
+    ) -> Optional[ModelEntry]:
+        """Retrieve a previous fit of a model with the same hash and dataset
+
+        The fit is looked up in the model database of the context and in the fit
+        cache shared by all contexts. Only fits made with the same estimation tool
+        and version are used. Hits are counted in the fit cache summary.
+        """
+        pass
+
+    @abstractmethod
+    def store_fit(self, model_entry: ModelEntry, key: ModelHash, esttool: str, version: str):
+        """Make a new fit available to other contexts and count it as a miss
+
+        The fit is tagged with the estimation tool and version that made it.
+        """
+        pass
+
+    @abstractmethod
+    def fit_lock(self, key: ModelHash) -> ContextManager:
+        """Lock held while looking up and fitting a model
+
+        Identical models fitted at the same time wait for each other so that
+        only the first is fitted.
+        """
+        pass
+
+    @abstractmethod
+    def retrieve_fit_cache_summary(self) -> pd.DataFrame:
+        """Retrieve the number of fit cache hits and misses and the saved runtime
+        for this context and its subcontexts
+        """
+        pass
+
+    @abstractmethod
+    def store_derivatives(self, key: ModelHash, df: pd.DataFrame):
+        """Store a table of derivatives evaluated with a derivative model
+
+        The table is shared by all contexts with the same top level context.
+
+        Parameters
+        ----------
+        key : ModelHash
+            Hash of the derivative model. It includes the initial estimates of
+            the model and the requested derivatives.
+        df : pd.DataFrame
+            Derivative table
+        """
+        pass
+
+    @abstractmethod
+    def retrieve_derivatives(self, key: ModelHash) -> Optional[pd.DataFrame]:
+        """Retrieve a stored table of derivatives or None if there is none for key"""
+        pass
+
+    @abstractmethod
+    def has_checkpoint(self, key: str) -> bool:
+        """Check if there is a stored output of a task with key"""
+        pass
+
+    @abstractmethod
+    def store_checkpoint(self, name: str, key: str, data: bytes):
+        """Store the serialized output of a task
+
+        The outputs are shared by all contexts with the same top level context.
+        Stored outputs are counted in the checkpoint manifest.
+
+        Parameters
+        ----------
+        name : str
+            Name of the task
+        key : str
+            Key of the task, see pharmpy.workflows.checkpoint
+        data : bytes
+            Serialized output
+        """
+        pass
+
+    @abstractmethod
+    def retrieve_checkpoint(self, name: str, key: str) -> bytes:
+        """Retrieve the serialized output of a task and count it as replayed
+
+        Raises KeyError if there is no output stored for key.
+        """
+        pass
+
+    @abstractmethod
+    def retrieve_checkpoint_manifest(self) -> pd.DataFrame:
+        """Retrieve the tasks of this context and its subcontexts that had their outputs
+        stored or were replayed from stored outputs
+        """
+        pass
+
     @abstractmethod
     def retrieve_common_options(self) -> dict[str, Any]:
         pass
@@ -0,0 +1,230 @@
+"""In-memory indexes of the files of a LocalDirectoryContext
+
+The files of a context keep their plain text layout. The annotations file, the
+log and the progress file are only appended to and each index reads what has
+been appended since its last refresh. One index per file is shared by all
+context objects in the process. The contexts hold on to their indexes and an
+index is dropped when no context uses it anymore.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import os
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TypeVar
+
+from pharmpy.internals.sort import sort_alphanum
+
+T = TypeVar('T', bound='FileIndex')
+
+_indexes: weakref.WeakValueDictionary[Tuple[type, Path], FileIndex] = weakref.WeakValueDictionary()
+_indexes_lock = threading.Lock()
+
+
+class FileIndex:
+    """Index of a file or directory kept up to date incrementally
+
+    Parameters
+    ----------
+    path : Path
+        Path to the indexed file or directory
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.RLock()
+        self._reset()
+
+    @classmethod
+    def get(cls: type[T], path: Path) -> T:
+        """Get the index of path shared by all contexts in this process"""
+        with _indexes_lock:
+            index = _indexes.get((cls, path))
+            if index is None:
+                index = cls(path)
+                _indexes[(cls, path)] = index
+            return index  # pyright: ignore [reportReturnType]
+
+    def _reset(self):
+        pass
+
+    def refresh(self):
+        """Read what has been added since the last refresh"""
+        pass
+
+
+class JournalIndex(FileIndex, ABC):
+    """Index of an append-only text file
+
+    Rewriting the file (e.g. compaction) is detected and causes a full reread.
+    """
+
+    header = False
+
+    def _reset(self):
+        self._inode = None
+        self._offset = 0
+
+    def refresh(self):
+        with self.lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                self._reset()
+                self._inode = st.st_ino
+            if st.st_size == self._offset:
+                return
+            with open(self.path, 'rb') as fh:
+                fh.seek(self._offset)
+                data = fh.read()
+            # NOTE: Only complete lines. Writers append whole lines.
+            end = data.rfind(b'\n') + 1
+            if end == 0:
+                return
+            text = data[:end].decode('utf-8')
+            if self._offset == 0 and self.header:
+                text = text.split('\n', 1)[1]
+            self._parse(text)
+            self._offset += end
+
+    @abstractmethod
+    def _parse(self, text: str):
+        """Parse complete lines read since the last refresh"""
+        pass
+
+
+class AnnotationsIndex(JournalIndex):
+    """Index of an annotations file with one "name annotation" line per model
+
+    Later lines for the same name replace earlier ones.
+    """
+
+    def _reset(self):
+        super()._reset()
+        self.annotations: Dict[str, str] = {}
+        self.nlines = 0
+
+    def _parse(self, text: str):
+        lines = text[:-1].split('\n')
+        for line in lines:
+            name, _, annotation = line.partition(' ')
+            self.annotations[name] = annotation
+        self.nlines += len(lines)
+
+    @property
+    def superseded(self) -> int:
+        """Number of lines replaced by later lines"""
+        return self.nlines - len(self.annotations)
+
+
+class LogIndex(JournalIndex):
+    """Index of a csv log with rows grouped by depth of their context path"""
+
+    header = True
+
+    def _reset(self):
+        super()._reset()
+        self.rows: List[List[str]] = []
+        self.rows_by_depth: Dict[int, List[int]] = {}
+
+    def _parse(self, text: str):
+        for row in csv.reader(io.StringIO(text, newline='')):
+            self.rows_by_depth.setdefault(row[0].count('/'), []).append(len(self.rows))
+            self.rows.append(row)
+
+
+class ProgressIndex(JournalIndex):
+    """Index of the csv file with the progress of running estimations
+
+    The lowest OFV of each model is kept per context path and dataset hash.
+    """
+
+    header = True
+    columns = ('path', 'model', 'time', 'iteration', 'ofv', 'dataset')
+
+    def _reset(self):
+        super()._reset()
+        self.rows: List[List[str]] = []
+        self.best: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    def _parse(self, text: str):
+        for row in csv.reader(io.StringIO(text, newline='')):
+            self.rows.append(row)
+            path, model, _, _, ofv, dataset = row
+            ofv = float(ofv)
+            if ofv != ofv:
+                continue
+            best = self.best.setdefault((path, dataset), {})
+            if ofv < best.get(model, float('inf')):
+                best[model] = ofv
+
+    def best_ofv(self, path: str, dataset: str, exclude: str) -> Optional[float]:
+        """Lowest OFV of the models in a context with the same dataset
+
+        Parameters
+        ----------
+        path : str
+            Context path
+        dataset : str
+            Dataset hash
+        exclude : str
+            Name of a model to leave out
+
+        Returns
+        -------
+        float
+            The lowest OFV or None if no other model has progressed
+        """
+        with self.lock:
+            best = self.best.get((path, dataset), {})
+            ofvs = [ofv for model, ofv in best.items() if model != exclude]
+        return min(ofvs) if ofvs else None
+
+
+class ModelNamesIndex(FileIndex):
+    """Index of a directory with one symlink per model name to the model in the database"""
+
+    def _reset(self):
+        self.keys: Dict[str, str] = {}
+        self.names: Dict[str, str] = {}
+
+    def add(self, name: str, digest: str):
+        with self.lock:
+            self.keys[name] = digest
+            self.names.setdefault(digest, name)
+
+    def refresh(self):
+        # NOTE: Only new links are resolved
+        with self.lock:
+            new = [name for name in os.listdir(self.path) if name not in self.keys]
+            for name in sort_alphanum(new):
+                link_path = self.path / name
+                resolved = link_path.resolve()
+                if resolved != link_path:
+                    self.add(name, resolved.name)
+
+    def _check(self, name: Optional[str]):
+        # NOTE: Start over if the context has been removed and created again
+        if name is not None and not os.path.lexists(self.path / name):
+            self._reset()
+
+    def key(self, name: str) -> Optional[str]:
+        with self.lock:
+            self._check(name if name in self.keys else None)
+            if name not in self.keys:
+                self.refresh()
+            return self.keys.get(name)
+
+    def name(self, digest: str) -> Optional[str]:
+        with self.lock:
+            self._check(self.names.get(digest))
+            if digest not in self.names:
+                self.refresh()
+            return self.names.get(digest)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import cProfile
+import csv
+import io
 import json
 import os.path
+import tempfile
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Literal, Optional
+from typing import Any, Literal, Optional, TypeVar
 
+from pharmpy.deps import numpy as np
 from pharmpy.deps import pandas as pd
 from pharmpy.internals.fs.lock import path_lock
 from pharmpy.internals.fs.path import path_absolute
@@ -14,11 +19,21 @@ from pharmpy.internals.sort import sort_alphanum
 from pharmpy.model import Model
 from pharmpy.tools.mfl.parse import ModelFeatures
 from pharmpy.workflows.hashing import ModelHash
+from pharmpy.workflows.model_entry import ModelEntry
 from pharmpy.workflows.results import ModelfitResults, Results
 
 from ..model_database import LocalModelDirectoryDatabase
 from ..results import read_results
 from .baseclass import Context
+from .index import AnnotationsIndex, FileIndex, LogIndex, ModelNamesIndex, ProgressIndex
+
+FILE_FIT_TOOL = 'fit.json'
+
+PROGRESS_COLUMNS = ProgressIndex.columns
+FIT_CACHE_COLUMNS = ('path', 'model', 'time', 'hit', 'runtime')
+CHECKPOINT_MANIFEST_COLUMNS = ('path', 'task', 'key', 'time', 'replayed')
+
+T = TypeVar('T', bound=FileIndex)
 
 
 class LocalDirectoryContext(Context):
@@ -37,6 +52,7 @@ class LocalDirectoryContext(Context):
             ref = Path.cwd()
         path = Path(ref) / name
         self.name = name
+        self._indexes = {}
 
         self._init_path(path)
         self._init_top_path()
@@ -44,6 +60,7 @@ class LocalDirectoryContext(Context):
         self._init_annotations()
         self._init_model_name_map()
         self._init_log()
+        self._fit_cache_database = None
         self._store_common_options(common_options)
 
     def _init_path(self, path):
@@ -90,6 +107,14 @@ class LocalDirectoryContext(Context):
                 with open(self._common_options_path, 'w') as f:
                     json.dump(common_options, f, indent=4, cls=MetadataJSONEncoder)
 
+    def _index(self, cls: type[T], path: Path) -> T:
+        # NOTE: Keep the shared index alive for as long as this context is
+        index = self._indexes.get((cls, path))
+        if index is None:
+            index = cls.get(path)
+            self._indexes[(cls, path)] = index
+        return index
+
     def _read_lock(self, path: Path):
         # NOTE: Obtain shared (blocking) lock on one file
         path = path.with_suffix('.lock')
@@ -119,10 +144,43 @@ class LocalDirectoryContext(Context):
         res = read_results(self.path / 'results.json')
         return res
 
+    def store_trace(self, trace: dict):
+        with open(self.path / 'trace.json', 'w') as f:
+            json.dump(trace, f)
+
+    def retrieve_trace(self) -> dict:
+        with open(self.path / 'trace.json', 'r') as f:
+            return json.load(f)
+
+    def store_profile(self, name: str, profile: cProfile.Profile):
+        path = self.path / 'profiles'
+        path.mkdir(exist_ok=True)
+        profile.dump_stats(path / f'{name}.prof')
+
     @property
     def _log_path(self) -> Path:
         return self._top_path / 'log.csv'
 
+    @property
+    def _progress_path(self) -> Path:
+        return self._top_path / 'progress.csv'
+
+    @property
+    def _fit_cache_path(self) -> Path:
+        return self._top_path / 'fit_cache.csv'
+
+    @property
+    def _derivatives_path(self) -> Path:
+        return self._top_path / 'derivatives'
+
+    @property
+    def _checkpoints_path(self) -> Path:
+        return self._top_path / 'checkpoints'
+
+    @property
+    def _checkpoint_manifest_path(self) -> Path:
+        return self._top_path / 'checkpoints.csv'
+
     @property
     def _metadata_path(self) -> Path:
         return self.path / 'metadata.json'
@@ -165,13 +223,12 @@ class LocalDirectoryContext(Context):
                 else:
                     relative_to_path = absolute_to_path
                 create_directory_symlink(from_path, relative_to_path)
+                self._index(ModelNamesIndex, self._models_path).add(name, str(key))
 
     def retrieve_key(self, name: str) -> ModelHash:
-        symlink_path = self._models_path / name
-        resolved_path = symlink_path.resolve()
-        if symlink_path == resolved_path:
+        digest = self._index(ModelNamesIndex, self._models_path).key(name)
+        if digest is None:
             raise KeyError(f'There is no model with the name "{name}"')
-        digest = resolved_path.name
         db = self.model_database
         with db.snapshot(ModelHash(digest)) as txn:
             key = txn.key
@@ -185,47 +242,45 @@ class LocalDirectoryContext(Context):
         return sort_alphanum([f.name for f in path.iterdir()])
 
     def retrieve_name(self, key: ModelHash) -> str:
-        path = self._models_path
         mydigest = str(key)
-        for link_path in path.iterdir():
-            resolved = link_path.resolve()
-            digest = resolved.name
-            if digest == mydigest:
-                return link_path.name
-        raise KeyError("Model with key {mydigest} could not be found.")
+        name = self._index(ModelNamesIndex, self._models_path).name(mydigest)
+        if name is None:
+            raise KeyError(f"Model with key {mydigest} could not be found.")
+        return name
 
     def store_annotation(self, name: str, annotation: str):
         path = self._annotations_path
+        index = self._index(AnnotationsIndex, path)
         with self._write_lock(path):
-            with open(path, 'r') as fh:
-                lines = []
-                found = False
-                for line in fh.readlines():
-                    a = line.split(" ", 1)
-                    if a[0] == name:
-                        lines.append(f'{name} {annotation}\n')
-                        found = True
-                    else:
-                        lines.append(line)
-                if not found:
-                    lines.append(f'{name} {annotation}\n')
-            with open(path, 'w') as fh:
-                fh.writelines(lines)
+            index.refresh()
+            if index.annotations.get(name) == annotation:
+                return
+            if name in index.annotations or index.superseded:
+                # NOTE: Rewrite the file with one line per model
+                annotations = dict(index.annotations, **{name: annotation})
+                tmp_path = path.with_suffix('.tmp')
+                with open(tmp_path, 'w', encoding='utf-8') as fh:
+                    fh.writelines(f'{k} {v}\n' for k, v in annotations.items())
+                os.replace(tmp_path, path)
+            else:
+                with open(path, 'a', encoding='utf-8') as fh:
+                    fh.write(f'{name} {annotation}\n')
+            index.refresh()
 
     def retrieve_annotation(self, name: str) -> str:
         path = self._annotations_path
+        index = self._index(AnnotationsIndex, path)
         with self._read_lock(path):
-            with open(path, 'r') as fh:
-                for line in fh.readlines():
-                    a = line.split(" ", 1)
-                    if a[0] == name:
-                        return a[1][:-1]
-        raise KeyError(f"No annotation for {name} available")
+            index.refresh()
+            try:
+                return index.annotations[name]
+            except KeyError:
+                raise KeyError(f"No annotation for {name} available")
 
     def log_message(self, severity, msg: str):
         log_path = self._log_path
         with self._write_lock(log_path):
-            with open(log_path, 'a') as fh:
+            with open(log_path, 'a', encoding='utf-8') as fh:
 
                 def mangle_message(msg):
                     return '"' + msg.replace('"', '""') + '"'
@@ -234,17 +289,195 @@ class LocalDirectoryContext(Context):
 
     def retrieve_log(self, level: Literal['all', 'current', 'lower'] = 'all') -> pd.DataFrame:
         log_path = self._log_path
+        index = self._index(LogIndex, log_path)
         with self._read_lock(log_path):
-            df = pd.read_csv(log_path)
-        count = df['path'].str.count('/')
-        curlevel = self.context_path.count('/')
-        if level == 'lower':
-            df = df.loc[count >= curlevel]
-        elif level == 'current':
-            df = df.loc[count == curlevel]
-        df = df.reset_index(drop=True)
+            with index.lock:
+                index.refresh()
+                curlevel = self.context_path.count('/')
+                if level == 'all':
+                    rows = list(index.rows)
+                else:
+                    if level == 'current':
+                        depths = [curlevel]
+                    else:
+                        depths = [depth for depth in index.rows_by_depth if depth >= curlevel]
+                    selected = sorted(
+                        i for depth in depths for i in index.rows_by_depth.get(depth, ())
+                    )
+                    rows = [index.rows[i] for i in selected]
+        df = pd.DataFrame(rows, columns=['path', 'time', 'severity', 'message'])
         return df
 
+    def log_progress(self, name: str, iteration: int, ofv: float, dataset: str = ''):
+        progress_path = self._progress_path
+        with self._write_lock(progress_path):
+            with _open_csv_for_append(progress_path, PROGRESS_COLUMNS) as fh:
+                fh.write(
+                    f'{self.context_path},{name},{datetime.now()},{iteration},{ofv!r},{dataset}\n'
+                )
+
+    def _refreshed_progress_index(self) -> ProgressIndex:
+        progress_path = self._progress_path
+        index = self._index(ProgressIndex, progress_path)
+        with self._read_lock(progress_path):
+            index.refresh()
+        return index
+
+    def retrieve_progress(self, level: Literal['all', 'current', 'lower'] = 'all') -> pd.DataFrame:
+        index = self._refreshed_progress_index()
+        with index.lock:
+            rows = list(index.rows)
+        df = pd.DataFrame(rows, columns=list(PROGRESS_COLUMNS))
+        df = df.astype({'iteration': 'int64', 'ofv': 'float64'})
+        if level == 'current':
+            df = df[df['path'] == self.context_path]
+        elif level == 'lower':
+            path = self.context_path
+            df = df[(df['path'] == path) | df['path'].str.startswith(path + '/')]
+        return df.reset_index(drop=True)
+
+    def retrieve_best_progress_ofv(self, name: str, dataset: str) -> Optional[float]:
+        index = self._refreshed_progress_index()
+        return index.best_ofv(self.context_path, dataset, name)
+
+    def _shared_fit_cache(self) -> Optional[LocalModelDirectoryDatabase]:
+        from pharmpy.workflows import conf
+
+        if conf.fit_cache is None:
+            return None
+        path = path_absolute(conf.fit_cache)
+        if path == self.model_database.path:
+            return None
+        # NOTE: Opened once per context (and again only if the option is changed)
+        if self._fit_cache_database is None or self._fit_cache_database.path != path:
+            self._fit_cache_database = LocalModelDirectoryDatabase(path)
+        return self._fit_cache_database
+
+    def _log_fit(self, name: str, hit: bool, res: Optional[ModelfitResults]):
+        runtime = None if res is None else res.runtime_total
+        runtime = '' if runtime is None else repr(float(runtime))
+        path = self._fit_cache_path
+        with self._write_lock(path):
+            with _open_csv_for_append(path, FIT_CACHE_COLUMNS) as fh:
+                fh.write(f'{self.context_path},{name},{datetime.now()},{int(hit)},{runtime}\n')
+
+    def retrieve_fit(
+        self, model: Model, key: ModelHash, esttool: str, version: str
+    ) -> Optional[ModelEntry]:
+        for database in (self.model_database, self._shared_fit_cache()):
+            if database is None or _retrieve_fit_tool(database, key) != (esttool, version):
+                continue
+            try:
+                me = database.retrieve_model_entry(key)
+            except (KeyError, AttributeError, FileNotFoundError):
+                continue
+            if me.modelfit_results is None or not model.has_same_dataset_as(me.model):
+                continue
+            if database is not self.model_database:
+                new = ModelEntry.create(model, modelfit_results=me.modelfit_results, log=me.log)
+                _copy_fit(database, self.model_database, new, key)
+            self._log_fit(model.name, True, me.modelfit_results)
+            return me
+        return None
+
+    def store_fit(self, model_entry: ModelEntry, key: ModelHash, esttool: str, version: str):
+        self._log_fit(model_entry.model.name, False, model_entry.modelfit_results)
+        if model_entry.modelfit_results is None:
+            return
+        _store_fit_tool(self.model_database, key, esttool, version)
+        shared = self._shared_fit_cache()
+        if shared is None:
+            return
+        try:
+            _copy_fit(self.model_database, shared, model_entry, key)
+        except KeyError:
+            # NOTE: The estimation tool stored the fit under another key
+            pass
+
+    def fit_lock(self, key: ModelHash):
+        shared = self._shared_fit_cache()
+        database = self.model_database if shared is None else shared
+        path = database.path / '.fitlocks' / f'{key}.lock'
+        path.parent.mkdir(exist_ok=True)
+        path.touch(exist_ok=True)
+        return path_lock(str(path), shared=False)
+
+    def store_derivatives(self, key: ModelHash, df: pd.DataFrame):
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in df.dtypes):
+            return
+        # NOTE: Stored column by column with the column names in a separate array
+        arrays = {f'c{i}': df[col].to_numpy() for i, col in enumerate(df.columns)}
+        arrays['columns'] = np.array([str(col) for col in df.columns])
+        path = self._derivatives_path
+        path.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp, path / f'{key}.npz')
+
+    def retrieve_derivatives(self, key: ModelHash) -> Optional[pd.DataFrame]:
+        path = self._derivatives_path / f'{key}.npz'
+        try:
+            npz = np.load(path, allow_pickle=False)
+        except FileNotFoundError:
+            return None
+        with npz:
+            columns = npz['columns'].tolist()
+            return pd.DataFrame({col: npz[f'c{i}'] for i, col in enumerate(columns)})
+
+    def _log_checkpoint(self, name: str, key: str, replayed: bool):
+        path = self._checkpoint_manifest_path
+        with self._write_lock(path):
+            with _open_csv_for_append(path, CHECKPOINT_MANIFEST_COLUMNS, newline='') as fh:
+                # NOTE: Task names can contain commas
+                csv.writer(fh).writerow(
+                    [self.context_path, name, key, datetime.now(), int(replayed)]
+                )
+
+    def has_checkpoint(self, key: str) -> bool:
+        return (self._checkpoints_path / f'{key}.pkl').is_file()
+
+    def store_checkpoint(self, name: str, key: str, data: bytes):
+        path = self._checkpoints_path
+        path.mkdir(exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp, path / f'{key}.pkl')
+        self._log_checkpoint(name, key, False)
+
+    def retrieve_checkpoint(self, name: str, key: str) -> bytes:
+        try:
+            data = (self._checkpoints_path / f'{key}.pkl').read_bytes()
+        except FileNotFoundError:
+            raise KeyError(key)
+        self._log_checkpoint(name, key, True)
+        return data
+
+    def retrieve_checkpoint_manifest(self) -> pd.DataFrame:
+        path = self._checkpoint_manifest_path
+        with self._read_lock(path):
+            df = _read_csv(
+                path, CHECKPOINT_MANIFEST_COLUMNS, {'path': str, 'task': str, 'key': str}
+            )
+        ctxpath = self.context_path
+        df = df[(df['path'] == ctxpath) | df['path'].str.startswith(ctxpath + '/')]
+        df = df.assign(replayed=df['replayed'].astype(bool))
+        return df.reset_index(drop=True)
+
+    def retrieve_fit_cache_summary(self) -> pd.DataFrame:
+        path = self._fit_cache_path
+        with self._read_lock(path):
+            df = _read_csv(path, FIT_CACHE_COLUMNS, {'path': str, 'model': str})
+        ctxpath = self.context_path
+        df = df[(df['path'] == ctxpath) | df['path'].str.startswith(ctxpath + '/')]
+        df = df.assign(saved_runtime=df['runtime'].where(df['hit'] == 1, 0.0))
+        summary = df.groupby('path', sort=False).agg(
+            hits=('hit', 'sum'), misses=('hit', lambda hit: int((hit == 0).sum()))
+        )
+        summary['saved_runtime'] = df.groupby('path', sort=False)['saved_runtime'].sum()
+        return summary
+
     def retrieve_common_options(self) -> dict[str, Any]:
         with open(self._common_options_path, 'r') as f:
             return json.load(f, cls=MetadataJSONDecoder)
@@ -288,3 +521,65 @@ class MetadataJSONDecoder(json.JSONDecoder):
 
     def object_hook(self, obj):
         return obj
+
+
+def _retrieve_fit_tool(
+    database: LocalModelDirectoryDatabase, key: ModelHash
+) -> Optional[tuple[str, str]]:
+    try:
+        path = database.retrieve_file(key, FILE_FIT_TOOL)
+    except (KeyError, FileNotFoundError):
+        return None
+    with open(path) as f:
+        d = json.load(f)
+    return d['esttool'], d['version']
+
+
+def _store_fit_tool(database: LocalModelDirectoryDatabase, key: ModelHash, esttool, version):
+    # NOTE: A regular file next to the model so that it is copied with the fit
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / FILE_FIT_TOOL
+        with open(path, 'w') as f:
+            json.dump({'esttool': esttool, 'version': version}, f)
+        with database.transaction(key) as txn:
+            txn.store_local_file(path)
+
+
+def _copy_fit(
+    source: LocalModelDirectoryDatabase,
+    destination: LocalModelDirectoryDatabase,
+    model_entry: ModelEntry,
+    key: ModelHash,
+):
+    # NOTE: The model file is written by the destination to refer to its own dataset
+    with tempfile.TemporaryDirectory() as tmp:
+        source.retrieve_local_files(key, tmp)
+        model_files = {Path(tmp) / 'model.mod', Path(tmp) / 'model.ctl'}
+        files = [path for path in Path(tmp).iterdir() if path.is_file()]
+        if not model_files.intersection(files):
+            raise KeyError(f'Could not find model {key} in {source}')
+        metadata_path = Path(tmp) / '.pharmpy' / 'metadata.json'
+        with destination.transaction(model_entry) as txn:
+            for path in files:
+                if path not in model_files:
+                    txn.store_local_file(path)
+            txn.store_model_entry()
+            if metadata_path.is_file():
+                with open(metadata_path) as f:
+                    txn.store_metadata(json.load(f))
+
+
+def _open_csv_for_append(path: Path, columns: tuple[str, ...], newline: Optional[str] = None):
+    # NOTE: The file is created with its header on the first write
+    fh = open(path, 'a', encoding='utf-8', newline=newline)
+    if fh.tell() == 0:
+        fh.write(','.join(columns) + '\n')
+    return fh
+
+
+def _read_csv(path: Path, columns: tuple[str, ...], dtype: dict) -> pd.DataFrame:
+    try:
+        return pd.read_csv(path, dtype=dtype)
+    except FileNotFoundError:
+        # NOTE: Nothing has been written yet
+        return pd.read_csv(io.StringIO(','.join(columns) + '\n'), dtype=dtype)
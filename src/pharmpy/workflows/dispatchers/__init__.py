@@ -8,6 +8,11 @@ class DispatcherConfiguration(config.Configuration):
         'Which type of dask scheduler to use (supports threaded and distributed).',
         str,
     )
+    process_pool_workers = config.ConfigItem(
+        1,
+        'Number of worker processes for batches of CPU bound tasks (1 runs batches in-process).',
+        int,
+    )
 
 
 conf = DispatcherConfiguration()
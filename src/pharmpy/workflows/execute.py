@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import os
+from dataclasses import fields, replace
 from pathlib import Path
 from typing import TypeVar
 
 from pharmpy.model import Model
 
+from .checkpoint import create_checkpointer
 from .results import ModelfitResults, Results
+from .trace import create_tracer
 from .workflow import Workflow, WorkflowBuilder, insert_context
 
 T = TypeVar('T')
@@ -28,7 +31,8 @@ def execute_workflow(
     path : Path
         Path to use for context if applicable.
     resume : bool
-        Whether to allow resuming previous workflow execution.
+        Whether to resume a previous execution of the workflow in the same context.
+        Tasks with outputs stored in the context are not run again.
 
     Returns
     -------
@@ -71,9 +75,22 @@ def execute_workflow(
     insert_context(wb, context)
     workflow = Workflow(wb)
 
-    res: T = dispatcher.run(workflow)
+    checkpointer = create_checkpointer(resume)
+    if checkpointer is not None:
+        workflow = checkpointer.instrument(workflow, context)
+    tracer = create_tracer()
+    if tracer is not None:
+        workflow = tracer.instrument(workflow)
+    try:
+        res: T = dispatcher.run(workflow)
+    finally:
+        if tracer is not None:
+            tracer.store(context)
+        if checkpointer is not None:
+            checkpointer.close()
 
     if isinstance(res, Results) and not isinstance(res, ModelfitResults):
+        res = _add_fit_cache_summary(res, context)
         context.store_results(res)
         if hasattr(res, 'rst_path'):
             from pharmpy.tools.reporting import create_report
@@ -86,3 +103,12 @@ def execute_workflow(
             create_report(res, context.path)
 
     return res
+
+
+def _add_fit_cache_summary(res: Results, context) -> Results:
+    if 'summary_fit_cache' not in (field.name for field in fields(res)):
+        return res
+    summary = context.retrieve_fit_cache_summary()
+    if summary.empty:
+        return res
+    return replace(res, summary_fit_cache=summary)
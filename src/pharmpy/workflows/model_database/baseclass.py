@@ -3,7 +3,7 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
 from pathlib import Path
-from typing import ContextManager, Union
+from typing import ContextManager, Optional, Union
 
 from pharmpy.model import Model
 
@@ -13,14 +13,20 @@ from ..results import Results
 
 
 class ModelTransaction(ABC):
-    def __init__(self, database: ModelDatabase, obj: Union[Model, ModelEntry, ModelHash]):
+    def __init__(
+        self,
+        database: ModelDatabase,
+        obj: Union[Model, ModelEntry, ModelHash],
+        key: Optional[ModelHash] = None,
+    ):
+        # NOTE: The key can be given to avoid rehashing the model
         self.database = database
         if isinstance(obj, ModelEntry):
             self.model_entry = obj
-            self.key = ModelHash(obj.model)
+            self.key = ModelHash(obj.model) if key is None else key
         elif isinstance(obj, Model):
             self.model_entry = ModelEntry.create(obj)
-            self.key = ModelHash(obj)
+            self.key = ModelHash(obj) if key is None else key
         elif isinstance(obj, ModelHash):
             self.model_entry = None
             self.key = obj
@@ -72,9 +78,14 @@ class ModelTransaction(ABC):
 
 
 class ModelSnapshot(ABC):
-    def __init__(self, database: ModelDatabase, model: Union[Model, ModelHash]):
+    def __init__(
+        self,
+        database: ModelDatabase,
+        model: Union[Model, ModelHash],
+        key: Optional[ModelHash] = None,
+    ):
         self.database = database
-        self.key = ModelHash(model)
+        self.key = ModelHash(model) if key is None else key
 
     @abstractmethod
     def retrieve_local_files(self, destination_path: Path) -> None:
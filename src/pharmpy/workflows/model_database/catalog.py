@@ -0,0 +1,90 @@
+"""Append-only catalog of a LocalModelDirectoryDatabase
+
+The catalog is a journal of JSON records, one per line, that is only ever
+appended to. It maps dataset hashes to dataset ids (the N in dataN.csv). All
+processes using the same database keep an in-memory index of the catalog and
+read records appended by others incrementally, so lookups and allocation of
+dataset ids do not need to scan the database directory.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from pharmpy.internals.fs.lock import path_lock
+
+
+class Catalog:
+    """In-memory index of a catalog file
+
+    Parameters
+    ----------
+    path : Path
+        Path to the catalog file
+    lock_path : Path
+        Path to the lock file serializing appends to the catalog
+    """
+
+    def __init__(self, path: Path, lock_path: Path):
+        self.path = path
+        self.lock_path = lock_path
+        self._offset = 0
+        self._index_lock = threading.Lock()
+        self._datasets: Dict[str, int] = {}
+        self._highest_dataset_id = 0
+
+    def lock(self):
+        """Exclusive lock for appending to the catalog"""
+        self.lock_path.touch(exist_ok=True)
+        return path_lock(str(self.lock_path), shared=False)
+
+    def refresh(self):
+        """Read records appended since the last refresh"""
+        with self._index_lock:
+            try:
+                with open(self.path, 'rb') as f:
+                    f.seek(self._offset)
+                    data = f.read()
+            except FileNotFoundError:
+                return
+            # NOTE: Only complete lines. The last one could still be being written
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].splitlines():
+                if line:
+                    self._add(json.loads(line))
+            self._offset += end
+
+    def _add(self, record: dict):
+        dataset_id = record['id']
+        self._datasets[record['hash']] = dataset_id
+        self._highest_dataset_id = max(self._highest_dataset_id, dataset_id)
+
+    def _append(self, records: Iterable[dict]):
+        # NOTE: Must be called with the catalog lock held
+        lines = ''.join(json.dumps(record) + '\n' for record in records)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+        self.refresh()
+
+    def dataset_id(self, dataset_hash: str) -> Optional[int]:
+        """Get the id of a dataset or None if it is not in the catalog"""
+        dataset_id = self._datasets.get(dataset_hash)
+        if dataset_id is None:
+            self.refresh()
+            dataset_id = self._datasets.get(dataset_hash)
+        return dataset_id
+
+    def next_dataset_id(self) -> int:
+        """Next free dataset id
+
+        Allocation must be serialized by the caller until the dataset has been added.
+        """
+        self.refresh()
+        return self._highest_dataset_id + 1
+
+    def add_datasets(self, datasets: Dict[str, int]):
+        """Add datasets to the catalog. Call with the catalog lock held."""
+        self._append({'hash': h, 'id': i} for h, i in datasets.items())
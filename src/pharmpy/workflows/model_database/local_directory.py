@@ -20,6 +20,7 @@ from .baseclass import (
     PendingTransactionError,
     TransactionalModelDatabase,
 )
+from .catalog import Catalog
 
 DIRECTORY_PHARMPY_METADATA = '.pharmpy'
 DIRECTORY_DATASETS = '.datasets'
@@ -28,6 +29,7 @@ FILE_METADATA = 'metadata.json'
 FILE_MODELFIT_RESULTS = 'results.json'
 FILE_PENDING = 'PENDING'
 FILE_LOCK = '.lock'
+FILE_CATALOG = '.catalog'
 
 
 def get_modelfit_results(model, path, esttool=None):
@@ -41,6 +43,8 @@ def get_modelfit_results(model, path, esttool=None):
     if esttool is not None:
         if esttool == 'dummy':
             import pharmpy.tools.external.dummy as tool
+        elif esttool == 'native':
+            import pharmpy.tools.external.native as tool
         elif esttool == 'nonmem':
             import pharmpy.tools.external.nonmem as tool
         elif esttool == 'nlmixr':
@@ -177,16 +181,34 @@ class LocalModelDirectoryDatabase(TransactionalModelDatabase):
         path.mkdir(parents=True, exist_ok=True)
         self.path = path_absolute(path)
         self.file_extension = file_extension
-
-    def _read_lock(self):
-        # NOTE: Obtain shared (blocking) lock on the entire database
-        path = self.path / FILE_LOCK
+        self.catalog = Catalog(self.path / FILE_CATALOG, self.path / FILE_LOCK)
+        if not self.catalog.path.exists():
+            self._import_dataset_index()
+
+    def _import_dataset_index(self):
+        # NOTE: Databases created before the catalog only have the index directories
+        index_path = self.path / DIRECTORY_DATASETS / DIRECTORY_INDEX
+        if not index_path.is_dir():
+            return
+        with self.catalog.lock():
+            if self.catalog.path.exists():
+                return
+            datasets = {}
+            for h_dir in index_path.iterdir():
+                for file in h_dir.iterdir():
+                    datasets[h_dir.name] = int(file.stem[4:])  # Remove data
+            self.catalog.add_datasets(datasets)
+
+    def _model_lock(self, key: ModelHash, shared: bool):
+        # NOTE: Obtain (blocking) lock on the directory of one model
+        path = self.path / str(key) / DIRECTORY_PHARMPY_METADATA / FILE_LOCK
         path.touch(exist_ok=True)
-        return path_lock(str(path), shared=True)
+        return path_lock(str(path), shared=shared)
 
-    def _write_lock(self):
-        # NOTE: Obtain exclusive (blocking) lock on the entire database
-        path = self.path / FILE_LOCK
+    def _datasets_lock(self):
+        # NOTE: Obtain exclusive (blocking) lock for registering datasets
+        path = self.path / DIRECTORY_DATASETS / FILE_LOCK
+        path.parent.mkdir(exist_ok=True)
         path.touch(exist_ok=True)
         return path_lock(str(path), shared=False)
 
@@ -196,14 +218,14 @@ class LocalModelDirectoryDatabase(TransactionalModelDatabase):
         model_path = self.path / str(key)
         destination = model_path / DIRECTORY_PHARMPY_METADATA
         destination.mkdir(parents=True, exist_ok=True)
-        with self._read_lock():
+        with self._model_lock(key, shared=True):
             # NOTE: Check that no pending transaction exists
             path = destination / FILE_PENDING
             if path.exists():
                 # TODO: Finish pending transaction from journal if possible
                 raise PendingTransactionError()
 
-            yield LocalModelDirectoryDatabaseSnapshot(self, obj)
+            yield LocalModelDirectoryDatabaseSnapshot(self, obj, key=key)
 
     @contextmanager
     def transaction(self, obj: Union[Model, ModelEntry, ModelHash]):
@@ -211,7 +233,7 @@ class LocalModelDirectoryDatabase(TransactionalModelDatabase):
         model_path = self.path / str(key)
         destination = model_path / DIRECTORY_PHARMPY_METADATA
         destination.mkdir(parents=True, exist_ok=True)
-        with self._write_lock():
+        with self._model_lock(key, shared=False):
             # NOTE: Mark state as pending
             path = destination / FILE_PENDING
             try:
@@ -220,7 +242,7 @@ class LocalModelDirectoryDatabase(TransactionalModelDatabase):
                 # TODO: Finish pending transaction from journal if possible
                 raise PendingTransactionError()
 
-            yield LocalModelDirectoryDatabaseTransaction(self, obj)
+            yield LocalModelDirectoryDatabaseTransaction(self, obj, key=key)
 
             # NOTE: Commit transaction (only if no exception was raised)
             path.unlink()
@@ -235,56 +257,62 @@ class LocalModelDirectoryDatabaseTransaction(ModelTransaction):
             raise ValueError("Cannot store model: No model attached to transaction")
 
         model = self.model_entry.model
-        datasets_path = self.database.path / DIRECTORY_DATASETS
-
-        # NOTE: Get the hash of the dataset and list filenames with contents
-        # matching this hash only
-        h = self.key.dataset_hash
-        h_dir = datasets_path / DIRECTORY_INDEX / str(h)
-        if h_dir.is_dir():
-            hpath = next(h_dir.iterdir())
-            # NOTE: This variable holds a string similar to "run1.csv"
-            matching_model_filename = hpath.name
-            data_path = datasets_path / matching_model_filename
-            dipath = data_path.with_suffix('.datainfo')
+        database = self.database
+        catalog = database.catalog
+        datasets_path = database.path / DIRECTORY_DATASETS
+
+        h = str(self.key.dataset_hash)
+        stored = False
+        dataset_id = catalog.dataset_id(h)
+        if dataset_id is None:
+            # NOTE: Only registration of new datasets is serialized
+            with database._datasets_lock():
+                dataset_id = catalog.dataset_id(h)
+                if dataset_id is None:
+                    model, dataset_id = self._store_dataset(model, h)
+                    stored = True
+        if not stored:
+            dipath = datasets_path / f'data{dataset_id}.datainfo'
             # TODO: Maybe catch FileNotFoundError and similar here (pass)
             curdi = DataInfo.read_json(dipath)
             # NOTE: Paths are not compared here
             if curdi == model.datainfo:
                 datainfo = model.datainfo.replace(path=curdi.path)
                 model = model.replace(datainfo=datainfo)
-        else:
-            h_dir.mkdir(parents=True, exist_ok=True)
 
-            highest = 0
-            for file in datasets_path.iterdir():
-                name = file.name
-                if name.startswith('data') and name.endswith('.csv'):
-                    number = int(name[4:-4])  # Remove data and .csv
-                    if number > highest:
-                        highest = number
+        # NOTE: Write the model
+        model_path = database.path / str(self.key)
+        model_path.mkdir(exist_ok=True)
+        write_model(model, model_path / ("model" + model.filename_extension), force=True)
+        return model
+
+    def _store_dataset(self, model, h):
+        # NOTE: Must be called with the datasets lock held
+        catalog = self.database.catalog
+        datasets_path = self.database.path / DIRECTORY_DATASETS
 
-            dataset_basename = f'data{highest + 1}'
-            dataset_filename = f'{dataset_basename}.csv'
+        dataset_id = catalog.next_dataset_id()
+        dataset_basename = f'data{dataset_id}'
+        dataset_filename = f'{dataset_basename}.csv'
 
-            # NOTE: Create the index file at .datasets/.hash/<hash>/<dataset_filename>
-            index_path = h_dir / dataset_filename
-            index_path.touch()
+        data_path = path_absolute(datasets_path / dataset_filename)
+        datainfo = model.datainfo.replace(path=data_path)
+        model = model.replace(datainfo=datainfo)
+        model = write_csv(model, path=data_path, force=True)
 
-            data_path = path_absolute(datasets_path / dataset_filename)
-            datainfo = model.datainfo.replace(path=data_path)
-            model = model.replace(datainfo=datainfo)
-            model = write_csv(model, path=data_path, force=True)
+        # NOTE: Write datainfo last so that we are "sure" dataset is there
+        # if datainfo is there
+        model.datainfo.to_json(datasets_path / (dataset_basename + '.datainfo'))
 
-            # NOTE: Write datainfo last so that we are "sure" dataset is there
-            # if datainfo is there
-            model.datainfo.to_json(datasets_path / (dataset_basename + '.datainfo'))
+        # NOTE: Create the index file at .datasets/.hash/<hash>/<dataset_filename>
+        # for databases read by versions without the catalog
+        h_dir = datasets_path / DIRECTORY_INDEX / h
+        h_dir.mkdir(parents=True, exist_ok=True)
+        (h_dir / dataset_filename).touch()
 
-        # NOTE: Write the model
-        model_path = self.database.path / str(self.key)
-        model_path.mkdir(exist_ok=True)
-        write_model(model, model_path / ("model" + model.filename_extension), force=True)
-        return model
+        with catalog.lock():
+            catalog.add_datasets({h: dataset_id})
+        return model, dataset_id
 
     def store_local_file(self, path, new_filename=None):
         if Path(path).is_file():
@@ -333,7 +361,7 @@ class LocalModelDirectoryDatabaseSnapshot(ModelSnapshot):
         if path.is_file() and stat(path).st_size > 0:
             return path
         else:
-            raise FileNotFoundError(f"Cannot retrieve {filename} for {self.name}")
+            raise FileNotFoundError(f"Cannot retrieve {filename} for {self.key}")
 
     def retrieve_model(self):
         path = self._find_full_model_path()
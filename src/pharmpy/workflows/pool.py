@@ -0,0 +1,191 @@
+"""Batching of CPU bound tasks into a process pool
+
+Tasks like the creation of candidate models in search tools spend most of their
+time in sympy and are GIL-bound when run as tasks on the threads of the dask
+dispatcher. add_batch_tasks replaces a group of such independent tasks with one
+batch task that maps the function over all inputs in a pool of worker processes,
+followed by one lightweight task per input selecting its result from the batch.
+
+Models are sent to and from the workers as pickles. A shared dataset store is
+active while a batch runs so that only a handle to each dataset is transferred
+(see pharmpy.internals.shm).
+
+The number of worker processes is set with the ``process_pool_workers`` option
+of ``pharmpy.workflows.dispatchers``. With the default of 1 worker the batch is run
+in the calling thread.
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, List, Optional, Sequence, TypeVar, Union
+
+from .task import Task
+from .workflow import WorkflowBuilder
+
+T = TypeVar('T')
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def get_number_of_workers() -> int:
+    """Number of worker processes to use for batches of tasks"""
+    from .dispatchers import conf
+
+    return max(1, int(conf.process_pool_workers))
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # NOTE: Forking is not safe from the threads of the dispatcher
+            _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def _shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(_shutdown_pool)
+
+
+def _call_chunk(function: Callable[..., T], chunk: Sequence[tuple]) -> List[T]:
+    return [function(*args) for args in chunk]
+
+
+def _call_chunk_in_worker(function: Callable[..., T], chunk: Sequence[tuple]) -> bytes:
+    from pharmpy.internals.shm import attached
+
+    with attached():
+        # NOTE: Pickled here so that datasets are sent back as handles
+        return pickle.dumps(_call_chunk(function, chunk))
+
+
+def map_in_processes(
+    function: Callable[..., T], inputs: Sequence[tuple], workers: Optional[int] = None
+) -> List[T]:
+    """Call function for each tuple of input arguments using a pool of processes
+
+    The inputs are split into one contiguous chunk per worker so that the function
+    (which can be a functools.partial holding arguments common to all calls) is only
+    sent once per worker.
+
+    Parameters
+    ----------
+    function : callable
+        Picklable function
+    inputs : list
+        Tuples of positional arguments, one per call
+    workers : int
+        Number of worker processes. Default is the configured number of workers.
+
+    Returns
+    -------
+    list
+        Results in the same order as the inputs
+    """
+    from pharmpy.internals.shm import SharedDataFrameStore, get_active_store
+
+    from .hashing import DatasetHash
+
+    if workers is None:
+        workers = get_number_of_workers()
+    inputs = list(inputs)
+    if workers <= 1 or len(inputs) <= 1:
+        return _call_chunk(function, inputs)
+
+    nchunks = min(workers, len(inputs))
+    size, rest = divmod(len(inputs), nchunks)
+    bounds = [i * size + min(i, rest) for i in range(nchunks + 1)]
+    chunks = [inputs[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+    if get_active_store() is None:
+        store = SharedDataFrameStore(lambda df: str(DatasetHash(df)))
+    else:
+        store = nullcontext()
+    with store:
+        pool = _get_pool(workers)
+        futures = [pool.submit(_call_chunk_in_worker, function, chunk) for chunk in chunks]
+        return [result for future in futures for result in pickle.loads(future.result())]
+
+
+class _BatchInputs:
+    # NOTE: Wrapping the inputs prevents the dask graph from interpreting them
+    def __init__(self, inputs):
+        self.inputs = tuple(inputs)
+
+
+def _run_batch(function, batch_inputs: _BatchInputs, *predecessor_results):
+    inputs = [(*args, *predecessor_results) for args in batch_inputs.inputs]
+    return map_in_processes(function, inputs)
+
+
+def _select(i: int, batch):
+    return batch[i]
+
+
+def add_batch_tasks(
+    wb: WorkflowBuilder,
+    names: Sequence[str],
+    function: Callable,
+    task_inputs: Sequence[tuple],
+    predecessors: Optional[Union[Task, List[Task]]] = None,
+    batch_name: str = 'batch',
+) -> List[Task]:
+    """Add tasks calling the same function to a workflow as one batch
+
+    The result is equivalent to adding ``Task(name, function, *task_input)`` for
+    each name and task input, all with the same predecessors, but the function is
+    called for all inputs in one task using a pool of worker processes.
+
+    Parameters
+    ----------
+    wb : WorkflowBuilder
+        Workflow builder to add the tasks to
+    names : list
+        Names of the tasks (one per task input)
+    function : callable
+        Picklable task function
+    task_inputs : list
+        Tuple of static input per task. The results of the predecessors are
+        appended to each.
+    predecessors : list or Task
+        Predecessors of all tasks
+    batch_name : str
+        Name of the batch task
+
+    Returns
+    -------
+    list
+        One task per name giving the result of the function for the corresponding task input
+    """
+    assert len(names) == len(task_inputs)
+    if not names:
+        return []
+    batch_task = Task(batch_name, _run_batch, function, _BatchInputs(task_inputs))
+    wb.add_task(batch_task, predecessors=predecessors)
+    tasks = []
+    for i, name in enumerate(names):
+        task = Task(name, _select, i)
+        wb.add_task(task, predecessors=batch_task)
+        tasks.append(task)
+    return tasks
+
+
+__all__ = ('add_batch_tasks', 'map_in_processes', 'get_number_of_workers')
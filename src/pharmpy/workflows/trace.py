@@ -0,0 +1,356 @@
+"""Tracing and profiling of the tasks of workflows
+
+If the ``trace`` option of ``pharmpy.workflows`` is set the function of each task
+of an executed workflow is wrapped to record a span with
+
+- wall and CPU time of the task
+- queue wait, i.e. the time from when all predecessors were done until the task started
+- peak RSS of the process when the task was done
+- approximate sizes of the input and output of the task
+- the part of the wall time spent waiting for external processes, e.g. NONMEM
+
+The trace is stored in the context as a Chrome trace (trace.json) that can be
+opened in chrome://tracing or https://ui.perfetto.dev. Workflows called from tasks
+(see call_workflow) are traced together with the calling workflow.
+
+Tasks with names matching one of the glob patterns of the ``profile_tasks`` option
+are run under cProfile and the profiles are stored in the context.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from fnmatch import fnmatchcase
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from pharmpy.model import Model
+
+from .model_entry import ModelEntry
+from .workflow import Workflow, WorkflowBuilder
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    from pharmpy.deps import numpy as np
+    from pharmpy.deps import pandas as pd
+
+# NOTE: Tracers are looked up by id so that wrapped functions stay picklable
+_tracers: dict[str, Tracer] = {}
+_current = threading.local()
+
+
+@dataclass(frozen=True)
+class Span:
+    """Measurements of one execution of a task
+
+    All times are in seconds. start is relative to the start of the trace.
+    """
+
+    name: str
+    start: float
+    wall: float
+    cpu: float
+    queue_wait: float
+    external: float
+    peak_rss: Optional[int]
+    input_size: int
+    output_size: int
+    thread: int
+    parent: Optional[str]
+
+    @property
+    def python(self) -> float:
+        """Wall time not spent waiting for external processes"""
+        return self.wall - self.external
+
+
+class _TaskState:
+    def __init__(self, tracer: Tracer, name: str):
+        self.tracer = tracer
+        self.name = name
+        self.external = 0.0
+
+
+class _TracedFunction:
+    def __init__(self, tracer_id, task_id, name, dependencies, profile, function, parent):
+        self.tracer_id = tracer_id
+        self.task_id = task_id
+        self.name = name
+        self.dependencies = dependencies
+        self.profile = profile
+        self.function = function
+        self.parent = parent
+        # NOTE: For inspect.signature, see insert_context
+        self.__wrapped__ = function
+
+    def __call__(self, *args):
+        tracer = _tracers.get(self.tracer_id)
+        if tracer is None:
+            return self.function(*args)
+        return tracer._run(self, args)
+
+
+class Tracer:
+    """Record spans of the tasks of workflows
+
+    Parameters
+    ----------
+    profile_tasks : list of str
+        Glob patterns for names of tasks to run under cProfile
+    """
+
+    def __init__(self, profile_tasks: Sequence[str] = ()):
+        self.id = str(uuid.uuid4())
+        self.profile_tasks = tuple(profile_tasks)
+        self.spans: list[Span] = []
+        self.profiles: dict[str, cProfile.Profile] = {}
+        self._start = time.perf_counter()
+        self._start_time = datetime.now()
+        self._done: dict[str, float] = {}
+        self._profile_counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        _tracers[self.id] = self
+
+    def instrument(self, workflow: Workflow, parent: Optional[str] = None) -> Workflow:
+        """Wrap the functions of all tasks of a workflow
+
+        Parameters
+        ----------
+        workflow : Workflow
+            Workflow to instrument
+        parent : str
+            Name of the task calling the workflow
+
+        Returns
+        -------
+        Workflow
+            Instrumented workflow
+        """
+        now = time.perf_counter()
+        ids = {task: str(uuid.uuid4()) for task in workflow.tasks}
+        wb = WorkflowBuilder(workflow)
+        for task, task_id in ids.items():
+            dependencies = tuple(ids[pred] for pred in workflow.get_predecessors(task))
+            if not dependencies:
+                self._done[task_id] = now
+            profile = any(fnmatchcase(task.name, pattern) for pattern in self.profile_tasks)
+            function = _TracedFunction(
+                self.id, task_id, task.name, dependencies, profile, task.function, parent
+            )
+            wb.replace_task(task, task.replace(function=function))
+        return Workflow(wb)
+
+    def _run(self, traced: _TracedFunction, args: tuple):
+        start = time.perf_counter()
+        with self._lock:
+            ready = max(
+                self._done.get(dep, start) for dep in traced.dependencies or (traced.task_id,)
+            )
+        input_size = _sizeof(args)
+        state = _TaskState(self, traced.name)
+        previous = getattr(_current, 'state', None)
+        _current.state = state
+        profile = cProfile.Profile() if traced.profile else None
+        output_size = 0
+        cpu_start = time.thread_time()
+        try:
+            if profile is not None:
+                try:
+                    profile.enable()
+                except ValueError:
+                    # NOTE: Only one profiler can be active at a time in Python 3.12+
+                    profile = None
+            result = traced.function(*args)
+            output_size = _sizeof(result)
+        finally:
+            if profile is not None:
+                profile.disable()
+            cpu = time.thread_time() - cpu_start
+            end = time.perf_counter()
+            _current.state = previous
+            span = Span(
+                name=traced.name,
+                start=start - self._start,
+                wall=end - start,
+                cpu=cpu,
+                queue_wait=max(start - ready, 0.0),
+                external=state.external,
+                peak_rss=_peak_rss(),
+                input_size=input_size,
+                output_size=output_size,
+                thread=threading.get_ident(),
+                parent=traced.parent,
+            )
+            with self._lock:
+                self._done[traced.task_id] = end
+                self.spans.append(span)
+                if profile is not None:
+                    n = self._profile_counts[traced.name]
+                    self._profile_counts[traced.name] += 1
+                    self.profiles[f'{_filename(traced.name)}-{n}'] = profile
+        return result
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """The trace in the Chrome trace event format
+
+        Returns
+        -------
+        dict
+            Trace with one complete event per span
+        """
+        pid = os.getpid()
+        events = []
+        for span in self.spans:
+            args = {
+                'cpu': span.cpu,
+                'queue_wait': span.queue_wait,
+                'external': span.external,
+                'python': span.python,
+                'peak_rss': span.peak_rss,
+                'input_size': span.input_size,
+                'output_size': span.output_size,
+            }
+            if span.parent is not None:
+                args['parent'] = span.parent
+            events.append(
+                {
+                    'name': span.name,
+                    'cat': 'task',
+                    'ph': 'X',
+                    'ts': span.start * 1e6,
+                    'dur': span.wall * 1e6,
+                    'pid': pid,
+                    'tid': span.thread,
+                    'args': args,
+                }
+            )
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'start_time': self._start_time.isoformat()},
+        }
+
+    def store(self, context):
+        """Store the trace and the profiles in a context and stop tracing"""
+        _tracers.pop(self.id, None)
+        context.store_trace(self.to_chrome_trace())
+        for name, profile in self.profiles.items():
+            context.store_profile(name, profile)
+
+
+def create_tracer() -> Optional[Tracer]:
+    """Create a tracer if tracing or profiling is enabled in the configuration"""
+    from pharmpy.workflows import conf
+
+    if not conf.trace and not conf.profile_tasks:
+        return None
+    return Tracer(conf.profile_tasks)
+
+
+def current_tracer() -> Optional[tuple[Tracer, str]]:
+    """The tracer and name of the traced task running in this thread, if any"""
+    state = getattr(_current, 'state', None)
+    if state is None or state.tracer.id not in _tracers:
+        return None
+    return state.tracer, state.name
+
+
+@contextmanager
+def external_process():
+    """Count the time spent in the block as waiting for an external process
+
+    Has no effect outside of traced tasks.
+    """
+    state = getattr(_current, 'state', None)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if state is not None:
+            state.external += time.perf_counter() - start
+
+
+def summarize_trace(trace: dict[str, Any]) -> pd.DataFrame:
+    """Summarize a Chrome trace per task name
+
+    Parameters
+    ----------
+    trace : dict
+        Trace as stored by a context
+
+    Returns
+    -------
+    pd.DataFrame
+        Number of calls, total times, maximum peak RSS and total input and output
+        sizes per task name. Sorted with the largest total wall time first.
+    """
+    columns = ['cpu', 'queue_wait', 'external', 'python', 'peak_rss', 'input_size', 'output_size']
+    rows = [
+        {'task': event['name'], 'wall': event['dur'] / 1e6, **event['args']}
+        for event in trace['traceEvents']
+        if event.get('ph') == 'X'
+    ]
+    df = pd.DataFrame(rows, columns=['task', 'wall', *columns])
+    summary = df.groupby('task').agg(
+        count=('wall', 'size'),
+        wall=('wall', 'sum'),
+        cpu=('cpu', 'sum'),
+        queue_wait=('queue_wait', 'sum'),
+        external=('external', 'sum'),
+        python=('python', 'sum'),
+        peak_rss=('peak_rss', 'max'),
+        input_size=('input_size', 'sum'),
+        output_size=('output_size', 'sum'),
+    )
+    return summary.sort_values('wall', ascending=False)
+
+
+def _filename(name: str) -> str:
+    return re.sub(r'[^\w.-]', '_', name)
+
+
+def _peak_rss() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:  # pragma: no cover
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # NOTE: Bytes on macOS and kilobytes on Linux
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def _sizeof(obj, depth: int = 0) -> int:
+    # NOTE: An approximation. Datasets are counted but not other attributes of models
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(index=True)))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, ModelEntry):
+        return _sizeof(obj.model, depth)
+    if isinstance(obj, Model):
+        dataset = obj.dataset
+        return sys.getsizeof(obj) + (0 if dataset is None else _sizeof(dataset))
+    if depth < 2 and isinstance(obj, (tuple, list, set, frozenset)):
+        return sys.getsizeof(obj) + sum(_sizeof(x, depth + 1) for x in obj)
+    if depth < 2 and isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_sizeof(x, depth + 1) for x in obj.values())
+    if callable(obj) or _is_context(obj):
+        return 0
+    return sys.getsizeof(obj)
+
+
+def _is_context(obj) -> bool:
+    from .context import Context
+
+    return isinstance(obj, Context)
@@ -0,0 +1,58 @@
+import pytest
+import sympy
+
+from pharmpy.basic import Expr, Matrix
+from pharmpy.basic.serialization import decode, encode, is_encoded
+
+
+@pytest.mark.parametrize(
+    'expr',
+    [
+        Expr.symbol('CL') * Expr.symbol('ETA_1').exp(),
+        Expr('THETA_1 + THETA_2/V - 1/3 + 2.5*x**(-2)'),
+        Expr('log(x) + sqrt(y) + Abs(z) + sign(z) + erf(x) + gamma(y)'),
+        Expr.piecewise(('1', 'x > 0'), ('2', 'Eq(x, 0)'), ('3', True)),
+        Expr.function('A_CENTRAL', 't'),
+        Expr.derivative(Expr.function('A_CENTRAL', 't'), 't'),
+        Expr('Max(x, y) + exp(-oo) + pi + E'),
+        Expr.integer(10) ** 100 + Expr.float(1e-300),
+        Expr.integer(0),
+    ],
+)
+def test_roundtrip(expr):
+    s = expr.serialize()
+    assert is_encoded(s)
+    assert Expr.deserialize(s) == expr
+
+
+def test_symbol_table():
+    expr = Expr('CL*CL + exp(CL)')
+    assert encode(expr._expr).count('"CL"') == 1
+
+
+def test_legacy_srepr():
+    expr = Expr('CL*exp(ETA_1) + 1/2')
+    s = sympy.srepr(sympy.sympify(expr._expr))
+    assert not is_encoded(s)
+    assert Expr.deserialize(s) == expr
+
+    m = sympy.Matrix([[1, sympy.Symbol('x')], [sympy.Symbol('x'), 2]])
+    assert Matrix.deserialize(sympy.srepr(m)) == Matrix(m)
+
+
+def test_unsupported_version():
+    with pytest.raises(ValueError, match='version 99'):
+        decode('@99[[],["i",1]]')
+
+
+def test_matrix_roundtrip():
+    m = Matrix([['OMEGA_1', 'OMEGA_2'], ['OMEGA_2', 'OMEGA_3']])
+    s = m.serialize()
+    assert is_encoded(s)
+    assert Matrix.deserialize(s) == m
+
+
+def test_canonical_order():
+    x, y, z = (Expr.symbol(name) for name in ('THETA_1', 'ETA_1', 'EPS_1'))
+    assert (x + y + z).serialize() == (z + y + x).serialize()
+    assert (x * y.exp()).serialize() == (y.exp() * x).serialize()
@@ -1,4 +1,5 @@
 import io
+import json
 import os
 import re
 import shutil
@@ -90,3 +91,19 @@ def test_reference(datadir, tmp_path):
             mod_new = f_new.read()
 
         assert re.search(r'run2\.csv', mod_new)
+
+
+def test_results_profile(tmp_path, capsys):
+    from pharmpy.workflows import Task, Workflow, WorkflowBuilder
+    from pharmpy.workflows.trace import Tracer
+
+    tracer = Tracer()
+    wf = tracer.instrument(Workflow(WorkflowBuilder(tasks=[Task('fit', sum, [1, 2])])))
+    wf.tasks[0].function(*wf.tasks[0].task_input)
+    with open(tmp_path / 'trace.json', 'w') as f:
+        json.dump(tracer.to_chrome_trace(), f)
+
+    cli.main(['results', 'profile', str(tmp_path)])
+    captured = capsys.readouterr()
+    assert 'fit' in captured.out
+    assert 'queue_wait' in captured.out
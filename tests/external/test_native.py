@@ -0,0 +1,137 @@
+import shutil
+
+import pytest
+
+from pharmpy.deps import numpy as np
+from pharmpy.internals.fs.cwd import chdir
+from pharmpy.modeling import (
+    fix_parameters,
+    load_example_model,
+    read_model,
+    set_estimation_step,
+    set_initial_estimates,
+    set_lower_bounds,
+)
+from pharmpy.tools import fit, load_example_modelfit_results, read_modelfit_results
+from pharmpy.tools.external.native.estimation import Objective, estimate
+from pharmpy.tools.external.native.run import create_modelfit_results
+from pharmpy.tools.ruvsearch.tool import _create_base_model
+from pharmpy.workflows import ModelEntry
+
+
+def test_evaluate_pheno_linear():
+    model = load_example_model('pheno_linear')
+    res = load_example_modelfit_results('pheno_linear')
+    objective = Objective(model)
+    theta = res.parameter_estimates[objective.parameter_names].to_numpy()
+    evaluation = objective.evaluate(theta)
+
+    assert evaluation.ofv == pytest.approx(res.ofv, abs=1e-6)
+    assert np.allclose(evaluation.individual_ofv, res.individual_ofv, atol=1e-4)
+    assert np.allclose(evaluation.etas, res.individual_estimates, atol=1e-5)
+    for cov, expected in zip(evaluation.etas_covariance, res.individual_estimates_covariance):
+        assert np.allclose(cov, expected, atol=1e-6)
+
+    # OFV at the initial estimates from the first line of pheno_linear.ext
+    inits = model.parameters.inits
+    theta = np.array([inits[name] for name in objective.parameter_names])
+    assert objective.evaluate(theta).ofv == pytest.approx(587.37144851874280, abs=1e-6)
+
+
+def test_evaluate_fo():
+    model = load_example_model('pheno_linear')
+    res = load_example_modelfit_results('pheno_linear')
+    theta = res.parameter_estimates[model.parameters.names].to_numpy()
+    fo = Objective(model, method='FO').evaluate(theta)
+    foce = Objective(model, interaction=False).evaluate(theta)
+    # The model is linear in the etas so FO and FOCE without interaction agree
+    assert fo.ofv == pytest.approx(foce.ofv)
+    assert np.all(fo.etas == 0)
+
+    with pytest.raises(ValueError, match='Interaction'):
+        Objective(model, method='FO', interaction=True)
+    with pytest.raises(ValueError, match='Unsupported'):
+        Objective(model, method='SAEM')
+
+
+def test_objective_ode(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno.mod')
+    with pytest.raises(ValueError, match='ODE'):
+        Objective(model)
+
+
+def test_estimate_pheno_linear():
+    model = load_example_model('pheno_linear')
+    res = load_example_modelfit_results('pheno_linear')
+    result = estimate(model)
+
+    assert result.minimization_successful
+    assert result.evaluation.ofv == pytest.approx(res.ofv, abs=1e-4)
+    assert np.allclose(
+        result.parameters, res.parameter_estimates[result.parameters.index], rtol=5e-3
+    )
+
+    result = estimate(model, evaluation=True)
+    assert result.evaluation.ofv == pytest.approx(587.37144851874280, abs=1e-6)
+    model = set_estimation_step(model, 'FOCE', evaluation=True)
+    assert estimate(model).function_evaluations == 1
+
+
+def test_create_modelfit_results():
+    model = load_example_model('pheno_linear')
+    res = create_modelfit_results(set_estimation_step(model, 'FOCE', evaluation=True))
+    assert res.ofv == pytest.approx(587.37144851874280, abs=1e-6)
+    assert list(res.individual_estimates.columns) == ['ETA_1', 'ETA_2']
+    assert list(res.individual_ofv.index) == list(range(1, 60))
+    assert res.individual_estimates_covariance.iloc[0].shape == (2, 2)
+    assert list(res.parameter_estimates.index) == model.parameters.names
+
+    # Like NONMEM results, only the estimates of the non-fixed parameters
+    model = fix_parameters(model, ['IVCL'])
+    res = create_modelfit_results(set_estimation_step(model, 'FOCE', evaluation=True))
+    assert 'IVCL' not in res.parameter_estimates.index
+    assert list(res.parameter_estimates.index) == model.parameters.nonfixed.names
+
+
+def test_fit_native(tmp_path, testdata):
+    with chdir(tmp_path):
+        for ext in ('mod', 'dta'):
+            shutil.copy2(testdata / 'nonmem' / 'qa' / f'pheno_linbase.{ext}', tmp_path)
+        model = read_model('pheno_linbase.mod')
+        res = fit(model, esttool='native')
+        # Final OFV in pheno_linbase.ext
+        assert res.ofv == pytest.approx(730.84727200902546, abs=1e-3)
+        assert (tmp_path / 'modelfit1').is_dir()
+
+
+def test_gradient():
+    model = load_example_model('pheno_linear')
+    res = load_example_modelfit_results('pheno_linear')
+    objective = Objective(model, method='FO')
+    assert objective.has_gradient
+    assert not Objective(model).has_gradient
+    theta = res.parameter_estimates[objective.parameter_names].to_numpy()
+    gradient = objective.gradient(theta)
+    for i, value in enumerate(gradient):
+        h = np.zeros_like(theta)
+        h[i] = 1e-6 * abs(theta[i])
+        difference = (objective.evaluate(theta + h).ofv - objective.evaluate(theta - h).ofv) / (
+            2 * h[i]
+        )
+        assert value == pytest.approx(difference, rel=1e-4, abs=1e-4)
+
+
+def test_estimate_theta_at_zero_bound(load_model_for_test, testdata):
+    path = testdata / 'nonmem' / 'ruvsearch' / 'mox3.mod'
+    model_entry = ModelEntry.create(
+        load_model_for_test(path), modelfit_results=read_modelfit_results(path)
+    )
+    model = _create_base_model(model_entry, 1, None).model
+    # The unconstrained estimate of the mean CWRES is negative
+    assert estimate(model).parameters['theta'] < 0
+    model = set_initial_estimates(model, {'theta': 0.1})
+    model = set_lower_bounds(model, {'theta': 0})
+    result = estimate(model)
+    # Only variances are kept off a lower bound of zero
+    assert result.parameters['theta'] == 0.0
+    assert result.parameters['omega'] > 0
@@ -0,0 +1,46 @@
+import gc
+
+import pandas as pd
+
+from pharmpy.internals import df as dfmodule
+from pharmpy.internals.df import hash_df_fs, hash_df_runtime
+
+
+def _df():
+    return pd.DataFrame({'ID': [1, 1, 2, 2], 'TIME': [0.0, 1.5, 0.0, 2.0], 'DV': [0, 3.2, 0, 4.1]})
+
+
+def test_hash_df_runtime():
+    df = _df()
+    h = hash_df_runtime(df)
+    assert isinstance(h, int)
+    assert hash_df_runtime(df) == h
+    assert hash_df_runtime(df.copy()) == h
+    assert hash_df_runtime(_df()) == h
+
+    changed = _df()
+    changed.loc[3, 'DV'] = 4.2
+    assert hash_df_runtime(changed) != h
+
+    renamed = _df().rename(columns={'DV': 'CP'})
+    assert hash_df_runtime(renamed) != h
+
+    assert hash_df_runtime(_df().iloc[:3]) != h
+
+
+def test_hash_df_runtime_memo():
+    df = _df()
+    hash_df_runtime(df)
+    assert df in dfmodule._runtime_hashes
+    n = len(dfmodule._runtime_hashes)
+    del df
+    gc.collect()
+    assert len(dfmodule._runtime_hashes) == n - 1
+
+
+def test_hash_df_fs():
+    df = _df()
+    assert hash_df_fs(df) == hash_df_fs(df.copy())
+    changed = _df()
+    changed.loc[0, 'TIME'] = 0.5
+    assert hash_df_fs(changed) != hash_df_fs(df)
@@ -0,0 +1,35 @@
+import gc
+
+from pharmpy.internals.memo import IdentityMemo
+
+
+class _Obj:
+    pass
+
+
+def test_identity_memo():
+    memo = IdentityMemo()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    a, b = _Obj(), _Obj()
+    assert memo.get(a, compute) == 1
+    assert memo.get(a, compute) == 1
+    assert memo.get(b, compute) == 2
+    assert a in memo and b in memo
+    assert len(memo) == 2
+
+    del a
+    gc.collect()
+    assert len(memo) == 1
+    assert b in memo
+
+    memo.clear()
+    assert b not in memo
+    assert memo.get(b, compute) == 3
+    del b
+    gc.collect()
+    assert len(memo) == 0
@@ -0,0 +1,172 @@
+import gc
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pharmpy.internals import shm
+from pharmpy.internals.shm import (
+    SharedDataFrame,
+    SharedDataFrameStore,
+    get_active_store,
+    open_dataframe,
+    share_dataframe,
+)
+
+
+def _key(df):
+    return str(pd.util.hash_pandas_object(df).sum())
+
+
+def _open_as_other_process(handle):
+    # Simulate a process that does not own the segment
+    original = shm._originals.pop(handle.segment)
+    try:
+        return handle.open()
+    finally:
+        shm._originals[handle.segment] = original
+
+
+def test_share_dataframe_no_store():
+    df = pd.DataFrame({'ID': [1.0, 2.0]})
+    assert get_active_store() is None
+    assert share_dataframe(df) is df
+    assert open_dataframe(df) is df
+    assert share_dataframe(None) is None
+
+
+def test_roundtrip_homogeneous():
+    df = pd.DataFrame(np.arange(30.0).reshape(10, 3), columns=['ID', 'TIME', 'DV'])
+    with SharedDataFrameStore(_key) as store:
+        assert get_active_store() is store
+        handle = share_dataframe(df)
+        assert isinstance(handle, SharedDataFrame)
+        assert share_dataframe(df) is handle
+        assert len(store) == 1
+
+        assert pickle.loads(pickle.dumps(handle)).open() is df
+        opened = _open_as_other_process(pickle.loads(pickle.dumps(handle)))
+        pd.testing.assert_frame_equal(opened, df)
+        assert not opened['DV'].to_numpy().flags.writeable
+    assert get_active_store() is None
+
+
+def test_roundtrip_mixed_dtypes():
+    df = pd.DataFrame(
+        {
+            'ID': [1, 1, 2],
+            'TIME': [0.0, 1.0, 0.0],
+            'SEX': pd.Categorical(['M', 'M', 'F']),
+            'NAME': ['a', 'b', 'c'],
+            'DV': [0.5, 0.7, 0.2],
+        },
+        index=[10, 11, 12],
+    )
+    with SharedDataFrameStore(_key) as store:
+        handle = store.share(df)
+        pd.testing.assert_frame_equal(_open_as_other_process(handle), df)
+
+
+def test_same_content_stored_once():
+    df1 = pd.DataFrame({'ID': [1.0, 2.0], 'DV': [3.0, 4.0]})
+    df2 = df1.copy()
+    with SharedDataFrameStore(_key) as store:
+        assert store.share(df1).segment == store.share(df2).segment
+        assert len(store) == 1
+
+
+def test_attach_from_other_process():
+    df = pd.DataFrame({'ID': [1.0, 2.0], 'DV': [3.0, 4.0]})
+    with SharedDataFrameStore(_key) as store:
+        handle = store.share(df)
+        # Simulate a process that has not yet attached to the segment
+        owned = shm._attached.pop(handle.segment)
+        try:
+            opened = _open_as_other_process(handle)
+            pd.testing.assert_frame_equal(opened, df)
+            assert shm._attached[handle.segment] is not owned
+            del opened
+            shm._attached.pop(handle.segment).close()
+        finally:
+            shm._attached[handle.segment] = owned
+
+
+def test_close_unlinks():
+    df = pd.DataFrame({'ID': [1.0, 2.0]})
+    store = SharedDataFrameStore(_key)
+    handle = store.share(df)
+    store.close()
+    assert len(store) == 0
+    with pytest.raises(FileNotFoundError):
+        handle.open()
+
+
+def test_pickle_model_transfers_handle(load_example_model_for_test):
+    model = load_example_model_for_test('pheno')
+    plain = pickle.dumps(model)
+    with SharedDataFrameStore(_key):
+        shared = pickle.dumps(model)
+        assert len(shared) < len(plain)
+        unpickled = pickle.loads(shared)
+        pd.testing.assert_frame_equal(unpickled.dataset, model.dataset)
+        assert unpickled == model
+
+
+def test_opened_dataframe_is_shared_back():
+    df = pd.DataFrame({'ID': [1.0, 2.0], 'DV': [3.0, 4.0]})
+    # Not entered, as in a worker process without an active store
+    store = SharedDataFrameStore(_key)
+    handle = store.share(df)
+    opened = _open_as_other_process(handle)
+    assert share_dataframe(opened) is handle
+    copy = opened.copy()
+    assert share_dataframe(copy) is copy
+    del opened
+    store.close()
+
+
+def test_close_with_live_frames():
+    df = pd.DataFrame({'ID': [1.0, 2.0], 'DV': [3.0, 4.0]})
+    store = SharedDataFrameStore(_key)
+    handle = store.share(df)
+    shm._attached.pop(handle.segment)
+    opened = _open_as_other_process(handle)
+    store.close()
+    shm.detach()
+    # The mapping is kept while the frame is alive
+    assert opened['DV'].sum() == 7.0
+    del opened
+    gc.collect()
+    shm.detach()
+    assert not shm._unreleased
+
+
+def test_attached_segments_closed_by_consumer():
+    df = pd.DataFrame({'ID': [1.0, 2.0], 'DV': [3.0, 4.0]})
+    store = SharedDataFrameStore(_key)
+    handle = store.share(df)
+    # Simulate a worker process that neither owns nor has attached to the segment
+    owned = shm._attached.pop(handle.segment)
+    original = shm._originals.pop(handle.segment)
+    try:
+        with shm.attached():
+            opened = handle.open()
+            assert handle.segment in shm._attached
+            del opened
+        assert handle.segment not in shm._attached
+        assert handle.segment not in shm._open_counts
+        assert not shm._unreleased
+
+        with shm.attached():
+            kept = handle.open()
+        # The mapping is kept while the frame is alive and closed when it is gone
+        assert kept['DV'].sum() == 7.0
+        del kept
+        gc.collect()
+        shm.detach()
+        assert not shm._unreleased
+    finally:
+        shm._attached[handle.segment] = owned
+        shm._originals[handle.segment] = original
+        store.close()
@@ -107,6 +107,14 @@ def test_indexing():
     assert len(di) == 1
     di = di[0:1] + col
     assert len(di) == 2
+    with pytest.raises(IndexError, match='Cannot find column COL1'):
+        di['COL1']
+
+
+def test_indexing_duplicate_names():
+    di = DataInfo.create(columns=[ColumnInfo.create("A", type='id'), "B", "A"])
+    assert di['A'].type == 'id'
+    assert di['B'] is di[1]
 
 
 def test_id_column():
@@ -78,6 +78,12 @@ def test_model_equality():
 
     assert hash(pheno1) != hash(pheno_linear1)
 
+    ie = pd.DataFrame({'ETA_1': [0.1, 0.2], 'ETA_2': [0.0, -0.1]}, index=[1, 2])
+    pheno_ie1 = pheno1.replace(initial_individual_estimates=ie)
+    pheno_ie2 = pheno1.replace(initial_individual_estimates=ie.copy())
+    assert hash(pheno_ie1) == hash(pheno_ie2)
+    assert hash(pheno_ie1) != hash(pheno1)
+
     with pytest.raises(
         NotImplementedError, match=re.escape("Cannot compare Model with <class 'str'>")
     ):
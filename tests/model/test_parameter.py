@@ -152,6 +152,17 @@ def test_pset_getitem():
         pset['noparamofmine']
 
 
+def test_pset_lookup_by_name():
+    pset = Parameters(tuple(Parameter.create(f'THETA_{i}', i) for i in range(300)))
+    assert pset['THETA_250'].init == 250
+    assert pset[Expr.symbol('THETA_3')].init == 3
+    assert 'THETA_299' in pset
+    assert 'THETA_300' not in pset
+    with pytest.raises(KeyError, match='Could not find THETA_300'):
+        pset['THETA_300']
+    assert not hasattr(pset, '__dict__')
+
+
 def test_pset_nonfixed():
     p1 = Parameter.create('Y', 9, fix=False)
     p2 = Parameter.create('X', 3, fix=True)
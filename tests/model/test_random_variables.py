@@ -395,6 +395,9 @@ def test_pickle():
     pickled = pickle.dumps(rvs)
     obj = pickle.loads(pickled)
     assert obj == rvs
+    assert rvs['ETA(3)'] is dist2
+    obj = pickle.loads(pickle.dumps(rvs))
+    assert obj['ETA(2)'] == dist1
 
 
 def test_hash():
@@ -417,8 +420,8 @@ def test_dict():
         'class': 'NormalDistribution',
         'name': 'ETA_3',
         'level': 'IIV',
-        'mean': 'Integer(2)',
-        'variance': 'Integer(1)',
+        'mean': '@1[[],["i",2]]',
+        'variance': '@1[[],["i",1]]',
     }
     dist2 = NormalDistribution.from_dict(d)
     assert dist1 == dist2
@@ -441,15 +444,15 @@ def test_dict():
                 'class': 'NormalDistribution',
                 'name': 'ETA_1',
                 'level': 'IIV',
-                'mean': 'Integer(0)',
-                'variance': 'Integer(1)',
+                'mean': '@1[[],["i",0]]',
+                'variance': '@1[[],["i",1]]',
             },
             {
                 'class': 'JointNormalDistribution',
                 'names': ('ETA_2', 'ETA_3'),
                 'level': 'IIV',
-                'mean': 'ImmutableDenseMatrix([[Integer(0)], [Integer(0)]])',
-                'variance': "ImmutableDenseMatrix([[Symbol('OMEGA11'), Symbol('OMEGA21')], [Symbol('OMEGA21'), Symbol('OMEGA22')]])",  # noqa: E501
+                'mean': '@1[[],["i",0,"i",0],[2,1]]',
+                'variance': '@1[["OMEGA11","OMEGA21","OMEGA22"],["s",0,"s",1,"s",1,"s",2],[2,2]]',
             },
         ),
         'eta_levels': {
@@ -764,6 +767,50 @@ def test_covariance_matrix():
     )
 
 
+def test_numeric_covariance():
+    x, y, z, w = symbol('x'), symbol('y'), symbol('z'), symbol('w')
+    dist1 = NormalDistribution.create('ETA(1)', 'iiv', 0, 2 * w)
+    dist2 = JointNormalDistribution.create(['ETA(2)', 'ETA(3)'], 'iiv', [1, w], [[x, y], [y, z]])
+    dist3 = NormalDistribution.create('EPS(1)', 'ruv', 0, 0.5)
+    rvs = RandomVariables.create([dist1, dist2, dist3])
+    cov = rvs.numeric_covariance(['w', 'x', 'y', 'z'])
+    assert cov.names == ('ETA(1)', 'ETA(2)', 'ETA(3)', 'EPS(1)')
+    assert cov.parameter_names == ('w', 'x', 'y', 'z')
+
+    values = np.array([[0.1, 1.0, 0.1, 2.0], [0.2, 1.0, 1.1, 1.0], [0.3, 1.0, 0.5, 1.0]])
+    matrices = cov(values)
+    assert matrices.shape == (3, 4, 4)
+    for row, matrix in zip(values, matrices):
+        d = dict(zip(cov.parameter_names, row))
+        expected = rvs.covariance_matrix.subs(d).to_numpy()
+        np.testing.assert_allclose(matrix, expected)
+    np.testing.assert_allclose(cov(values[0]), matrices[0])
+    np.testing.assert_allclose(cov.mean(values[1]), [0, 1, 0.2, 0])
+
+    valid = cov.validate(values)
+    assert list(valid) == [
+        rvs.validate_parameters(dict(zip(cov.parameter_names, row))) for row in values
+    ]
+    assert list(valid) == [True, False, True]
+
+    nearest = cov.nearest_valid(values)
+    assert cov.validate(nearest).all()
+    np.testing.assert_array_equal(nearest[[0, 2]], values[[0, 2]])
+    expected = rvs.nearest_valid_parameters(dict(zip(cov.parameter_names, values[1])))
+    np.testing.assert_allclose(nearest[1], [expected[name] for name in cov.parameter_names])
+
+    samples = cov.sample(values[[0, 2]], samples=20000, rng=23)
+    assert samples.shape == (2, 20000, 4)
+    np.testing.assert_allclose(samples[1].mean(axis=0), cov.mean(values[2]), atol=0.03)
+    np.testing.assert_allclose(np.cov(samples[1].T), matrices[2], atol=0.05)
+
+    with pytest.raises(ValueError, match='Expected parameter vectors of length 4'):
+        cov(np.zeros((2, 3)))
+    with pytest.raises(ValueError, match='Missing values'):
+        rvs.numeric_covariance(['x', 'y', 'z'])
+    assert rvs.numeric_covariance().parameter_names == ('w', 'x', 'y', 'z')
+
+
 def test_get_rvs_with_same_dist():
     var1 = symbol('OMEGA(1,1)')
 
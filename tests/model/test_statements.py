@@ -132,15 +132,15 @@ def test_dict(load_model_for_test, testdata):
     d = ass1.to_dict()
     assert d == {
         'class': 'Assignment',
-        'symbol': "Symbol('KA')",
-        'expression': "Add(Symbol('X'), Symbol('Y'))",
+        'symbol': '@1[["KA"],["s",0]]',
+        'expression': '@1[["X","Y"],["+",2,"s",0,"s",1]]',
     }
     ass2 = Assignment.from_dict(d)
     assert ass1 == ass2
 
     dose1 = Bolus.create('AMT')
     d = dose1.to_dict()
-    assert d == {'class': 'Bolus', 'amount': "Symbol('AMT')", 'admid': 1}
+    assert d == {'class': 'Bolus', 'amount': '@1[["AMT"],["s",0]]', 'admid': 1}
     dose2 = Bolus.from_dict(d)
     assert dose1 == dose2
 
@@ -148,9 +148,9 @@ def test_dict(load_model_for_test, testdata):
     d = inf1.to_dict()
     assert d == {
         'class': 'Infusion',
-        'amount': "Symbol('AMT')",
+        'amount': '@1[["AMT"],["s",0]]',
         'admid': 1,
-        'rate': "Symbol('R1')",
+        'rate': '@1[["R1"],["s",0]]',
         'duration': None,
     }
     inf2 = Infusion.from_dict(d)
@@ -161,11 +161,11 @@ def test_dict(load_model_for_test, testdata):
     assert d == {
         'class': 'Compartment',
         'name': 'CENTRAL',
-        'amount': "Function('A_CENTRAL')(Symbol('t'))",
-        'doses': ({'class': 'Bolus', 'amount': "Symbol('AMT')", 'admid': 1},),
-        'input': 'Integer(0)',
-        'lag_time': 'Integer(0)',
-        'bioavailability': 'Integer(1)',
+        'amount': '@1[["t"],["U","A_CENTRAL",1,"s",0]]',
+        'doses': ({'class': 'Bolus', 'amount': '@1[["AMT"],["s",0]]', 'admid': 1},),
+        'input': '@1[[],["i",0]]',
+        'lag_time': '@1[[],["i",0]]',
+        'bioavailability': '@1[[],["i",1]]',
     }
     central2 = Compartment.from_dict(d)
     assert central == central2
@@ -185,15 +185,15 @@ def test_dict(load_model_for_test, testdata):
             {
                 'class': 'Compartment',
                 'name': 'CENTRAL',
-                'amount': "Function('A_CENTRAL')(Symbol('t'))",
-                'doses': ({'class': 'Bolus', 'amount': "Symbol('AMT')", 'admid': 1},),
-                'input': 'Integer(0)',
-                'lag_time': 'Integer(0)',
-                'bioavailability': 'Integer(1)',
+                'amount': '@1[["t"],["U","A_CENTRAL",1,"s",0]]',
+                'doses': ({'class': 'Bolus', 'amount': '@1[["AMT"],["s",0]]', 'admid': 1},),
+                'input': '@1[[],["i",0]]',
+                'lag_time': '@1[[],["i",0]]',
+                'bioavailability': '@1[[],["i",1]]',
             },
         ),
-        'rates': [(1, 0, "Mul(Symbol('CL'), Pow(Symbol('V'), Integer(-1)))")],
-        't': "Symbol('t')",
+        'rates': [(1, 0, '@1[["V","CL"],["*",2,"^","s",0,"i",-1,"s",1]]')],
+        't': '@1[["t"],["s",0]]',
     }
     odes2 = CompartmentalSystem.from_dict(d)
     assert odes == odes2
@@ -204,8 +204,8 @@ def test_dict(load_model_for_test, testdata):
         'statements': (
             {
                 'class': 'Assignment',
-                'symbol': "Symbol('Y')",
-                'expression': "Add(Symbol('EPS_1'), Symbol('ETA_1'), Symbol('THETA_1'))",
+                'symbol': '@1[["Y"],["s",0]]',
+                'expression': '@1[["EPS_1","ETA_1","THETA_1"],["+",3,"s",0,"s",1,"s",2]]',
             },
         )
     }
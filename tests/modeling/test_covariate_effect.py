@@ -8,6 +8,8 @@ from pharmpy.modeling import add_iov
 from pharmpy.modeling.covariate_effect import (
     CovariateEffect,
     _choose_param_inits,
+    _covariate_statistics,
+    _summarize_covariate,
     add_covariate_effect,
     get_covariate_effects,
     has_covariate_effect,
@@ -479,6 +481,25 @@ def test_choose_param_inits(pheno_path, load_model_for_test, cov_eff, init, lowe
     assert inits['upper'] == upper
 
 
+def test_summarize_covariate(pheno_path, load_model_for_test):
+    model = load_model_for_test(pheno_path)
+    df = model.dataset
+
+    summary = _summarize_covariate(df, 'WGT')
+    assert summary['mean'] == pytest.approx(df.groupby('ID')['WGT'].mean().mean())
+    assert summary['median'] == df.groupby('ID')['WGT'].median().median()
+    assert summary['std'] == pytest.approx(df.groupby('ID')['WGT'].mean().std())
+    assert summary['min'] == df['WGT'].min()
+    assert summary['max'] == df['WGT'].max()
+    assert _summarize_covariate(df, 'WGT') is summary
+    assert df in _covariate_statistics
+
+    model = add_covariate_effect(model, 'CL', 'APGR', 'exp')
+    summary = _summarize_covariate(df, 'APGR')
+    _choose_param_inits('exp', model, 'APGR')
+    assert _summarize_covariate(model.dataset, 'APGR') is summary
+
+
 @pytest.mark.parametrize(
     ('model_path', 'effect', 'has'),
     [
@@ -2,6 +2,7 @@ import numpy as np
 import pytest
 
 from pharmpy.deps import pandas as pd
+from pharmpy.model import LazyDataset
 from pharmpy.modeling import (
     add_time_after_dose,
     bin_observations,
@@ -10,6 +11,7 @@ from pharmpy.modeling import (
     drop_columns,
     drop_dropped_columns,
     expand_additional_doses,
+    get_baselines,
     get_cmt,
     get_concentration_parameters_from_data,
     get_covariate_baselines,
@@ -24,7 +26,9 @@ from pharmpy.modeling import (
     get_observations,
     list_time_varying_covariates,
     load_dataset,
+    load_dataset_lazily,
     remove_loq_data,
+    set_covariates,
     set_dataset,
     set_dvid,
     set_lloq_data,
@@ -538,6 +542,49 @@ def test_load_dataset(load_example_model_for_test):
     assert model.dataset is not None
 
 
+def test_load_dataset_lazily(load_example_model_for_test):
+    model = load_example_model_for_test("pheno")
+    lazy = load_dataset_lazily(model)
+    assert isinstance(lazy, LazyDataset)
+    pd.testing.assert_frame_equal(lazy.load(), model.dataset)
+
+
+def test_unloaded_dataset_in_chunks(load_example_model_for_test):
+    from pharmpy.config import ConfigurationContext
+    from pharmpy.model.data import conf
+
+    model = load_example_model_for_test("pheno")
+    model = set_covariates(model, ['WGT', 'APGR'])
+    unloaded = unload_dataset(model)
+
+    lazy = load_dataset_lazily(model)
+    blocks = list(lazy.blocks(['DV']))
+    assert sum(len(block) for block in blocks) == 744
+    for first, second in zip(blocks, blocks[1:]):
+        assert first['ID'].iloc[-1] != second['ID'].iloc[0]
+
+    # Chunks of 100 rows split the records of individuals
+    with ConfigurationContext(conf, chunksize=100):
+        assert get_ids(unloaded) == get_ids(model)
+        assert get_number_of_individuals(unloaded) == 59
+        assert get_number_of_observations(unloaded) == 155
+        pd.testing.assert_series_equal(
+            get_number_of_observations_per_individual(unloaded),
+            get_number_of_observations_per_individual(model),
+        )
+        pd.testing.assert_series_equal(get_observations(unloaded), get_observations(model))
+        pd.testing.assert_series_equal(
+            get_observations(unloaded, keep_index=True), get_observations(model, keep_index=True)
+        )
+        pd.testing.assert_frame_equal(get_baselines(unloaded), get_baselines(model))
+        pd.testing.assert_frame_equal(
+            get_covariate_baselines(unloaded), get_covariate_baselines(model)
+        )
+        pd.testing.assert_frame_equal(
+            check_dataset(unloaded, dataframe=True), check_dataset(model, dataframe=True)
+        )
+
+
 def test_set_dataset(load_example_model_for_test, testdata):
     model = load_example_model_for_test("pheno")
     mox_path = testdata / 'nonmem' / 'models' / 'mox_simulated_normal.csv'
@@ -1,19 +1,27 @@
 from io import StringIO
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 from pharmpy.deps import pandas as pd
+from pharmpy.deps.scipy import stats
 from pharmpy.model.external.nonmem.dataset import read_nonmem_dataset
 from pharmpy.modeling import (
+    evaluate_conditional_weighted_residuals,
     evaluate_epsilon_gradient,
     evaluate_eta_gradient,
     evaluate_expression,
     evaluate_individual_prediction,
+    evaluate_npd,
+    evaluate_npde,
     evaluate_population_prediction,
     evaluate_weighted_residuals,
+    remove_iiv,
+    set_first_order_absorption,
+    set_zero_order_absorption,
 )
-from pharmpy.tools import read_modelfit_results
+from pharmpy.tools import load_example_modelfit_results, read_modelfit_results
 
 tabpath = Path(__file__).resolve().parent.parent / 'testdata' / 'nonmem' / 'pheno_real_linbase.tab'
 lincorrect = read_nonmem_dataset(
@@ -64,6 +72,71 @@ def test_evaluate_individual_prediction(load_model_for_test, testdata):
     pd.testing.assert_series_equal(lincorrect['CIPREDI'], pred, rtol=1e-4, check_names=False)
 
 
+def test_evaluate_prediction_ode(load_example_model_for_test):
+    model = load_example_model_for_test('pheno')
+    res = load_example_modelfit_results('pheno')
+    parameters = dict(res.parameter_estimates)
+
+    pred = evaluate_population_prediction(model, parameters=parameters)
+    pd.testing.assert_series_equal(res.predictions['PRED'], pred, rtol=1e-4, check_index=False)
+
+    ipred = evaluate_individual_prediction(
+        model, etas=res.individual_estimates, parameters=parameters
+    )
+    pd.testing.assert_series_equal(res.predictions['IPRED'], ipred, rtol=1e-4, check_index=False)
+
+
+def _single_dose_dataset():
+    n = 6
+    return pd.DataFrame(
+        {
+            'ID': [1] * n + [2] * 3,
+            'TIME': [0.0, 1.0, 2.0, 4.0, 8.0, 24.0, 0.0, 3.0, 6.0],
+            'AMT': [100.0, 0, 0, 0, 0, 0, 50.0, 0, 0],
+            'WGT': [1.0] * n + [2.0] * 3,
+            'APGR': [7.0] * (n + 3),
+            'DV': [0.0] * (n + 3),
+            'FA1': [0.0] * (n + 3),
+            'FA2': [0.0] * (n + 3),
+        }
+    )
+
+
+def test_evaluate_prediction_ode_absorption(load_example_model_for_test):
+    model = remove_iiv(load_example_model_for_test('pheno'))
+    df = _single_dose_dataset()
+
+    model = set_first_order_absorption(model).replace(dataset=df)
+    pred = evaluate_population_prediction(model)
+    inits = model.parameters.inits
+    cl = inits['PTVCL'] * df['WGT']
+    v = inits['PTVV'] * df['WGT']
+    k = cl / v
+    ka = 1 / inits['POP_MAT']
+    dose = np.where(df['ID'] == 1, 100.0, 50.0)
+    t = df['TIME']
+    expected = dose * ka / (v * (ka - k)) * (np.exp(-k * t) - np.exp(-ka * t))
+    np.testing.assert_allclose(pred, expected, rtol=1e-10, atol=1e-12)
+
+
+def test_evaluate_prediction_ode_infusion(load_example_model_for_test):
+    model = remove_iiv(load_example_model_for_test('pheno'))
+    df = _single_dose_dataset()
+
+    model = set_zero_order_absorption(model).replace(dataset=df)
+    pred = evaluate_population_prediction(model)
+    inits = model.parameters.inits
+    cl = inits['PTVCL'] * df['WGT']
+    v = inits['PTVV'] * df['WGT']
+    k = cl / v
+    duration = 2 * inits['POP_MAT']
+    rate = np.where(df['ID'] == 1, 100.0, 50.0) / duration
+    t = df['TIME']
+    during = rate / cl * (1 - np.exp(-k * np.minimum(t, duration)))
+    expected = during * np.exp(-k * np.maximum(t - duration, 0))
+    np.testing.assert_allclose(pred, expected, rtol=1e-10, atol=1e-12)
+
+
 def test_evaluate_eta_gradient(load_model_for_test, testdata):
     path = testdata / 'nonmem' / 'minimal.mod'
     model = load_model_for_test(path)
@@ -100,3 +173,99 @@ def test_evaluate_weighted_residuals(load_model_for_test, testdata):
     res = read_modelfit_results(linpath)
     wres = evaluate_weighted_residuals(linmod, parameters=dict(res.parameter_estimates))
     pd.testing.assert_series_equal(lincorrect['WRES'], wres, rtol=1e-4, check_names=False)
+
+
+def test_evaluate_weighted_residuals_unordered_individuals(load_model_for_test, testdata):
+    linpath = testdata / 'nonmem' / 'pheno_real_linbase.mod'
+    linmod = load_model_for_test(linpath)
+    res = read_modelfit_results(linpath)
+    parameters = dict(res.parameter_estimates)
+    wres = evaluate_weighted_residuals(linmod, parameters=parameters)
+
+    # Records of individuals interleaved and not in original order
+    order = np.argsort(linmod.dataset['ID'].to_numpy() % 7, kind='stable')
+    dataset = linmod.dataset.iloc[order].reset_index(drop=True)
+    shuffled = evaluate_weighted_residuals(linmod, parameters=parameters, dataset=dataset)
+    np.testing.assert_allclose(shuffled.to_numpy(), wres.to_numpy()[order], rtol=1e-12)
+
+
+def test_evaluate_conditional_weighted_residuals(load_model_for_test, testdata):
+    # The CWRES of pheno_real are the CWRES of the model linearized around its EBEs
+    linmod = load_model_for_test(testdata / 'nonmem' / 'pheno_real_linbase.mod')
+    path = testdata / 'nonmem' / 'pheno_real.mod'
+    res = read_modelfit_results(path)
+    tab = read_nonmem_dataset(
+        testdata / 'nonmem' / 'pheno_real.tab',
+        ignore_character='@',
+        colnames=['ID', 'TIME', 'AMT', 'WGT', 'APGR', 'IPRED', 'PRED', 'TAD', 'CWRES', 'NPDE'],
+    )
+    parameters = {name: res.parameter_estimates[name] for name in linmod.parameters.names}
+    cwres = evaluate_conditional_weighted_residuals(
+        linmod, etas=res.individual_estimates, parameters=parameters
+    )
+    correct = tab.loc[tab['AMT'] == 0, 'CWRES'].to_numpy()
+    np.testing.assert_allclose(cwres.to_numpy(), correct, atol=2e-4)
+
+    # At eta=0 CWRES are the WRES
+    etas = res.individual_estimates * 0
+    cwres = evaluate_conditional_weighted_residuals(linmod, etas=etas, parameters=parameters)
+    wres = evaluate_weighted_residuals(linmod, parameters=parameters)
+    np.testing.assert_allclose(cwres.to_numpy(), wres.to_numpy())
+
+
+def _naive_npde(ids, dv, sims, decorrelate):
+    pde = np.empty(len(dv))
+    for i in np.unique(ids):
+        rows = np.flatnonzero(ids == i)
+        y = sims[rows]
+        e = y.mean(axis=1)
+        ysim = y - e[:, np.newaxis]
+        yobs = dv[rows] - e
+        if decorrelate:
+            L = np.linalg.cholesky(np.atleast_2d(np.cov(y)))
+            ysim = np.linalg.solve(L, ysim)
+            yobs = np.linalg.solve(L, yobs)
+        pde[rows] = (ysim < yobs[:, np.newaxis]).mean(axis=1)
+    k = sims.shape[1]
+    return stats.norm.ppf(np.clip(pde, 1 / (2 * k), 1 - 1 / (2 * k)))
+
+
+def test_evaluate_npde(load_model_for_test, testdata):
+    linmod = load_model_for_test(testdata / 'nonmem' / 'pheno_real_linbase.mod')
+    df = linmod.dataset
+    ids = df['ID'].to_numpy()
+    dv = df['DV'].to_numpy()
+    rng = np.random.default_rng(42)
+    eta = rng.normal(size=(len(np.unique(ids)), 200))[pd.factorize(ids)[0]]
+    sims = dv[:, np.newaxis] * (1 + 0.1 * eta + 0.05 * rng.normal(size=(len(dv), 200)))
+
+    npde = evaluate_npde(linmod, sims)
+    assert npde.name == 'NPDE'
+    np.testing.assert_allclose(npde.to_numpy(), _naive_npde(ids, dv, sims, True))
+
+    npd = evaluate_npd(linmod, pd.DataFrame(sims))
+    assert npd.name == 'NPD'
+    np.testing.assert_allclose(npd.to_numpy(), _naive_npde(ids, dv, sims, False))
+
+    with pytest.raises(ValueError):
+        evaluate_npde(linmod, sims[:10])
+
+
+def test_evaluate_npde_dose_records(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno.mod')
+    df = model.dataset
+    obs = (df['AMT'] == 0).to_numpy()
+    ids = df['ID'].to_numpy()
+    dv = df['DV'].to_numpy()
+    rng = np.random.default_rng(42)
+    eta = rng.normal(size=(len(np.unique(ids)), 200))[pd.factorize(ids)[0]]
+    sims = dv[:, np.newaxis] * (1 + 0.1 * eta + 0.05 * rng.normal(size=(len(dv), 200)))
+    assert (sims[~obs] == 0).all()
+
+    for func, decorrelate in ((evaluate_npde, True), (evaluate_npd, False)):
+        values = func(model, sims)
+        assert len(values) == len(df)
+        assert values[~obs].isna().all()
+        expected = _naive_npde(ids[obs], dv[obs], sims[obs], decorrelate)
+        np.testing.assert_allclose(values[obs].to_numpy(), expected)
+        np.testing.assert_allclose(func(model, sims[obs]).to_numpy(), values.to_numpy())
@@ -1,5 +1,6 @@
 import re
 import shutil
+from functools import partial
 from typing import Iterable
 
 import pytest
@@ -12,6 +13,7 @@ from pharmpy.modeling import (
     add_peripheral_compartment,
     find_clearance_parameters,
     find_volume_parameters,
+    fix_parameters,
     get_central_volume_and_clearance,
     get_initial_conditions,
     get_lag_times,
@@ -43,7 +45,12 @@ from pharmpy.modeling import (
     set_zero_order_input,
     unload_dataset,
 )
-from pharmpy.modeling.odes import CompartmentalSystem, CompartmentalSystemBuilder
+from pharmpy.modeling.odes import (
+    CompartmentalSystem,
+    CompartmentalSystemBuilder,
+    _ode_features,
+    get_structural_features,
+)
 
 
 def test_advan1(create_model_for_test):
@@ -2420,6 +2427,38 @@ def test_has_zero_order_absorption(load_model_for_test, pheno_path):
     assert has_zero_order_absorption(model)
 
 
+@pytest.mark.parametrize(
+    'transformations, expected',
+    [
+        ([], ('INST', 'FO', 0, False, False, 0)),
+        ([set_zero_order_absorption], ('ZO', 'FO', 0, False, False, 0)),
+        ([set_seq_zo_fo_absorption, add_lag_time], ('SEQ-ZO-FO', 'FO', 0, True, True, 0)),
+        ([partial(set_transit_compartments, n=3)], ('FO', 'FO', 3, False, False, 0)),
+        (
+            [set_zero_order_elimination, partial(set_peripheral_compartments, n=2)],
+            ('INST', 'ZO', 0, False, False, 2),
+        ),
+        ([set_mixed_mm_fo_elimination], ('INST', 'MIX-FO-MM', 0, False, False, 0)),
+    ],
+)
+def test_get_structural_features(load_model_for_test, pheno_path, transformations, expected):
+    model = load_model_for_test(pheno_path)
+    for transformation in transformations:
+        model = transformation(model)
+    features = get_structural_features(model)
+    keys = ('absorption', 'elimination', 'transits', 'depot', 'lagtime', 'peripherals')
+    assert tuple(features[key] for key in keys) == expected
+    assert model.statements in _ode_features
+
+
+def test_get_structural_features_parameters(load_model_for_test, pheno_path):
+    model = load_model_for_test(pheno_path)
+    model = set_michaelis_menten_elimination(model)
+    assert get_structural_features(model)['elimination'] == 'MM'
+    model = fix_parameters(model, ['POP_KM'])
+    assert get_structural_features(model)['elimination'] == 'ZO'
+
+
 def test_lag_on_nl_elim(load_model_for_test, testdata):
     model = load_model_for_test(testdata / 'nonmem' / 'models' / 'mox2.mod')
     model = set_zero_order_elimination(model)
@@ -1,11 +1,18 @@
 import os
+import sys
 from unittest import mock
 
 import pytest
 
 import pharmpy.config as config
 import pharmpy.tools.external.nonmem.config
+from pharmpy.internals.fs.cwd import chdir
+from pharmpy.modeling import read_model
+from pharmpy.tools.external.nonmem import run
+from pharmpy.tools.external.nonmem.monitor import Progress, create_policy
 from pharmpy.tools.external.nonmem.run import nmfe_path
+from pharmpy.tools.modelfit.tool import get_esttool_version
+from pharmpy.workflows import LocalDirectoryContext, ModelEntry
 
 
 @mock.patch.dict(os.environ, {"PATH": ""})
@@ -18,3 +25,85 @@ def test_nmfe_path():
     with config.ConfigurationContext(pharmpy.tools.external.nonmem.conf, default_nonmem_path=''):
         with pytest.raises(FileNotFoundError, match='Cannot find pharmpy.conf'):
             nmfe_path()
+
+
+def test_get_esttool_version_nonmem(tmp_path):
+    nmfe = tmp_path / 'nm751' / 'run' / 'nmfe75'
+    nmfe.parent.mkdir(parents=True)
+    nmfe.touch()
+    (tmp_path / 'nm').symlink_to(tmp_path / 'nm751', target_is_directory=True)
+    expected = ('nonmem', os.path.normcase(os.path.realpath(nmfe)))
+    for path in (tmp_path / 'nm751', tmp_path / 'nm'):
+        with config.ConfigurationContext(
+            pharmpy.tools.external.nonmem.conf, default_nonmem_path=path
+        ):
+            assert get_esttool_version('nonmem') == expected
+
+
+FAKE_NMFE = '''
+import shutil
+import sys
+import time
+from pathlib import Path
+
+results = Path(sys.argv[1])
+delay = float(sys.argv[2])
+with open('model.ext', 'w') as fh:
+    for line in results.with_suffix('.ext').read_text().splitlines(keepends=True):
+        fh.write(line)
+        fh.flush()
+        time.sleep(delay)
+for suffix in ('.lst', '.phi', '.cov', '.cor', '.coi'):
+    shutil.copy2(results.with_suffix(suffix), Path('model').with_suffix(suffix))
+'''
+
+
+def _execute_with_fake_nmfe(tmp_path, testdata, monkeypatch, delay, common_options):
+    script = tmp_path / 'nmfe.py'
+    script.write_text(FAKE_NMFE)
+    results = testdata / 'nonmem' / 'pheno_real'
+    monkeypatch.setattr(
+        run, 'nmfe', lambda *args: [sys.executable, str(script), str(results), str(delay)]
+    )
+    monkeypatch.setattr(run, 'PROGRESS_INTERVAL', 0.05)
+    model = read_model(testdata / 'nonmem' / 'pheno_real.mod')
+    context = LocalDirectoryContext('fit', tmp_path, common_options=common_options)
+    with chdir(tmp_path):
+        model_entry = run.execute_model(ModelEntry.create(model=model), context)
+    return model_entry, context
+
+
+def test_execute_model_progress(tmp_path, testdata, monkeypatch):
+    model_entry, context = _execute_with_fake_nmfe(tmp_path, testdata, monkeypatch, 0.001, None)
+    assert model_entry.modelfit_results.ofv == pytest.approx(586.27605628188053)
+    progress = context.retrieve_progress()
+    assert list(progress['model']) == ['pheno_real'] * 13
+    assert list(progress['iteration']) == list(range(13))
+    assert progress['ofv'].iloc[-1] == 586.27605628188053
+
+
+@pytest.mark.filterwarnings('ignore:Expected result files do not exist')
+def test_execute_model_early_stopping(tmp_path, testdata, monkeypatch):
+    early_stopping = {'delta': 0.5, 'iterations': 2, 'ofv': 585.0}
+    model_entry, context = _execute_with_fake_nmfe(
+        tmp_path, testdata, monkeypatch, 0.5, {'early_stopping': early_stopping}
+    )
+    res = model_entry.modelfit_results
+    assert not res.minimization_successful
+    message = res.log.errors.to_dataframe()['message'].iloc[-1]
+    assert message == (
+        'Run terminated early: OFV 586.7448857127 after 2 iterations is worse than 585.0 + 0.5'
+    )
+    assert list(context.retrieve_progress()['iteration']) == [0, 1, 2]
+    log = context.retrieve_log()
+    assert log['message'].str.contains('pheno_real: Run terminated early').any()
+
+
+def test_create_policy():
+    assert create_policy(None, 500.0) is None
+    assert create_policy({'delta': 10}, None) is None
+    policy = create_policy({'delta': 10, 'iterations': 1}, 500.0)
+    assert policy([Progress(1, 'FOCE', 0, 600.0)]) is None
+    assert policy([Progress(1, 'FOCE', 1, 505.0)]) is None
+    assert policy([Progress(1, 'FOCE', 1, 511.0)]).startswith('OFV 511.0 after 1 iterations')
+    assert create_policy({'delta': 10, 'ofv': 100}, 500.0).ofv == 100
@@ -9,7 +9,11 @@ from pharmpy.internals.fs.cwd import chdir
 from pharmpy.model import Parameter, Parameters
 from pharmpy.modeling import read_model
 from pharmpy.tools import read_modelfit_results
-from pharmpy.tools.external.nonmem.results import parse_modelfit_results, simfit_results
+from pharmpy.tools.external.nonmem.results import (
+    parse_modelfit_results,
+    parse_simulation_results,
+    simfit_results,
+)
 from pharmpy.workflows.results import read_results
 
 
@@ -171,6 +175,25 @@ def test_simfit(testdata, load_model_for_test):
     assert results[2].ofv == 570.73440114145342
 
 
+def test_simulation_results(tmp_path, testdata, load_model_for_test):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno_real.mod')
+    table = (testdata / 'nonmem' / 'sdtab1').read_text()
+    (tmp_path / 'sdtab1').write_text(table * 3)
+    dv = model.dataset['DV'].to_numpy()
+
+    res = parse_simulation_results(model, tmp_path / 'pheno_real.mod')
+    df = res.table
+    assert list(df.columns) == ['DV']
+    assert df.index.names == ['SIM', 'index']
+    assert len(df) == 3 * len(dv)
+    assert list(df.index.unique('SIM')) == [1, 2, 3]
+    assert np.array_equal(df.loc[2, 'DV'].to_numpy(), dv)
+
+    res = parse_simulation_results(model, tmp_path / 'pheno_real.mod', subproblem=3)
+    assert list(res.table.index.unique('SIM')) == [3]
+    assert len(res.table) == len(dv)
+
+
 def test_residuals(testdata):
     res = read_modelfit_results(testdata / 'nonmem' / 'pheno_real.mod')
     df = res.residuals
@@ -2,7 +2,14 @@ import pytest
 
 from pharmpy.deps import pandas as pd
 from pharmpy.internals.fs.cwd import chdir
-from pharmpy.model.external.nonmem.table import CovTable, ExtTable, NONMEMTableFile, PhiTable
+from pharmpy.model.external.nonmem.table import (
+    CovTable,
+    ExtTable,
+    ExtTableStream,
+    NONMEMTableFile,
+    PhiTable,
+    index_table_file,
+)
 
 
 def test_nonmem_table(pheno_ext):
@@ -120,3 +127,47 @@ def test_nonmemtablefile_notitle_github_issues_1251(tmp_path):
 
         assert tuple(df.columns) == ('ID', 'TIME', 'CWRES', 'CIPREDI', 'VC')
         assert len(df) == 2
+
+
+def test_ext_table_stream(tmp_path, pheno_ext):
+    lines = pheno_ext.read_text().splitlines(keepends=True)
+    path = tmp_path / 'run.ext'
+    stream = ExtTableStream(path)
+    assert stream.read() == []
+
+    with open(path, 'w') as fh:
+        fh.write(''.join(lines[:4]) + lines[4][:20])
+    rows = stream.read()
+    assert [row.iteration for row in rows] == [0, 1]
+    assert rows[0].table_number == 1
+    assert rows[0].method == 'First Order Conditional Estimation with Interaction'
+    assert rows[1].ofv == 586.90974697980869
+    assert rows[1].values['THETA(1)'] == 4.68001e-03
+
+    with open(path, 'a') as fh:
+        fh.write(lines[4][20:] + ''.join(lines[5:]))
+    rows = stream.read()
+    assert [row.iteration for row in rows][:3] == [2, 3, 4]
+    assert rows[-1].iteration == -1000000008
+    assert stream.read() == []
+
+
+def test_index_table_file(tmp_path, testdata):
+    ext = (testdata / 'nonmem' / 'modelfit_results' / 'simfit' / 'sim-1.ext').read_bytes()
+    path = tmp_path / 'run.ext'
+    path.write_bytes(ext)
+    locations = index_table_file(path)
+    assert len(locations) == 6
+    assert all(location.title.startswith('TABLE NO.') for location in locations)
+    assert locations[0].start == ext.index(b'\n') + 1
+    assert locations[-1].end == len(ext)
+    assert all(a.end < b.start for a, b in zip(locations[:-1], locations[1:]))
+
+    table_file = NONMEMTableFile(path)
+    assert [table.subproblem for table in table_file] == [1, 1, 2, 2, 3, 3]
+    assert table_file[3].final_ofv == 565.84904364342981
+
+    path.write_bytes(b'\n' + ext)
+    assert index_table_file(path)[0].title is None
+    with pytest.raises(ValueError, match='missing TABLE NO.'):
+        NONMEMTableFile(path)
@@ -1,5 +1,10 @@
+import pytest
+
+from pharmpy.deps import numpy as np
 from pharmpy.deps import pandas as pd
-from pharmpy.tools.bootstrap.results import calculate_results
+from pharmpy.tools.bootstrap.results import BootstrapAggregator, calculate_results
+from pharmpy.tools.bootstrap.tool import aggregate_fits, post_process_results, resample_model
+from pharmpy.workflows import LocalDirectoryContext
 from pharmpy.workflows.results import ModelfitResults, read_results
 
 
@@ -36,3 +41,109 @@ def test_bootstrap():
 
 def test_read_results(testdata):
     read_results(testdata / 'results/bootstrap_results.json')
+
+
+def test_resample_model(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno.mod')
+    df = model.dataset
+    resampled, included = resample_model(model, 'bs_1', 23)
+    assert resampled.name == 'bs_1'
+    assert len(included) == df['ID'].nunique()
+    assert len(set(included)) < len(included)
+    new_df = resampled.dataset
+    assert list(new_df['ID'].unique()) == list(range(1, len(included) + 1))
+    for new_id, orig_id in enumerate(included, start=1):
+        orig = df[df['ID'] == orig_id].drop(columns='ID').reset_index(drop=True)
+        new = new_df[new_df['ID'] == new_id].drop(columns='ID').reset_index(drop=True)
+        pd.testing.assert_frame_equal(orig, new)
+
+    _, included2 = resample_model(model, 'bs_1', 23)
+    assert included2 == included
+
+
+def test_aggregator():
+    names = ['TVCL', 'TVV']
+    iofv = pd.Series([10.0, 20.0, 30.0], index=[1, 2, 3])
+    orig = ModelfitResults(
+        ofv=60, parameter_estimates=pd.Series([1.0, 2.0], index=names), individual_ofv=iofv
+    )
+    fits = [
+        (50, [1.1, 2.2], [1, 1, 2]),
+        (52, [0.9, 1.8], [2, 3, 3]),
+        (55, [1.3, 2.1], [1, 2, 3]),
+        (49, [0.8, 2.4], [3, 3, 3]),
+        (51, [1.0, 1.9], [1, 1, 1]),
+    ]
+
+    aggregator = BootstrapAggregator(orig)
+    for ofv, pe, inc in fits:
+        aggregator.add(
+            ModelfitResults(ofv=ofv, parameter_estimates=pd.Series(pe, index=names)), inc
+        )
+    assert aggregator.n == 5
+
+    # Expected values from calculate_results before the aggregator was introduced
+    res = aggregator.results(plots=False)
+    expected = pd.DataFrame(
+        {
+            'mean': [1.02, 2.08],
+            'median': [1.0, 2.1],
+            'bias': [0.02, 0.08],
+            'stderr': [0.19235384061671346, 0.23874672772626646],
+            'RSE': [0.1885821966830524, 0.1147820806376281],
+        },
+        index=names,
+    )
+    pd.testing.assert_frame_equal(res.parameter_statistics, expected)
+    expected_cov = pd.DataFrame([[0.037, -0.0045], [-0.0045, 0.057]], index=names, columns=names)
+    pd.testing.assert_frame_equal(res.covariance_matrix, expected_cov)
+    assert list(res.parameter_distribution['2.5%']) == pytest.approx([0.81, 1.81])
+    assert list(res.parameter_distribution['97.5%']) == pytest.approx([1.28, 2.38])
+    ofvs = res.ofvs
+    assert list(ofvs['bootstrap_bootdata_ofv']) == [50, 52, 55, 49, 51]
+    assert list(ofvs['original_bootdata_ofv']) == [40, 80, 60, 90, 30]
+    assert list(ofvs['original_origdata_ofv']) == [60] * 5
+    assert list(ofvs['delta_bootdata']) == [-10, 28, 5, 41, -21]
+    assert ofvs['bootstrap_origdata_ofv'].isna().all()
+    assert ofvs['delta_origdata'].isna().all()
+
+    # A fit without results only adds a row of OFVs
+    copy = aggregator.copy()
+    copy.add(None, [1, 2, 3])
+    assert copy.n == 6
+    assert len(copy.parameter_estimates) == 5
+    res = copy.results(plots=False)
+    pd.testing.assert_frame_equal(res.parameter_statistics, expected)
+    assert np.isnan(res.ofvs['bootstrap_bootdata_ofv'][5])
+    assert res.ofvs['original_bootdata_ofv'][5] == 60
+    assert aggregator.n == 5
+
+    assert not aggregator.check_intervals(0.01)
+    assert aggregator.check_intervals(0.01)
+    copy = aggregator.copy()
+    copy.add(ModelfitResults(ofv=0, parameter_estimates=pd.Series([100.0, 100.0], index=names)))
+    assert not copy.check_intervals(0.01)
+
+
+def test_aggregator_no_estimates(tmp_path):
+    names = ['TVCL', 'TVV']
+    orig = ModelfitResults(ofv=60, parameter_estimates=pd.Series([1.0, 2.0], index=names))
+    ctx = LocalDirectoryContext('bootstrap', tmp_path)
+    aggregator = aggregate_fits(
+        ctx, 3, 0.01, BootstrapAggregator(orig), (None, [1, 2]), (ModelfitResults(), [2, 2])
+    )
+    assert aggregator.parameter_names is None
+    assert aggregator.n == 2
+    # Interim results
+    res = ctx.retrieve_results()
+    assert list(res.parameter_statistics.index) == names
+
+    res = post_process_results(ctx, aggregator)
+    assert list(res.parameter_estimates.columns) == names
+    assert len(res.parameter_estimates) == 0
+    assert res.parameter_statistics.isna().all().all()
+    assert res.ofvs['bootstrap_bootdata_ofv'].isna().all()
+    assert 'None of the bootstrap fits' in ctx.retrieve_log()['message'].iloc[-1]
+
+    res = BootstrapAggregator().results(plots=False)
+    assert res.parameter_estimates.empty
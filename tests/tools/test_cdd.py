@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 import numpy as np
 from pytest import approx
 
@@ -296,4 +298,44 @@ def test_cdd_calculate_results(load_model_for_test, testdata):
     )
 
 
+def _synthetic_cdd_results(n, nparams, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(1, n + 1)
+    iofv = pd.Series(rng.normal(10, 2, n), index=ids)
+    base = SimpleNamespace(individual_ofv=iofv, covariance_matrix=np.eye(nparams))
+    results = []
+    for i in ids:
+        a = rng.normal(size=(nparams, nparams))
+        cov = pd.DataFrame(a @ a.T / nparams + np.eye(nparams))
+        results.append(
+            SimpleNamespace(ofv=iofv.sum() - iofv[i] - rng.uniform(), covariance_matrix=cov)
+        )
+    results[3] = None
+    skipped = [[str(i)] for i in ids]
+    skipped[5] = ['6', '7', '100000']
+    return base, results, skipped
+
+
+def test_vectorized_case_statistics():
+    base, results, skipped = _synthetic_cdd_results(200, 4)
+    iofv = base.individual_ofv
+
+    dofv = cdd.compute_delta_ofv(base, results, skipped)
+    expected = [
+        (
+            np.nan
+            if res is None
+            else iofv.drop([int(i) for i in skip if int(i) in iofv.index]).sum() - res.ofv
+        )
+        for skip, res in zip(skipped, results)
+    ]
+    assert dofv == approx(expected, nan_ok=True)
+
+    ratios = cdd.compute_covariance_ratios(results, base.covariance_matrix)
+    expected = [
+        np.nan if res is None else np.sqrt(np.linalg.det(res.covariance_matrix)) for res in results
+    ]
+    assert ratios == approx(expected, nan_ok=True)
+
+
 # tox -e py38 -- pytest -s test_parameter.py
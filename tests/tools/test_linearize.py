@@ -4,16 +4,20 @@ import pytest
 
 from pharmpy.deps import pandas as pd
 from pharmpy.model import DataInfo
+from pharmpy.modeling import set_initial_estimates
 from pharmpy.tools import read_modelfit_results
 from pharmpy.tools.linearize.delinearize import delinearize_model
 from pharmpy.tools.linearize.results import calculate_results, psn_linearize_results
 from pharmpy.tools.linearize.tool import (
     _create_linearized_model,
     _create_linearized_model_statements,
+    cleanup_columns,
     create_derivative_model,
+    retrieve_or_create_derivative_table,
 )
 from pharmpy.tools.psn_helpers import create_results
-from pharmpy.workflows import ModelEntry
+from pharmpy.workflows import LocalDirectoryContext, ModelEntry
+from pharmpy.workflows.hashing import ModelHash
 
 
 def test_ofv(load_model_for_test, testdata):
@@ -200,3 +204,23 @@ def test_delinearize_model(load_model_for_test, testdata):
     assert (
         delinearized_model.parameters["IVV"].init == pm_delinearized_model.parameters["IIV_CL"].init
     )
+
+
+def test_derivative_table_reused(tmp_path, load_model_for_test, testdata):
+    path = testdata / "nonmem" / "linearize" / "linearize_dir1" / "scm_dir1" / "derivatives.mod"
+    derivative_model = load_model_for_test(path)
+    derivative_modelentry = ModelEntry.create(
+        model=derivative_model, modelfit_results=read_modelfit_results(path)
+    )
+    context = LocalDirectoryContext('linearize', tmp_path)
+
+    table = retrieve_or_create_derivative_table(context, derivative_modelentry)
+    pd.testing.assert_frame_equal(table, cleanup_columns(derivative_modelentry))
+
+    # NOTE: The table is taken from the context even without the fit
+    no_fit = ModelEntry.create(model=derivative_model)
+    pd.testing.assert_frame_equal(retrieve_or_create_derivative_table(context, no_fit), table)
+
+    # NOTE: Other estimates give another table
+    changed = set_initial_estimates(derivative_model, {'TVCL': 0.005})
+    assert context.retrieve_derivatives(ModelHash(changed)) is None
@@ -1,13 +1,16 @@
 import sys
+from pathlib import Path
 
 import pytest
 
+from pharmpy.deps import numpy as np
 from pharmpy.modeling import load_example_model
 from pharmpy.tools import (
     load_example_modelfit_results,
     predict_influential_individuals,
     predict_outliers,
 )
+from pharmpy.tools.funcs import ml
 
 tflite_condition = (
     sys.version_info >= (3, 12)
@@ -33,3 +36,24 @@ def test_predict_influential_individuals():
     res = predict_influential_individuals(model, results)
     assert len(res) == 59
     assert res['dofv'][59] == pytest.approx(0.08806940913200378)
+
+
+def test_predict_backends(monkeypatch):
+    model = load_example_model('pheno')
+    results = load_example_modelfit_results('pheno')
+    data = ml._create_dataset(model, results)
+    model_path = Path(ml.__file__).parent / 'ml_models' / 'outliers.tflite'
+
+    output = ml._predict(model_path, data, backend='numpy')
+    assert output.shape == (59,)
+    assert output[0] == pytest.approx(-0.28144291043281555)
+    assert ml._get_predictor(str(model_path), 'numpy') is ml._get_predictor(
+        str(model_path), 'numpy'
+    )
+
+    pytest.importorskip('tflite_runtime')
+    monkeypatch.setattr(ml, 'CHUNK_SIZE', 7)
+    predictor = ml._TFLitePredictor(str(model_path))
+    tflite_output = predictor(data.to_numpy(dtype=np.float32))
+    assert np.allclose(tflite_output, output, rtol=1e-5)
+    assert np.array_equal(predictor(data.to_numpy(dtype=np.float32)[:3]), tflite_output[:3])
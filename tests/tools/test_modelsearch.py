@@ -11,10 +11,11 @@ from pharmpy.modeling import (
     set_zero_order_elimination,
 )
 from pharmpy.tools import read_modelfit_results
-from pharmpy.tools.mfl.helpers import funcs, modelsearch_features
+from pharmpy.tools.mfl.helpers import all_combinations, funcs, modelsearch_features
 from pharmpy.tools.mfl.parse import parse
 from pharmpy.tools.mfl.parse import parse as mfl_parse
 from pharmpy.tools.modelsearch.algorithms import (
+    CandidateLattice,
     _add_iiv_to_func,
     _is_allowed,
     exhaustive,
@@ -230,6 +231,27 @@ def test_is_allowed():
     assert _is_allowed(feat_current, func_current, feat_previous, features)
 
 
+def test_candidate_lattice():
+    features = parse(
+        'ABSORPTION([FO,ZO,SEQ-ZO-FO]);LAGTIME(ON);TRANSITS([0,1,3],*);PERIPHERALS([0,1,2])'
+    )
+    features = funcs(Model(), features, modelsearch_features)
+    lattice = CandidateLattice(features)
+    for combo in [()] + list(all_combinations(features)):
+        expected = tuple(
+            feat for feat, func in features.items() if _is_allowed(feat, func, combo, features)
+        )
+        assert lattice.transitions(frozenset(combo)) == expected
+
+    assert ('PERIPHERALS', 0) in lattice.transitions(frozenset())
+    assert ('PERIPHERALS', 2) not in lattice.transitions(frozenset())
+    assert ('PERIPHERALS', 2) in lattice.transitions(frozenset({('PERIPHERALS', 1)}))
+    assert lattice.transitions(frozenset({('ABSORPTION', 'ZO')})) == (
+        ('PERIPHERALS', 0),
+        ('LAGTIME', 'ON'),
+    )
+
+
 @pytest.mark.parametrize(
     'transform_funcs, no_of_added_etas',
     [
@@ -3,12 +3,25 @@ from dataclasses import replace
 
 import pytest
 
+from pharmpy.deps import numpy as np
+from pharmpy.deps.scipy import stats
 from pharmpy.internals.fs.cwd import chdir
 from pharmpy.modeling import remove_parameter_uncertainty_step, transform_blq
 from pharmpy.tools import read_modelfit_results
+from pharmpy.tools.external.native.run import create_modelfit_results
 from pharmpy.tools.ruvsearch.results import psn_resmod_results
-from pharmpy.tools.ruvsearch.tool import _create_dataset, create_workflow, validate_input
+from pharmpy.tools.ruvsearch.tool import (
+    _create_base_model,
+    _create_combined_model,
+    _create_dataset,
+    _create_iiv_on_ruv_model,
+    _create_power_model,
+    _create_time_varying_model,
+    create_workflow,
+    validate_input,
+)
 from pharmpy.workflows import ModelEntry, Workflow
+from pharmpy.workflows.results import read_results
 
 
 def test_filter_dataset(load_model_for_test, testdata):
@@ -165,6 +178,12 @@ def test_create_dataset(load_model_for_test, testdata, tmp_path):
             TypeError,
             'Invalid `model`',
         ),
+        (
+            None,
+            dict(resmod_esttool='psn'),
+            TypeError,
+            'Invalid `resmod_esttool`',
+        ),
     ],
 )
 def test_validate_input_raises(
@@ -183,6 +202,7 @@ def test_validate_input_raises(
         validate_input(**kwargs)
 
     validate_input(None, skip=['IIV_on_RUV', 'power'])
+    validate_input(None, resmod_esttool=None)
 
 
 def test_validate_input_raises_modelfit_results(load_model_for_test, testdata):
@@ -220,3 +240,74 @@ def test_validate_input_raises_ipred(load_model_for_test, testdata):
 
     with pytest.raises(ValueError, match="IPRED"):
         validate_input(model=model, results=modelfit_results)
+
+
+def _marginal_ofv(df, theta, omega, variances):
+    # -2 log-likelihood without the constant of y_i ~ N(theta, omega + diag(variances))
+    ofv = 0.0
+    for _, group in df.assign(R=variances).groupby('ID', sort=False):
+        cov = omega * np.ones((len(group), len(group))) + np.diag(group['R'])
+        logpdf = stats.multivariate_normal(np.full(len(group), theta), cov).logpdf(group['DV'])
+        ofv += -2 * logpdf - len(group) * np.log(2 * np.pi)
+    return ofv
+
+
+def test_resmod_native(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'ruvsearch' / 'mox3.mod')
+    res = read_modelfit_results(testdata / 'nonmem' / 'ruvsearch' / 'mox3.mod')
+    base = _create_base_model(ModelEntry.create(model, modelfit_results=res), 1, None)
+    df = base.model.dataset
+
+    base_res = create_modelfit_results(base.model)
+    pe = base_res.parameter_estimates
+    expected = _marginal_ofv(df, pe['theta'], pe['omega'], np.full(len(df), pe['sigma']))
+    assert base_res.minimization_successful
+    assert base_res.ofv == pytest.approx(expected, abs=1e-6)
+
+    tvar = _create_time_varying_model(base, groups=4, i=2, current_iteration=1, dv=None).model
+    tvar_res = create_modelfit_results(tvar)
+    pe = tvar_res.parameter_estimates
+    cutoff = df['TAD'].quantile(q=0.5)
+    variances = pe['sigma'] * np.where(df['TAD'] < cutoff, pe['time_varying'] ** 2, 1.0)
+    assert tvar_res.ofv == pytest.approx(_marginal_ofv(df, pe['theta'], pe['omega'], variances))
+
+    # The candidate models are nested in the base model
+    for entry in (
+        _create_iiv_on_ruv_model(base, 1, None),
+        _create_power_model(base, 1, None),
+        _create_combined_model(base, 1),
+    ):
+        candidate_res = create_modelfit_results(entry.model)
+        assert candidate_res.minimization_successful
+        assert candidate_res.ofv <= base_res.ofv + 1e-6
+
+
+def test_resmod_native_vs_nonmem(load_model_for_test, testdata):
+    # The first iteration of a ruvsearch run on mox3 with the CWRES models estimated by NONMEM
+    model = load_model_for_test(testdata / 'nonmem' / 'ruvsearch' / 'mox3.mod')
+    res = read_modelfit_results(testdata / 'nonmem' / 'ruvsearch' / 'mox3.mod')
+    nonmem = read_results(testdata / 'results' / 'ruvsearch_results.json').cwres_models
+    nonmem = nonmem.xs((1, 1), level=['dvid', 'iteration'])
+
+    base = _create_base_model(ModelEntry.create(model, modelfit_results=res), 1, None)
+    entries = {
+        'IIV_on_RUV': _create_iiv_on_ruv_model(base, 1, None),
+        'power': _create_power_model(base, 1, None),
+        'combined': _create_combined_model(base, 1),
+    }
+    for i in range(1, 4):
+        entries[f'time_varying{i}'] = _create_time_varying_model(
+            base, groups=4, i=i, current_iteration=1, dv=None
+        )
+
+    base_ofv = create_modelfit_results(base.model).ofv
+    for name, entry in entries.items():
+        candidate_res = create_modelfit_results(entry.model)
+        assert base_ofv - candidate_res.ofv == pytest.approx(nonmem.loc[name, 'dofv'], abs=1e-5)
+        # NOTE: The estimates from NONMEM are rounded
+        for param, value in nonmem.loc[name, 'parameters'].items():
+            param = {'omega': 'IIV_RUV1', 'theta': 'time_varying'}.get(param, param)
+            if name == 'power':
+                param = 'power1'
+            estimate = candidate_res.parameter_estimates[param]
+            assert estimate == pytest.approx(value, rel=5e-3, abs=1e-4)
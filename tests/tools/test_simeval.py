@@ -1,7 +1,61 @@
-from pharmpy.tools.simeval.results import psn_simeval_results
+import numpy as np
+import pandas as pd
+import pytest
+
+from pharmpy.tools.simeval.results import IndividualOFVAggregator, psn_simeval_results
 
 
 def test_psn_simeval_results(testdata):
     res = psn_simeval_results(testdata / 'psn' / 'simeval_dir1')
     assert len(res.sampled_iofv) == 59
     assert len(res.iofv_summary) == 59
+    assert list(res.sampled_iofv.columns) == list(range(1, res.sampled_iofv.shape[1] + 1))
+
+
+def test_individual_ofv_aggregator():
+    rng = np.random.default_rng(42)
+    index = pd.Index([1, 2, 3, 4], name='ID')
+    samples = [pd.Series(rng.normal(10, 2, 4), index=index) for _ in range(40)]
+    samples[3] = samples[3].drop(2)
+    samples[7] = None
+
+    aggregator = IndividualOFVAggregator(index)
+    for iofv in samples:
+        aggregator.add(iofv)
+
+    expected = pd.concat(
+        [iofv if iofv is not None else pd.Series(np.nan, index=index) for iofv in samples],
+        axis=1,
+        keys=range(1, 41),
+    )
+    pd.testing.assert_frame_equal(aggregator.sampled_iofv, expected, rtol=1e-6)
+    pd.testing.assert_series_equal(aggregator.mean(), expected.T.mean(), check_names=False)
+    pd.testing.assert_series_equal(aggregator.std(), expected.T.std(), check_names=False)
+    pd.testing.assert_series_equal(
+        aggregator.quantile(0.25), expected.T.quantile(0.25), rtol=1e-6, check_names=False
+    )
+
+    summary = aggregator.summary(pd.Series([10.0, 30.0, 10.0, 10.0], index=index))
+    assert summary['residual_outlier'].tolist() == [False, True, False, False]
+
+
+def test_individual_ofv_aggregator_interim():
+    index = pd.Index([1, 2])
+    aggregator = IndividualOFVAggregator(index)
+    assert np.isnan(aggregator.mean()).all()
+    aggregator.add(pd.Series([1.0, 2.0], index=index))
+    assert aggregator.mean().tolist() == [1.0, 2.0]
+    assert np.isnan(aggregator.std()).all()
+    aggregator.add(pd.Series([3.0, 2.0], index=index))
+    assert aggregator.std().tolist() == pytest.approx([np.sqrt(2), 0.0])
+
+
+def test_individual_ofv_aggregator_precision():
+    index = pd.Index([1])
+    aggregator = IndividualOFVAggregator(index)
+    aggregator.add(pd.Series([1234.56789012345], index=index))
+    # The running moments are kept in float64 and the samples in float32
+    assert aggregator.mean().iloc[0] == 1234.56789012345
+    assert aggregator._samples.dtype == np.float32
+    assert aggregator.sampled_iofv.dtypes.tolist() == ['float64']
+    assert aggregator.quantile(0.5).iloc[0] == pytest.approx(1234.56789012345, rel=1e-6)
@@ -1,4 +1,5 @@
 import sys
+from functools import lru_cache
 
 import numpy as np
 import pytest
@@ -10,6 +11,7 @@ from pharmpy.tools import (
     summarize_individuals,
     summarize_individuals_count_table,
 )
+from pharmpy.tools.funcs import ml
 from pharmpy.tools.funcs.summarize_individuals import dofv
 from pharmpy.workflows.results import ModelfitResults
 
@@ -53,10 +55,11 @@ def test_tflite_not_installed(pheno_path, monkeypatch):
     df = summarize_individuals([model], [results])
     assert not df['predicted_dofv'].isnull().any().any()
 
-    with pytest.warns(UserWarning, match='tflite is not installed'):
-        monkeypatch.setitem(sys.modules, 'tflite_runtime', None)
-        df = summarize_individuals([model], [results])
-        assert df['predicted_dofv'].isnull().all().all()
+    # NOTE: Predictions fall back to numpy
+    monkeypatch.setitem(sys.modules, 'tflite_runtime', None)
+    monkeypatch.setattr(ml, '_get_predictor', lru_cache()(ml._get_predictor.__wrapped__))
+    df_numpy = summarize_individuals([model], [results])
+    assert np.allclose(df_numpy['predicted_dofv'], df['predicted_dofv'], rtol=1e-5)
 
 
 def test_dofv_parent_model_is_none(pheno_path):
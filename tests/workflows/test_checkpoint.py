@@ -0,0 +1,136 @@
+import threading
+import warnings
+
+import pytest
+
+import pharmpy.tools.modelsearch.tool as modelsearch_tool
+from pharmpy.config import ConfigurationContext
+from pharmpy.internals.fs.cwd import chdir
+from pharmpy.tools import run_tool
+from pharmpy.workflows import LocalDirectoryContext, Task, Workflow, WorkflowBuilder, conf
+from pharmpy.workflows.checkpoint import Checkpointer, dumps, loads
+from pharmpy.workflows.execute import execute_workflow
+
+_calls = []
+_crash = []
+
+
+def _source(x):
+    _calls.append('t1')
+    return [x] * 3
+
+
+def _double(lst):
+    _calls.append('t2')
+    return lst * 2
+
+
+def _total(lst):
+    _calls.append('t3')
+    if _crash:
+        raise RuntimeError('crash')
+    return sum(lst)
+
+
+def _workflow(x):
+    t1 = Task('t1', _source, x)
+    t2 = Task('t2', _double)
+    t3 = Task('t3', _total)
+    wb = WorkflowBuilder(tasks=[t1], name='checkpointed')
+    wb.add_task(t2, predecessors=[t1])
+    wb.add_task(t3, predecessors=[t2])
+    return Workflow(wb)
+
+
+def test_checkpointer_keys(load_model_for_test, pheno_path):
+    model = load_model_for_test(pheno_path)
+    checkpointer = Checkpointer()
+    task = Task('t', _source, model, {'a', 'b'})
+    key = checkpointer.key(task, ())
+    assert key == checkpointer.key(Task('t', _source, model.replace(), {'b', 'a'}), ())
+    assert key != checkpointer.key(Task('t', _source, model, {'a', 'b'}), ('x',))
+    assert key != checkpointer.key(Task('t', _double, model, {'a', 'b'}), ())
+    assert key != checkpointer.key(Task('t', _source, model.replace(name='x'), {'a', 'b'}), ())
+    df = model.dataset.copy()
+    df.loc[0, 'WGT'] = 1.0
+    assert key != checkpointer.key(Task('t', _source, model.replace(dataset=df), {'a', 'b'}), ())
+    assert checkpointer.key(Task('t', _source, lambda: None), ()) is not None
+    assert checkpointer.key(Task('t', _source, threading.Lock()), ()) is None
+    checkpointer.close()
+
+    assert loads(dumps(model)).dataset.equals(model.dataset)
+
+
+def test_execute_workflow_resume(tmp_path):
+    _calls.clear()
+    _crash.append(True)
+    with chdir(tmp_path), warnings.catch_warnings():
+        warnings.filterwarnings(
+            "ignore",
+            message=".*creating scratch directories is taking a surprisingly long time",
+            category=UserWarning,
+        )
+        with ConfigurationContext(conf, checkpoints=True):
+            with pytest.raises(RuntimeError):
+                execute_workflow(_workflow(2))
+        assert _calls == ['t1', 't2', 't3']
+
+        _calls.clear()
+        _crash.clear()
+        res = execute_workflow(_workflow(2), resume=True)
+        assert res == 12
+        assert _calls == ['t3']
+
+        _calls.clear()
+        res = execute_workflow(_workflow(2), resume=True)
+        assert res == 12
+        assert _calls == []
+
+        _calls.clear()
+        res = execute_workflow(_workflow(3), resume=True)
+        assert res == 18
+        assert _calls == ['t1', 't2', 't3']
+
+    ctx = LocalDirectoryContext('checkpointed', tmp_path)
+    manifest = ctx.retrieve_checkpoint_manifest()
+    assert list(manifest.columns) == ['path', 'task', 'key', 'time', 'replayed']
+    assert list(manifest['task'][~manifest['replayed']]) == ['t1', 't2', 't3', 't1', 't2', 't3']
+    assert list(manifest['task'][manifest['replayed']]) == ['t2', 't3']
+
+
+def test_resume_dummy_tool(tmp_path, load_model_for_test, testdata, monkeypatch):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno.mod')
+    post_process = modelsearch_tool.post_process
+
+    def crash(*args):
+        raise RuntimeError('crash')
+
+    def run(resume):
+        return run_tool(
+            'modelsearch',
+            'ABSORPTION([FO,ZO]);PERIPHERALS([0,1])',
+            'exhaustive',
+            model=model,
+            esttool='dummy',
+            path='ms',
+            resume=resume,
+        )
+
+    with chdir(tmp_path), ConfigurationContext(conf, checkpoints=True):
+        monkeypatch.setattr(modelsearch_tool, 'post_process', crash)
+        with pytest.raises(RuntimeError):
+            run(False)
+        ctx = LocalDirectoryContext('ms', tmp_path)
+        stored = ctx.retrieve_checkpoint_manifest()
+        assert not stored['replayed'].any()
+        fits = stored['task'].str.startswith('run').sum()
+        assert fits >= 4
+
+        monkeypatch.setattr(modelsearch_tool, 'post_process', post_process)
+        res = run(True)
+        assert len(res.summary_tool) == 4
+
+    manifest = ctx.retrieve_checkpoint_manifest()
+    replayed = manifest[manifest['replayed']]
+    assert replayed['task'].str.startswith('run').sum() == fits
+    assert set(replayed['key']) <= set(stored['key'])
@@ -1,7 +1,15 @@
+import gc
+
 import pytest
 
-from pharmpy.tools import load_example_modelfit_results
-from pharmpy.workflows import LocalDirectoryContext
+import pharmpy
+from pharmpy.config import ConfigurationContext
+from pharmpy.deps import pandas as pd
+from pharmpy.modeling import set_name
+from pharmpy.tools import fit, load_example_modelfit_results
+from pharmpy.workflows import LocalDirectoryContext, conf
+from pharmpy.workflows.context import index
+from pharmpy.workflows.context.index import AnnotationsIndex
 from pharmpy.workflows.hashing import ModelHash
 from pharmpy.workflows.model_entry import ModelEntry
 from pharmpy.workflows.results import read_results
@@ -15,6 +23,8 @@ def test_init(tmp_path):
     assert (ctx.path / 'log.csv').is_file()
     assert (ctx.path / 'annotations').is_file()
     assert ctx.context_path == 'mycontext'
+    for name in ('progress.csv', 'fit_cache.csv', 'checkpoints.csv', 'trace.json'):
+        assert not (ctx.path / name).exists()
 
     subctx = ctx.create_subcontext("mysubcontext")
     assert (subctx.path / 'models').is_dir()
@@ -135,3 +145,144 @@ def test_key(tmp_path, load_example_model_for_test):
     assert name == "pheno"
     annotation = ctx.retrieve_annotation("pheno")
     assert annotation.startswith("PHENOBARB")
+
+
+def test_annotations_appended(tmp_path):
+    ctx = LocalDirectoryContext(name='mycontext', ref=tmp_path)
+    ctx.store_annotation('run1', 'first')
+    ctx.store_annotation('run2', 'with spaces in it')
+    ctx.store_annotation('run1', 'second')
+    assert ctx.retrieve_annotation('run1') == 'second'
+    assert ctx.retrieve_annotation('run2') == 'with spaces in it'
+    assert (ctx.path / 'annotations').read_text() == 'run1 second\nrun2 with spaces in it\n'
+    with pytest.raises(KeyError):
+        ctx.retrieve_annotation('run3')
+
+    # NOTE: A new context object sees the same annotations
+    ctx = LocalDirectoryContext(name='mycontext', ref=tmp_path)
+    assert ctx.retrieve_annotation('run1') == 'second'
+
+    for i in range(300):
+        ctx.store_annotation('run1', f'update {i}')
+    assert ctx.retrieve_annotation('run1') == 'update 299'
+    assert ctx.retrieve_annotation('run2') == 'with spaces in it'
+    assert len((ctx.path / 'annotations').read_text().splitlines()) == 2
+
+
+def test_files_created_on_first_write(tmp_path):
+    ctx = LocalDirectoryContext(name='mycontext', ref=tmp_path)
+    assert ctx.retrieve_progress().empty
+    manifest = ctx.retrieve_checkpoint_manifest()
+    assert manifest.empty
+    assert list(manifest.columns) == ['path', 'task', 'key', 'time', 'replayed']
+    assert ctx.retrieve_fit_cache_summary().empty
+    assert not (ctx.path / 'checkpoints.csv').exists()
+
+    ctx.store_checkpoint('task', 'abc', b'data')
+    ctx.log_progress('run1', 1, 10.0)
+    with open(ctx.path / 'checkpoints.csv') as fh:
+        assert fh.readline() == 'path,task,key,time,replayed\n'
+    assert len(ctx.retrieve_checkpoint_manifest()) == 1
+    assert ctx.retrieve_progress()['ofv'].tolist() == [10.0]
+
+
+def test_indexes_released_with_contexts(tmp_path):
+    ctx = LocalDirectoryContext(name='mycontext', ref=tmp_path)
+    ctx.store_annotation('run1', 'first')
+    other = LocalDirectoryContext(name='mycontext', ref=tmp_path)
+    assert other.retrieve_annotation('run1') == 'first'
+    key = (AnnotationsIndex, ctx.path / 'annotations')
+    assert key in index._indexes
+
+    del ctx
+    assert key in index._indexes
+    del other
+    gc.collect()
+    assert key not in index._indexes
+
+
+def test_log_appended_from_other_context_objects(tmp_path):
+    ctx = LocalDirectoryContext(name='mycontext', ref=tmp_path)
+    subctx = ctx.create_subcontext('sub')
+    ctx.log_message('info', 'top')
+    assert len(ctx.retrieve_log()) == 1
+    other = LocalDirectoryContext(name='mycontext', ref=tmp_path).get_subcontext('sub')
+    other.log_message('info', 'multi\nline')
+    ctx.log_message('info', 'top again')
+    df = subctx.retrieve_log(level='current')
+    assert tuple(df['message']) == ('multi\nline',)
+    df = ctx.retrieve_log()
+    assert tuple(df['message']) == ('top', 'multi\nline', 'top again')
+
+
+def test_progress(tmp_path):
+    ctx = LocalDirectoryContext(name='mycontext', ref=tmp_path)
+    sub = ctx.create_subcontext('sub')
+    assert ctx.retrieve_best_progress_ofv('run1', 'data1') is None
+    ctx.log_progress('run1', 0, 120.0, 'data1')
+    ctx.log_progress('run1', 1, 100.0, 'data1')
+    ctx.log_progress('run2', 0, 90.0, 'data2')
+    sub.log_progress('run3', 0, 80.0, 'data1')
+    ctx.log_progress('run4', 0, float('nan'), 'data1')
+    assert ctx.retrieve_best_progress_ofv('run4', 'data1') == 100.0
+    assert ctx.retrieve_best_progress_ofv('run1', 'data1') is None
+    assert ctx.retrieve_best_progress_ofv('run1', 'data2') == 90.0
+    assert sub.retrieve_best_progress_ofv('run1', 'data1') == 80.0
+
+    df = ctx.retrieve_progress()
+    assert tuple(df['model']) == ('run1', 'run1', 'run2', 'run3', 'run4')
+    assert tuple(df['iteration']) == (0, 1, 0, 0, 0)
+    assert df['ofv'].dtype == 'float64'
+    assert tuple(sub.retrieve_progress(level='current')['model']) == ('run3',)
+    assert len(ctx.retrieve_progress(level='current')) == 4
+
+    # NOTE: A new context object sees the same progress
+    other = LocalDirectoryContext(name='mycontext', ref=tmp_path)
+    other.log_progress('run2', 1, 50.0, 'data1')
+    assert ctx.retrieve_best_progress_ofv('run1', 'data1') == 50.0
+
+
+def test_fit_cache(tmp_path, load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno.mod')
+    key = ModelHash(model)
+
+    with ConfigurationContext(conf, fit_cache=tmp_path / 'cache'):
+        res1 = fit(model, esttool='dummy', path=tmp_path / 'first')
+        ctx = LocalDirectoryContext('first', tmp_path)
+        summary = ctx.retrieve_fit_cache_summary()
+        assert summary.loc['first', 'misses'] == 1
+        assert summary.loc['first', 'hits'] == 0
+        assert (tmp_path / 'cache').is_dir()
+
+        res2 = fit(set_name(model, 'copy'), esttool='dummy', path=tmp_path / 'second')
+        assert res2.ofv == res1.ofv
+        ctx2 = LocalDirectoryContext('second', tmp_path)
+        summary = ctx2.retrieve_fit_cache_summary()
+        assert summary.loc['second', 'hits'] == 1
+        assert summary.loc['second', 'misses'] == 0
+        assert ctx2.retrieve_fit(model, key, 'dummy', pharmpy.__version__) is not None
+        assert ctx2.retrieve_fit(model, key, 'native', pharmpy.__version__) is None
+        assert ctx2.retrieve_fit(model, key, 'dummy', '0.1.0') is None
+        assert ctx2._shared_fit_cache() is ctx2._shared_fit_cache()
+
+    # Identical candidates in one batch are only fitted once
+    fit([model, set_name(model, 'copy')], esttool='dummy', path=tmp_path / 'third')
+    summary = LocalDirectoryContext('third', tmp_path).retrieve_fit_cache_summary()
+    assert summary.loc['third', 'hits'] == 1
+    assert summary.loc['third', 'misses'] == 1
+
+
+def test_derivatives(tmp_path, load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno.mod')
+    key = ModelHash(model)
+    ctx = LocalDirectoryContext('mycontext', tmp_path)
+    assert ctx.retrieve_derivatives(key) is None
+
+    df = pd.DataFrame({'ID': [1, 1, 2], 'D_ETA_1': [0.1, 0.2, 0.3], 'OPRED': [1.0, 2.0, 3.0]})
+    ctx.store_derivatives(key, df)
+    sub = ctx.create_subcontext('sub')
+    pd.testing.assert_frame_equal(sub.retrieve_derivatives(key), df)
+
+    other = ModelHash(set_name(model, 'other').replace(dataset=model.dataset.iloc[:-1]))
+    ctx.store_derivatives(other, df.assign(NAME='x'))
+    assert ctx.retrieve_derivatives(other) is None
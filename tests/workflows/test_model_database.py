@@ -2,12 +2,13 @@ import json
 import os
 import os.path
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 
 from pharmpy.internals.fs.cwd import chdir
-from pharmpy.modeling import add_time_after_dose
+from pharmpy.modeling import add_time_after_dose, set_initial_estimates
 from pharmpy.tools import read_modelfit_results
 from pharmpy.workflows import (
     LocalDirectoryDatabase,
@@ -136,3 +137,62 @@ def test_store_and_retrieve_model_entry(tmp_path, load_model_for_test, testdata)
 
         assert model_entry_retrieve.model == model
         assert model_entry_retrieve.modelfit_results.ofv == modelfit_results.ofv
+
+
+def test_store_model_concurrently(tmp_path, load_model_for_test, testdata):
+    with chdir(tmp_path):
+        shutil.copy(testdata / 'nonmem' / 'pheno_real.mod', 'pheno_real.mod')
+        shutil.copy(testdata / 'nonmem' / 'pheno.dta', 'pheno.dta')
+        model = load_model_for_test("pheno_real.mod")
+        df = model.dataset
+
+        n = 24
+        ndatasets = 4
+        models = []
+        for i in range(n):
+            dataset = df.assign(WGT=df['WGT'] + i % ndatasets)
+            models.append(
+                set_initial_estimates(model, {'PTVCL': 0.001 + i * 1e-5}).replace(
+                    name=f'run{i}', dataset=dataset
+                )
+            )
+
+        db = LocalModelDirectoryDatabase("database")
+
+        def store(m):
+            db.store_model(m)
+            with db.transaction(m) as txn:
+                txn.store_local_file('pheno_real.mod', 'copy.mod')
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(store, models))
+
+        datasets = sorted(p.name for p in Path('database/.datasets').glob('data*.csv'))
+        assert datasets == [f'data{i}.csv' for i in range(1, ndatasets + 1)]
+
+        # NOTE: A new database instance reads the index from the catalog
+        db = LocalModelDirectoryDatabase("database")
+        dataset_ids = set()
+        for m in models:
+            key = str(ModelHash(m))
+            dataset_ids.add(db.catalog.dataset_id(str(ModelHash(m).dataset_hash)))
+            assert (Path('database') / key / 'copy.mod').is_file()
+            assert not (Path('database') / key / '.pharmpy' / 'PENDING').exists()
+            assert db.retrieve_model(m).dataset['WGT'].iloc[0] == m.dataset['WGT'].iloc[0]
+        assert dataset_ids == set(range(1, ndatasets + 1))
+
+
+def test_import_dataset_index(tmp_path, load_model_for_test, testdata):
+    with chdir(tmp_path):
+        shutil.copy(testdata / 'nonmem' / 'pheno_real.mod', 'pheno_real.mod')
+        shutil.copy(testdata / 'nonmem' / 'pheno.dta', 'pheno.dta')
+        model = load_model_for_test("pheno_real.mod")
+        db = LocalModelDirectoryDatabase("database")
+        db.store_model(model)
+
+        # NOTE: Databases created by older versions have no catalog
+        os.remove('database/.catalog')
+        db = LocalModelDirectoryDatabase("database")
+        assert db.catalog.dataset_id(str(ModelHash(model).dataset_hash)) == 1
+        db.store_model(add_time_after_dose(model).replace(name='run2'))
+        assert Path('database/.datasets/data2.csv').is_file()
@@ -0,0 +1,49 @@
+from operator import add
+
+from pharmpy.internals.shm import get_active_store
+from pharmpy.modeling import set_name
+from pharmpy.workflows import Task, Workflow, WorkflowBuilder
+from pharmpy.workflows.pool import add_batch_tasks, get_number_of_workers, map_in_processes
+
+
+def test_get_number_of_workers():
+    assert get_number_of_workers() == 1
+
+
+def test_map_in_processes_serial():
+    assert map_in_processes(add, [(1, 2), (3, 4), (5, 6)], workers=1) == [3, 7, 11]
+    assert map_in_processes(add, [], workers=2) == []
+
+
+def test_map_in_processes(load_model_for_test, testdata):
+    model = load_model_for_test(testdata / 'nonmem' / 'pheno.mod')
+    names = ['run1', 'run2', 'run3']
+    models = map_in_processes(set_name, [(model, name) for name in names], workers=2)
+    assert [m.name for m in models] == names
+    for m in models:
+        assert m.statements == model.statements
+        # The dataset was handed over through shared memory both ways
+        assert m.dataset is model.dataset
+    assert get_active_store() is None
+
+
+def test_add_batch_tasks():
+    wb = WorkflowBuilder()
+    start = Task('start', lambda: 10)
+    wb.add_task(start)
+    tasks = add_batch_tasks(wb, ['a', 'b'], add, [(1,), (2,)], predecessors=start)
+    wf = Workflow(wb)
+
+    assert [task.name for task in tasks] == ['a', 'b']
+    assert len(wf) == 4
+    batch = wf.get_predecessors(tasks[0])[0]
+    assert batch.name == 'batch'
+    assert wf.get_predecessors(tasks[1]) == [batch]
+    assert wf.get_predecessors(batch) == [start]
+
+    results = batch.function(*batch.task_input, 10)
+    assert results == [11, 12]
+    assert [task.function(*task.task_input, results) for task in tasks] == [11, 12]
+
+    assert add_batch_tasks(wb, [], add, []) == []
+    assert len(Workflow(wb)) == 4
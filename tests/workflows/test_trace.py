@@ -0,0 +1,72 @@
+import time
+import warnings
+
+import pytest
+
+from pharmpy.config import ConfigurationContext
+from pharmpy.internals.fs.cwd import chdir
+from pharmpy.workflows import LocalDirectoryContext, Task, Workflow, WorkflowBuilder, conf
+from pharmpy.workflows.execute import execute_workflow
+from pharmpy.workflows.trace import Tracer, current_tracer, external_process, summarize_trace
+
+
+def _run_external():
+    with external_process():
+        time.sleep(0.05)
+    return [1.0] * 100
+
+
+def test_tracer():
+    t1 = Task('t1', _run_external)
+    t2 = Task('t2', len)
+    wb = WorkflowBuilder(tasks=[t1])
+    wb.add_task(t2, predecessors=[t1])
+    tracer = Tracer(profile_tasks=['t*2'])
+    wf = tracer.instrument(Workflow(wb))
+    (t1,) = wf.input_tasks
+    (t2,) = wf.output_tasks
+    assert current_tracer() is None
+
+    res = t1.function()
+    time.sleep(0.02)
+    assert t2.function(res) == 100
+
+    span1, span2 = tracer.spans
+    assert span1.name == 't1'
+    assert span1.external >= 0.05
+    assert span1.python == pytest.approx(span1.wall - span1.external)
+    assert span1.output_size > span1.input_size
+    assert span2.queue_wait >= 0.02
+    assert span2.input_size > span1.output_size
+    assert list(tracer.profiles) == ['t2-0']
+
+    trace = tracer.to_chrome_trace()
+    assert [event['name'] for event in trace['traceEvents']] == ['t1', 't2']
+    assert trace['traceEvents'][0]['dur'] == pytest.approx(span1.wall * 1e6)
+    summary = summarize_trace(trace)
+    assert list(summary.index) == ['t1', 't2']
+    assert summary.loc['t1', 'count'] == 1
+    assert summary.loc['t1', 'external'] == pytest.approx(span1.external)
+
+
+def test_execute_workflow_trace(tmp_path):
+    t1 = Task('t1', _run_external)
+    t2 = Task('t2', len)
+    wb = WorkflowBuilder(tasks=[t1], name='traced')
+    wb.add_task(t2, predecessors=[t1])
+    wf = Workflow(wb)
+
+    with chdir(tmp_path), warnings.catch_warnings():
+        warnings.filterwarnings(
+            "ignore",
+            message=".*creating scratch directories is taking a surprisingly long time",
+            category=UserWarning,
+        )
+        with ConfigurationContext(conf, trace=True, profile_tasks=['t2']):
+            res = execute_workflow(wf)
+
+    assert res == 100
+    ctx = LocalDirectoryContext('traced', tmp_path)
+    trace = ctx.retrieve_trace()
+    assert sorted(event['name'] for event in trace['traceEvents']) == ['t1', 't2']
+    assert (ctx.path / 'profiles' / 't2-0.prof').is_file()